@@ -0,0 +1,50 @@
+"""add call rollups
+
+Revision ID: 5c2e8a4f1b37
+Revises: 3a1f7c2d9e10
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5c2e8a4f1b37"
+down_revision: Union[str, None] = "3a1f7c2d9e10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create call_rollups. Populate it with scripts/backfill_call_rollups.py after upgrading."""
+    op.create_table(
+        "call_rollups",
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("assistant_id", sa.String(length=64), nullable=False),
+        sa.Column("hour_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("call_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("failed_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_sum", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("duration_sq_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("cost_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sentiment_sum", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("sentiment_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("tenant_id", "assistant_id", "hour_start"),
+    )
+    op.create_index(
+        "ix_call_rollups_tenant_hour",
+        "call_rollups",
+        ["tenant_id", "hour_start"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_call_rollups_tenant_hour", table_name="call_rollups")
+    op.drop_table("call_rollups")
@@ -0,0 +1,38 @@
+"""add calls keyset pagination index
+
+Revision ID: 7d4b1e9c3a52
+Revises: 5c2e8a4f1b37
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7d4b1e9c3a52"
+down_revision: Union[str, None] = "5c2e8a4f1b37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Built CONCURRENTLY so the calls table stays writable during the upgrade."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_calls_tenant_started_at_id",
+            "calls",
+            ["tenant_id", sa.text("started_at DESC"), "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_calls_tenant_started_at_id",
+            table_name="calls",
+            postgresql_concurrently=True,
+        )
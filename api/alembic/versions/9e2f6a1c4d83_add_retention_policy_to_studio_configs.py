@@ -0,0 +1,44 @@
+"""add retention policy to studio configs
+
+Revision ID: 9e2f6a1c4d83
+Revises: 7d4b1e9c3a52
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9e2f6a1c4d83"
+down_revision: Union[str, None] = "7d4b1e9c3a52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "studio_configs",
+        sa.Column(
+            "transcript_retention_hours",
+            sa.Integer(),
+            nullable=True,
+            comment="Hours before call transcripts are scrubbed",
+        ),
+    )
+    op.add_column(
+        "studio_configs",
+        sa.Column(
+            "call_retention_days",
+            sa.Integer(),
+            nullable=True,
+            comment="Days before call records are deleted",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("studio_configs", "call_retention_days")
+    op.drop_column("studio_configs", "transcript_retention_hours")
@@ -0,0 +1,44 @@
+"""add call summary digest mode to studio configs
+
+Revision ID: a6d3f9c2e815
+Revises: f3b8d2a6c417
+Create Date: 2026-10-17 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6d3f9c2e815"
+down_revision: Union[str, None] = "f3b8d2a6c417"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "studio_configs",
+        sa.Column(
+            "summary_digest_mode",
+            sa.String(length=16),
+            server_default="immediate",
+            nullable=False,
+        ),
+    )
+    op.add_column(
+        "studio_configs",
+        sa.Column(
+            "summary_digest_sent_until",
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment="End of the last digest window queued",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("studio_configs", "summary_digest_sent_until")
+    op.drop_column("studio_configs", "summary_digest_mode")
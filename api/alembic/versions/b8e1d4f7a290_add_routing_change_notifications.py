@@ -0,0 +1,89 @@
+"""notify routing changes on users, studio_configs and phone_numbers
+
+Revision ID: b8e1d4f7a290
+Revises: a6d3f9c2e815
+Create Date: 2026-10-17 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b8e1d4f7a290"
+down_revision: Union[str, None] = "a6d3f9c2e815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, key column sent in the payload, columns whose updates change routing)
+ROUTING_TRIGGERS = (
+    ("users", "id", "id, twilio_phone_number"),
+    ("studio_configs", "user_id", "user_id, vapi_assistant_id"),
+    ("phone_numbers", "e164", "e164, org_id, routing"),
+)
+
+
+def upgrade() -> None:
+    """
+    Publish ``{"table": ..., "key": ...}`` on the ``ava_routing`` channel when a
+    row affecting webhook routing changes (see application/services/routing_index.py).
+
+    Updates only fire for the routing columns, so logins and settings edits stay quiet.
+    A changed key notifies both the old and the new value.
+    """
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notify_routing_change() RETURNS trigger AS $$
+        DECLARE
+            old_key text;
+            new_key text;
+        BEGIN
+            IF TG_OP <> 'INSERT' THEN
+                old_key := to_jsonb(OLD) ->> TG_ARGV[0];
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                new_key := to_jsonb(NEW) ->> TG_ARGV[0];
+            END IF;
+            IF old_key IS NOT NULL AND old_key IS DISTINCT FROM new_key THEN
+                PERFORM pg_notify('ava_routing', json_build_object('table', TG_TABLE_NAME, 'key', old_key)::text);
+            END IF;
+            IF new_key IS NOT NULL THEN
+                PERFORM pg_notify('ava_routing', json_build_object('table', TG_TABLE_NAME, 'key', new_key)::text);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table, key_column, routing_columns in ROUTING_TRIGGERS:
+        # phone_numbers has no creating migration yet; skip its trigger where the table is missing.
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('{table}') IS NOT NULL THEN
+                    CREATE TRIGGER {table}_routing_notify
+                    AFTER INSERT OR DELETE OR UPDATE OF {routing_columns} ON {table}
+                    FOR EACH ROW EXECUTE FUNCTION notify_routing_change('{key_column}');
+                END IF;
+            END
+            $$
+            """
+        )
+
+
+def downgrade() -> None:
+    for table, _, _ in ROUTING_TRIGGERS:
+        op.execute(
+            f"""
+            DO $$
+            BEGIN
+                IF to_regclass('{table}') IS NOT NULL THEN
+                    DROP TRIGGER IF EXISTS {table}_routing_notify ON {table};
+                END IF;
+            END
+            $$
+            """
+        )
+    op.execute("DROP FUNCTION IF EXISTS notify_routing_change()")
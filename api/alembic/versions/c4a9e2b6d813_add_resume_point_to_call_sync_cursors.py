@@ -0,0 +1,28 @@
+"""add a resume point to call sync cursors
+
+Revision ID: c4a9e2b6d813
+Revises: b8e1d4f7a290
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e2b6d813"
+down_revision: Union[str, None] = "b8e1d4f7a290"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("call_sync_cursors", sa.Column("resume_created_before", sa.String(length=64), nullable=True))
+    op.add_column("call_sync_cursors", sa.Column("resume_updated_at", sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("call_sync_cursors", "resume_updated_at")
+    op.drop_column("call_sync_cursors", "resume_created_before")
@@ -0,0 +1,32 @@
+"""add webhook event idempotency keys
+
+Revision ID: c8a3f5d1e274
+Revises: b41d7e2a9f06
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c8a3f5d1e274"
+down_revision: Union[str, None] = "b41d7e2a9f06"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("webhook_events", sa.Column("event_key", sa.String(length=128), nullable=True))
+    op.create_unique_constraint(
+        "uq_webhook_events_source_type_key",
+        "webhook_events",
+        ["source", "event_type", "event_key"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_webhook_events_source_type_key", "webhook_events", type_="unique")
+    op.drop_column("webhook_events", "event_key")
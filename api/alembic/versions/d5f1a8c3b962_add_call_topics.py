@@ -0,0 +1,44 @@
+"""add call topics
+
+Revision ID: d5f1a8c3b962
+Revises: c8a3f5d1e274
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d5f1a8c3b962"
+down_revision: Union[str, None] = "c8a3f5d1e274"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create call_topics. Populate it with scripts/backfill_call_topics.py after upgrading."""
+    op.create_table(
+        "call_topics",
+        sa.Column("call_id", sa.String(length=64), nullable=False),
+        sa.Column("term", sa.String(length=64), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="1"),
+        sa.ForeignKeyConstraint(["call_id"], ["calls.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("call_id", "term"),
+    )
+    op.create_index(
+        "ix_call_topics_tenant_day_term",
+        "call_topics",
+        ["tenant_id", "day", "term"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_call_topics_tenant_day_term", table_name="call_topics")
+    op.drop_table("call_topics")
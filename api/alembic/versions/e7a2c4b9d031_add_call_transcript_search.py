@@ -0,0 +1,77 @@
+"""add call transcript search
+
+Revision ID: e7a2c4b9d031
+Revises: d5f1a8c3b962
+Create Date: 2026-10-17 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e7a2c4b9d031"
+down_revision: Union[str, None] = "d5f1a8c3b962"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add calls.search_config and the generated calls.search_vector with its GIN index.
+
+    Adding a stored generated column rewrites ``calls`` under an exclusive lock;
+    run it in a quiet window on large tables. The index is then built concurrently.
+    """
+    op.add_column(
+        "calls",
+        sa.Column("search_config", postgresql.REGCONFIG(), nullable=False, server_default="simple"),
+    )
+    # Existing calls take their tenant's studio config language (see call_search_repository.SEARCH_CONFIGS).
+    op.execute(
+        """
+        UPDATE calls AS c
+        SET search_config = (
+            CASE split_part(lower(s.language), '-', 1)
+                WHEN 'en' THEN 'english'
+                WHEN 'fr' THEN 'french'
+                WHEN 'es' THEN 'spanish'
+                WHEN 'de' THEN 'german'
+                WHEN 'it' THEN 'italian'
+                WHEN 'pt' THEN 'portuguese'
+                WHEN 'nl' THEN 'dutch'
+                ELSE 'simple'
+            END
+        )::regconfig
+        FROM studio_configs AS s
+        WHERE s.user_id = c.tenant_id::text AND c.transcript IS NOT NULL
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE calls ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (to_tsvector(search_config, coalesce(transcript, ''))) STORED
+        """
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_calls_search_vector",
+            "calls",
+            ["search_vector"],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_calls_search_vector",
+            table_name="calls",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("calls", "search_vector")
+    op.drop_column("calls", "search_config")
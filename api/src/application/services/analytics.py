@@ -1,5 +1,5 @@
 """
-Analytics service orchestrating Vapi data with local persistence.
+Analytics service computing dashboard metrics from locally synced calls.
 """
 
 from __future__ import annotations
@@ -7,152 +7,217 @@ from __future__ import annotations
 from collections import Counter, defaultdict
 from datetime import datetime, timedelta, timezone
 from math import sqrt
-from statistics import mean
-from typing import Any, Dict, Iterable, List, Optional, Sequence
-from uuid import UUID
+from typing import Any, Dict, List, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.src.infrastructure.external.vapi_client import VapiClient
-from api.src.infrastructure.persistence.models.call import CallRecord
-from api.src.infrastructure.persistence.repositories.call_repository import (
-    get_calls_in_range,
-    get_recent_calls,
-    upsert_calls,
+from api.src.application.services.call_sync import (
+    _normalize_tenant_id,
+    _now,
+    synchronise_calls_from_vapi,
+)
+from api.src.core.settings import get_settings
+from api.src.domain.services.topic_extraction import extract_terms
+from api.src.infrastructure.persistence.repositories.call_analytics_repository import (
+    ANOMALY_STATUSES,
+    HourlyCallBucket,
+    get_anomaly_candidates,
+    get_hourly_call_buckets,
+    get_hourly_rollup_buckets,
+    get_recent_calls_with_sentiment,
+    get_topic_sources,
+)
+from api.src.infrastructure.persistence.repositories.call_topic_repository import (
+    get_tenant_language,
+    get_trending_terms,
 )
 
 SECONDS_IN_MINUTE = 60
-STOPWORDS = {
-    "the",
-    "and",
-    "you",
-    "est",
-    "que",
-    "pour",
-    "avec",
-    "from",
-    "your",
-    "nous",
-    "this",
-    "that",
-    "have",
-    "call",
-    "bonjour",
-    "hello",
-    "merci",
-    "please",
-    "avez",
-    "dans",
-    "will",
-    "just",
-    "been",
-    "could",
-    "would",
-}
-
-
-def _now() -> datetime:
-    return datetime.now(tz=timezone.utc)
-
-
-def _parse_datetime(value: Any) -> datetime:
-    if isinstance(value, str):
-        try:
-            return datetime.fromisoformat(value.replace("Z", "+00:00"))
-        except ValueError:
-            pass
-    return _now()
-
-
-def _normalize_tenant_id(value):
-    if isinstance(value, UUID):
-        return value
-    if isinstance(value, str):
-        try:
-            return UUID(value)
-        except ValueError:
-            return value
-    return value
-
-
-def _as_call_record(raw: dict[str, Any], tenant_id) -> CallRecord:
-    started_at = _parse_datetime(raw.get("startedAt"))
-    ended_at = _parse_datetime(raw.get("endedAt")) if raw.get("endedAt") else None
-    record = CallRecord(
-        id=str(raw.get("id")),
-        assistant_id=str(raw.get("assistantId", "")),
-        tenant_id=_normalize_tenant_id(tenant_id),
-        customer_number=str(raw.get("customer", {}).get("number", "")) if isinstance(raw.get("customer"), dict) else None,
-        status=str(raw.get("status", "unknown")),
-        started_at=started_at,
-        ended_at=ended_at,
-        duration_seconds=_safe_int(raw.get("durationSeconds")),
-        cost=_safe_float(raw.get("cost")),
-        meta=raw,  # Fixed: was 'metadata', should be 'meta'
-        transcript=_extract_transcript(raw),
-    )
-    return record
 
 
-def _safe_int(value: Any) -> int | None:
-    try:
-        return int(value)
-    except (TypeError, ValueError):
-        return None
+async def compute_dashboard(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    lookback_days: int = 14,
+    overview_days: int = 7,
+    topics_limit: int = 12,
+    anomalies_limit: int = 20,
+    recent_limit: int = 20,
+) -> Dict[str, Any]:
+    """
+    Compute every dashboard aggregate from a single grouped scan of the call window.
 
+    One ``GROUP BY`` hour query feeds the overview, time series, heatmap and the
+    anomaly duration statistics; anomalies, topics and recent calls then only
+    read the few columns they need.
+    """
 
-def _safe_float(value: Any) -> float | None:
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
+    end = _now()
+    start = end - timedelta(days=max(lookback_days, overview_days))
+    overview_start = end - timedelta(days=overview_days)
+    tenant_key = _normalize_tenant_id(tenant_id)
 
+    buckets = await _hourly_buckets(
+        session,
+        tenant_id=tenant_key,
+        start=start,
+        end=end,
+        overview_start=overview_start,
+    )
 
-def _extract_transcript(raw: dict[str, Any]) -> Optional[str]:
-    transcript = raw.get("transcript")
-    if isinstance(transcript, str):
-        return transcript
-    if isinstance(transcript, dict):
-        return transcript.get("text")
-    return None
+    return {
+        "overview": _overview_from_buckets(
+            [bucket for bucket in buckets if bucket.in_overview], start=overview_start, end=end
+        ),
+        "series": _time_series_from_buckets(buckets, start=start, end=end),
+        "heatmap": _heatmap_from_buckets(buckets),
+        "anomalies": await _anomalies_from_buckets(
+            session, buckets, tenant_id=tenant_key, start=start, end=end, limit=anomalies_limit
+        ),
+        "topics": await compute_trending_topics(
+            session, tenant_id=tenant_key, lookback_days=lookback_days, limit=topics_limit
+        ),
+        "calls": await recent_calls_with_transcripts(session, tenant_id=tenant_key, limit=recent_limit),
+    }
 
 
-async def synchronise_calls_from_vapi(
+async def compute_overview_metrics(
     session: AsyncSession,
     *,
     tenant_id,
-    vapi_client: VapiClient,
-    limit: int = 100,
-) -> Sequence[CallRecord]:
-    """Fetch latest calls from Vapi and persist them locally."""
+    lookback_days: int = 7,
+) -> Dict[str, Any]:
+    """Return aggregated analytics metrics for the given tenant."""
 
+    end = _now()
+    start = end - timedelta(days=lookback_days)
     tenant_key = _normalize_tenant_id(tenant_id)
-    raw_calls = await vapi_client.list_calls(limit=limit)
-    records = [_as_call_record(raw, tenant_key) for raw in raw_calls if raw.get("id")]
-    await upsert_calls(session, records)
-    return records
+    buckets = await _hourly_buckets(session, tenant_id=tenant_key, start=start, end=end)
+    return _overview_from_buckets(buckets, start=start, end=end)
 
 
-async def compute_overview_metrics(
+async def compute_time_series(
     session: AsyncSession,
     *,
     tenant_id,
-    lookback_days: int = 7,
-) -> Dict[str, Any]:
-    """Return aggregated analytics metrics for the given tenant."""
-
+    lookback_days: int = 14,
+) -> Sequence[Dict[str, Any]]:
     end = _now()
     start = end - timedelta(days=lookback_days)
     tenant_key = _normalize_tenant_id(tenant_id)
-    calls = await get_calls_in_range(session, tenant_id=tenant_key, start=start, end=end)
+    buckets = await _hourly_buckets(session, tenant_id=tenant_key, start=start, end=end)
+    return _time_series_from_buckets(buckets, start=start, end=end)
+
+
+async def compute_trending_topics(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    lookback_days: int = 14,
+    limit: int = 12,
+) -> Sequence[Dict[str, Any]]:
+    """
+    Most frequent topic terms over the last ``lookback_days``.
+
+    Reads the ``call_topics`` index filled at ingest (whole UTC days). With
+    ``analytics_use_topic_index`` off, terms are extracted from the raw calls.
+    """
+
+    end = _now()
+    start = end - timedelta(days=lookback_days)
+
+    if get_settings().analytics_use_topic_index:
+        most_common = await get_trending_terms(session, tenant_id=tenant_id, since=start.date(), limit=limit)
+    else:
+        most_common = await _trending_terms_from_calls(session, tenant_id=tenant_id, start=start, end=end, limit=limit)
+
+    if not most_common:
+        return []
+
+    max_count = most_common[0][1]
+    return [
+        {
+            "label": label,
+            "count": count,
+            "weight": round(count / max_count, 2),
+            "callId": call_id,
+        }
+        for label, count, call_id in most_common
+    ]
+
+
+async def _trending_terms_from_calls(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    limit: int,
+) -> List[tuple[str, int, str]]:
+    sources = await get_topic_sources(session, tenant_id=tenant_id, start=start, end=end)
+    language = await get_tenant_language(session, tenant_id)
+
+    counter: Counter[str] = Counter()
+    samples: Dict[str, str] = {}
+    for call_id, transcript, *metadata_topics in sources:
+        terms = extract_terms(transcript, *metadata_topics, language=language)
+        counter.update(terms)
+        for term in terms:
+            samples.setdefault(term, call_id)
+    return [(label, count, samples[label]) for label, count in counter.most_common(limit)]
+
+
+async def detect_anomalies(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    lookback_days: int = 14,
+    limit: int = 20,
+) -> Sequence[Dict[str, Any]]:
+    end = _now()
+    start = end - timedelta(days=lookback_days)
+    buckets = await _hourly_buckets(session, tenant_id=tenant_id, start=start, end=end)
+    return await _anomalies_from_buckets(
+        session, buckets, tenant_id=tenant_id, start=start, end=end, limit=limit
+    )
+
+
+async def compute_activity_heatmap(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    lookback_days: int = 14,
+) -> Sequence[Dict[str, Any]]:
+    end = _now()
+    start = end - timedelta(days=lookback_days)
+    buckets = await _hourly_buckets(session, tenant_id=tenant_id, start=start, end=end)
+    return _heatmap_from_buckets(buckets)
+
+
+async def _hourly_buckets(session: AsyncSession, **kwargs: Any) -> Sequence[HourlyCallBucket]:
+    """Read hourly buckets from ``call_rollups`` or, when disabled, straight from ``calls``."""
 
-    total_calls = len(calls)
-    active_now = sum(1 for call in calls if call.status in {"in-progress", "ringing", "queued"})
-    durations = [call.duration_seconds for call in calls if call.duration_seconds]
-    avg_duration = mean(durations) if durations else 0
-    satisfaction_scores = _collect_satisfaction_scores(calls)
-    avg_satisfaction = mean(satisfaction_scores) if satisfaction_scores else 0.95
-    total_cost = sum(call.cost or 0 for call in calls)
+    if get_settings().analytics_use_rollups:
+        return await get_hourly_rollup_buckets(session, **kwargs)
+    return await get_hourly_call_buckets(session, **kwargs)
+
+
+def _overview_from_buckets(
+    buckets: Sequence[HourlyCallBucket],
+    *,
+    start: datetime,
+    end: datetime,
+) -> Dict[str, Any]:
+    total_calls = sum(bucket.total for bucket in buckets)
+    active_now = sum(bucket.active for bucket in buckets)
+    duration_sum = sum(bucket.duration_sum for bucket in buckets)
+    duration_count = sum(bucket.duration_count for bucket in buckets)
+    sentiment_sum = sum(bucket.sentiment_sum for bucket in buckets)
+    sentiment_count = sum(bucket.sentiment_count for bucket in buckets)
+    avg_duration = duration_sum / duration_count if duration_count else 0
+    avg_satisfaction = sentiment_sum / sentiment_count if sentiment_count else 0.95
+    total_cost = sum(bucket.cost_sum for bucket in buckets)
 
     return {
         "totalCalls": total_calls,
@@ -167,37 +232,17 @@ async def compute_overview_metrics(
     }
 
 
-async def compute_time_series(
-    session: AsyncSession,
+def _time_series_from_buckets(
+    buckets: Sequence[HourlyCallBucket],
     *,
-    tenant_id,
-    lookback_days: int = 14,
+    start: datetime,
+    end: datetime,
 ) -> Sequence[Dict[str, Any]]:
-    end = _now()
-    start = end - timedelta(days=lookback_days)
-    tenant_key = _normalize_tenant_id(tenant_id)
-    calls = await get_calls_in_range(session, tenant_id=tenant_key, start=start, end=end)
-
-    day_buckets: Dict[datetime, Dict[str, Any]] = defaultdict(
-        lambda: {
-            "totalCalls": 0,
-            "durationSeconds": 0,
-            "failed": 0,
-            "sentiments": [],
-        }
-    )
-
-    for call in calls:
-        day = call.started_at.astimezone(timezone.utc).date()
-        bucket_key = datetime.combine(day, datetime.min.time(), tzinfo=timezone.utc)
-        bucket = day_buckets[bucket_key]
-        bucket["totalCalls"] += 1
-        bucket["durationSeconds"] += call.duration_seconds or 0
-        if call.status.lower() in {"failed", "no-answer", "error", "abandoned"}:
-            bucket["failed"] += 1
-        sentiment = _extract_sentiment(call)
-        if sentiment is not None:
-            bucket["sentiments"].append(sentiment)
+    day_buckets: Dict[datetime, HourlyCallBucket] = {}
+    for bucket in buckets:
+        day = datetime.combine(bucket.hour.date(), datetime.min.time(), tzinfo=timezone.utc)
+        day_bucket = day_buckets.setdefault(day, HourlyCallBucket(hour=day))
+        day_bucket.merge(bucket)
 
     series: List[Dict[str, Any]] = []
     cursor = datetime.combine(start.date(), datetime.min.time(), tzinfo=timezone.utc)
@@ -205,11 +250,13 @@ async def compute_time_series(
 
     while cursor <= end_cursor:
         bucket = day_buckets.get(cursor)
-        if bucket:
-            total_calls = bucket["totalCalls"]
-            avg_duration = (bucket["durationSeconds"] / total_calls) if total_calls else 0
-            avg_sentiment = mean(bucket["sentiments"]) if bucket["sentiments"] else None
-            failed_rate = (bucket["failed"] / total_calls) if total_calls else 0
+        if bucket and bucket.total:
+            total_calls = bucket.total
+            avg_duration = bucket.duration_sum / total_calls
+            avg_sentiment = (
+                bucket.sentiment_sum / bucket.sentiment_count if bucket.sentiment_count else None
+            )
+            failed_rate = bucket.failed / total_calls
         else:
             total_calls = 0
             avg_duration = 0
@@ -230,65 +277,61 @@ async def compute_time_series(
     return series
 
 
-async def compute_trending_topics(
-    session: AsyncSession,
-    *,
-    tenant_id,
-    lookback_days: int = 14,
-    limit: int = 12,
-) -> Sequence[Dict[str, Any]]:
-    end = _now()
-    start = end - timedelta(days=lookback_days)
-    calls = await get_calls_in_range(session, tenant_id=tenant_id, start=start, end=end)
-
-    counter: Counter[str] = Counter()
-    samples: Dict[str, str] = {}
-
-    for call in calls:
-        for topic in _extract_topics(call):
-            normalized = topic.lower()
-            if not normalized or normalized in STOPWORDS:
-                continue
-            counter[normalized] += 1
-            samples.setdefault(normalized, call.id)
+def _heatmap_from_buckets(buckets: Sequence[HourlyCallBucket]) -> Sequence[Dict[str, Any]]:
+    heatmap: Dict[tuple[int, int], int] = defaultdict(int)
+    for bucket in buckets:
+        weekday = bucket.hour.weekday()  # Monday = 0
+        heatmap[(weekday, bucket.hour.hour)] += bucket.total
 
-    if not counter:
+    if not heatmap:
         return []
 
-    most_common = counter.most_common(limit)
-    max_count = most_common[0][1]
-    topics = [
+    max_value = max(heatmap.values()) or 1
+    return [
         {
-            "label": label,
+            "weekday": day,
+            "hour": hour,
             "count": count,
-            "weight": round(count / max_count, 2),
-            "callId": samples.get(label),
+            "intensity": round(count / max_value, 2),
         }
-        for label, count in most_common
+        for (day, hour), count in sorted(heatmap.items())
     ]
 
-    return topics
 
+def _long_duration_threshold(buckets: Sequence[HourlyCallBucket]) -> float:
+    """Mean + 2 standard deviations of non-zero durations, never below 15 minutes."""
 
-async def detect_anomalies(
+    count = sum(bucket.duration_count for bucket in buckets)
+    if not count:
+        return 15 * 60
+    mean_duration = sum(bucket.duration_sum for bucket in buckets) / count
+    variance = max(sum(bucket.duration_sq_sum for bucket in buckets) / count - mean_duration**2, 0.0)
+    return max(mean_duration + 2 * sqrt(variance), 15 * 60)
+
+
+async def _anomalies_from_buckets(
     session: AsyncSession,
+    buckets: Sequence[HourlyCallBucket],
     *,
     tenant_id,
-    lookback_days: int = 14,
-    limit: int = 20,
+    start: datetime,
+    end: datetime,
+    limit: int,
 ) -> Sequence[Dict[str, Any]]:
-    end = _now()
-    start = end - timedelta(days=lookback_days)
-    calls = await get_calls_in_range(session, tenant_id=tenant_id, start=start, end=end)
-
-    durations = [call.duration_seconds for call in calls if call.duration_seconds]
-    mean_duration = mean(durations) if durations else 0
-    variance = mean([(duration - mean_duration) ** 2 for duration in durations]) if durations else 0
-    std_dev = sqrt(variance)
-    long_threshold = max(mean_duration + 2 * std_dev, 15 * 60) if durations else 15 * 60
+    long_threshold = _long_duration_threshold(buckets)
+    # Every candidate yields at least one anomaly, so the newest ``limit`` candidates
+    # are enough to produce the newest ``limit`` anomalies.
+    candidates = await get_anomaly_candidates(
+        session,
+        tenant_id=tenant_id,
+        start=start,
+        end=end,
+        long_duration_threshold=long_threshold,
+        limit=limit,
+    )
 
     anomalies: List[Dict[str, Any]] = []
-    for call in calls:
+    for call in candidates:
         if call.duration_seconds and call.duration_seconds >= long_threshold:
             anomalies.append(
                 {
@@ -300,7 +343,7 @@ async def detect_anomalies(
                     "assistantId": call.assistant_id,
                 }
             )
-        if call.status.lower() in {"failed", "error", "no-answer"}:
+        if call.status.lower() in ANOMALY_STATUSES:
             anomalies.append(
                 {
                     "callId": call.id,
@@ -311,8 +354,7 @@ async def detect_anomalies(
                     "assistantId": call.assistant_id,
                 }
             )
-        sentiment = _extract_sentiment(call)
-        if sentiment is not None and sentiment < 0.2:
+        if call.sentiment is not None and call.sentiment < 0.2:
             anomalies.append(
                 {
                     "callId": call.id,
@@ -328,38 +370,6 @@ async def detect_anomalies(
     return anomalies[:limit]
 
 
-async def compute_activity_heatmap(
-    session: AsyncSession,
-    *,
-    tenant_id,
-    lookback_days: int = 14,
-) -> Sequence[Dict[str, Any]]:
-    end = _now()
-    start = end - timedelta(days=lookback_days)
-    calls = await get_calls_in_range(session, tenant_id=tenant_id, start=start, end=end)
-
-    heatmap: Dict[tuple[int, int], int] = defaultdict(int)
-    for call in calls:
-        dt = call.started_at.astimezone(timezone.utc)
-        weekday = dt.weekday()  # Monday = 0
-        hour = dt.hour
-        heatmap[(weekday, hour)] += 1
-
-    if not heatmap:
-        return []
-
-    max_value = max(heatmap.values()) or 1
-    return [
-        {
-            "weekday": day,
-            "hour": hour,
-            "count": count,
-            "intensity": round(count / max_value, 2),
-        }
-        for (day, hour), count in sorted(heatmap.items())
-    ]
-
-
 async def recent_calls_with_transcripts(
     session: AsyncSession,
     *,
@@ -368,7 +378,7 @@ async def recent_calls_with_transcripts(
 ) -> Sequence[dict]:
     """Return recent calls, enriched with transcripts."""
 
-    calls = await get_recent_calls(session, tenant_id=tenant_id, limit=limit)
+    calls = await get_recent_calls_with_sentiment(session, tenant_id=tenant_id, limit=limit)
     return [
         {
             "id": call.id,
@@ -380,30 +390,12 @@ async def recent_calls_with_transcripts(
             "cost": call.cost,
             "customerNumber": call.customer_number,
             "transcript": call.transcript,
-            "sentiment": _extract_sentiment(call),
+            "sentiment": call.sentiment,
         }
         for call in calls
     ]
 
 
-def _collect_satisfaction_scores(calls: Sequence[CallRecord]) -> list[float]:
-    scores: list[float] = []
-    for call in calls:
-        satisfaction = None
-        if isinstance(call.meta, dict):
-            analytics = call.meta.get("analytics")
-            if isinstance(analytics, dict):
-                satisfaction = analytics.get("sentimentScore") or analytics.get("customerSatisfaction")
-        if satisfaction is None and call.meta.get("sentimentScore") if isinstance(call.meta, dict) else None:
-            satisfaction = call.meta["sentimentScore"]
-        if satisfaction is not None:
-            try:
-                scores.append(float(satisfaction))
-            except (TypeError, ValueError):
-                continue
-    return scores
-
-
 def _format_duration(value: float) -> str:
     if value <= 0:
         return "0:00"
@@ -412,43 +404,9 @@ def _format_duration(value: float) -> str:
     return f"{minutes}:{seconds:02d}"
 
 
-def _extract_sentiment(call: CallRecord) -> float | None:
-    metadata = call.meta or {}
-    if not isinstance(metadata, dict):
-        return None
-    analytics = metadata.get("analytics")
-    if isinstance(analytics, dict):
-        sentiment = analytics.get("sentimentScore") or analytics.get("customerSatisfaction")
-        if sentiment is not None:
-            try:
-                return float(sentiment)
-            except (TypeError, ValueError):
-                return None
-    sentiment = metadata.get("sentimentScore")
-    if sentiment is not None:
-        try:
-            return float(sentiment)
-        except (TypeError, ValueError):
-            return None
-    return None
-
-
-def _extract_topics(call: CallRecord) -> Iterable[str]:
-    metadata = call.meta or {}
-    topics: List[str] = []
-    if isinstance(metadata, dict):
-        for key in ("topics", "tags", "keywords"):
-            value = metadata.get(key)
-            if isinstance(value, list):
-                topics.extend([str(item) for item in value if item])
-    if call.transcript:
-        tokens = [token.strip(".,!?:;()[]{}\"'").lower() for token in call.transcript.split()]
-        topics.extend([token for token in tokens if len(token) > 3])
-    return topics
-
-
 __all__ = [
     "synchronise_calls_from_vapi",
+    "compute_dashboard",
     "compute_overview_metrics",
     "compute_time_series",
     "compute_trending_topics",
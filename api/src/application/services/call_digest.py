@@ -0,0 +1,254 @@
+"""
+Call summary digests.
+
+Tenants choose in their studio config how call summaries are emailed:
+``immediate`` (one email per ended call, queued by the webhook handler),
+``hourly`` or ``daily``. :class:`CallDigestWorker` handles the digest modes.
+Once a window has closed (plus a grace period for late webhooks and the sync
+worker), it renders every call that ended in it into one email and queues it.
+Hourly windows follow UTC hours; daily windows follow the tenant's local
+midnight. ``summary_digest_sent_until`` records the last window queued, and the
+outbound email's dedupe key makes a window's digest unique across processes.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.application.services.outbound_email import (
+    EMAIL_KIND_CALL_DIGEST,
+    enqueue_email,
+    get_outbound_email_worker,
+)
+from api.src.application.services.retention import get_retention_policy
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.email.templates import CallEmailData, render_call_digest_email
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.user import User
+
+logger = logging.getLogger("ava.call_digest")
+
+DIGEST_MODE_IMMEDIATE = "immediate"
+DIGEST_MODE_HOURLY = "hourly"
+DIGEST_MODE_DAILY = "daily"
+DIGEST_MODES = (DIGEST_MODE_IMMEDIATE, DIGEST_MODE_HOURLY, DIGEST_MODE_DAILY)
+
+# Calls never last this long; bounds the (tenant_id, started_at) index scan of a window.
+_MAX_CALL_DURATION = timedelta(hours=12)
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def sends_immediate_summary(config: Optional[StudioConfig]) -> bool:
+    """True when each ended call gets its own summary email."""
+
+    return config is None or (config.summary_digest_mode or DIGEST_MODE_IMMEDIATE) == DIGEST_MODE_IMMEDIATE
+
+
+def _zone(name: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(name or "UTC")
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo("UTC")
+
+
+def digest_window(mode: str, closed_before: datetime, tz_name: Optional[str] = None) -> tuple[datetime, datetime]:
+    """The latest ``(start, end)`` window of ``mode`` that ends at or before ``closed_before``."""
+
+    if mode == DIGEST_MODE_HOURLY:
+        end = closed_before.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        return end - timedelta(hours=1), end
+    local = closed_before.astimezone(_zone(tz_name))
+    end_local = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    # Wall-clock arithmetic: local midnight to local midnight, 23 or 25 hours on DST days.
+    start_local = end_local - timedelta(days=1)
+    return start_local.astimezone(timezone.utc), end_local.astimezone(timezone.utc)
+
+
+def _window_label(mode: str, start: datetime, end: datetime, tz_name: Optional[str]) -> str:
+    zone = _zone(tz_name) if mode == DIGEST_MODE_DAILY else timezone.utc
+    start_local, end_local = start.astimezone(zone), end.astimezone(zone)
+    if mode == DIGEST_MODE_DAILY:
+        if end - start > timedelta(hours=25):
+            return f"{start_local:%d/%m/%Y} – {end_local - timedelta(days=1):%d/%m/%Y}"
+        return f"{start_local:%d/%m/%Y}"
+    return f"{start_local:%d/%m/%Y %H:%M}–{end_local:%H:%M} UTC"
+
+
+async def _window_calls(
+    session: AsyncSession,
+    *,
+    tenant_id: UUID,
+    start: datetime,
+    end: datetime,
+    transcript_cutoff: Optional[datetime],
+) -> list[CallEmailData]:
+    ended_at = func.coalesce(CallRecord.ended_at, CallRecord.started_at)
+    rows = await session.execute(
+        select(
+            CallRecord.customer_number,
+            CallRecord.status,
+            CallRecord.started_at,
+            CallRecord.duration_seconds,
+            CallRecord.transcript,
+            # Only the caller name, not the whole stored Vapi payload
+            CallRecord.meta["caller_name"].as_string().label("caller_name"),
+        )
+        .where(
+            CallRecord.tenant_id == tenant_id,
+            CallRecord.started_at >= start - _MAX_CALL_DURATION,
+            CallRecord.started_at < end,
+            ended_at >= start,
+            ended_at < end,
+        )
+        .order_by(CallRecord.started_at)
+    )
+    calls = []
+    for row in rows:
+        started_at = row.started_at if row.started_at.tzinfo else row.started_at.replace(tzinfo=timezone.utc)
+        expired = transcript_cutoff is not None and started_at < transcript_cutoff
+        calls.append(
+            CallEmailData(
+                caller=row.caller_name or row.customer_number or "Unknown Caller",
+                phone=row.customer_number,
+                status=row.status,
+                started_at=started_at,
+                duration_seconds=row.duration_seconds,
+                transcript=None if expired else row.transcript,
+            )
+        )
+    return calls
+
+
+async def queue_call_digest(
+    session: AsyncSession,
+    config: StudioConfig,
+    *,
+    now: datetime,
+    grace: timedelta,
+) -> Optional[UUID]:
+    """
+    Queue the digest of the latest closed window for one tenant and advance its
+    cursor. Returns the queued email id (None when there was nothing to send).
+    """
+
+    mode = config.summary_digest_mode
+    start, end = digest_window(mode, now - grace, config.timezone)
+    previous = config.summary_digest_sent_until
+    if previous is not None:
+        previous = previous if previous.tzinfo else previous.replace(tzinfo=timezone.utc)
+        if previous >= end:
+            return None
+        # Catch up on windows missed while the worker was down, in one email.
+        start = previous
+
+    try:
+        tenant_id = UUID(str(config.user_id))
+    except ValueError:
+        return None
+
+    email_id = None
+    policy = await get_retention_policy(session, tenant_id)
+    calls = await _window_calls(
+        session, tenant_id=tenant_id, start=start, end=end, transcript_cutoff=policy.transcript_cutoff(now)
+    )
+    if calls:
+        user_email = await session.scalar(select(User.email).where(User.id == config.user_id))
+        recipient = config.fallback_email or config.summary_email or user_email
+        if recipient:
+            email_id = await enqueue_email(
+                session,
+                kind=EMAIL_KIND_CALL_DIGEST,
+                recipients=[recipient],
+                subject=f"📞 {len(calls)} appel{'s' if len(calls) != 1 else ''} - {config.organization_name}",
+                html=render_call_digest_email(
+                    calls,
+                    business_name=config.organization_name,
+                    window=_window_label(mode, start, end, config.timezone),
+                ),
+                studio_config=config,
+                dedupe_key=f"{EMAIL_KIND_CALL_DIGEST}:{config.user_id}:{end:%Y%m%dT%H%MZ}",
+                commit=False,
+            )
+
+    # Never moves the cursor back if another process already queued a later window.
+    await session.execute(
+        update(StudioConfig)
+        .where(
+            StudioConfig.id == config.id,
+            or_(StudioConfig.summary_digest_sent_until.is_(None), StudioConfig.summary_digest_sent_until < end),
+        )
+        .values(summary_digest_sent_until=end)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return email_id
+
+
+class CallDigestWorker(PeriodicWorker):
+    """Queue the hourly and daily call digests that are due."""
+
+    name = "call-digest"
+
+    def __init__(self, *, interval_seconds: float, session_factory: async_sessionmaker = SessionLocal) -> None:
+        super().__init__(interval_seconds=interval_seconds)
+        self._session_factory = session_factory
+
+    async def run_once(self) -> None:
+        grace = timedelta(seconds=get_settings().call_digest_grace_seconds)
+        now = _now()
+        async with self._session_factory() as session:
+            configs: Sequence[StudioConfig] = (
+                await session.execute(
+                    select(StudioConfig).where(
+                        StudioConfig.summary_digest_mode.in_((DIGEST_MODE_HOURLY, DIGEST_MODE_DAILY))
+                    )
+                )
+            ).scalars().all()
+
+        queued = 0
+        for config in configs:
+            try:
+                async with self._session_factory() as session:
+                    if await queue_call_digest(session, config, now=now, grace=grace) is not None:
+                        queued += 1
+            except Exception:  # noqa: BLE001 - one tenant must not block the others
+                logger.exception("Call digest failed for user %s", config.user_id)
+        if queued:
+            logger.info("Queued %s call digests", queued)
+            get_outbound_email_worker().wake()
+
+
+_worker: Optional[CallDigestWorker] = None
+
+
+def get_call_digest_worker() -> CallDigestWorker:
+    global _worker
+    if _worker is None:
+        _worker = CallDigestWorker(interval_seconds=get_settings().call_digest_interval_seconds)
+    return _worker
+
+
+__all__ = [
+    "DIGEST_MODES",
+    "DIGEST_MODE_DAILY",
+    "DIGEST_MODE_HOURLY",
+    "DIGEST_MODE_IMMEDIATE",
+    "CallDigestWorker",
+    "digest_window",
+    "get_call_digest_worker",
+    "queue_call_digest",
+    "sends_immediate_summary",
+]
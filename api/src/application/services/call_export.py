@@ -0,0 +1,168 @@
+"""
+Bulk export of call history as CSV or NDJSON.
+
+Rows come from a server-side cursor and are encoded into ~64 KB chunks as
+they arrive, so an export holds one batch of rows in memory whatever the
+date range. ``meta.<path>`` columns flatten fields of the call metadata
+(``meta.vapi.analysis.summary``); nested objects are written as JSON.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.repositories.call_repository import stream_call_export
+
+EXPORT_FORMATS = ("csv", "ndjson")
+META_PREFIX = "meta."
+CHUNK_SIZE = 64 * 1024
+
+# Export column name -> attribute of the exported row
+BASE_COLUMNS = {
+    "id": "id",
+    "assistantId": "assistant_id",
+    "customerNumber": "customer_number",
+    "status": "status",
+    "startedAt": "started_at",
+    "endedAt": "ended_at",
+    "durationSeconds": "duration_seconds",
+    "cost": "cost",
+    "transcript": "transcript",
+}
+DEFAULT_COLUMNS = tuple(name for name in BASE_COLUMNS if name != "transcript")
+
+
+def parse_export_columns(raw: Optional[str]) -> tuple[str, ...]:
+    """Validate a comma separated column list; ``None`` selects the listing columns."""
+
+    if not raw:
+        return DEFAULT_COLUMNS
+    columns = tuple(dict.fromkeys(part.strip() for part in raw.split(",") if part.strip()))
+    unknown = [
+        name
+        for name in columns
+        if name not in BASE_COLUMNS and not (name.startswith(META_PREFIX) and len(name) > len(META_PREFIX))
+    ]
+    if unknown:
+        raise ValueError(
+            f"Unknown export columns: {', '.join(unknown)}. "
+            f"Use {', '.join(BASE_COLUMNS)} or meta.<field>."
+        )
+    return columns
+
+
+def _meta_value(meta: Any, path: str) -> Any:
+    value = meta
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _record(row: Any, columns: Sequence[str], transcript_cutoff: Optional[datetime]) -> dict[str, Any]:
+    record: dict[str, Any] = {}
+    for name in columns:
+        if name.startswith(META_PREFIX):
+            value = _meta_value(row.meta, name[len(META_PREFIX):])
+        else:
+            value = getattr(row, BASE_COLUMNS[name])
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        record[name] = value
+
+    # The retention job scrubs expired transcripts; until it runs they are only hidden.
+    if (
+        "transcript" in record
+        and transcript_cutoff is not None
+        and row.started_at is not None
+        and _as_utc(row.started_at) < transcript_cutoff
+    ):
+        record["transcript"] = None
+    return record
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    return "" if value is None else value
+
+
+async def iter_call_export(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    columns: Sequence[str],
+    export_format: str = "csv",
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    transcript_cutoff: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[bytes]:
+    """Yield the encoded export in chunks of roughly ``CHUNK_SIZE`` bytes."""
+
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format!r}")
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer is not None:
+        writer.writerow(columns)
+
+    rows = stream_call_export(
+        session,
+        tenant_id=tenant_id,
+        started_from=started_from,
+        started_to=started_to,
+        include_transcript="transcript" in columns,
+        include_meta=any(name.startswith(META_PREFIX) for name in columns),
+        batch_size=batch_size,
+    )
+    async for row in rows:
+        record = _record(row, columns, transcript_cutoff)
+        if writer is not None:
+            writer.writerow([_csv_cell(record[name]) for name in columns])
+        else:
+            buffer.write(json.dumps(record, ensure_ascii=False, default=str))
+            buffer.write("\n")
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def gzip_chunks(chunks: AsyncIterator[bytes], *, level: int = 6) -> AsyncIterator[bytes]:
+    """Compress a byte stream into a single gzip member on the fly."""
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip header and trailer
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+__all__ = [
+    "BASE_COLUMNS",
+    "DEFAULT_COLUMNS",
+    "EXPORT_FORMATS",
+    "gzip_chunks",
+    "iter_call_export",
+    "parse_export_columns",
+]
@@ -0,0 +1,393 @@
+"""
+Incremental call synchronisation between Vapi and the local ``calls`` table.
+
+Each tenant keeps a :class:`CallSyncCursor` recording the newest ``updatedAt``
+seen from Vapi, so a pass only pulls calls created or changed since the last
+one. A catch-up larger than ``call_sync_max_pages`` resumes where it stopped
+on the following passes before the cursor moves. Analytics endpoints read
+straight from the local table and ask the background :class:`CallSyncWorker`
+to refresh stale tenants.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterable, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.application.services.tenant import ensure_tenant_for_user
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.external.vapi_client import VapiClient
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_sync_cursor import CallSyncCursor
+from api.src.infrastructure.persistence.models.user import User
+from api.src.infrastructure.persistence.repositories.call_repository import upsert_calls
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import refresh_call_rollups
+from api.src.infrastructure.persistence.repositories.call_search_repository import get_tenant_search_config
+from api.src.infrastructure.persistence.repositories.call_topic_repository import refresh_call_topics
+
+logger = logging.getLogger("ava.call_sync")
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def _parse_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            pass
+    return _now()
+
+
+def _parse_optional_datetime(value: Any) -> Optional[datetime]:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # SQLite hands back naive datetimes
+    if value is not None and value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+def _isoformat(value: datetime) -> str:
+    return value.astimezone(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _normalize_tenant_id(value):
+    if isinstance(value, UUID):
+        return value
+    if isinstance(value, str):
+        try:
+            return UUID(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _as_call_record(raw: dict[str, Any], tenant_id) -> CallRecord:
+    started_at = _parse_datetime(raw.get("startedAt"))
+    ended_at = _parse_datetime(raw.get("endedAt")) if raw.get("endedAt") else None
+    record = CallRecord(
+        id=str(raw.get("id")),
+        assistant_id=str(raw.get("assistantId", "")),
+        tenant_id=_normalize_tenant_id(tenant_id),
+        customer_number=str(raw.get("customer", {}).get("number", "")) if isinstance(raw.get("customer"), dict) else None,
+        status=str(raw.get("status", "unknown")),
+        started_at=started_at,
+        ended_at=ended_at,
+        duration_seconds=_safe_int(raw.get("durationSeconds")),
+        cost=_safe_float(raw.get("cost")),
+        meta=raw,  # Fixed: was 'metadata', should be 'meta'
+        transcript=_extract_transcript(raw),
+    )
+    return record
+
+
+def _safe_int(value: Any) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _safe_float(value: Any) -> float | None:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _extract_transcript(raw: dict[str, Any]) -> Optional[str]:
+    transcript = raw.get("transcript")
+    if isinstance(transcript, str):
+        return transcript
+    if isinstance(transcript, dict):
+        return transcript.get("text")
+    return None
+
+
+async def get_sync_cursor(session: AsyncSession, tenant_id) -> Optional[CallSyncCursor]:
+    """Return the sync cursor for a tenant, if it has ever been synchronised."""
+
+    return await session.get(CallSyncCursor, _normalize_tenant_id(tenant_id))
+
+
+def is_cursor_stale(cursor: Optional[CallSyncCursor], *, max_age_seconds: Optional[int] = None) -> bool:
+    """True when the tenant has never synced or its last sync is older than ``max_age_seconds``."""
+
+    if cursor is None or cursor.last_synced_at is None:
+        return True
+    max_age = max_age_seconds if max_age_seconds is not None else get_settings().call_sync_interval_seconds
+    return _now() - _as_utc(cursor.last_synced_at) > timedelta(seconds=max_age)
+
+
+async def _fetch_changed_calls(
+    vapi_client: VapiClient,
+    *,
+    updated_after: Optional[datetime],
+    page_size: int,
+    max_pages: int,
+    created_before: Optional[str] = None,
+) -> tuple[list[dict[str, Any]], Optional[str]]:
+    """
+    Page backwards through calls changed since ``updated_after`` (newest first).
+
+    Returns the calls and, when ``max_pages`` stopped the walk early, the
+    ``createdAt`` to resume below on the next pass (None once complete).
+    """
+
+    updated_at_gt = _isoformat(updated_after) if updated_after else None
+    created_at_lt = created_before
+    collected: list[dict[str, Any]] = []
+
+    for _ in range(max(1, max_pages)):
+        page = await vapi_client.list_calls(
+            limit=page_size,
+            updated_at_gt=updated_at_gt,
+            created_at_lt=created_at_lt,
+        )
+        page = [raw for raw in page if isinstance(raw, dict) and raw.get("id")]
+        collected.extend(page)
+        if len(page) < page_size:
+            return collected, None
+        oldest_created = min((raw.get("createdAt") for raw in page if raw.get("createdAt")), default=None)
+        if not oldest_created or oldest_created == created_at_lt:
+            return collected, None
+        created_at_lt = oldest_created
+
+    logger.info(
+        "Call sync stopped after %s pages; older calls will be fetched on the next pass",
+        max_pages,
+    )
+    return collected, created_at_lt
+
+
+async def synchronise_calls_from_vapi(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    vapi_client: VapiClient,
+    limit: Optional[int] = None,
+    max_pages: Optional[int] = None,
+) -> Sequence[CallRecord]:
+    """
+    Fetch calls created or updated since the tenant's cursor and persist them locally.
+
+    ``limit`` is the Vapi page size. The cursor is read and the transaction
+    committed before paging through Vapi, so no connection sits idle in a
+    transaction during the HTTP round trips. The calls, their hourly rollups
+    and topic terms and the cursor are then written in one short transaction,
+    so a failed pass leaves the cursor untouched.
+    """
+
+    settings = get_settings()
+    page_size = limit or settings.call_sync_page_size
+    tenant_key = _normalize_tenant_id(tenant_id)
+
+    cursor = await session.get(CallSyncCursor, tenant_key)
+    updated_after = _as_utc(cursor.last_updated_at) if cursor else None
+    created_before = cursor.resume_created_before if cursor else None
+    await session.commit()
+
+    raw_calls, resume_created_before = await _fetch_changed_calls(
+        vapi_client,
+        updated_after=updated_after,
+        page_size=page_size,
+        max_pages=max_pages or settings.call_sync_max_pages,
+        created_before=created_before,
+    )
+
+    # A call can show up on two pages if it changed mid-pass; keep the latest payload.
+    latest: dict[str, dict[str, Any]] = {}
+    for raw in raw_calls:
+        latest.setdefault(str(raw["id"]), raw)
+    records = [_as_call_record(raw, tenant_key) for raw in latest.values()]
+
+    # Locked until commit, so a concurrent pass for the tenant cannot move it back.
+    cursor = await session.get(CallSyncCursor, tenant_key, with_for_update=True, populate_existing=True)
+    if cursor is None:
+        cursor = CallSyncCursor(tenant_id=tenant_key)
+        session.add(cursor)
+    if (_as_utc(cursor.last_updated_at), cursor.resume_created_before) == (updated_after, created_before):
+        _advance_cursor(cursor, latest.values(), resume_created_before=resume_created_before)
+    else:
+        logger.debug("Call sync for tenant %s: cursor moved by a concurrent pass, keeping it", tenant_key)
+    # A call whose startedAt moved leaves its old hour too, so both hours are rebuilt.
+    previous_started_at = (
+        list(await session.scalars(select(CallRecord.started_at).where(CallRecord.id.in_(list(latest)))))
+        if latest
+        else []
+    )
+    result = await upsert_calls(
+        session, records, commit=False, search_config=await get_tenant_search_config(session, tenant_key)
+    )
+    await refresh_call_rollups(
+        session,
+        tenant_id=tenant_key,
+        started_at=[*previous_started_at, *(record.started_at for record in records)],
+    )
+    await refresh_call_topics(session, call_ids=[record.id for record in records])
+    await session.commit()
+    logger.debug(
+        "Call sync for tenant %s: %s inserted, %s updated",
+        tenant_key,
+        result.inserted,
+        result.updated,
+    )
+    return records
+
+
+def _advance_cursor(
+    cursor: CallSyncCursor,
+    raw_calls: Iterable[dict[str, Any]],
+    *,
+    resume_created_before: Optional[str] = None,
+) -> None:
+    """
+    Record a pass. ``last_updated_at`` only moves once every call changed since
+    it has been fetched: while a catch-up is cut short by the page cap, older
+    pages are still below it, so it stays put and the next pass resumes from
+    ``resume_created_before``.
+    """
+
+    newest_updated_at = _as_utc(cursor.resume_updated_at)
+    last_started_at = _as_utc(cursor.last_started_at)
+    for raw in raw_calls:
+        updated_at = _parse_optional_datetime(raw.get("updatedAt"))
+        if updated_at and cursor.resume_created_before is None and (
+            newest_updated_at is None or updated_at > newest_updated_at
+        ):
+            # During a catch-up the high-water of its first pass is kept: calls fetched on that pass
+            # and changed afterwards have a later updatedAt and are picked up again.
+            newest_updated_at = updated_at
+
+        started_at = _parse_optional_datetime(raw.get("startedAt"))
+        if started_at and (last_started_at is None or started_at > last_started_at):
+            cursor.last_started_at = last_started_at = started_at
+            cursor.last_call_id = str(raw["id"])
+
+    if resume_created_before is not None:
+        cursor.resume_created_before = resume_created_before
+        cursor.resume_updated_at = newest_updated_at
+    else:
+        if newest_updated_at and (cursor.last_updated_at is None or newest_updated_at > _as_utc(cursor.last_updated_at)):
+            cursor.last_updated_at = newest_updated_at
+        cursor.resume_created_before = None
+        cursor.resume_updated_at = None
+
+    cursor.last_synced_at = _now()
+    cursor.last_error = None
+
+
+async def _record_sync_error(tenant_id, error: str) -> None:
+    async with SessionLocal() as session:
+        cursor = await session.get(CallSyncCursor, tenant_id)
+        if cursor is None:
+            cursor = CallSyncCursor(tenant_id=tenant_id)
+            session.add(cursor)
+        cursor.last_error = error[:1000]
+        await session.commit()
+
+
+async def sync_user_calls(user_id: str) -> int:
+    """Run one incremental sync for a user in its own session. Returns the number of calls fetched."""
+
+    async with SessionLocal() as session:
+        user = await session.get(User, user_id)
+        if user is None or not user.vapi_api_key:
+            return 0
+        tenant = await ensure_tenant_for_user(session, user)
+        tenant_id = tenant.id
+        try:
+            records = await synchronise_calls_from_vapi(
+                session,
+                tenant_id=tenant_id,
+                vapi_client=VapiClient(token=user.vapi_api_key),
+            )
+        except Exception as exc:
+            await session.rollback()
+            await _record_sync_error(tenant_id, str(exc))
+            raise
+    return len(records)
+
+
+class CallSyncWorker(PeriodicWorker):
+    """
+    Keep local call data fresh without blocking API requests.
+
+    Every ``interval_seconds`` the worker syncs every user with a Vapi key.
+    ``request_sync`` queues a single user and wakes the worker so stale
+    dashboards refresh in the background.
+    """
+
+    name = "call-sync"
+
+    def __init__(self, *, interval_seconds: float) -> None:
+        super().__init__(interval_seconds=interval_seconds)
+        self._pending: set[str] = set()
+        self._last_full_pass: Optional[datetime] = None
+
+    def request_sync(self, user_id) -> None:
+        self._pending.add(str(user_id))
+        self.wake()
+
+    async def run_once(self) -> None:
+        pending, self._pending = self._pending, set()
+
+        full_pass_due = self._last_full_pass is None or (
+            _now() - self._last_full_pass >= timedelta(seconds=self.interval_seconds)
+        )
+        if full_pass_due:
+            self._last_full_pass = _now()
+            user_ids = await self._users_with_vapi_key()
+        else:
+            user_ids = sorted(pending)
+
+        for user_id in user_ids:
+            try:
+                fetched = await sync_user_calls(user_id)
+                logger.debug("Synced %s calls for user %s", fetched, user_id)
+            except Exception:  # noqa: BLE001 - one tenant must not block the others
+                logger.warning("Call sync failed for user %s", user_id, exc_info=True)
+
+    async def _users_with_vapi_key(self) -> list[str]:
+        async with SessionLocal() as session:
+            result = await session.execute(
+                select(User.id).where(User.vapi_api_key.is_not(None)).where(User.vapi_api_key != "")
+            )
+            return [str(user_id) for user_id in result.scalars().all()]
+
+
+_worker: Optional[CallSyncWorker] = None
+
+
+def get_call_sync_worker() -> CallSyncWorker:
+    global _worker
+    if _worker is None:
+        _worker = CallSyncWorker(interval_seconds=get_settings().call_sync_interval_seconds)
+    return _worker
+
+
+__all__ = [
+    "CallSyncWorker",
+    "get_call_sync_worker",
+    "get_sync_cursor",
+    "is_cursor_stale",
+    "sync_user_calls",
+    "synchronise_calls_from_vapi",
+]
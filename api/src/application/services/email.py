@@ -6,7 +6,6 @@ import logging
 from typing import Optional
 
 from api.src.core.crypto import EncryptionError, get_smtp_encryptor
-from api.src.infrastructure.email import EmailService, get_email_service
 from api.src.infrastructure.email.smtp_client import SMTPConfig
 from api.src.infrastructure.persistence.models.studio_config import StudioConfig as StudioConfigModel
 
@@ -47,8 +46,3 @@ def resolve_smtp_config(config: Optional[StudioConfigModel]) -> Optional[SMTPCon
         password=password,
         sender=config.smtp_username or None,
     )
-
-
-def get_user_email_service(config: Optional[StudioConfigModel]) -> EmailService:
-    smtp_config = resolve_smtp_config(config)
-    return get_email_service(smtp_config=smtp_config)
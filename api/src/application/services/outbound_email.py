@@ -0,0 +1,440 @@
+"""
+Outbound email pipeline.
+
+Request and webhook handlers only render and enqueue: the email is stored in
+the ``outbound_emails`` table and the local worker is woken, so no handler
+waits on an SMTP server or the Resend API. :class:`OutboundEmailWorker`
+claims due emails and groups them by lane: one lane per tenant SMTP
+configuration, one for the platform SMTP server and one for Resend. Each lane
+has its own concurrency cap; the SMTP emails of a lane go out over a few
+pooled sessions. Failures are retried with exponential backoff and jitter.
+Rejections (unknown recipient, refused sender, invalid Resend payload) are
+dead-lettered at once. The row records the delivery status.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import smtplib
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence, Union
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.application.services.email import resolve_smtp_config
+from api.src.application.services.webhook_queue import retry_delay
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.email.email_service import MAGIC_LINK_SUBJECT, get_email_service
+from api.src.infrastructure.email.resend_client import ResendError, send_resend_email
+from api.src.infrastructure.email.smtp_client import SMTPConfig, SMTPMessage, get_smtp_client
+from api.src.infrastructure.email.templates import CallEmailData, render_call_summary_email
+from api.src.infrastructure.persistence.models.outbound_email import (
+    EMAIL_PROVIDER_RESEND,
+    EMAIL_PROVIDER_SMTP,
+    OutboundEmail,
+)
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig as StudioConfigModel
+from api.src.infrastructure.persistence.repositories.outbound_email_repository import (
+    claim_outbound_emails,
+    enqueue_outbound_email,
+    fail_outbound_email,
+    get_outbound_email_stats,
+    mark_outbound_email_sent,
+    prune_outbound_emails,
+)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.outbound_email")
+
+EMAIL_KIND_MAGIC_LINK = "magic_link"
+EMAIL_KIND_CALL_SUMMARY = "call_summary"
+EMAIL_KIND_CALL_TRANSCRIPT = "call_transcript"
+EMAIL_KIND_CALL_DIGEST = "call_digest"
+
+Lane = tuple[str, Optional[str]]
+SendResult = Union[str, Exception]
+
+if METRICS_AVAILABLE:
+    outbound_email_queue_depth_metric = Gauge(
+        "outbound_email_queue_depth",
+        "Outbound emails by status",
+        ["status"],
+    )
+    outbound_email_queue_lag_metric = Gauge(
+        "outbound_email_queue_lag_seconds",
+        "Age of the oldest due outbound email",
+    )
+    outbound_emails_processed_metric = Counter(
+        "outbound_emails_processed_total",
+        "Outbound emails processed by outcome (sent, retry, dead)",
+        ["provider", "kind", "outcome"],
+    )
+    outbound_email_lane_duration_metric = Histogram(
+        "outbound_email_lane_seconds",
+        "Time spent delivering one claimed batch of a lane",
+        ["provider"],
+    )
+else:
+    outbound_email_queue_depth_metric = None
+    outbound_email_queue_lag_metric = None
+    outbound_emails_processed_metric = None
+    outbound_email_lane_duration_metric = None
+
+
+class EmailDeliveryError(RuntimeError):
+    """An email that cannot be delivered as queued; ``permanent`` errors are not retried."""
+
+    def __init__(self, message: str, *, permanent: bool) -> None:
+        super().__init__(message)
+        self.permanent = permanent
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def choose_email_provider(studio_config: Optional[StudioConfigModel] = None) -> Optional[Lane]:
+    """
+    Lane for a new email: the tenant's own SMTP server, else Resend, else the
+    platform SMTP server. None when nothing is configured.
+    """
+
+    if studio_config is not None and resolve_smtp_config(studio_config) is not None:
+        return EMAIL_PROVIDER_SMTP, studio_config.user_id
+    if get_settings().resend_api_key:
+        return EMAIL_PROVIDER_RESEND, None
+    if get_email_service().platform_smtp_config() is not None:
+        return EMAIL_PROVIDER_SMTP, None
+    return None
+
+
+async def enqueue_email(
+    session: AsyncSession,
+    *,
+    kind: str,
+    recipients: Sequence[str],
+    subject: str,
+    html: str,
+    studio_config: Optional[StudioConfigModel] = None,
+    dedupe_key: Optional[str] = None,
+    commit: bool = True,
+) -> Optional[UUID]:
+    """
+    Queue an email and return its id.
+
+    Returns None when no provider is configured or ``dedupe_key`` was already
+    queued. With ``commit=False`` the row joins the caller's transaction; the
+    caller wakes the worker after committing (``get_outbound_email_worker().wake()``),
+    otherwise the next poll picks it up.
+    """
+
+    lane = choose_email_provider(studio_config)
+    if lane is None:
+        logger.warning("No email provider configured, dropping %s email", kind)
+        return None
+    provider, smtp_user_id = lane
+    email_id = await enqueue_outbound_email(
+        session,
+        kind=kind,
+        provider=provider,
+        smtp_user_id=smtp_user_id,
+        recipients=recipients,
+        subject=subject,
+        html=html,
+        now=_now(),
+        dedupe_key=dedupe_key,
+    )
+    if email_id is None:
+        logger.info("Email %s already queued, skipping", dedupe_key)
+        return None
+    if commit:
+        await session.commit()
+        get_outbound_email_worker().wake()
+    return email_id
+
+
+async def queue_magic_link(session: AsyncSession, *, to_email: str, magic_token: str, locale: str = "fr") -> bool:
+    """Queue a magic link through the platform sender; in development the link is only logged."""
+
+    service = get_email_service()
+    magic_url = service.magic_link_url(magic_token, locale)
+    if get_settings().environment == "development" or choose_email_provider() is None:
+        service.log_magic_link(magic_url)
+        return True
+    await enqueue_email(
+        session,
+        kind=EMAIL_KIND_MAGIC_LINK,
+        recipients=[to_email],
+        subject=MAGIC_LINK_SUBJECT,
+        html=service.render_magic_link(magic_url),
+    )
+    return True
+
+
+async def queue_call_summary(
+    session: AsyncSession,
+    *,
+    studio_config: Optional[StudioConfigModel],
+    to_email: str,
+    call_id: str,
+    caller_name: str,
+    caller_phone: str,
+    transcript: Optional[str],
+    duration: Optional[int],
+    call_date: datetime,
+    business_name: str,
+    commit: bool = True,
+) -> Optional[UUID]:
+    """Queue the summary of an ended call, at most once per call."""
+
+    return await enqueue_email(
+        session,
+        kind=EMAIL_KIND_CALL_SUMMARY,
+        recipients=[to_email],
+        subject=f"📞 Nouvel appel - {caller_name}",
+        html=render_call_summary_email(
+            CallEmailData(
+                caller=caller_name,
+                phone=caller_phone,
+                status=None,
+                started_at=call_date,
+                duration_seconds=duration,
+                transcript=transcript,
+            ),
+            business_name=business_name,
+        ),
+        studio_config=studio_config,
+        dedupe_key=f"{EMAIL_KIND_CALL_SUMMARY}:{call_id}" if call_id else None,
+        commit=commit,
+    )
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """Errors that a retry will not fix."""
+
+    if isinstance(error, (EmailDeliveryError, ResendError)):
+        return error.permanent
+    if isinstance(error, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return True
+    if isinstance(error, smtplib.SMTPDataError):
+        return 500 <= error.smtp_code < 600
+    return False
+
+
+class OutboundEmailWorker(PeriodicWorker):
+    """
+    Drain the outbound email queue.
+
+    Each pass claims up to ``concurrency`` due emails at a time, sends every
+    lane concurrently and records the outcomes, until nothing is due.
+    ``wake()`` (called on enqueue) starts a pass immediately.
+    """
+
+    name = "outbound-email"
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: float,
+        concurrency: int,
+        smtp_concurrency: int,
+        resend_concurrency: int,
+        session_factory: async_sessionmaker = SessionLocal,
+    ) -> None:
+        super().__init__(interval_seconds=interval_seconds)
+        self.concurrency = max(1, concurrency)
+        self.smtp_concurrency = max(1, smtp_concurrency)
+        self.resend_concurrency = max(1, resend_concurrency)
+        self._session_factory = session_factory
+        self._last_housekeeping: Optional[float] = None
+
+    async def run_once(self) -> None:
+        settings = get_settings()
+        lease = timedelta(seconds=settings.email_queue_lease_seconds)
+        while True:
+            async with self._session_factory() as session:
+                emails = await claim_outbound_emails(session, limit=self.concurrency, now=_now(), lease=lease)
+            if not emails:
+                break
+            lanes: dict[Lane, list[OutboundEmail]] = {}
+            for email in emails:
+                lanes.setdefault((email.provider, email.smtp_user_id), []).append(email)
+            outcomes = await asyncio.gather(*(self._send_lane(lane, batch) for lane, batch in lanes.items()))
+            await self._record([pair for lane_outcomes in outcomes for pair in lane_outcomes])
+
+        await self._housekeeping()
+
+    async def _send_lane(self, lane: Lane, emails: list[OutboundEmail]) -> list[tuple[OutboundEmail, SendResult]]:
+        provider, smtp_user_id = lane
+        started = time.perf_counter()
+        try:
+            if provider == EMAIL_PROVIDER_SMTP:
+                return await self._send_smtp(smtp_user_id, emails)
+            if provider == EMAIL_PROVIDER_RESEND:
+                return await self._send_resend(emails)
+            error = EmailDeliveryError(f"Unknown email provider {provider!r}", permanent=True)
+            return [(email, error) for email in emails]
+        finally:
+            if outbound_email_lane_duration_metric is not None:
+                outbound_email_lane_duration_metric.labels(provider=provider).observe(time.perf_counter() - started)
+
+    async def _smtp_config(self, smtp_user_id: Optional[str]) -> Optional[SMTPConfig]:
+        if smtp_user_id is None:
+            return get_email_service().platform_smtp_config()
+        async with self._session_factory() as session:
+            studio_config = await session.scalar(
+                select(StudioConfigModel).where(StudioConfigModel.user_id == smtp_user_id)
+            )
+        return resolve_smtp_config(studio_config)
+
+    async def _send_smtp(
+        self, smtp_user_id: Optional[str], emails: list[OutboundEmail]
+    ) -> list[tuple[OutboundEmail, SendResult]]:
+        config = await self._smtp_config(smtp_user_id)
+        if config is None:
+            error = EmailDeliveryError("SMTP configuration removed or unreadable", permanent=True)
+            return [(email, error) for email in emails]
+
+        # At most ``smtp_concurrency`` sessions per server; each sends its share back to back.
+        sessions = min(self.smtp_concurrency, len(emails))
+        chunks = [emails[index::sessions] for index in range(sessions)]
+        client = get_smtp_client()
+        results = await asyncio.gather(
+            *(
+                client.send_many(
+                    config,
+                    [SMTPMessage(tuple(email.recipients), email.subject, email.html or "") for email in chunk],
+                )
+                for chunk in chunks
+            ),
+            return_exceptions=True,
+        )
+        pairs: list[tuple[OutboundEmail, SendResult]] = []
+        for chunk, chunk_results in zip(chunks, results):
+            if isinstance(chunk_results, BaseException):
+                pairs.extend((email, chunk_results) for email in chunk)
+            else:
+                pairs.extend(zip(chunk, chunk_results))
+        return pairs
+
+    async def _send_resend(self, emails: list[OutboundEmail]) -> list[tuple[OutboundEmail, SendResult]]:
+        settings = get_settings()
+        if not settings.resend_api_key:
+            error = EmailDeliveryError("Resend API key is not configured", permanent=True)
+            return [(email, error) for email in emails]
+        limiter = asyncio.Semaphore(self.resend_concurrency)
+        sender = f"AVA <noreply@{settings.resend_domain}>"
+
+        async def send(email: OutboundEmail) -> tuple[OutboundEmail, SendResult]:
+            async with limiter:
+                try:
+                    message_id = await send_resend_email(
+                        api_key=settings.resend_api_key,
+                        sender=sender,
+                        recipients=email.recipients,
+                        subject=email.subject,
+                        html=email.html or "",
+                    )
+                except Exception as exc:  # noqa: BLE001 - recorded on the row and retried
+                    return email, exc
+                return email, message_id
+
+        return list(await asyncio.gather(*(send(email) for email in emails)))
+
+    async def _record(self, outcomes: list[tuple[OutboundEmail, SendResult]]) -> None:
+        settings = get_settings()
+        now = _now()
+        async with self._session_factory() as session:
+            for email, result in outcomes:
+                if not isinstance(result, Exception):
+                    await mark_outbound_email_sent(session, email.id, now=now, provider_message_id=result)
+                    outcome = "sent"
+                else:
+                    error = f"{type(result).__name__}: {result}"
+                    if is_permanent_failure(result) or email.attempts >= settings.email_queue_max_attempts:
+                        await fail_outbound_email(session, email.id, error=error, retry_at=None)
+                        outcome = "dead"
+                        logger.error("Outbound email %s dead-lettered after %s attempts: %s", email.id, email.attempts, error)
+                    else:
+                        delay = retry_delay(
+                            email.attempts,
+                            base_seconds=settings.email_queue_backoff_seconds,
+                            max_seconds=settings.email_queue_max_backoff_seconds,
+                        )
+                        await fail_outbound_email(session, email.id, error=error, retry_at=now + timedelta(seconds=delay))
+                        outcome = "retry"
+                        logger.warning("Outbound email %s failed on attempt %s: %s", email.id, email.attempts, error)
+                if outbound_emails_processed_metric is not None:
+                    outbound_emails_processed_metric.labels(
+                        provider=email.provider, kind=email.kind, outcome=outcome
+                    ).inc()
+            await session.commit()
+
+    async def _housekeeping(self) -> None:
+        """Prune old sent/dead emails and refresh the depth/lag gauges, at most every few seconds."""
+
+        settings = get_settings()
+        tick = time.monotonic()
+        if self._last_housekeeping is not None and tick - self._last_housekeeping < settings.email_queue_stats_seconds:
+            return
+        self._last_housekeeping = tick
+
+        now = _now()
+        async with self._session_factory() as session:
+            await prune_outbound_emails(session, before=now - timedelta(days=settings.outbound_email_retention_days))
+            await session.commit()
+            stats = await get_outbound_email_stats(session, now=now)
+
+        if outbound_email_queue_depth_metric is not None:
+            outbound_email_queue_depth_metric.labels(status="pending").set(stats.pending)
+            outbound_email_queue_depth_metric.labels(status="sending").set(stats.sending)
+            outbound_email_queue_depth_metric.labels(status="dead").set(stats.dead)
+        if outbound_email_queue_lag_metric is not None:
+            oldest = stats.oldest_due_at
+            if oldest is not None and oldest.tzinfo is None:
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            outbound_email_queue_lag_metric.set(max(0.0, (now - oldest).total_seconds()) if oldest else 0.0)
+
+
+_worker: Optional[OutboundEmailWorker] = None
+
+
+def get_outbound_email_worker() -> OutboundEmailWorker:
+    global _worker
+    if _worker is None:
+        settings = get_settings()
+        _worker = OutboundEmailWorker(
+            interval_seconds=settings.email_queue_poll_seconds,
+            concurrency=settings.email_queue_concurrency,
+            smtp_concurrency=settings.email_queue_smtp_concurrency,
+            resend_concurrency=settings.email_queue_resend_concurrency,
+        )
+    return _worker
+
+
+__all__ = [
+    "EMAIL_KIND_CALL_DIGEST",
+    "EMAIL_KIND_CALL_SUMMARY",
+    "EMAIL_KIND_CALL_TRANSCRIPT",
+    "EMAIL_KIND_MAGIC_LINK",
+    "EmailDeliveryError",
+    "OutboundEmailWorker",
+    "choose_email_provider",
+    "enqueue_email",
+    "get_outbound_email_worker",
+    "is_permanent_failure",
+    "queue_call_summary",
+    "queue_magic_link",
+]
@@ -0,0 +1,308 @@
+"""
+Scheduled data retention for call records.
+
+Expired transcripts are nulled out and old calls deleted by set-based
+statements in bounded batches, each committed on its own so a pass never
+holds long locks. Windows come from settings and can be overridden per
+tenant in the studio config; request handlers only read and hide expired data.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.repositories.call_repository import (
+    prune_old_calls,
+    scrub_expired_transcripts,
+)
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import prune_call_rollups
+from api.src.infrastructure.persistence.repositories.call_topic_repository import prune_call_topics
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.retention")
+
+if METRICS_AVAILABLE:
+    retention_rows_metric = Counter(
+        "call_retention_rows_total",
+        "Call rows processed by the retention job",
+        ["action"],
+    )
+    retention_last_run_metric = Gauge(
+        "call_retention_last_run_timestamp_seconds",
+        "Unix time of the last completed retention pass",
+    )
+else:
+    retention_rows_metric = None
+    retention_last_run_metric = None
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """How long a tenant keeps transcripts and call records (``None`` = forever)."""
+
+    transcript_retention: Optional[timedelta]
+    call_retention: Optional[timedelta]
+
+    def transcript_cutoff(self, now: datetime) -> Optional[datetime]:
+        return now - self.transcript_retention if self.transcript_retention else None
+
+    def call_cutoff(self, now: datetime) -> Optional[datetime]:
+        return now - self.call_retention if self.call_retention else None
+
+
+@dataclass(frozen=True)
+class RetentionResult:
+    """Rows processed by :func:`apply_retention`."""
+
+    transcripts_scrubbed: int = 0
+    calls_deleted: int = 0
+
+    def __add__(self, other: "RetentionResult") -> "RetentionResult":
+        return RetentionResult(
+            transcripts_scrubbed=self.transcripts_scrubbed + other.transcripts_scrubbed,
+            calls_deleted=self.calls_deleted + other.calls_deleted,
+        )
+
+
+def default_retention_policy() -> RetentionPolicy:
+    settings = get_settings()
+    return _policy(settings.transcript_retention_hours, settings.call_retention_days)
+
+
+def _policy(transcript_hours: Optional[int], call_days: Optional[int]) -> RetentionPolicy:
+    return RetentionPolicy(
+        transcript_retention=timedelta(hours=transcript_hours) if transcript_hours else None,
+        call_retention=timedelta(days=call_days) if call_days else None,
+    )
+
+
+def _override(default: RetentionPolicy, config) -> RetentionPolicy:
+    return RetentionPolicy(
+        transcript_retention=(
+            timedelta(hours=config.transcript_retention_hours)
+            if config.transcript_retention_hours
+            else default.transcript_retention
+        ),
+        call_retention=(
+            timedelta(days=config.call_retention_days) if config.call_retention_days else default.call_retention
+        ),
+    )
+
+
+async def get_retention_policy(session: AsyncSession, tenant_id) -> RetentionPolicy:
+    """Effective policy of one tenant (its studio config overrides, else the defaults)."""
+
+    default = default_retention_policy()
+    result = await session.execute(
+        select(StudioConfig.transcript_retention_hours, StudioConfig.call_retention_days)
+        .where(StudioConfig.user_id == str(tenant_id))
+        .limit(1)
+    )
+    config = result.first()
+    return _override(default, config) if config else default
+
+
+async def load_retention_overrides(session: AsyncSession) -> dict[UUID, RetentionPolicy]:
+    """Policies of tenants whose studio config overrides a retention window."""
+
+    default = default_retention_policy()
+    result = await session.execute(
+        select(
+            StudioConfig.user_id,
+            StudioConfig.transcript_retention_hours,
+            StudioConfig.call_retention_days,
+        ).where(
+            or_(
+                StudioConfig.transcript_retention_hours.is_not(None),
+                StudioConfig.call_retention_days.is_not(None),
+            )
+        )
+    )
+    overrides: dict[UUID, RetentionPolicy] = {}
+    for config in result:
+        try:
+            tenant_id = UUID(str(config.user_id))
+        except ValueError:
+            logger.warning("Skipping retention override with invalid user id %r", config.user_id)
+            continue
+        overrides[tenant_id] = _override(default, config)
+    return overrides
+
+
+def _record(action: str, rows: int) -> None:
+    if retention_rows_metric is not None and rows:
+        retention_rows_metric.labels(action=action).inc(rows)
+
+
+async def _in_batches(
+    session: AsyncSession,
+    operation: Callable[..., Awaitable[int]],
+    action: str,
+    *,
+    batch_size: int,
+    max_batches: int,
+    **kwargs: Any,
+) -> tuple[int, bool]:
+    """
+    Run ``operation`` until a batch comes back short, committing after each one.
+
+    Returns the rows processed and whether every expired row was reached
+    (False when ``max_batches`` stopped the run).
+    """
+
+    total = 0
+    for _ in range(max(1, max_batches)):
+        processed = await operation(session, limit=batch_size, **kwargs)
+        await session.commit()
+        _record(action, processed)
+        total += processed
+        if processed < batch_size:
+            return total, True
+    logger.info("Retention [%s] stopped after %s batches; continuing next pass", action, max_batches)
+    return total, False
+
+
+async def _apply_policy(
+    session: AsyncSession,
+    policy: RetentionPolicy,
+    *,
+    now: datetime,
+    batch_size: int,
+    max_batches: int,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+) -> RetentionResult:
+    scope = {"tenant_id": tenant_id, "exclude_tenant_ids": tuple(exclude_tenant_ids)}
+    scrubbed = deleted = 0
+
+    transcript_cutoff = policy.transcript_cutoff(now)
+    if transcript_cutoff is not None:
+        scrubbed, _ = await _in_batches(
+            session,
+            scrub_expired_transcripts,
+            "transcript_scrubbed",
+            before=transcript_cutoff,
+            batch_size=batch_size,
+            max_batches=max_batches,
+            **scope,
+        )
+
+    call_cutoff = policy.call_cutoff(now)
+    if call_cutoff is not None:
+        deleted, finished = await _in_batches(
+            session,
+            prune_old_calls,
+            "call_deleted",
+            before=call_cutoff,
+            batch_size=batch_size,
+            max_batches=max_batches,
+            **scope,
+        )
+        # Rollups go only once no expired call is left, so an interrupted deletion never leaves raw
+        # calls without their hours. A pass finishing a capped run may delete nothing, hence no count check.
+        if finished:
+            await prune_call_rollups(session, before=call_cutoff, **scope)
+            # Topic rows hold terms, not transcript text, and feed the 14-day trending window,
+            # so they live as long as their calls (the foreign key also drops them per call).
+            await prune_call_topics(session, before=call_cutoff, **scope)
+            await session.commit()
+
+    return RetentionResult(transcripts_scrubbed=scrubbed, calls_deleted=deleted)
+
+
+async def apply_retention(
+    session: AsyncSession,
+    *,
+    now: Optional[datetime] = None,
+    batch_size: Optional[int] = None,
+    max_batches: Optional[int] = None,
+) -> RetentionResult:
+    """
+    Apply every tenant's retention policy once.
+
+    Tenants with an override are processed one by one; everybody else shares
+    the default policy in a single set of batches. Commits after every batch.
+    """
+
+    settings = get_settings()
+    now = now or _now()
+    batch_size = batch_size or settings.retention_batch_size
+    max_batches = max_batches or settings.retention_max_batches
+
+    overrides = await load_retention_overrides(session)
+    result = RetentionResult()
+    for tenant_id, policy in overrides.items():
+        result += await _apply_policy(
+            session, policy, now=now, batch_size=batch_size, max_batches=max_batches, tenant_id=tenant_id
+        )
+    result += await _apply_policy(
+        session,
+        default_retention_policy(),
+        now=now,
+        batch_size=batch_size,
+        max_batches=max_batches,
+        exclude_tenant_ids=overrides.keys(),
+    )
+
+    if retention_last_run_metric is not None:
+        retention_last_run_metric.set(now.timestamp())
+    return result
+
+
+class RetentionWorker(PeriodicWorker):
+    """Run :func:`apply_retention` every ``interval_seconds``."""
+
+    name = "retention"
+
+    async def run_once(self) -> None:
+        async with SessionLocal() as session:
+            result = await apply_retention(session)
+        if result.transcripts_scrubbed or result.calls_deleted:
+            logger.info(
+                "Retention pass: %s transcripts scrubbed, %s calls deleted",
+                result.transcripts_scrubbed,
+                result.calls_deleted,
+            )
+
+
+_worker: Optional[RetentionWorker] = None
+
+
+def get_retention_worker() -> RetentionWorker:
+    global _worker
+    if _worker is None:
+        _worker = RetentionWorker(interval_seconds=get_settings().retention_interval_seconds)
+    return _worker
+
+
+__all__ = [
+    "RetentionPolicy",
+    "RetentionResult",
+    "RetentionWorker",
+    "apply_retention",
+    "default_retention_policy",
+    "get_retention_policy",
+    "get_retention_worker",
+    "load_retention_overrides",
+]
@@ -0,0 +1,431 @@
+"""
+In-memory routing index for webhook tenant resolution.
+
+Vapi ``call.ended`` webhooks are routed by assistant id and Twilio status
+callbacks by the called number. :class:`RoutingIndex` keeps both mappings
+(plus user id -> studio config) in process memory, so resolving a webhook is a
+dict lookup followed by primary-key reads instead of scans of ``users`` and
+``studio_configs``.
+
+:class:`RoutingIndexWorker` loads the index on startup and keeps it current.
+Triggers on ``users``, ``studio_configs`` and ``phone_numbers`` publish changed
+keys on the ``ava_routing`` channel. When a session-level Postgres connection
+is available, the worker LISTENs and re-reads only the changed rows.
+Otherwise it polls ``updated_at``. Either way it reloads everything
+periodically (and after the listener reconnects). Until the first load
+completes, and on a miss (a key saved on another worker since the last
+refresh), callers fall back to their SQL lookups.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import inspect, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import Settings, get_settings
+from api.src.infrastructure.database.pooling import POOL_MODE_QUEUE
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.persistence.models.phone_number import PhoneNumber
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.user import User
+
+try:  # pragma: no cover - optional dependency
+    import asyncpg  # type: ignore
+except ImportError:  # pragma: no cover - polling only
+    asyncpg = None
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.routing_index")
+
+ROUTING_CHANNEL = "ava_routing"
+ROUTING_TABLE_USERS = "users"
+ROUTING_TABLE_STUDIO_CONFIGS = "studio_configs"
+ROUTING_TABLE_PHONE_NUMBERS = "phone_numbers"
+ROUTING_TABLES = (ROUTING_TABLE_USERS, ROUTING_TABLE_STUDIO_CONFIGS, ROUTING_TABLE_PHONE_NUMBERS)
+
+# updated_at is the writer's transaction start, so a row can commit after a later poll's watermark.
+_POLL_OVERLAP = timedelta(seconds=30)
+
+if METRICS_AVAILABLE:
+    routing_index_entries_metric = Gauge(
+        "routing_index_entries",
+        "Keys held by the webhook routing index",
+        ["kind"],
+    )
+    routing_index_lookups_metric = Counter(
+        "routing_index_lookups_total",
+        "Webhook routing lookups served from memory",
+        ["kind", "result"],
+    )
+else:
+    routing_index_entries_metric = None
+    routing_index_lookups_metric = None
+
+
+def normalize_phone_number(number: Optional[str]) -> Optional[str]:
+    """Best-effort E.164: strips spaces, turns a ``00`` prefix into ``+`` and adds a missing ``+``."""
+
+    if not number:
+        return None
+    number = number.strip()
+    if not number:
+        return None
+    if number.startswith("00"):
+        number = f"+{number[2:]}"
+    if not number.startswith("+") and number.replace("+", "").lstrip("-").isdigit():
+        number = f"+{number}"
+    return number
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where a webhook belongs: the user, their tenant and their studio config."""
+
+    user_id: str
+    tenant_id: Optional[UUID]
+    config_id: Optional[str]
+
+
+def _tenant_id(user_id: str) -> Optional[UUID]:
+    try:
+        return UUID(str(user_id))
+    except ValueError:
+        return None
+
+
+def _count_lookup(kind: str, route: Optional[Route]) -> Optional[Route]:
+    if routing_index_lookups_metric is not None:
+        routing_index_lookups_metric.labels(kind=kind, result="hit" if route else "miss").inc()
+    return route
+
+
+class RoutingIndex:
+    """
+    Assistant id, phone number and user id -> :class:`Route`.
+
+    The index mirrors the routing columns row by row (users' Twilio numbers,
+    studio configs' assistant ids, ``phone_numbers``) and builds routes at
+    lookup time, so a change to one row never requires recomputing others.
+    """
+
+    def __init__(self) -> None:
+        self._user_numbers: dict[str, Optional[str]] = {}  # every user id -> their Twilio number
+        self._number_users: dict[str, str] = {}
+        self._configs: dict[str, tuple[str, Optional[str]]] = {}  # user id -> (config id, assistant id)
+        self._assistant_users: dict[str, str] = {}
+        self._phones: dict[str, tuple[str, Optional[str]]] = {}  # e164 -> (org id, routed assistant id)
+        # No migration creates phone_numbers yet; it is only read once it exists.
+        self._has_phone_numbers = False
+        self.loaded = False
+
+    # Lookups
+
+    def _route(self, user_id: Optional[str]) -> Optional[Route]:
+        if user_id is None or user_id not in self._user_numbers:
+            return None
+        config = self._configs.get(user_id)
+        return Route(user_id=user_id, tenant_id=_tenant_id(user_id), config_id=config[0] if config else None)
+
+    def for_user(self, user_id: Any) -> Optional[Route]:
+        return _count_lookup("user", self._route(str(user_id)) if user_id else None)
+
+    def for_assistant(self, assistant_id: Optional[str]) -> Optional[Route]:
+        return _count_lookup("assistant", self._route(self._assistant_users.get(assistant_id or "")))
+
+    def for_number(self, number: Optional[str]) -> Optional[Route]:
+        e164 = normalize_phone_number(number)
+        if e164 is None:
+            return _count_lookup("number", None)
+        user_id = self._number_users.get(e164)
+        if user_id is None and e164 in self._phones:
+            org_id, assistant_id = self._phones[e164]
+            # A number routed to an assistant belongs to the assistant's owner, else to its org (a user id).
+            user_id = self._assistant_users.get(assistant_id or "") or org_id
+        return _count_lookup("number", self._route(user_id))
+
+    # Row mirroring
+
+    def _set_user(self, user_id: str, number: Optional[str]) -> None:
+        self._drop_user(user_id)
+        e164 = normalize_phone_number(number)
+        self._user_numbers[user_id] = e164
+        if e164:
+            self._number_users[e164] = user_id
+
+    def _drop_user(self, user_id: str) -> None:
+        e164 = self._user_numbers.pop(user_id, None)
+        if e164 and self._number_users.get(e164) == user_id:
+            del self._number_users[e164]
+
+    def _set_config(self, user_id: str, config_id: str, assistant_id: Optional[str]) -> None:
+        self._drop_config(user_id)
+        self._configs[user_id] = (config_id, assistant_id)
+        if assistant_id:
+            self._assistant_users[assistant_id] = user_id
+
+    def _drop_config(self, user_id: str) -> None:
+        _, assistant_id = self._configs.pop(user_id, (None, None))
+        if assistant_id and self._assistant_users.get(assistant_id) == user_id:
+            del self._assistant_users[assistant_id]
+
+    def _set_phone(self, e164: str, org_id: str, assistant_id: Optional[str]) -> None:
+        key = normalize_phone_number(e164)
+        if key:
+            self._phones[key] = (org_id, assistant_id)
+
+    def _drop_phone(self, e164: str) -> None:
+        self._phones.pop(normalize_phone_number(e164) or "", None)
+
+    def _report(self) -> None:
+        if routing_index_entries_metric is None:
+            return
+        routing_index_entries_metric.labels(kind="assistant").set(len(self._assistant_users))
+        routing_index_entries_metric.labels(kind="number").set(len(self._number_users) + len(self._phones))
+        routing_index_entries_metric.labels(kind="user").set(len(self._user_numbers))
+
+    # Loading
+
+    async def _apply_rows(self, session: AsyncSession, *conditions_by_table: Any) -> Optional[datetime]:
+        user_filter, config_filter, phone_filter = conditions_by_table
+        latest: Optional[datetime] = None
+
+        def seen(updated_at: Optional[datetime]) -> None:
+            nonlocal latest
+            if updated_at is not None and (latest is None or updated_at > latest):
+                latest = updated_at
+
+        if user_filter is not None:
+            for row in await session.execute(
+                select(User.id, User.twilio_phone_number, User.updated_at).where(*user_filter)
+            ):
+                self._set_user(row.id, row.twilio_phone_number)
+                seen(row.updated_at)
+        if config_filter is not None:
+            for row in await session.execute(
+                select(StudioConfig.id, StudioConfig.user_id, StudioConfig.vapi_assistant_id, StudioConfig.updated_at)
+                .where(*config_filter)
+                .order_by(StudioConfig.created_at.desc())
+            ):
+                # Users have one config; should there be several, the oldest wins.
+                self._set_config(row.user_id, row.id, row.vapi_assistant_id)
+                seen(row.updated_at)
+        if phone_filter is not None and self._has_phone_numbers:
+            for row in await session.execute(
+                select(
+                    PhoneNumber.e164,
+                    PhoneNumber.org_id,
+                    PhoneNumber.routing["assistant_id"].as_string().label("assistant_id"),
+                    PhoneNumber.updated_at,
+                ).where(*phone_filter)
+            ):
+                self._set_phone(row.e164, row.org_id, row.assistant_id)
+                seen(row.updated_at)
+        return latest
+
+    async def load(self, session: AsyncSession) -> Optional[datetime]:
+        """Replace the whole index; returns the latest ``updated_at`` read (the polling watermark)."""
+
+        fresh = RoutingIndex()
+        fresh._has_phone_numbers = await session.run_sync(
+            lambda sync_session: inspect(sync_session.connection()).has_table(ROUTING_TABLE_PHONE_NUMBERS)
+        )
+        latest = await fresh._apply_rows(session, (), (), ())
+        # Swap in one step: lookups never see a half-loaded index.
+        self._user_numbers, self._number_users = fresh._user_numbers, fresh._number_users
+        self._configs, self._assistant_users = fresh._configs, fresh._assistant_users
+        self._phones, self._has_phone_numbers = fresh._phones, fresh._has_phone_numbers
+        self.loaded = True
+        self._report()
+        return latest
+
+    async def refresh(self, session: AsyncSession, table: str, key: str) -> None:
+        """Re-read the rows behind one notification (``key`` is the user id, or the number for phone_numbers)."""
+
+        if table == ROUTING_TABLE_USERS:
+            self._drop_user(key)
+            await self._apply_rows(session, (User.id == key,), None, None)
+        elif table == ROUTING_TABLE_STUDIO_CONFIGS:
+            self._drop_config(key)
+            await self._apply_rows(session, None, (StudioConfig.user_id == key,), None)
+        elif table == ROUTING_TABLE_PHONE_NUMBERS:
+            self._drop_phone(key)
+            await self._apply_rows(session, None, None, (PhoneNumber.e164 == key,))
+        self._report()
+
+    async def refresh_since(self, session: AsyncSession, since: Optional[datetime]) -> Optional[datetime]:
+        """Apply rows updated since ``since`` (polling); deletes wait for the next full load."""
+
+        if since is None:
+            return await self.load(session)
+        cutoff = since - _POLL_OVERLAP
+        latest = await self._apply_rows(
+            session,
+            (User.updated_at >= cutoff,),
+            (StudioConfig.updated_at >= cutoff,),
+            (PhoneNumber.updated_at >= cutoff,),
+        )
+        self._report()
+        return max(latest, since) if latest is not None else since
+
+
+def routing_listen_url(settings: Settings) -> Optional[str]:
+    """asyncpg DSN for LISTEN, or None when only polling is possible (PgBouncer transaction mode)."""
+
+    url = settings.routing_index_listen_url
+    if not url and settings.database_pool_mode == POOL_MODE_QUEUE:
+        url = settings.database_url
+    if not url or asyncpg is None:
+        return None
+    parsed = make_url(url)
+    if not parsed.drivername.startswith("postgresql"):
+        return None
+    return parsed.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class RoutingIndexWorker(PeriodicWorker):
+    """Load the routing index, then follow LISTEN/NOTIFY (or poll) to keep it current."""
+
+    name = "routing-index"
+
+    def __init__(
+        self,
+        index: RoutingIndex,
+        *,
+        interval_seconds: float,
+        reload_seconds: float,
+        listen_url: Optional[str] = None,
+        session_factory: async_sessionmaker = SessionLocal,
+    ) -> None:
+        super().__init__(interval_seconds=interval_seconds)
+        self.index = index
+        self._reload_seconds = reload_seconds
+        self._listen_url = listen_url
+        self._session_factory = session_factory
+        self._listener: Any = None
+        self._pending: set[tuple[str, str]] = set()
+        self._reload_needed = True
+        self._loaded_at = 0.0
+        self._watermark: Optional[datetime] = None
+
+    def start(self) -> None:
+        super().start()
+        self.wake()  # Load now rather than after the first poll interval
+
+    async def stop(self) -> None:
+        await super().stop()
+        listener, self._listener = self._listener, None
+        if listener is not None and not listener.is_closed():
+            await listener.close()
+
+    def note_change(self, table: str, key: Any) -> None:
+        """Re-read one key on the next pass (NOTIFY callback, or a write made by this process)."""
+
+        if table in ROUTING_TABLES and key:
+            self._pending.add((table, str(key)))
+            self.wake()
+
+    def _on_notification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        try:
+            change = json.loads(payload)
+            self.note_change(change["table"], change["key"])
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed routing notification: %r", payload)
+
+    async def _ensure_listener(self) -> bool:
+        if self._listen_url is None:
+            return False
+        if self._listener is not None:
+            if not self._listener.is_closed():
+                return True
+            logger.warning("Routing index listener disconnected; reconnecting")
+            self._listener = None
+        try:
+            listener = await asyncpg.connect(self._listen_url, timeout=10)
+            await listener.add_listener(ROUTING_CHANNEL, self._on_notification)
+        except Exception as exc:  # noqa: BLE001 - polling keeps the index current meanwhile
+            logger.warning("Routing index cannot LISTEN (%s); polling instead", exc)
+            return False
+        self._listener = listener
+        # Changes made while nobody was listening are only visible to a full load.
+        self._reload_needed = True
+        return True
+
+    async def run_once(self) -> None:
+        listening = await self._ensure_listener()
+        reload_due = time.monotonic() - self._loaded_at >= self._reload_seconds
+        async with self._session_factory() as session:
+            if self._reload_needed or reload_due or not self.index.loaded:
+                # Notifications that arrive during the load are kept and re-applied afterwards.
+                self._pending.clear()
+                self._watermark = await self.index.load(session)
+                self._reload_needed = False
+                self._loaded_at = time.monotonic()
+                logger.info("Routing index loaded (%s)", "listening" if listening else "polling")
+                return
+
+            pending, self._pending = self._pending, set()
+            for table, key in pending:
+                await self.index.refresh(session, table, key)
+            if not listening:
+                self._watermark = await self.index.refresh_since(session, self._watermark)
+
+
+_index = RoutingIndex()
+_worker: Optional[RoutingIndexWorker] = None
+
+
+def get_routing_index() -> RoutingIndex:
+    return _index
+
+
+def get_routing_index_worker() -> RoutingIndexWorker:
+    global _worker
+    if _worker is None:
+        settings = get_settings()
+        _worker = RoutingIndexWorker(
+            _index,
+            interval_seconds=settings.routing_index_poll_seconds,
+            reload_seconds=settings.routing_index_reload_seconds,
+            listen_url=routing_listen_url(settings),
+        )
+    return _worker
+
+
+def note_routing_change(table: str, key: Any) -> None:
+    """Apply a committed routing change of this process without waiting for NOTIFY or the next poll."""
+
+    if _worker is not None and _worker.running:
+        _worker.note_change(table, key)
+
+
+__all__ = [
+    "ROUTING_CHANNEL",
+    "ROUTING_TABLES",
+    "ROUTING_TABLE_PHONE_NUMBERS",
+    "ROUTING_TABLE_STUDIO_CONFIGS",
+    "ROUTING_TABLE_USERS",
+    "Route",
+    "RoutingIndex",
+    "RoutingIndexWorker",
+    "get_routing_index",
+    "get_routing_index_worker",
+    "normalize_phone_number",
+    "note_routing_change",
+    "routing_listen_url",
+]
@@ -13,6 +13,19 @@ from api.src.infrastructure.persistence.models.tenant import Tenant
 from api.src.infrastructure.persistence.models.user import User
 
 
+def tenant_id_for_user(user: User):
+    """
+    The user's tenant id (``tenant_id = user.id``) without touching the database.
+
+    For read paths: a tenant without a row simply has no calls yet.
+    """
+
+    try:
+        return UUID(str(user.id))
+    except ValueError:
+        return user.id
+
+
 async def ensure_tenant_for_user(session: AsyncSession, user: User, *, name: Optional[str] = None) -> Tenant:
     """
     Ensure a Tenant row exists that matches the user's ID.
@@ -38,4 +51,4 @@ async def ensure_tenant_for_user(session: AsyncSession, user: User, *, name: Opt
     return tenant
 
 
-__all__ = ["ensure_tenant_for_user"]
+__all__ = ["ensure_tenant_for_user", "tenant_id_for_user"]
@@ -2,8 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
 from dataclasses import dataclass
-from functools import lru_cache
 from typing import Any
 
 from fastapi import HTTPException, status
@@ -11,6 +11,8 @@ from twilio.rest import Client as TwilioRestClient
 
 from api.src.core.settings import get_settings
 from api.src.infrastructure.external.circuit_breaker import get_circuit_breaker
+from api.src.infrastructure.external.twilio_gateway import get_twilio_gateway
+from api.src.infrastructure.external.single_flight import SingleFlight, request_key
 from api.src.infrastructure.persistence.models.user import User
 
 
@@ -52,17 +54,6 @@ def resolve_twilio_credentials(
     )
 
 
-@lru_cache(maxsize=128)
-def _get_cached_client(account_sid: str, auth_token: str) -> TwilioRestClient:
-    """
-    Return cached Twilio client for connection pooling.
-    
-    LRU cache ensures we reuse clients for same credentials,
-    reducing connection overhead.
-    """
-    return TwilioRestClient(account_sid, auth_token)
-
-
 def get_twilio_client(
     user: User | None = None,
     *,
@@ -71,10 +62,37 @@ def get_twilio_client(
     """
     Get Twilio client with connection pooling.
     
-    Resolves credentials and returns cached client instance.
+    Resolves credentials and returns the gateway's cached client instance.
+    Call its methods through ``get_twilio_gateway().run`` so they stay off the event loop.
     """
     creds = resolve_twilio_credentials(user, allow_env_fallback=allow_env_fallback)
-    return _get_cached_client(creds.account_sid, creds.auth_token)
+    return get_twilio_gateway().client(creds.account_sid, creds.auth_token)
+
+
+_lookups = SingleFlight("twilio")
+
+
+async def list_incoming_numbers(
+    client: TwilioRestClient,
+    *,
+    phone_number: str | None = None,
+    limit: int = 50,
+) -> list[Any]:
+    """
+    List the account's incoming numbers off the event loop.
+
+    Concurrent identical lookups with the same credentials share one Twilio
+    request; the auth token is part of the key so bad credentials never reuse
+    a good result.
+    """
+    params: dict[str, Any] = {"limit": limit}
+    if phone_number:
+        params["phone_number"] = phone_number
+    token_digest = hashlib.sha256((client.password or "").encode()).hexdigest()[:16]
+    key = request_key(client.username, token_digest, "incoming_phone_numbers", params=params)
+    return await _lookups.do(
+        key, lambda: get_twilio_gateway().run("incoming_phone_numbers.list", client.incoming_phone_numbers.list, **params)
+    )
 
 
 async def make_twilio_call_with_circuit_breaker(
@@ -105,8 +123,9 @@ async def make_twilio_call_with_circuit_breaker(
     
     async def _make_call():
         client = get_twilio_client(user, allow_env_fallback=True)
-        # Note: Twilio SDK is synchronous, but we wrap it for circuit breaker compatibility
-        return client.calls.create(to=to, from_=from_, url=url, method=method)
+        return await get_twilio_gateway().run(
+            "calls.create", client.calls.create, to=to, from_=from_, url=url, method=method
+        )
     
     return await breaker.call(_make_call)
 
@@ -137,7 +156,7 @@ async def send_twilio_sms_with_circuit_breaker(
     
     async def _send_sms():
         client = get_twilio_client(user, allow_env_fallback=True)
-        return client.messages.create(to=to, from_=from_, body=body)
+        return await get_twilio_gateway().run("messages.create", client.messages.create, to=to, from_=from_, body=body)
     
     return await breaker.call(_send_sms)
 
@@ -146,6 +165,7 @@ __all__ = [
     "TwilioCredentials",
     "resolve_twilio_credentials",
     "get_twilio_client",
+    "list_incoming_numbers",
     "make_twilio_call_with_circuit_breaker",
     "send_twilio_sms_with_circuit_breaker",
 ]
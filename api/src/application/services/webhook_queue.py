@@ -0,0 +1,358 @@
+"""
+Background processing of queued webhook events.
+
+Webhook endpoints verify the request, store the raw event in the
+``webhook_events`` outbox and return immediately. :class:`WebhookQueueWorker`
+drains the outbox with a bounded number of concurrent handlers, retries
+failures with exponential backoff and jitter, and dead-letters events that
+keep failing. Handlers are registered per ``(source, event_type)``.
+
+Events carrying a provider id (Vapi call id, Twilio CallSid + status) are
+deduplicated: a small in-process LRU answers hot redeliveries without any
+I/O, and the outbox's unique ``(source, event_type, event_key)`` index is
+the durable check.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.core.background import PeriodicWorker
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import SessionLocal
+from api.src.infrastructure.persistence.models.webhook_event import WEBHOOK_EVENT_DONE, WebhookEvent
+from api.src.infrastructure.persistence.repositories.webhook_event_repository import (
+    claim_webhook_events,
+    complete_webhook_event,
+    enqueue_webhook_event,
+    fail_webhook_event,
+    get_webhook_queue_stats,
+    prune_webhook_events,
+    webhook_event_exists,
+)
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.webhook_queue")
+
+WebhookHandler = Callable[[dict[str, Any]], Awaitable[Any]]
+
+if METRICS_AVAILABLE:
+    webhook_queue_depth_metric = Gauge(
+        "webhook_queue_depth",
+        "Webhook events in the outbox by status",
+        ["status"],
+    )
+    webhook_queue_lag_metric = Gauge(
+        "webhook_queue_lag_seconds",
+        "Age of the oldest due webhook event",
+    )
+    webhook_events_processed_metric = Counter(
+        "webhook_events_processed_total",
+        "Webhook events processed by outcome (done, retry, dead)",
+        ["source", "event_type", "outcome"],
+    )
+    webhook_event_duration_metric = Histogram(
+        "webhook_event_processing_seconds",
+        "Time spent in a webhook event handler",
+        ["source", "event_type"],
+    )
+    webhook_duplicates_metric = Counter(
+        "webhook_duplicates_total",
+        "Redelivered webhook events ignored by the idempotency check",
+        ["source", "event_type"],
+    )
+else:
+    webhook_queue_depth_metric = None
+    webhook_queue_lag_metric = None
+    webhook_events_processed_metric = None
+    webhook_event_duration_metric = None
+    webhook_duplicates_metric = None
+
+# Recently seen event keys per process; the database remains the source of truth.
+DEDUPE_CACHE_SIZE = 10_000
+
+_handlers: dict[tuple[str, str], WebhookHandler] = {}
+
+
+def _now() -> datetime:
+    return datetime.now(tz=timezone.utc)
+
+
+def register_webhook_handler(source: str, event_type: str, handler: WebhookHandler) -> None:
+    """Route queued events of ``source``/``event_type`` to ``handler(payload)``."""
+
+    _handlers[(source, event_type)] = handler
+
+
+class RecentWebhookKeys:
+    """Bounded LRU of ``(source, event_type, event_key)`` already stored in the outbox."""
+
+    def __init__(self, maxsize: int = DEDUPE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._keys: OrderedDict[tuple[str, str, str], None] = OrderedDict()
+
+    def __contains__(self, key: tuple[str, str, str]) -> bool:
+        if key in self._keys:
+            self._keys.move_to_end(key)
+            return True
+        return False
+
+    def add(self, key: tuple[str, str, str]) -> None:
+        self._keys[key] = None
+        self._keys.move_to_end(key)
+        while len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+_recent_keys = RecentWebhookKeys()
+
+
+def webhook_recently_seen(source: str, event_type: str, event_key: Optional[str]) -> bool:
+    """True when this process already stored the event (no I/O). Counts the duplicate."""
+
+    if event_key is None or (source, event_type, event_key) not in _recent_keys:
+        return False
+    _record_duplicate(source, event_type)
+    return True
+
+
+def remember_webhook(source: str, event_type: str, event_key: Optional[str]) -> None:
+    """Cache a key once the event row is committed."""
+
+    if event_key is not None:
+        _recent_keys.add((source, event_type, event_key))
+
+
+def _record_duplicate(source: str, event_type: str) -> None:
+    logger.info("Ignoring duplicate %s/%s webhook", source, event_type)
+    if webhook_duplicates_metric is not None:
+        webhook_duplicates_metric.labels(source=source, event_type=event_type).inc()
+
+
+async def enqueue_webhook(
+    session: AsyncSession,
+    *,
+    source: str,
+    event_type: str,
+    payload: dict[str, Any],
+    event_key: Optional[str] = None,
+) -> bool:
+    """
+    Persist an event in the outbox, commit, and wake the local worker.
+
+    Returns False (and stores nothing) when ``event_key`` was already queued.
+    """
+
+    if webhook_recently_seen(source, event_type, event_key):
+        return False
+    inserted = await enqueue_webhook_event(
+        session, source=source, event_type=event_type, event_key=event_key, payload=payload, now=_now()
+    )
+    await session.commit()
+    remember_webhook(source, event_type, event_key)
+    if not inserted:
+        _record_duplicate(source, event_type)
+        return False
+    get_webhook_queue_worker().wake()
+    return True
+
+
+async def run_webhook_inline(
+    *,
+    source: str,
+    event_type: str,
+    event_key: Optional[str],
+    payload: dict[str, Any],
+    handler: WebhookHandler,
+) -> bool:
+    """
+    Handle an event in the request when the queue is disabled, at most once per key.
+
+    The event is recorded as done only after ``handler`` succeeds, so a failed
+    attempt can still be redelivered. Returns False for a duplicate.
+    """
+
+    if webhook_recently_seen(source, event_type, event_key):
+        return False
+    if event_key is not None:
+        async with SessionLocal() as session:
+            if await webhook_event_exists(session, source=source, event_type=event_type, event_key=event_key):
+                remember_webhook(source, event_type, event_key)
+                _record_duplicate(source, event_type)
+                return False
+
+    await handler(payload)
+
+    async with SessionLocal() as session:
+        await enqueue_webhook_event(
+            session,
+            source=source,
+            event_type=event_type,
+            event_key=event_key,
+            payload=payload,
+            now=_now(),
+            status=WEBHOOK_EVENT_DONE,
+        )
+        await session.commit()
+    remember_webhook(source, event_type, event_key)
+    return True
+
+
+def retry_delay(attempts: int, *, base_seconds: float, max_seconds: float) -> float:
+    """Exponential backoff with "equal jitter": half fixed, half random."""
+
+    delay = min(max_seconds, base_seconds * 2 ** max(0, attempts - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def _record(event: WebhookEvent, outcome: str) -> None:
+    if webhook_events_processed_metric is not None:
+        webhook_events_processed_metric.labels(
+            source=event.source, event_type=event.event_type, outcome=outcome
+        ).inc()
+
+
+class WebhookQueueWorker(PeriodicWorker):
+    """
+    Drain the webhook outbox.
+
+    Each pass claims up to ``concurrency`` due events at a time and runs
+    their handlers concurrently until nothing is due. ``wake()`` (called on
+    enqueue) starts a pass immediately; the interval only matters for retries
+    and events enqueued by other processes.
+    """
+
+    name = "webhook-queue"
+
+    def __init__(
+        self,
+        *,
+        interval_seconds: float,
+        concurrency: int,
+        session_factory: async_sessionmaker = SessionLocal,
+    ) -> None:
+        super().__init__(interval_seconds=interval_seconds)
+        self.concurrency = max(1, concurrency)
+        self._session_factory = session_factory
+        self._last_housekeeping: Optional[float] = None
+
+    async def run_once(self) -> None:
+        settings = get_settings()
+        lease = timedelta(seconds=settings.webhook_queue_lease_seconds)
+        while True:
+            async with self._session_factory() as session:
+                events = await claim_webhook_events(session, limit=self.concurrency, now=_now(), lease=lease)
+            if not events:
+                break
+            await asyncio.gather(*(self._process(event) for event in events))
+
+        await self._housekeeping()
+
+    async def _process(self, event: WebhookEvent) -> None:
+        settings = get_settings()
+        handler = _handlers.get((event.source, event.event_type))
+        started = time.perf_counter()
+        error: Optional[str] = None
+        if handler is None:
+            error = f"No handler registered for {event.source}/{event.event_type}"
+        else:
+            try:
+                await handler(event.payload)
+            except Exception as exc:  # noqa: BLE001 - any failure is retried
+                error = f"{type(exc).__name__}: {exc}"
+                logger.warning(
+                    "Webhook event %s (%s) failed on attempt %s", event.id, event.event_type, event.attempts,
+                    exc_info=True,
+                )
+        if webhook_event_duration_metric is not None:
+            webhook_event_duration_metric.labels(source=event.source, event_type=event.event_type).observe(
+                time.perf_counter() - started
+            )
+
+        async with self._session_factory() as session:
+            if error is None:
+                await complete_webhook_event(session, event.id, now=_now())
+                outcome = "done"
+            elif handler is None or event.attempts >= settings.webhook_queue_max_attempts:
+                await fail_webhook_event(session, event.id, error=error, retry_at=None)
+                outcome = "dead"
+                logger.error("Webhook event %s dead-lettered after %s attempts: %s", event.id, event.attempts, error)
+            else:
+                delay = retry_delay(
+                    event.attempts,
+                    base_seconds=settings.webhook_queue_backoff_seconds,
+                    max_seconds=settings.webhook_queue_max_backoff_seconds,
+                )
+                await fail_webhook_event(session, event.id, error=error, retry_at=_now() + timedelta(seconds=delay))
+                outcome = "retry"
+            await session.commit()
+        _record(event, outcome)
+
+    async def _housekeeping(self) -> None:
+        """Prune processed events and refresh the depth/lag gauges, at most every few seconds."""
+
+        settings = get_settings()
+        tick = time.monotonic()
+        if self._last_housekeeping is not None and tick - self._last_housekeeping < settings.webhook_queue_stats_seconds:
+            return
+        self._last_housekeeping = tick
+
+        now = _now()
+        async with self._session_factory() as session:
+            await prune_webhook_events(session, before=now - timedelta(days=settings.webhook_event_retention_days))
+            await session.commit()
+            stats = await get_webhook_queue_stats(session, now=now)
+
+        if webhook_queue_depth_metric is not None:
+            webhook_queue_depth_metric.labels(status="pending").set(stats.pending)
+            webhook_queue_depth_metric.labels(status="processing").set(stats.processing)
+            webhook_queue_depth_metric.labels(status="dead").set(stats.dead)
+        if webhook_queue_lag_metric is not None:
+            oldest = stats.oldest_due_at
+            if oldest is not None and oldest.tzinfo is None:
+                oldest = oldest.replace(tzinfo=timezone.utc)
+            webhook_queue_lag_metric.set(max(0.0, (now - oldest).total_seconds()) if oldest else 0.0)
+
+
+_worker: Optional[WebhookQueueWorker] = None
+
+
+def get_webhook_queue_worker() -> WebhookQueueWorker:
+    global _worker
+    if _worker is None:
+        settings = get_settings()
+        _worker = WebhookQueueWorker(
+            interval_seconds=settings.webhook_queue_poll_seconds,
+            concurrency=settings.webhook_queue_concurrency,
+        )
+    return _worker
+
+
+__all__ = [
+    "RecentWebhookKeys",
+    "WebhookQueueWorker",
+    "enqueue_webhook",
+    "get_webhook_queue_worker",
+    "register_webhook_handler",
+    "remember_webhook",
+    "retry_delay",
+    "run_webhook_inline",
+    "webhook_recently_seen",
+]
@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
+from api.src.core.background import register_background_worker
 from api.src.core.middleware import configure_middleware
 from api.src.core.settings import get_settings
 from api.src.core.logging import configure_logging
@@ -93,6 +94,60 @@ def create_app() -> FastAPI:
 
     app.include_router(api_v1_router, prefix=settings.api_prefix)
 
+    @app.on_event("shutdown")
+    async def close_outbound_http_clients() -> None:
+        from api.src.infrastructure.external.http_pool import close_http_clients
+
+        await close_http_clients()
+
+    @app.on_event("shutdown")
+    async def stop_twilio_gateway() -> None:
+        from api.src.infrastructure.external.twilio_gateway import close_twilio_gateway
+
+        close_twilio_gateway()
+
+    @app.on_event("shutdown")
+    async def close_smtp_sessions() -> None:
+        from api.src.infrastructure.email.smtp_client import close_smtp_client
+
+        close_smtp_client()
+
+    @app.on_event("shutdown")
+    async def dispose_database_engines() -> None:
+        from api.src.infrastructure.database.session import dispose_engines
+
+        await dispose_engines()
+
+    if settings.call_sync_enabled:
+        from api.src.application.services.call_sync import get_call_sync_worker
+
+        register_background_worker(app, get_call_sync_worker())
+
+    if settings.retention_enabled:
+        from api.src.application.services.retention import get_retention_worker
+
+        register_background_worker(app, get_retention_worker())
+
+    if settings.webhook_queue_enabled:
+        from api.src.application.services.webhook_queue import get_webhook_queue_worker
+
+        register_background_worker(app, get_webhook_queue_worker())
+
+    if settings.email_queue_enabled:
+        from api.src.application.services.outbound_email import get_outbound_email_worker
+
+        register_background_worker(app, get_outbound_email_worker())
+
+    if settings.call_digest_enabled:
+        from api.src.application.services.call_digest import get_call_digest_worker
+
+        register_background_worker(app, get_call_digest_worker())
+
+    if settings.routing_index_enabled:
+        from api.src.application.services.routing_index import get_routing_index_worker
+
+        register_background_worker(app, get_routing_index_worker())
+
     return app
 
 
@@ -0,0 +1,92 @@
+"""Lightweight periodic background workers bound to the FastAPI lifecycle."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import FastAPI
+
+from api.src.core.settings import get_settings
+
+logger = logging.getLogger("ava.background")
+
+
+class PeriodicWorker:
+    """
+    Run ``run_once`` every ``interval_seconds`` inside the API event loop.
+
+    Subclasses implement ``run_once``. Calling ``wake()`` triggers an
+    immediate pass instead of waiting for the next tick, which lets request
+    handlers ask for on-demand work without blocking on it.
+    """
+
+    name = "worker"
+
+    def __init__(self, *, interval_seconds: float) -> None:
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run_once(self) -> None:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # Rebind the event to the running loop (workers may outlive a TestClient loop)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._loop(), name=f"ava-{self.name}")
+        logger.info("Background worker [%s] started", self.name)
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        logger.info("Background worker [%s] stopped", self.name)
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:  # noqa: BLE001 - a failed pass must not kill the loop
+                logger.exception("Background worker [%s] pass failed", self.name)
+
+
+def register_background_worker(app: FastAPI, worker: PeriodicWorker) -> None:
+    """Start ``worker`` on application startup and stop it on shutdown."""
+
+    @app.on_event("startup")
+    async def _start_worker() -> None:
+        if not get_settings().background_workers_enabled:
+            logger.info("Background workers disabled, not starting [%s]", worker.name)
+            return
+        worker.start()
+
+    @app.on_event("shutdown")
+    async def _stop_worker() -> None:
+        await worker.stop()
+
+
+__all__ = ["PeriodicWorker", "register_background_worker"]
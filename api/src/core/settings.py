@@ -26,6 +26,10 @@ class Settings(BaseSettings):
     jwt_secret_key: str = "CHANGE_ME_IN_PRODUCTION_USE_ENV_VAR"
     twilio_account_sid: Optional[str] = None
     twilio_auth_token: Optional[str] = None
+    # The synchronous SDK runs on a bounded worker pool (see twilio_gateway)
+    twilio_max_concurrency: int = 16
+    twilio_timeout_seconds: float = 15.0
+    twilio_client_cache_size: int = 128
 
     # Email settings (Resend)
     resend_api_key: Optional[str] = None
@@ -35,6 +39,12 @@ class Settings(BaseSettings):
     # Backend URL (for webhook configuration)
     backend_url: str = "https://ava-api-production.onrender.com"
     smtp_encryption_key: str = ""
+    # Tenant SMTP: authenticated sessions are pooled per configuration (see smtp_client)
+    smtp_max_workers: int = 8  # Threads running blocking smtplib calls
+    smtp_pool_size: int = 4  # Concurrent sessions per SMTP configuration
+    smtp_idle_timeout_seconds: float = 60.0  # Idle sessions are closed after this
+    smtp_timeout_seconds: float = 10.0
+    smtp_max_messages_per_connection: int = 100  # Then the session is recycled
 
     # Feature flags
     integrations_stub_mode: bool = True  # Enable stub integrations (disable in production)
@@ -43,15 +53,110 @@ class Settings(BaseSettings):
     database_max_retries: int = 3  # Number of times to retry transient failures
     database_retry_backoff_seconds: float = 0.5  # Base backoff between retries (exponential)
     database_statement_timeout_ms: int = 15_000  # Applied via server_settings for safety
+    database_pool_mode: str = "nullpool_pgbouncer"  # or "queue_pool" for direct Postgres / session pooling
+    database_pool_size: int = 10  # queue_pool only
+    database_max_overflow: int = 10  # queue_pool only
+    database_pool_timeout_seconds: float = 10.0  # queue_pool: wait for a free connection
+    database_pool_recycle_seconds: int = 1800  # queue_pool: reconnect older connections
+    database_pool_pre_ping: bool = True  # queue_pool: validate connections on checkout
+    database_statement_cache_size: int = 100  # queue_pool: asyncpg prepared statements per connection
+    database_read_url: Optional[str] = None  # Optional read replica (analytics, call listings)
+    database_read_health_interval_seconds: float = 10.0  # Replica probe interval; reads fall back to primary
+    database_read_health_timeout_seconds: float = 2.0
     
     # Circuit breaker configuration (Phase 2-4)
     circuit_breaker_enabled: bool = True
     circuit_breaker_threshold: int = 3
     circuit_breaker_recovery_timeout: int = 30
+    circuit_breaker_registry_size: int = 1024  # Per-tenant breakers kept in memory (LRU)
+    circuit_breaker_redis_url: Optional[str] = None  # Share open/closed state across workers
+    vapi_max_concurrency_per_tenant: int = 8  # In-flight Vapi requests per API token
+    vapi_retry_max_attempts: int = 3
+    vapi_retry_backoff_seconds: float = 0.5
+    vapi_retry_max_backoff_seconds: float = 8.0
+    vapi_retry_deadline_seconds: float = 20.0  # Total budget, including Retry-After waits
+    vapi_cache_enabled: bool = True  # Read-through cache of assistants and phone numbers
+    vapi_cache_ttl_seconds: float = 60.0
+    vapi_cache_stale_seconds: float = 300.0  # Served while a background refresh runs
+    cache_max_entries: int = 10_000  # In-process cache size (LRU)
+    cache_redis_url: Optional[str] = None  # Share cached reads across workers
+    auth_user_cache_ttl_seconds: float = 30.0  # Process-local user cache per (user id, token iat); 0 disables
     
+    # Outbound HTTP pools (one shared keep-alive client per upstream, e.g. Vapi, OpenAI)
+    http_pool_max_connections: int = 100
+    http_pool_max_keepalive: int = 20
+    http_pool_keepalive_expiry_seconds: float = 30.0
+    http_timeout_seconds: float = 10.0
+    http_connect_timeout_seconds: float = 5.0
+    http2_enabled: bool = True  # Needs the optional h2 package, otherwise HTTP/1.1
+
     # Rate limiting configuration (Phase 2-4)
     rate_limit_per_minute: int = 10  # 30-60 recommended for production
 
+    # Background workers
+    background_workers_enabled: bool = True  # Disable in tests / one-off scripts
+
+    # Incremental Vapi call sync
+    call_sync_enabled: bool = True
+    call_sync_interval_seconds: int = 300  # Full pass over all tenants
+    call_sync_page_size: int = 100
+    call_sync_max_pages: int = 5  # Upper bound of pages fetched per tenant per pass
+
+    # Analytics read hourly call_rollups instead of raw calls. Enable only after
+    # scripts/backfill_call_rollups.py has run: until then the table holds new calls only.
+    analytics_use_rollups: bool = False
+    # Trending topics read call_topics instead of extracting terms from raw calls. Enable only
+    # after scripts/backfill_call_topics.py has run: until then the table holds new calls only.
+    analytics_use_topic_index: bool = False
+
+    # GET /calls/export rows fetched per server-side cursor round trip
+    call_export_batch_size: int = 1000
+
+    # Data retention job (tenants can override the windows in their studio config)
+    retention_enabled: bool = True
+    retention_interval_seconds: int = 900
+    retention_batch_size: int = 1000  # Rows per UPDATE/DELETE statement
+    retention_max_batches: int = 50  # Per policy per pass; the rest waits for the next pass
+    transcript_retention_hours: int = 24
+    call_retention_days: Optional[int] = None  # None keeps call records forever
+
+    # Webhook outbox (call.ended events are queued and processed in the background)
+    webhook_queue_enabled: bool = True
+    webhook_queue_concurrency: int = 4  # Events handled at once per process
+    webhook_queue_poll_seconds: float = 2.0
+    webhook_queue_max_attempts: int = 8  # Then the event is dead-lettered
+    webhook_queue_backoff_seconds: float = 5.0
+    webhook_queue_max_backoff_seconds: float = 900.0
+    webhook_queue_lease_seconds: int = 300  # Processing events older than this are reclaimed
+    webhook_queue_stats_seconds: float = 15.0
+    webhook_event_retention_days: int = 7
+
+    # Outbound email queue (magic links, call summaries)
+    email_queue_enabled: bool = True
+    email_queue_concurrency: int = 8  # Emails claimed per batch
+    email_queue_poll_seconds: float = 5.0
+    email_queue_smtp_concurrency: int = 2  # Parallel sessions per SMTP configuration
+    email_queue_resend_concurrency: int = 4  # Parallel Resend API calls
+    email_queue_max_attempts: int = 6  # Then the email is dead-lettered
+    email_queue_backoff_seconds: float = 30.0
+    email_queue_max_backoff_seconds: float = 3600.0
+    email_queue_lease_seconds: int = 300  # Sending emails older than this are reclaimed
+    email_queue_stats_seconds: float = 15.0
+    outbound_email_retention_days: int = 7
+
+    # Hourly/daily call summary digests (tenants opt in through their studio config)
+    call_digest_enabled: bool = True
+    call_digest_interval_seconds: int = 300
+    call_digest_grace_seconds: int = 600  # Wait after a window closes for late webhooks and the sync
+
+    # In-memory webhook routing index (assistant id / phone number -> user, tenant, studio config)
+    routing_index_enabled: bool = True
+    routing_index_poll_seconds: float = 30.0  # Polls updated_at when LISTEN/NOTIFY is unavailable
+    routing_index_reload_seconds: float = 900.0  # Full reload (catches deletes missed while polling)
+    # LISTEN needs a session-level connection: set this when DATABASE_URL goes through PgBouncer in
+    # transaction mode. Defaults to database_url with database_pool_mode=queue_pool, polling otherwise.
+    routing_index_listen_url: Optional[str] = None
+
     @field_validator("allowed_origins", mode="before")
     @classmethod
     def parse_origins(cls, v) -> List[str]:
@@ -0,0 +1,97 @@
+"""
+Keyword extraction for call topics.
+
+Terms come from the call metadata (``topics``, ``tags``, ``keywords``) and
+from transcript words longer than three characters, minus the stopwords of
+the tenant's language. Extraction runs once per call at ingest; analytics
+only aggregates the stored counts.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any, FrozenSet, Optional
+
+MAX_TERM_LENGTH = 64
+MIN_TRANSCRIPT_TOKEN_LENGTH = 4
+_PUNCTUATION = ".,!?:;()[]{}\"'…«»“”‘’-"
+
+STOPWORDS_BY_LANGUAGE: dict[str, FrozenSet[str]] = {
+    "en": frozenset(
+        {
+            "the", "and", "you", "from", "your", "this", "that", "have", "will", "just", "been",
+            "could", "would", "should", "there", "their", "they", "them", "then", "than", "what",
+            "when", "where", "which", "while", "with", "about", "into", "some", "also", "very",
+            "were", "here", "over", "only", "more", "much", "yeah", "okay", "sure", "thank",
+            "thanks", "hello", "please", "call", "calling", "right", "well", "like", "know",
+            "want", "need", "going", "does", "doing", "said", "because", "yes",
+        }
+    ),
+    "fr": frozenset(
+        {
+            "est", "que", "pour", "avec", "nous", "vous", "avez", "dans", "elle", "ils", "elles",
+            "leur", "leurs", "mais", "donc", "alors", "aussi", "très", "bien", "tout", "tous",
+            "toute", "toutes", "cette", "celui", "celle", "comme", "quand", "suis", "sont",
+            "était", "être", "avoir", "fait", "faire", "peut", "plus", "moins", "votre", "notre",
+            "vos", "nos", "sur", "par", "pas", "oui", "non", "d'accord", "c'est", "j'ai",
+            "qu'il", "quoi", "voilà", "bonjour", "bonsoir", "merci", "appel", "allô", "allo",
+        }
+    ),
+    "es": frozenset(
+        {
+            "que", "para", "con", "por", "una", "los", "las", "del", "este", "esta", "estos",
+            "pero", "como", "cuando", "donde", "porque", "muy", "bien", "todo", "todos", "usted",
+            "ustedes", "nosotros", "tiene", "tengo", "puede", "hacer", "están", "está", "sobre",
+            "hola", "gracias", "bueno", "vale", "llamada", "favor",
+        }
+    ),
+    "de": frozenset(
+        {
+            "und", "der", "die", "das", "ich", "sie", "wir", "ihr", "mit", "für", "auf", "ist",
+            "nicht", "eine", "einen", "einem", "einer", "aber", "auch", "oder", "wenn", "dann",
+            "noch", "schon", "sehr", "haben", "habe", "können", "kann", "werden", "wird", "ihre",
+            "hallo", "danke", "bitte", "anruf", "genau", "also",
+        }
+    ),
+}
+
+_ALL_STOPWORDS: FrozenSet[str] = frozenset().union(*STOPWORDS_BY_LANGUAGE.values())
+
+
+def stopwords_for(language: Optional[str]) -> FrozenSet[str]:
+    """
+    Stopwords for a language tag such as ``fr-FR`` or ``en``.
+
+    Unknown or missing languages get every list combined, which is what
+    mixed-language tenants want anyway.
+    """
+
+    base = (language or "").split("-")[0].split("_")[0].lower()
+    return STOPWORDS_BY_LANGUAGE.get(base, _ALL_STOPWORDS)
+
+
+def extract_terms(transcript: Optional[str], *metadata_values: Any, language: Optional[str] = None) -> Counter[str]:
+    """Count the topic terms of one call."""
+
+    stopwords = stopwords_for(language)
+    terms: Counter[str] = Counter()
+
+    def add(term: str) -> None:
+        term = term.lower()[:MAX_TERM_LENGTH]
+        if term and term not in stopwords:
+            terms[term] += 1
+
+    for value in metadata_values:  # meta["topics"], meta["tags"], meta["keywords"]
+        if isinstance(value, list):
+            for item in value:
+                if item:
+                    add(str(item).strip())
+    if transcript:
+        for token in transcript.split():
+            token = token.strip(_PUNCTUATION)
+            if len(token) >= MIN_TRANSCRIPT_TOKEN_LENGTH:
+                add(token)
+    return terms
+
+
+__all__ = ["MAX_TERM_LENGTH", "STOPWORDS_BY_LANGUAGE", "extract_terms", "stopwords_for"]
@@ -0,0 +1,18 @@
+"""Caching infrastructure module."""
+from api.src.infrastructure.cache.read_through import (
+    CacheBackend,
+    CacheEntry,
+    InMemoryCacheBackend,
+    ReadThroughCache,
+    RedisCacheBackend,
+    get_cache_backend,
+)
+
+__all__ = [
+    "CacheBackend",
+    "CacheEntry",
+    "InMemoryCacheBackend",
+    "ReadThroughCache",
+    "RedisCacheBackend",
+    "get_cache_backend",
+]
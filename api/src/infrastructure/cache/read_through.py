@@ -0,0 +1,248 @@
+"""
+Read-through cache with TTL and stale-while-revalidate.
+
+Entries live in a namespace (typically one tenant) so a write can drop
+everything the tenant has cached in one call. A fresh entry is served as is;
+a stale one is served immediately while a single background task reloads it;
+past the stale window the caller waits for the loader. The in-process LRU is
+the default backend, Redis (optional) shares entries between workers.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from api.src.core.settings import get_settings
+
+try:
+    from prometheus_client import Counter
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+try:
+    import redis.asyncio as redis_asyncio
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger("ava.cache")
+
+if METRICS_AVAILABLE:
+    cache_requests_metric = Counter(
+        "read_through_cache_requests_total",
+        "Read-through cache lookups by result (hit, stale, miss)",
+        ["cache", "result"],
+    )
+else:
+    cache_requests_metric = None
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """A cached value with its freshness deadlines (unix time)."""
+
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+
+class CacheBackend(Protocol):
+    async def get(self, namespace: str, key: str) -> Optional[CacheEntry]: ...
+
+    async def set(self, namespace: str, key: str, entry: CacheEntry) -> None: ...
+
+    async def invalidate(self, namespace: str) -> None: ...
+
+
+class InMemoryCacheBackend:
+    """Process-local LRU bounded to ``max_entries``. Values are copied in and out."""
+
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[tuple[str, str], CacheEntry] = OrderedDict()
+        self._namespaces: dict[str, set[str]] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return None
+        if entry.stale_until <= time.time():
+            self._discard((namespace, key))
+            return None
+        self._entries.move_to_end((namespace, key))
+        return CacheEntry(copy.deepcopy(entry.value), entry.fresh_until, entry.stale_until)
+
+    async def set(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        self._entries[(namespace, key)] = CacheEntry(copy.deepcopy(entry.value), entry.fresh_until, entry.stale_until)
+        self._entries.move_to_end((namespace, key))
+        self._namespaces.setdefault(namespace, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest, _ = next(iter(self._entries.items()))
+            self._discard(oldest)
+
+    async def invalidate(self, namespace: str) -> None:
+        for key in self._namespaces.pop(namespace, set()):
+            self._entries.pop((namespace, key), None)
+
+    def _discard(self, item: tuple[str, str]) -> None:
+        self._entries.pop(item, None)
+        keys = self._namespaces.get(item[0])
+        if keys is not None:
+            keys.discard(item[1])
+            if not keys:
+                del self._namespaces[item[0]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """One Redis hash per namespace; values must be JSON serialisable (needs ``redis``)."""
+
+    def __init__(self, url: str, *, prefix: str = "ava:cache:") -> None:
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("The redis package is required for the Redis cache backend")
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, namespace: str, key: str) -> Optional[CacheEntry]:
+        raw = await self._client.hget(self._prefix + namespace, key)
+        if not raw:
+            return None
+        data = json.loads(raw)
+        if data["stale_until"] <= time.time():
+            return None
+        return CacheEntry(data["value"], data["fresh_until"], data["stale_until"])
+
+    async def set(self, namespace: str, key: str, entry: CacheEntry) -> None:
+        name = self._prefix + namespace
+        payload = json.dumps(
+            {"value": entry.value, "fresh_until": entry.fresh_until, "stale_until": entry.stale_until}
+        )
+        async with self._client.pipeline(transaction=False) as pipe:
+            pipe.hset(name, key, payload)
+            pipe.expire(name, max(1, int(entry.stale_until - time.time())))
+            await pipe.execute()
+
+    async def invalidate(self, namespace: str) -> None:
+        await self._client.delete(self._prefix + namespace)
+
+
+class ReadThroughCache:
+    """
+    Serve ``loader()`` results for ``ttl_seconds``, then stale for ``stale_seconds`` more.
+
+    Backend errors degrade to calling the loader; a failed background refresh
+    keeps serving the stale value until it expires.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        backend: CacheBackend,
+        ttl_seconds: float,
+        stale_seconds: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self._generations: dict[str, int] = {}
+        self._refreshing: dict[tuple[str, str], asyncio.Task] = {}
+
+    async def get_or_load(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            entry = await self.backend.get(namespace, key)
+        except Exception:  # noqa: BLE001 - a cache outage must not fail reads
+            logger.warning("Cache [%s] read failed; loading directly", self.name, exc_info=True)
+            entry = None
+
+        now = time.time()
+        if entry is not None and now < entry.fresh_until:
+            self._record("hit")
+            return entry.value
+        if entry is not None:
+            self._record("stale")
+            self._refresh_in_background(namespace, key, loader)
+            return entry.value
+
+        self._record("miss")
+        return await self._load(namespace, key, loader)
+
+    async def invalidate(self, namespace: str) -> None:
+        """Drop every entry of ``namespace``; in-flight loads will not write back."""
+
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        try:
+            await self.backend.invalidate(namespace)
+        except Exception:  # noqa: BLE001
+            logger.warning("Cache [%s] invalidation of %s failed", self.name, namespace, exc_info=True)
+
+    async def _load(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generations.get(namespace, 0)
+        value = await loader()
+        if self._generations.get(namespace, 0) == generation:
+            now = time.time()
+            entry = CacheEntry(value, now + self.ttl_seconds, now + self.ttl_seconds + self.stale_seconds)
+            try:
+                await self.backend.set(namespace, key, entry)
+            except Exception:  # noqa: BLE001
+                logger.warning("Cache [%s] write failed", self.name, exc_info=True)
+        return value
+
+    def _refresh_in_background(self, namespace: str, key: str, loader: Callable[[], Awaitable[Any]]) -> None:
+        item = (namespace, key)
+        if item in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load(namespace, key, loader)
+            except Exception:  # noqa: BLE001 - keep serving the stale value
+                logger.warning("Cache [%s] background refresh failed", self.name, exc_info=True)
+            finally:
+                self._refreshing.pop(item, None)
+
+        self._refreshing[item] = asyncio.create_task(refresh())
+
+    def _record(self, result: str) -> None:
+        if cache_requests_metric is not None:
+            cache_requests_metric.labels(cache=self.name, result=result).inc()
+
+
+_backend: Optional[CacheBackend] = None
+
+
+def get_cache_backend() -> CacheBackend:
+    """Redis when ``cache_redis_url`` is set (and redis installed), else the in-process LRU."""
+    global _backend
+    if _backend is None:
+        settings = get_settings()
+        if settings.cache_redis_url and REDIS_AVAILABLE:
+            _backend = RedisCacheBackend(settings.cache_redis_url)
+        else:
+            if settings.cache_redis_url:
+                logger.warning("cache_redis_url is set but redis is not installed; using the in-process cache")
+            _backend = InMemoryCacheBackend(max_entries=settings.cache_max_entries)
+    return _backend
+
+
+__all__ = [
+    "CacheBackend",
+    "CacheEntry",
+    "InMemoryCacheBackend",
+    "ReadThroughCache",
+    "RedisCacheBackend",
+    "get_cache_backend",
+]
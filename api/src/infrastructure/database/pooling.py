@@ -0,0 +1,185 @@
+"""
+Connection pool options and instrumentation.
+
+Two modes are supported:
+
+``nullpool_pgbouncer``
+    No SQLAlchemy pooling and no prepared statements; PgBouncer in
+    transaction mode multiplexes connections (the Render/Supabase setup).
+``queue_pool``
+    A bounded pool of long-lived asyncpg connections with pre-ping, recycling
+    and prepared statement caching, for a direct Postgres or a session-mode
+    pooler where reconnecting on every request is wasted handshakes.
+
+Both pool classes time checkouts (for NullPool that is the connect itself)
+and pool usage is reported to Prometheus at scrape time.
+"""
+
+from __future__ import annotations
+
+import time
+import weakref
+from typing import Any, Iterator
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool
+
+from api.src.core.settings import Settings
+
+try:
+    from prometheus_client import Counter, Histogram
+    from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+POOL_MODE_NULLPOOL = "nullpool_pgbouncer"
+POOL_MODE_QUEUE = "queue_pool"
+POOL_MODES = (POOL_MODE_NULLPOOL, POOL_MODE_QUEUE)
+
+if METRICS_AVAILABLE:
+    db_pool_checkout_metric = Histogram(
+        "db_pool_checkout_seconds",
+        "Time to get a database connection from the pool (connect time with NullPool)",
+        ["engine"],
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+    )
+    db_pool_timeouts_metric = Counter(
+        "db_pool_checkout_timeouts_total",
+        "Checkouts that gave up because the pool stayed exhausted",
+        ["engine"],
+    )
+else:
+    db_pool_checkout_metric = None
+    db_pool_timeouts_metric = None
+
+_pools: "weakref.WeakSet[Pool]" = weakref.WeakSet()
+
+
+class _InstrumentedPoolMixin:
+    """Time ``_do_get`` (the checkout) and count pool timeouts."""
+
+    engine_label = "primary"
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        except sa_exc.TimeoutError:
+            if db_pool_timeouts_metric is not None:
+                db_pool_timeouts_metric.labels(engine=self.engine_label).inc()
+            raise
+        finally:
+            if db_pool_checkout_metric is not None:
+                db_pool_checkout_metric.labels(engine=self.engine_label).observe(time.perf_counter() - started)
+
+    def recreate(self) -> Pool:
+        # engine.dispose() swaps in a new pool; keep it labelled and collected.
+        pool = super().recreate()  # type: ignore[misc]
+        label_pool(pool, self.engine_label)
+        return pool
+
+
+class InstrumentedNullPool(_InstrumentedPoolMixin, NullPool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def label_pool(pool: Pool, engine_label: str) -> None:
+    """Name a pool in the metrics and include it in the usage collector."""
+
+    pool.engine_label = engine_label  # type: ignore[attr-defined]
+    _pools.add(pool)
+
+
+def engine_options(settings: Settings) -> dict[str, Any]:
+    """``create_async_engine`` keyword arguments for ``settings.database_pool_mode``."""
+
+    mode = settings.database_pool_mode
+    if mode not in POOL_MODES:
+        raise ValueError(f"Unknown database_pool_mode {mode!r}; expected one of {', '.join(POOL_MODES)}")
+
+    server_settings = {
+        "jit": "off",  # 🔥 Disable JIT for predictable performance
+        "application_name": "ava-api-production",  # 🔥 Identify in PostgreSQL logs
+        "statement_timeout": f"{settings.database_statement_timeout_ms}ms",  # 🔥 DIVINE: Must include unit!
+    }
+    connect_args: dict[str, Any] = {
+        "timeout": 10.0,  # 🔥 10-second connection timeout (give Supabase time to wake)
+        "command_timeout": settings.database_statement_timeout_ms / 1000,  # 🔥 Query timeout (seconds)
+        "server_settings": server_settings,
+    }
+
+    if mode == POOL_MODE_NULLPOOL:
+        # PgBouncer already multiplexes connections, so SQLAlchemy MUST avoid pooling.
+        # Using NullPool prevents cached prepared statements from leaking across
+        # logical connections and eliminates DuplicatePreparedStatementError.
+        connect_args["statement_cache_size"] = 0  # 🔥 Disable asyncpg prepared statements (PgBouncer compat)
+        connect_args["prepared_statement_cache_size"] = 0  # 🔥 Disable SQLAlchemy prepared statements
+        return {"poolclass": InstrumentedNullPool, "connect_args": connect_args}
+
+    # Direct Postgres / session pooling: connections are ours, so keep them and cache statements.
+    connect_args["statement_cache_size"] = settings.database_statement_cache_size
+    connect_args["prepared_statement_cache_size"] = settings.database_statement_cache_size
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool,
+        "pool_size": settings.database_pool_size,
+        "max_overflow": settings.database_max_overflow,
+        "pool_timeout": settings.database_pool_timeout_seconds,
+        "pool_recycle": settings.database_pool_recycle_seconds,
+        "pool_pre_ping": settings.database_pool_pre_ping,
+        "connect_args": connect_args,
+    }
+
+
+def pool_usage() -> Iterator[tuple[str, int, int, int]]:
+    """Yield ``(engine, checked_out, idle, capacity)`` for every labelled queue pool."""
+
+    for pool in list(_pools):
+        if not isinstance(pool, AsyncAdaptedQueuePool):
+            continue
+        checked_out = pool.checkedout()
+        capacity = pool.size() + max(0, getattr(pool, "_max_overflow", 0))
+        yield pool.engine_label, checked_out, pool.checkedin(), capacity  # type: ignore[attr-defined]
+
+
+if METRICS_AVAILABLE:
+
+    class _DatabasePoolCollector:
+        """Report pool saturation at scrape time."""
+
+        def collect(self):
+            connections = GaugeMetricFamily(
+                "db_pool_connections",
+                "Database pool connections by state",
+                labels=["engine", "state"],
+            )
+            saturation = GaugeMetricFamily(
+                "db_pool_saturation_ratio",
+                "Checked-out connections divided by pool size plus overflow",
+                labels=["engine"],
+            )
+            for engine_label, checked_out, idle, capacity in pool_usage():
+                connections.add_metric([engine_label, "checked_out"], checked_out)
+                connections.add_metric([engine_label, "idle"], idle)
+                saturation.add_metric([engine_label], checked_out / capacity if capacity else 0.0)
+            yield connections
+            yield saturation
+
+    REGISTRY.register(_DatabasePoolCollector())
+
+
+__all__ = [
+    "InstrumentedAsyncAdaptedQueuePool",
+    "InstrumentedNullPool",
+    "POOL_MODES",
+    "POOL_MODE_NULLPOOL",
+    "POOL_MODE_QUEUE",
+    "engine_options",
+    "label_pool",
+    "pool_usage",
+]
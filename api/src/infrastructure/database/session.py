@@ -2,18 +2,26 @@
 Database session helpers for the Ava multi-tenant backend.
 
 The project uses SQLAlchemy 2.x with async sessions. The connection URL is
-supplied via the `DATABASE_URL` environment variable.
+supplied via the `DATABASE_URL` environment variable; `database_pool_mode`
+selects PgBouncer-friendly NullPool or a local queue pool (see ``pooling``).
+An optional `DATABASE_READ_URL` gets its own engine for read-heavy queries:
+`get_read_session` routes to it unless the caller asks for the primary
+(read-your-writes) or the replica failed its last health check.
 """
 
 from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import AsyncGenerator
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import asynccontextmanager
+
+from fastapi import Request
+from sqlalchemy import text
 
 from sqlalchemy.exc import InterfaceError, OperationalError
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 
 try:  # pragma: no cover - optional dependency
     from asyncpg import exceptions as asyncpg_exceptions  # type: ignore
@@ -21,33 +29,60 @@ except ImportError:  # pragma: no cover - fallback when asyncpg missing (tests)
     asyncpg_exceptions = None
 
 from api.src.core.settings import get_settings
+from api.src.infrastructure.database.pooling import engine_options, label_pool
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
 
 logger = logging.getLogger("ava.database")
 
+# Clients send ``X-Read-Consistency: primary`` to read their own writes right after a mutation.
+READ_CONSISTENCY_HEADER = "X-Read-Consistency"
+
+if METRICS_AVAILABLE:
+    db_read_sessions_metric = Counter(
+        "db_read_sessions_total",
+        "Read-only sessions opened, by the engine that served them",
+        ["target"],
+    )
+    db_replica_available_metric = Gauge(
+        "db_replica_available",
+        "1 when the read replica passed its last health check",
+    )
+else:
+    db_read_sessions_metric = None
+    db_replica_available_metric = None
+
 settings = get_settings()
 
-# 🔥 DIVINE ARCHITECTURE: Render + PgBouncer (transaction pooling)
-# PgBouncer already multiplexes connections, so SQLAlchemy MUST avoid pooling.
-# Using NullPool prevents cached prepared statements from leaking across
-# logical connections and eliminates DuplicatePreparedStatementError.
-engine = create_async_engine(
-    settings.database_url,
-    echo=False,
-    future=True,
-    poolclass=NullPool,
-    connect_args={
-        "statement_cache_size": 0,  # 🔥 Disable asyncpg prepared statements (PgBouncer compat)
-        "prepared_statement_cache_size": 0,  # 🔥 Disable SQLAlchemy prepared statements (PgBouncer compat)
-        "timeout": 10.0,  # 🔥 10-second connection timeout (give Supabase time to wake)
-        "command_timeout": settings.database_statement_timeout_ms / 1000,  # 🔥 Query timeout (seconds)
-        "server_settings": {
-            "jit": "off",  # 🔥 Disable JIT for predictable performance
-            "application_name": "ava-api-production",  # 🔥 Identify in PostgreSQL logs
-            "statement_timeout": f"{settings.database_statement_timeout_ms}ms",  # 🔥 DIVINE: Must include unit!
-        },
-    },
-)
+
+_engines: list[AsyncEngine] = []
+
+
+def create_engine_for(url: str, *, label: str) -> AsyncEngine:
+    """Engine for ``url`` using the configured pool mode; ``label`` names it in metrics."""
+    created = create_async_engine(url, echo=False, future=True, **engine_options(settings))
+    label_pool(created.sync_engine.pool, label)
+    _engines.append(created)
+    return created
+
+
+async def dispose_engines() -> None:
+    """Close pooled connections of every engine created here (application shutdown)."""
+    for created in _engines:
+        await created.dispose()
+
+
+# 🔥 DIVINE ARCHITECTURE: Render + PgBouncer (transaction pooling) by default;
+# set AVA_API_DATABASE_POOL_MODE=queue_pool when talking to Postgres directly.
+engine = create_engine_for(settings.database_url, label="primary")
+read_engine = create_engine_for(settings.database_read_url, label="replica") if settings.database_read_url else engine
 SessionLocal = async_sessionmaker(bind=engine, expire_on_commit=False, class_=AsyncSession)
+ReadSessionLocal = async_sessionmaker(bind=read_engine, expire_on_commit=False, class_=AsyncSession)
 
 _ASYNC_PG_ERRORS: tuple[type[Exception], ...]
 if asyncpg_exceptions:
@@ -62,7 +97,7 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
     """
     🔥 DIVINE: Provide an AsyncSession for FastAPI dependency injection.
     
-    Per-request sessions with NullPool (PgBouncer handles connection pooling).
+    Per-request sessions; pooling follows ``database_pool_mode``.
     Failures bubble up to FastAPI error handlers - let upstream retry logic
     handle transient errors instead of hiding them in generator loops.
     
@@ -73,4 +108,83 @@ async def get_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
-__all__ = ["SessionLocal", "engine", "get_session"]
+class ReplicaHealth:
+    """Cached ``SELECT 1`` probe of the read engine; one probe in flight at a time."""
+
+    def __init__(self) -> None:
+        self.available = True
+        self._checked_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def check(self) -> bool:
+        interval = settings.database_read_health_interval_seconds
+        if self._checked_at is not None and time.monotonic() - self._checked_at < interval:
+            return self.available
+        if self._lock.locked():
+            return self.available  # Another request is probing; use the last result
+        async with self._lock:
+            try:
+                # The timeout covers connecting too: a blackholed replica must not stall the probe.
+                await asyncio.wait_for(self._probe(), timeout=settings.database_read_health_timeout_seconds)
+                healthy = True
+            except Exception:  # noqa: BLE001 - any failure sends reads to the primary
+                healthy = False
+            if healthy != self.available:
+                log = logger.info if healthy else logger.warning
+                log("Read replica is %s", "available again" if healthy else "unavailable; reading from the primary")
+            self.available = healthy
+            self._checked_at = time.monotonic()
+            if db_replica_available_metric is not None:
+                db_replica_available_metric.set(1 if healthy else 0)
+        return self.available
+
+    @staticmethod
+    async def _probe() -> None:
+        async with read_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+
+replica_health = ReplicaHealth()
+
+
+@asynccontextmanager
+async def read_session(*, primary: bool = False) -> AsyncIterator[AsyncSession]:
+    """
+    Session for read-only queries: the replica when configured and healthy.
+
+    Pass ``primary=True`` for read-your-writes right after a mutation.
+    """
+    use_replica = not primary and read_engine is not engine and await replica_health.check()
+    if db_read_sessions_metric is not None:
+        db_read_sessions_metric.labels(target="replica" if use_replica else "primary").inc()
+    factory = ReadSessionLocal if use_replica else SessionLocal
+    async with factory() as session:
+        yield session
+
+
+def wants_primary(request: Request) -> bool:
+    """True when the client sent ``X-Read-Consistency: primary``."""
+    return request.headers.get(READ_CONSISTENCY_HEADER, "").strip().lower() == "primary"
+
+
+async def get_read_session(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency for analytics and listings; honours ``X-Read-Consistency: primary``."""
+    async with read_session(primary=wants_primary(request)) as session:
+        yield session
+
+
+__all__ = [
+    "READ_CONSISTENCY_HEADER",
+    "ReadSessionLocal",
+    "ReplicaHealth",
+    "SessionLocal",
+    "create_engine_for",
+    "dispose_engines",
+    "engine",
+    "get_read_session",
+    "get_session",
+    "read_engine",
+    "read_session",
+    "replica_health",
+    "wants_primary",
+]
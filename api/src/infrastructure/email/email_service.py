@@ -1,13 +1,19 @@
 import os
-import smtplib
 import logging
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from html import escape
+from typing import Optional
+
 from api.src.core.settings import get_settings
+from api.src.infrastructure.email.smtp_client import SMTPConfig, get_smtp_client
 
 logger = logging.getLogger("ava.email")
 
+MAGIC_LINK_SUBJECT = "Connexion à AvaFirst"
+
+
 class EmailService:
+    """Platform sender (magic links, fallback for tenants without their own SMTP)."""
+
     def __init__(self):
         self.smtp_host = os.getenv("SMTP_HOST", "smtp.gmail.com")
         self.smtp_port = int(os.getenv("SMTP_PORT", "587"))
@@ -16,31 +22,49 @@ class EmailService:
         self.from_email = os.getenv("FROM_EMAIL", "noreply@avafirst.ai")
         self.frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
 
+    def platform_smtp_config(self) -> Optional[SMTPConfig]:
+        config = SMTPConfig(
+            server=self.smtp_host,
+            port=self.smtp_port,
+            username=self.smtp_user,
+            password=self.smtp_password,
+            sender=self.from_email,
+        )
+        return config if config.is_complete() else None
+
+    def magic_link_url(self, magic_token: str, locale: str = "fr") -> str:
+        return f"{self.frontend_url}/{locale}/verify-magic-link?token={magic_token}"
+
+    def render_magic_link(self, magic_url: str) -> str:
+        return f'<a href="{escape(magic_url)}">Cliquez ici pour vous connecter</a>'
+
+    def log_magic_link(self, magic_url: str) -> None:
+        # 🚨 MODE DEV / SECOURS : On affiche le lien direct
+        print(f"\n{'='*20} MAGIC LINK {'='*20}")
+        print(f"URL: {magic_url}")
+        print(f"{'='*50}\n")
+
     async def send_magic_link(self, to_email: str, magic_token: str, locale: str = "fr") -> bool:
-        magic_url = f"{self.frontend_url}/{locale}/verify-magic-link?token={magic_token}"
+        """
+        Send a magic link right away through the platform SMTP server.
+
+        Request handlers should queue it instead (``queue_magic_link``); this
+        stays for scripts and runs smtplib on the SMTP client's worker threads.
+        """
+
+        magic_url = self.magic_link_url(magic_token, locale)
         settings = get_settings()
+        smtp_config = self.platform_smtp_config()
 
-        # 🚨 MODE DEV / SECOURS : On affiche le lien direct
-        if settings.environment == "development" or not self.smtp_user:
-            print(f"\n{'='*20} MAGIC LINK {'='*20}")
-            print(f"URL: {magic_url}")
-            print(f"{'='*50}\n")
+        if settings.environment == "development" or smtp_config is None:
+            self.log_magic_link(magic_url)
             return True
 
         # MODE PROD : Tentative d'envoi réel
         try:
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = "Connexion à AvaFirst"
-            msg["From"] = self.from_email
-            msg["To"] = to_email
-
-            html = f'<a href="{magic_url}">Cliquez ici pour vous connecter</a>'
-            msg.attach(MIMEText(html, "html", "utf-8"))
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
+            await get_smtp_client().send_email(
+                smtp_config, [to_email], MAGIC_LINK_SUBJECT, self.render_magic_link(magic_url)
+            )
             return True
 
         except Exception as e:
@@ -0,0 +1,52 @@
+"""Resend API delivery over the shared pooled HTTP client."""
+
+from __future__ import annotations
+
+import logging
+from typing import Sequence
+
+import httpx
+
+from api.src.infrastructure.external.http_pool import get_http_client
+
+logger = logging.getLogger("ava.email")
+
+RESEND_API_BASE = "https://api.resend.com"
+
+
+class ResendError(RuntimeError):
+    """Resend refused or failed a send. ``permanent`` errors are not worth retrying."""
+
+    def __init__(self, message: str, *, permanent: bool) -> None:
+        super().__init__(message)
+        self.permanent = permanent
+
+
+async def send_resend_email(
+    *,
+    api_key: str,
+    sender: str,
+    recipients: Sequence[str],
+    subject: str,
+    html: str,
+) -> str:
+    """Send one email and return Resend's message id."""
+
+    client = get_http_client(RESEND_API_BASE)
+    try:
+        response = await client.post(
+            f"{RESEND_API_BASE}/emails",
+            json={"from": sender, "to": list(recipients), "subject": subject, "html": html},
+            headers={"Authorization": f"Bearer {api_key}"},
+        )
+    except httpx.HTTPError as exc:
+        raise ResendError(f"Resend request failed: {exc}", permanent=False) from exc
+
+    if response.status_code >= 400:
+        # 429 and 5xx are transient; other 4xx (validation, domain, key) will not fix themselves.
+        permanent = response.status_code < 500 and response.status_code != 429
+        raise ResendError(f"Resend returned {response.status_code}: {response.text[:500]}", permanent=permanent)
+    return str(response.json().get("id", ""))
+
+
+__all__ = ["RESEND_API_BASE", "ResendError", "send_resend_email"]
@@ -1,18 +1,59 @@
-"""Lightweight SMTP email client leveraging the Python stdlib."""
+"""
+Lightweight SMTP email client leveraging the Python stdlib.
+
+Authenticated sessions are pooled per :class:`SMTPConfig`, so a tenant sending
+many call summaries pays the connect, EHLO, STARTTLS and login round trips once
+instead of per email. A reused session is checked with ``NOOP`` first; sessions
+idle longer than the idle timeout are closed, and a session is recycled after a
+number of messages. smtplib blocks, so every call runs on a dedicated, bounded
+thread pool; a per-configuration semaphore keeps waiting callers on the event
+loop and caps the sessions opened against one server.
+"""
 
 from __future__ import annotations
 
 import asyncio
 import logging
 import smtplib
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Iterable, Optional
+from email.utils import make_msgid
+from typing import Iterable, Optional, Sequence, Union
+
+from api.src.core.settings import get_settings
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
 
 logger = logging.getLogger("ava.smtp")
 
+# Pools kept for configurations not used recently (e.g. after a password change) are dropped.
+_MAX_POOLS = 256
+
+if METRICS_AVAILABLE:
+    smtp_send_duration_metric = Histogram(
+        "smtp_send_duration_seconds",
+        "SMTP messages sent through the pool, including the wait for a session",
+        ["outcome"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+    )
+    smtp_connections_metric = Counter(
+        "smtp_connections_opened_total",
+        "Authenticated SMTP sessions opened (connect, STARTTLS and login)",
+    )
+else:
+    smtp_send_duration_metric = None
+    smtp_connections_metric = None
+
 
 @dataclass(frozen=True)
 class SMTPConfig:
@@ -27,8 +68,137 @@ class SMTPConfig:
         return all([self.server, self.port, self.username, self.password])
 
 
+@dataclass(frozen=True)
+class SMTPMessage:
+    recipients: tuple[str, ...]
+    subject: str
+    html: str
+
+
+@dataclass
+class _Session:
+    smtp: smtplib.SMTP
+    last_used: float
+    messages: int = 0
+    reused: bool = False
+
+
+def _close(session: _Session) -> None:
+    try:
+        session.smtp.quit()
+    except (smtplib.SMTPException, OSError):
+        session.smtp.close()
+
+
+class SMTPConnectionPool:
+    """Idle authenticated sessions for one SMTP configuration (thread-safe)."""
+
+    def __init__(
+        self,
+        config: SMTPConfig,
+        *,
+        max_idle: int,
+        idle_timeout: float,
+        timeout: float,
+        max_messages: int,
+    ) -> None:
+        self.config = config
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self._idle: list[_Session] = []
+        self._lock = threading.Lock()
+
+    def connect(self) -> _Session:
+        config = self.config
+        smtp = smtplib.SMTP(config.server, config.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if config.use_starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            smtp.login(config.username, config.password)
+        except BaseException:
+            smtp.close()
+            raise
+        if smtp_connections_metric is not None:
+            smtp_connections_metric.inc()
+        return _Session(smtp=smtp, last_used=time.monotonic())
+
+    def acquire(self) -> _Session:
+        """Most recently used live session, or a new one."""
+
+        while True:
+            with self._lock:
+                session = self._idle.pop() if self._idle else None
+            if session is None:
+                return self.connect()
+            if time.monotonic() - session.last_used > self.idle_timeout:
+                _close(session)
+                continue
+            try:
+                code, _ = session.smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                code = None
+            if code == 250:
+                session.reused = True
+                return session
+            session.smtp.close()
+
+    def release(self, session: _Session) -> None:
+        session.last_used = time.monotonic()
+        if session.messages < self.max_messages:
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(session)
+                    return
+        _close(session)
+
+    def discard(self, session: _Session) -> None:
+        session.smtp.close()
+
+    def evict_idle(self) -> None:
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [session for session in self._idle if session.last_used < cutoff]
+            self._idle = [session for session in self._idle if session.last_used >= cutoff]
+        for session in expired:
+            _close(session)
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._idle = self._idle, []
+        for session in sessions:
+            _close(session)
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+
 class SMTPClient:
-    """Blocking SMTP client executed inside a thread pool."""
+    """Blocking SMTP client executed on a dedicated thread pool, with pooled sessions."""
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 8,
+        pool_size: int = 4,
+        idle_timeout: float = 60.0,
+        timeout: float = 10.0,
+        max_messages_per_connection: int = 100,
+    ) -> None:
+        self.max_workers = max_workers
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pools: OrderedDict[SMTPConfig, SMTPConnectionPool] = OrderedDict()
+        self._limiters: dict[SMTPConfig, tuple[asyncio.Semaphore, asyncio.AbstractEventLoop]] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
 
     async def send_email(
         self,
@@ -37,61 +207,225 @@ class SMTPClient:
         subject: str,
         html: str,
     ) -> str:
+        [result] = await self.send_many(config, [SMTPMessage(tuple(recipients), subject, html)])
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    async def send_many(
+        self,
+        config: SMTPConfig,
+        messages: Sequence[SMTPMessage],
+    ) -> list[Union[str, Exception]]:
+        """
+        Send ``messages`` over one pooled session.
+
+        Returns one entry per message: its Message-ID, or the exception that
+        stopped it. A failing message does not stop the others, except when no
+        session can be opened (connection or authentication errors).
+        """
+
         if not config.is_complete():
             raise ValueError("Incomplete SMTP configuration.")
 
-        message_id = await asyncio.to_thread(
-            self._send_email_sync,
-            config,
-            list(recipients),
-            subject,
-            html,
-        )
-        return message_id
+        async with self._limiter(config):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._pool_executor(), self._send_many_sync, config, list(messages))
+
+    def _limiter(self, config: SMTPConfig) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        limiter = self._limiters.get(config)
+        if limiter is None or limiter[1] is not loop:
+            limiter = (asyncio.Semaphore(self.pool_size), loop)
+            self._limiters[config] = limiter
+        return limiter[0]
+
+    def _pool_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="smtp")
+        return self._executor
 
-    def _send_email_sync(
+    def _connection_pool(self, config: SMTPConfig) -> SMTPConnectionPool:
+        evicted: list[SMTPConnectionPool] = []
+        with self._lock:
+            pool = self._pools.get(config)
+            if pool is None:
+                pool = SMTPConnectionPool(
+                    config,
+                    max_idle=self.pool_size,
+                    idle_timeout=self.idle_timeout,
+                    timeout=self.timeout,
+                    max_messages=self.max_messages_per_connection,
+                )
+                self._pools[config] = pool
+                while len(self._pools) > _MAX_POOLS:
+                    stale_config, stale_pool = self._pools.popitem(last=False)
+                    self._limiters.pop(stale_config, None)
+                    evicted.append(stale_pool)
+            else:
+                self._pools.move_to_end(config)
+        for stale_pool in evicted:
+            stale_pool.close()
+        return pool
+
+    def _sweep(self) -> None:
+        """Close idle sessions of every configuration, at most twice per idle timeout."""
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep < self.idle_timeout / 2:
+                return
+            self._last_sweep = now
+            pools = list(self._pools.values())
+        for pool in pools:
+            pool.evict_idle()
+
+    def _send_many_sync(self, config: SMTPConfig, messages: list[SMTPMessage]) -> list[Union[str, Exception]]:
+        self._sweep()
+        pool = self._connection_pool(config)
+        results: list[Union[str, Exception]] = []
+        session: Optional[_Session] = None
+        try:
+            for index, message in enumerate(messages):
+                started_at = time.perf_counter()
+                try:
+                    if session is None:
+                        session = pool.acquire()
+                    session = self._deliver(pool, session, config, message, results)
+                except (smtplib.SMTPConnectError, smtplib.SMTPAuthenticationError, OSError) as exc:
+                    if session is None:
+                        # No session could be opened: the rest would fail the same way.
+                        logger.error("SMTP connection failed.", extra={"server": config.server}, exc_info=exc)
+                        results.extend([exc] * (len(messages) - index))
+                        self._observe("connect_error", started_at)
+                        break
+                    self._fail(pool, session, exc, results)
+                    session = None
+                    self._observe("error", started_at)
+                    continue
+                except smtplib.SMTPException as exc:
+                    self._fail(pool, session, exc, results)
+                    session = None
+                    self._observe("error", started_at)
+                    continue
+
+                duration_ms = (time.perf_counter() - started_at) * 1000
+                self._observe("ok", started_at)
+                logger.info(
+                    "SMTP email dispatched",
+                    extra={
+                        "recipients": list(message.recipients),
+                        "sender": config.sender or config.username,
+                        "server": config.server,
+                        "duration_ms": round(duration_ms, 2),
+                    },
+                )
+                if session is not None and session.messages >= pool.max_messages:
+                    pool.release(session)
+                    session = None
+        finally:
+            if session is not None:
+                pool.release(session)
+        return results
+
+    def _deliver(
         self,
+        pool: SMTPConnectionPool,
+        session: _Session,
         config: SMTPConfig,
-        recipients: list[str],
-        subject: str,
-        html: str,
-    ) -> str:
+        message: SMTPMessage,
+        results: list[Union[str, Exception]],
+    ) -> _Session:
+        msg = self._build_message(config, message)
+        try:
+            session.smtp.send_message(msg)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            if not session.reused:
+                raise
+            # The server dropped the idle session after the NOOP; it never accepted the message.
+            pool.discard(session)
+            session = pool.connect()
+            session.smtp.send_message(msg)
+        session.messages += 1
+        results.append(msg["Message-ID"])
+        return session
+
+    @staticmethod
+    def _fail(
+        pool: SMTPConnectionPool,
+        session: Optional[_Session],
+        exc: Exception,
+        results: list[Union[str, Exception]],
+    ) -> None:
+        if session is not None:
+            pool.discard(session)
+        if isinstance(exc, smtplib.SMTPAuthenticationError):
+            logger.error("SMTP authentication failed.", exc_info=exc)
+        else:
+            logger.error("SMTP send failed.", exc_info=exc)
+        results.append(exc)
+
+    @staticmethod
+    def _observe(outcome: str, started_at: float) -> None:
+        if smtp_send_duration_metric is not None:
+            smtp_send_duration_metric.labels(outcome=outcome).observe(time.perf_counter() - started_at)
+
+    @staticmethod
+    def _build_message(config: SMTPConfig, message: SMTPMessage) -> MIMEMultipart:
         sender = config.sender or config.username
 
         msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
+        msg["Subject"] = message.subject
         msg["From"] = sender
-        msg["To"] = ", ".join(recipients)
+        msg["To"] = ", ".join(message.recipients)
+        msg["Message-ID"] = make_msgid(domain=sender.rpartition("@")[2] or None)
 
-        msg.attach(MIMEText(html, "html"))
+        msg.attach(MIMEText(message.html, "html"))
+        return msg
 
-        try:
-            started_at = time.perf_counter()
-            with smtplib.SMTP(config.server, config.port, timeout=10) as smtp:
-                smtp.ehlo()
-                if config.use_starttls:
-                    smtp.starttls()
-                    smtp.ehlo()
-                smtp.login(config.username, config.password)
-                smtp.send_message(msg)
-            duration_ms = (time.perf_counter() - started_at) * 1000
-            logger.info(
-                "SMTP email dispatched",
-                extra={
-                    "recipients": recipients,
-                    "sender": sender,
-                    "server": config.server,
-                    "duration_ms": round(duration_ms, 2),
-                },
-            )
-        except smtplib.SMTPAuthenticationError as exc:
-            logger.error("SMTP authentication failed.", exc_info=exc)
-            raise
-        except smtplib.SMTPException as exc:
-            logger.error("SMTP send failed.", exc_info=exc)
-            raise
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+            self._limiters.clear()
+        for pool in pools:
+            pool.close()
+
+
+_client: Optional[SMTPClient] = None
+
+
+def get_smtp_client() -> SMTPClient:
+    global _client
+    if _client is None:
+        settings = get_settings()
+        _client = SMTPClient(
+            max_workers=settings.smtp_max_workers,
+            pool_size=settings.smtp_pool_size,
+            idle_timeout=settings.smtp_idle_timeout_seconds,
+            timeout=settings.smtp_timeout_seconds,
+            max_messages_per_connection=settings.smtp_max_messages_per_connection,
+        )
+    return _client
+
+
+def close_smtp_client() -> None:
+    """Stop the worker threads and log out of pooled sessions (application shutdown)."""
 
-        return msg.get("Message-ID", "")
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        client.shutdown()
 
 
-__all__ = ["SMTPClient", "SMTPConfig"]
+__all__ = [
+    "SMTPClient",
+    "SMTPConfig",
+    "SMTPConnectionPool",
+    "SMTPMessage",
+    "close_smtp_client",
+    "get_smtp_client",
+]
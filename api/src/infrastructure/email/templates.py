@@ -0,0 +1,238 @@
+"""
+HTML templates for call emails (transcript, per-call summary, digest).
+
+Templates are ``string.Template`` sources, compiled once per process and
+cached by name. The per-call and digest emails share the same layout, call
+card and transcript fragments. Repeated fragments (transcript turns, calls
+of a digest) are rendered into a list and joined once, so rendering is linear
+in the number of turns. Every value is HTML-escaped before substitution.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from html import escape
+from string import Template
+from typing import Iterable, Optional, Sequence
+
+_SOURCES = {
+    "layout": """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>$title - AVA</title>
+</head>
+<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh;">
+    <div style="max-width: 800px; margin: 0 auto; padding: 40px 20px;">
+        <!-- Header -->
+        <div style="text-align: center; margin-bottom: 40px;">
+            <h1 style="color: white; font-size: 48px; font-weight: 800; margin: 0 0 16px 0; text-shadow: 0 2px 10px rgba(0,0,0,0.2);">
+                ✨ AVA
+            </h1>
+            <p style="color: rgba(255,255,255,0.9); font-size: 18px; margin: 0;">
+                $heading
+            </p>
+        </div>
+$body
+        <!-- Footer -->
+        <div style="text-align: center; color: rgba(255,255,255,0.8); font-size: 12px;">
+            <p style="margin: 0 0 8px 0;">Powered by AVA - AI Voice Assistant Platform</p>
+            <p style="margin: 0; opacity: 0.7;">This is an automated email. Please do not reply.</p>
+        </div>
+    </div>
+</body>
+</html>
+""",
+    "call_card": """
+        <!-- Card -->
+        <div style="background: rgba(255, 255, 255, 0.95); backdrop-filter: blur(10px); border-radius: 24px; box-shadow: 0 20px 60px rgba(0,0,0,0.3); padding: 40px; margin-bottom: 24px;">
+            <!-- Call Info -->
+            <div style="border-bottom: 1px solid rgba(0,0,0,0.1); padding-bottom: 24px; margin-bottom: 32px;">
+                <h2 style="margin: 0 0 16px 0; font-size: 24px; font-weight: 700; color: #1a202c;">
+                    📞 $caller
+                </h2>
+                <div style="display: grid; gap: 12px; font-size: 14px; color: #4a5568;">
+$details
+                </div>
+            </div>
+
+            <!-- Transcript -->
+            <div>
+                <h2 style="margin: 0 0 24px 0; font-size: 24px; font-weight: 700; color: #1a202c;">
+                    💬 Conversation
+                </h2>
+                <div style="display: flex; flex-direction: column; gap: 20px;">
+$turns
+                </div>
+            </div>
+        </div>
+""",
+    "detail": """                    <div><strong>$label:</strong> $value</div>
+""",
+    "status_badge": """<span style="display: inline-block; padding: 4px 12px; background: #48bb78; color: white; border-radius: 12px; font-size: 12px; font-weight: 600;">$status</span>""",
+    "turn_ai": """
+                    <div style="display: flex; align-items: start; gap: 12px;">
+                        <div style="flex-shrink: 0; width: 40px; height: 40px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
+                            AI
+                        </div>
+                        <div style="flex: 1; background: #f7fafc; border: 1px solid #e2e8f0; border-radius: 16px; padding: 16px; max-width: 70%;">
+                            <div style="font-size: 12px; font-weight: 600; color: #667eea; margin-bottom: 8px;">AVA Assistant</div>
+                            <div style="font-size: 14px; color: #2d3748; line-height: 1.6;">$text</div>
+                        </div>
+                    </div>
+""",
+    "turn_user": """
+                    <div style="display: flex; align-items: start; gap: 12px; flex-direction: row-reverse;">
+                        <div style="flex-shrink: 0; width: 40px; height: 40px; background: linear-gradient(135deg, #4299e1 0%, #38b2ac 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
+                            U
+                        </div>
+                        <div style="flex: 1; background: #ebf8ff; border: 1px solid #bee3f8; border-radius: 16px; padding: 16px; max-width: 70%;">
+                            <div style="font-size: 12px; font-weight: 600; color: #4299e1; margin-bottom: 8px;">Customer</div>
+                            <div style="font-size: 14px; color: #2d3748; line-height: 1.6;">$text</div>
+                        </div>
+                    </div>
+""",
+    "no_transcript": """
+                    <div style="font-size: 14px; color: #718096;">$text</div>
+""",
+    "digest_intro": """
+        <div style="background: rgba(255, 255, 255, 0.95); border-radius: 24px; padding: 24px 40px; margin-bottom: 24px; font-size: 16px; color: #2d3748;">
+            <strong>$business</strong> · $count · $window
+        </div>
+""",
+}
+
+# Speaker prefixes written by the webhook (AVA/Caller) and by Vapi's transcript string (AI/User).
+_AI_SPEAKERS = ("ai", "ava", "assistant", "bot")
+_USER_SPEAKERS = ("user", "caller", "customer")
+
+
+@dataclass(frozen=True)
+class CallEmailData:
+    """The fields of a call shown in an email."""
+
+    caller: str
+    phone: Optional[str]
+    status: Optional[str]
+    started_at: Optional[datetime]
+    duration_seconds: Optional[int]
+    transcript: Optional[str]
+    cost: Optional[float] = None
+
+
+@lru_cache(maxsize=None)
+def get_template(name: str) -> Template:
+    """Compiled template by name (compiled once, then cached)."""
+
+    return Template(_SOURCES[name])
+
+
+def render_template(name: str, **values: str) -> str:
+    return get_template(name).substitute(values)
+
+
+def parse_transcript(transcript: Optional[str]) -> list[tuple[str, str]]:
+    """
+    Split a stored transcript into ``(speaker, text)`` turns, ``speaker`` being
+    ``ai`` or ``user``. Lines without a known prefix continue the previous turn.
+    """
+
+    turns: list[tuple[str, list[str]]] = []
+    for raw_line in (transcript or "").splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+        prefix, separator, rest = line.partition(":")
+        speaker = prefix.strip().lower() if separator else ""
+        if speaker in _AI_SPEAKERS:
+            turns.append(("ai", [rest.strip()]))
+        elif speaker in _USER_SPEAKERS:
+            turns.append(("user", [rest.strip()]))
+        elif turns:
+            turns[-1][1].append(line)
+    return [(speaker, " ".join(parts)) for speaker, parts in turns]
+
+
+def render_turns(turns: Iterable[tuple[str, str]], *, empty_text: str = "No transcript available") -> str:
+    turn_ai, turn_user = get_template("turn_ai"), get_template("turn_user")
+    fragments = [
+        (turn_ai if speaker == "ai" else turn_user).substitute(text=escape(text)) for speaker, text in turns
+    ]
+    if not fragments:
+        return render_template("no_transcript", text=escape(empty_text))
+    return "".join(fragments)
+
+
+def _format_duration(seconds: Optional[int]) -> str:
+    minutes, seconds = divmod(seconds or 0, 60)
+    return f"{minutes} min {seconds:02d} s" if minutes else f"{seconds}s"
+
+
+def render_call_card(call: CallEmailData, *, show_cost: bool = False) -> str:
+    detail = get_template("detail")
+    rows = [
+        ("Phone Number", escape(call.phone or "N/A")),
+        ("Date", call.started_at.strftime("%Y-%m-%d %H:%M UTC") if call.started_at else "N/A"),
+        ("Duration", _format_duration(call.duration_seconds)),
+    ]
+    if call.status:
+        rows.insert(1, ("Status", render_template("status_badge", status=escape(call.status))))
+    if show_cost:
+        rows.append(("Cost", f"${call.cost or 0:.4f}"))
+    return render_template(
+        "call_card",
+        caller=escape(call.caller),
+        details="".join(detail.substitute(label=label, value=value) for label, value in rows),
+        turns=render_turns(parse_transcript(call.transcript)),
+    )
+
+
+def render_call_transcript_email(call: CallEmailData) -> str:
+    """Full transcript of one call (sent on demand from the dashboard)."""
+
+    return render_template(
+        "layout",
+        title="Call Transcript",
+        heading="Call Transcript",
+        body=render_call_card(call, show_cost=True),
+    )
+
+
+def render_call_summary_email(call: CallEmailData, *, business_name: str) -> str:
+    """Summary of one ended call (immediate mode)."""
+
+    return render_template(
+        "layout",
+        title="Nouvel appel",
+        heading=f"{escape(business_name)} · Nouvel appel",
+        body=render_call_card(call),
+    )
+
+
+def render_call_digest_email(calls: Sequence[CallEmailData], *, business_name: str, window: str) -> str:
+    """All calls of a digest window in one email (hourly or daily mode)."""
+
+    count = f"{len(calls)} appel{'s' if len(calls) != 1 else ''}"
+    intro = render_template("digest_intro", business=escape(business_name), count=count, window=escape(window))
+    return render_template(
+        "layout",
+        title="Résumé des appels",
+        heading="Résumé des appels",
+        body=intro + "".join(render_call_card(call) for call in calls),
+    )
+
+
+__all__ = [
+    "CallEmailData",
+    "get_template",
+    "parse_transcript",
+    "render_call_card",
+    "render_call_digest_email",
+    "render_call_summary_email",
+    "render_call_transcript_email",
+    "render_template",
+    "render_turns",
+]
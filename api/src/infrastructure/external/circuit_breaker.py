@@ -1,16 +1,31 @@
-"""Circuit breaker pattern for external API resilience."""
+"""
+Circuit breaker pattern for external API resilience.
+
+Breakers can be partitioned by a key (e.g. a tenant's API token) so one
+tenant's failures never open the circuit for everybody; the registry keeps the
+most recently used breakers only. Open/closed transitions are published to a
+:class:`CircuitStateBackend` so several API workers agree on an outage: the
+in-memory default covers a single process, Redis (optional) shares it.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from typing import Any, AsyncIterator, Callable, Optional, Protocol, TypeVar
 
 from fastapi import HTTPException, status
 
+from api.src.core.settings import get_settings
+
 try:
     from prometheus_client import Counter, Gauge
 
@@ -18,6 +33,13 @@ try:
 except ImportError:
     METRICS_AVAILABLE = False
 
+try:
+    import redis.asyncio as redis_asyncio
+
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
 logger = logging.getLogger("ava.circuit_breaker")
 
 T = TypeVar("T")
@@ -66,6 +88,78 @@ class CircuitBreakerConfig:
     failure_threshold: int = 3  # Open circuit after N consecutive failures
     recovery_timeout: int = 30  # Seconds before attempting recovery (half-open)
     success_threshold: int = 2  # Close circuit after N successes in half-open state
+    excluded_exceptions: tuple[type[BaseException], ...] = ()  # Re-raised without counting (e.g. 4xx errors)
+    max_concurrency: Optional[int] = None  # Bulkhead: cap on in-flight calls through this breaker
+    concurrency_timeout: float = 10.0  # Seconds to wait for a bulkhead slot before rejecting
+    state_sync_interval: float = 1.0  # Seconds between reads of the shared state backend
+
+
+@dataclass(frozen=True)
+class CircuitSnapshot:
+    """Shared view of a breaker: its state and when it last opened."""
+
+    state: CircuitState
+    opened_at: float
+    updated_at: float
+
+
+class CircuitStateBackend(Protocol):
+    """Where breakers publish open/closed transitions for other workers."""
+
+    async def get(self, name: str) -> Optional[CircuitSnapshot]: ...
+
+    async def set(self, name: str, snapshot: CircuitSnapshot, *, ttl: float) -> None: ...
+
+
+class InMemoryCircuitStateBackend:
+    """Process-local backend (default). Snapshots expire after their TTL."""
+
+    def __init__(self) -> None:
+        self._snapshots: dict[str, tuple[CircuitSnapshot, float]] = {}
+
+    async def get(self, name: str) -> Optional[CircuitSnapshot]:
+        entry = self._snapshots.get(name)
+        if entry is None:
+            return None
+        snapshot, expires_at = entry
+        if expires_at < time.time():
+            self._snapshots.pop(name, None)
+            return None
+        return snapshot
+
+    async def set(self, name: str, snapshot: CircuitSnapshot, *, ttl: float) -> None:
+        now = time.time()
+        self._snapshots[name] = (snapshot, now + ttl)
+        expired = [key for key, (_, expires_at) in self._snapshots.items() if expires_at < now]
+        for key in expired:
+            del self._snapshots[key]
+
+
+class RedisCircuitStateBackend:
+    """Share breaker state across processes through Redis (needs the ``redis`` package)."""
+
+    def __init__(self, url: str, *, prefix: str = "ava:circuit:") -> None:
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("The redis package is required for the Redis circuit state backend")
+        self._client = redis_asyncio.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, name: str) -> Optional[CircuitSnapshot]:
+        raw = await self._client.get(self._prefix + name)
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return CircuitSnapshot(
+            state=CircuitState(data["state"]),
+            opened_at=float(data["opened_at"]),
+            updated_at=float(data["updated_at"]),
+        )
+
+    async def set(self, name: str, snapshot: CircuitSnapshot, *, ttl: float) -> None:
+        payload = json.dumps(
+            {"state": snapshot.state.value, "opened_at": snapshot.opened_at, "updated_at": snapshot.updated_at}
+        )
+        await self._client.set(self._prefix + name, payload, ex=max(1, int(ttl)))
 
 
 @dataclass
@@ -79,10 +173,18 @@ class CircuitBreaker:
 
     name: str
     config: CircuitBreakerConfig = field(default_factory=CircuitBreakerConfig)
+    service: str = ""  # Metrics label; defaults to ``name``
+    backend: Optional[CircuitStateBackend] = None
     _state: CircuitState = CircuitState.CLOSED
     _failure_count: int = 0
     _success_count: int = 0
     _last_failure_time: float = 0
+    _synced_at: float = 0  # ``updated_at`` of the last snapshot published or adopted
+    _last_sync: float = 0
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    def __post_init__(self) -> None:
+        self.service = self.service or self.name
 
     @property
     def state(self) -> CircuitState:
@@ -100,7 +202,8 @@ class CircuitBreaker:
             CircuitState.OPEN: 2,
         }[self._state]
 
-        circuit_breaker_state_metric.labels(service=self.name).set(state_value)
+        if self.service == self.name:  # Partitioned breakers would explode label cardinality
+            circuit_breaker_state_metric.labels(service=self.name).set(state_value)
 
     def _should_attempt_reset(self) -> bool:
         """Check if enough time has passed to attempt recovery."""
@@ -122,9 +225,11 @@ class CircuitBreaker:
             Result from func
             
         Raises:
-            HTTPException: If circuit is open (503)
+            HTTPException: If circuit is open or the bulkhead is full (503)
             Exception: Original exception from func if circuit allows
         """
+        await self._pull_shared_state()
+
         # Check if we should transition to half-open
         if self._should_attempt_reset():
             logger.info(
@@ -152,16 +257,81 @@ class CircuitBreaker:
             )
 
         # Attempt the call
+        previous_state = self._state
         try:
-            result = await func(*args, **kwargs)
+            async with self._bulkhead():
+                result = await func(*args, **kwargs)
             self._on_success()
             return result
         except HTTPException:
             # Don't count HTTP exceptions as circuit breaker failures
             raise
+        except self.config.excluded_exceptions:
+            # Client errors (bad credentials, unknown id) say nothing about upstream health
+            raise
         except Exception as exc:
             self._on_failure(exc)
             raise
+        finally:
+            if self._state != previous_state and self._state != CircuitState.HALF_OPEN:
+                await self._push_shared_state()
+
+    @asynccontextmanager
+    async def _bulkhead(self) -> AsyncIterator[None]:
+        if not self.config.max_concurrency:
+            yield
+            return
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.config.concurrency_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Circuit breaker [{self.name}] bulkhead full - rejecting request",
+                extra={"circuit": self.name, "max_concurrency": self.config.max_concurrency},
+            )
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Too many concurrent {self.service} requests. Please try again shortly.",
+            )
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+    async def _pull_shared_state(self) -> None:
+        """Adopt a newer open/closed transition published by another worker."""
+        if self.backend is None:
+            return
+        now = time.time()
+        if now - self._last_sync < self.config.state_sync_interval:
+            return
+        self._last_sync = now
+        try:
+            snapshot = await self.backend.get(self.name)
+        except Exception:  # noqa: BLE001 - the backend must never break calls
+            logger.debug(f"Circuit breaker [{self.name}] could not read shared state", exc_info=True)
+            return
+        if snapshot is None or snapshot.updated_at <= self._synced_at:
+            return
+        self._synced_at = snapshot.updated_at
+        if snapshot.state != self._state:
+            self._state = snapshot.state
+            self._last_failure_time = snapshot.opened_at
+            self._success_count = 0
+            if snapshot.state == CircuitState.CLOSED:
+                self._failure_count = 0
+            self._emit_state_metric()
+
+    async def _push_shared_state(self) -> None:
+        if self.backend is None:
+            return
+        self._synced_at = time.time()
+        snapshot = CircuitSnapshot(state=self._state, opened_at=self._last_failure_time, updated_at=self._synced_at)
+        try:
+            await self.backend.set(self.name, snapshot, ttl=max(60.0, self.config.recovery_timeout * 10))
+        except Exception:  # noqa: BLE001 - the backend must never break calls
+            logger.warning(f"Circuit breaker [{self.name}] could not publish shared state", exc_info=True)
 
     def _on_success(self) -> None:
         """Handle successful call - reset failure count or close circuit."""
@@ -182,7 +352,7 @@ class CircuitBreaker:
                 self._success_count = 0
                 self._emit_state_metric()
                 if METRICS_AVAILABLE and circuit_breaker_closes_metric:
-                    circuit_breaker_closes_metric.labels(service=self.name).inc()
+                    circuit_breaker_closes_metric.labels(service=self.service).inc()
 
     def _on_failure(self, exc: Exception) -> None:
         """Handle failed call - increment counter and potentially open circuit."""
@@ -191,7 +361,7 @@ class CircuitBreaker:
 
         # Emit failure metric
         if METRICS_AVAILABLE and circuit_breaker_failures_metric:
-            circuit_breaker_failures_metric.labels(service=self.name).inc()
+            circuit_breaker_failures_metric.labels(service=self.service).inc()
 
         if self._failure_count >= self.config.failure_threshold:
             logger.error(
@@ -207,46 +377,96 @@ class CircuitBreaker:
             self._state = CircuitState.OPEN
             self._emit_state_metric()
             if METRICS_AVAILABLE and circuit_breaker_opens_metric:
-                circuit_breaker_opens_metric.labels(service=self.name).inc()
+                circuit_breaker_opens_metric.labels(service=self.service).inc()
+
+
+# Global registry of circuit breakers (least recently used are evicted)
+_breakers: OrderedDict[str, CircuitBreaker] = OrderedDict()
+_state_backend: Optional[CircuitStateBackend] = None
+
+
+def get_circuit_state_backend() -> CircuitStateBackend:
+    """Redis when ``circuit_breaker_redis_url`` is set (and redis installed), else in-memory."""
+    global _state_backend
+    if _state_backend is None:
+        redis_url = get_settings().circuit_breaker_redis_url
+        if redis_url and REDIS_AVAILABLE:
+            _state_backend = RedisCircuitStateBackend(redis_url)
+        else:
+            if redis_url:
+                logger.warning("circuit_breaker_redis_url is set but redis is not installed; using in-memory state")
+            _state_backend = InMemoryCircuitStateBackend()
+    return _state_backend
 
 
-# Global registry of circuit breakers
-_breakers: dict[str, CircuitBreaker] = {}
+def set_circuit_state_backend(backend: Optional[CircuitStateBackend]) -> None:
+    global _state_backend
+    _state_backend = backend
 
 
-def get_circuit_breaker(name: str, config: CircuitBreakerConfig | None = None) -> CircuitBreaker:
+def _partition(key: str) -> str:
+    """Stable short digest so secrets (API tokens) never appear in names or logs."""
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def get_circuit_breaker(
+    name: str,
+    config: CircuitBreakerConfig | None = None,
+    *,
+    key: Optional[str] = None,
+) -> CircuitBreaker:
     """
     Get or create a circuit breaker by name.
     
     Args:
-        name: Unique identifier for this circuit breaker
+        name: Unique identifier for this circuit breaker (the service)
         config: Optional configuration (only used on first creation)
+        key: Optional partition (e.g. tenant API token); each key gets its own breaker
         
     Returns:
         CircuitBreaker instance
     """
-    if name not in _breakers:
-        _breakers[name] = CircuitBreaker(
-            name=name,
-            config=config or CircuitBreakerConfig(),
-        )
-    return _breakers[name]
-
-
-def with_circuit_breaker(name: str, config: CircuitBreakerConfig | None = None):
+    registry_key = f"{name}:{_partition(key)}" if key else name
+    breaker = _breakers.get(registry_key)
+    if breaker is not None:
+        _breakers.move_to_end(registry_key)
+        return breaker
+
+    breaker = CircuitBreaker(
+        name=registry_key,
+        config=config or CircuitBreakerConfig(),
+        service=name,
+        backend=get_circuit_state_backend(),
+    )
+    _breakers[registry_key] = breaker
+    max_size = max(1, get_settings().circuit_breaker_registry_size)
+    while len(_breakers) > max_size:
+        # An evicted open breaker is restored from the state backend when recreated
+        _breakers.popitem(last=False)
+    return breaker
+
+
+def with_circuit_breaker(
+    name: str,
+    config: CircuitBreakerConfig | None = None,
+    *,
+    key: Callable[..., Optional[str]] | None = None,
+):
     """
     Decorator to wrap async functions with circuit breaker protection.
     
+    ``key`` receives the call's arguments and returns the breaker partition.
+
     Usage:
-        @with_circuit_breaker("vapi")
-        async def call_vapi_api():
+        @with_circuit_breaker("vapi", key=lambda self, *args, **kwargs: self.token)
+        async def call_vapi_api(self):
             ...
     """
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> T:
-            breaker = get_circuit_breaker(name, config)
+            breaker = get_circuit_breaker(name, config, key=key(*args, **kwargs) if key else None)
             return await breaker.call(func, *args, **kwargs)
 
         return wrapper
@@ -257,7 +477,13 @@ def with_circuit_breaker(name: str, config: CircuitBreakerConfig | None = None):
 __all__ = [
     "CircuitBreaker",
     "CircuitBreakerConfig",
+    "CircuitSnapshot",
     "CircuitState",
+    "CircuitStateBackend",
+    "InMemoryCircuitStateBackend",
+    "RedisCircuitStateBackend",
     "get_circuit_breaker",
+    "get_circuit_state_backend",
+    "set_circuit_state_backend",
     "with_circuit_breaker",
 ]
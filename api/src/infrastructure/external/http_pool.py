@@ -0,0 +1,136 @@
+"""
+Process-wide pooled HTTP clients for outbound API calls.
+
+One ``httpx.AsyncClient`` is kept per upstream base URL so requests reuse
+TCP/TLS connections (and HTTP/2 streams when ``h2`` is installed) instead of
+handshaking every time. Per-tenant credentials stay per request: callers pass
+their own headers. Clients are closed on application shutdown.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Iterator, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from api.src.core.settings import get_settings
+
+try:
+    import h2  # noqa: F401 - only needed by httpx for HTTP/2
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    from prometheus_client.core import REGISTRY, GaugeMetricFamily
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.http_pool")
+
+
+def _upstream(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.netloc else base_url
+
+
+class HttpClientPool:
+    """Shared ``AsyncClient`` per upstream, recreated if its event loop changed or it was closed."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, tuple[httpx.AsyncClient, Optional[asyncio.AbstractEventLoop]]] = {}
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        upstream = _upstream(base_url)
+        loop = _running_loop()
+        entry = self._clients.get(upstream)
+        if entry is not None:
+            client, client_loop = entry
+            if not client.is_closed and client_loop is loop:
+                return client
+        client = self._create_client()
+        self._clients[upstream] = (client, loop)
+        return client
+
+    def _create_client(self) -> httpx.AsyncClient:
+        settings = get_settings()
+        http2 = settings.http2_enabled and HTTP2_AVAILABLE
+        if settings.http2_enabled and not HTTP2_AVAILABLE:
+            logger.debug("HTTP/2 requested but the h2 package is missing; using HTTP/1.1")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.http_pool_max_connections,
+                max_keepalive_connections=settings.http_pool_max_keepalive,
+                keepalive_expiry=settings.http_pool_keepalive_expiry_seconds,
+            ),
+            timeout=httpx.Timeout(
+                settings.http_timeout_seconds,
+                connect=settings.http_connect_timeout_seconds,
+            ),
+        )
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client, _ in clients.values():
+            await client.aclose()
+
+    def connection_counts(self) -> Iterator[tuple[str, int, int]]:
+        """Yield ``(upstream, in_use, idle)`` for every open client."""
+
+        for upstream, (client, _) in self._clients.items():
+            if client.is_closed:
+                continue
+            # httpx does not expose pool stats publicly; read httpcore's pool defensively.
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []) or [])
+            idle = sum(1 for connection in connections if connection.is_idle())
+            yield upstream, len(connections) - idle, idle
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+_pool = HttpClientPool()
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Shared pooled client for ``base_url``'s upstream. Do not close it."""
+
+    return _pool.get(base_url)
+
+
+async def close_http_clients() -> None:
+    await _pool.aclose()
+
+
+if METRICS_AVAILABLE:
+
+    class _HttpPoolCollector:
+        """Report connection usage at scrape time."""
+
+        def collect(self):
+            metric = GaugeMetricFamily(
+                "http_pool_connections",
+                "Outbound HTTP connections per upstream by state",
+                labels=["upstream", "state"],
+            )
+            for upstream, in_use, idle in _pool.connection_counts():
+                metric.add_metric([upstream, "in_use"], in_use)
+                metric.add_metric([upstream, "idle"], idle)
+            yield metric
+
+    REGISTRY.register(_HttpPoolCollector())
+
+
+__all__ = ["HTTP2_AVAILABLE", "HttpClientPool", "close_http_clients", "get_http_client"]
@@ -0,0 +1,148 @@
+"""
+Retry policy for outbound API calls.
+
+Retries use exponential backoff with full jitter, honour a server's
+``Retry-After`` hint and stop once a total deadline would be exceeded.
+Callers wrap the circuit breaker (not the other way round) and pass it in, so
+every attempt is counted by the breaker and retrying stops as soon as it is
+no longer closed: retries never pile onto an upstream that is already down.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from tenacity import (
+    AsyncRetrying,
+    RetryCallState,
+    retry_if_exception,
+    stop_after_attempt,
+    stop_before_delay,
+    wait_random_exponential,
+)
+
+from api.src.infrastructure.external.circuit_breaker import CircuitBreaker, CircuitState
+
+try:
+    from prometheus_client import Counter, Histogram
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.retry")
+
+T = TypeVar("T")
+
+if METRICS_AVAILABLE:
+    outbound_retries_metric = Counter(
+        "outbound_retries_total",
+        "Outbound API attempts that were retried",
+        ["service", "reason"],
+    )
+    outbound_retry_delay_metric = Histogram(
+        "outbound_retry_delay_seconds",
+        "Latency added by waiting between outbound API retries",
+        ["service"],
+        buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30),
+    )
+else:
+    outbound_retries_metric = None
+    outbound_retry_delay_metric = None
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Attempt budget for one logical request."""
+
+    max_attempts: int = 3
+    backoff_seconds: float = 0.5  # Base of the exponential backoff
+    max_backoff_seconds: float = 8.0  # Cap of a single jittered wait (not of Retry-After)
+    deadline_seconds: float = 20.0  # No retry is started that would sleep past this
+
+
+def parse_retry_after(value: Optional[str], *, now: Optional[datetime] = None) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - (now or datetime.now(tz=timezone.utc))).total_seconds())
+
+
+class _wait_with_retry_after:
+    """Jittered exponential backoff, but never shorter than the server's ``Retry-After``."""
+
+    def __init__(self, policy: RetryPolicy) -> None:
+        self._backoff = wait_random_exponential(multiplier=policy.backoff_seconds, max=policy.max_backoff_seconds)
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        delay = self._backoff(retry_state)
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        retry_after = getattr(exc, "retry_after", None)
+        return max(delay, retry_after) if retry_after is not None else delay
+
+
+def _reason(exc: Optional[BaseException]) -> str:
+    status_code = getattr(exc, "status_code", None)
+    return str(status_code) if status_code is not None else type(exc).__name__
+
+
+async def call_with_retries(
+    func: Callable[[], Awaitable[T]],
+    *,
+    policy: RetryPolicy,
+    should_retry: Callable[[BaseException], bool],
+    service: str,
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """
+    Await ``func()`` and retry it while ``should_retry(exc)`` holds.
+
+    The last exception is re-raised unchanged once the attempts or the
+    deadline run out, or when ``breaker`` is not closed.
+    """
+
+    def retryable(exc: BaseException) -> bool:
+        if breaker is not None and breaker.state != CircuitState.CLOSED:
+            return False
+        return should_retry(exc)
+
+    def before_sleep(retry_state: RetryCallState) -> None:
+        exc = retry_state.outcome.exception() if retry_state.outcome else None
+        delay = retry_state.upcoming_sleep
+        reason = _reason(exc)
+        logger.info(
+            "Retrying %s request after %s (attempt %s, waiting %.2fs)",
+            service, reason, retry_state.attempt_number, delay,
+        )
+        if outbound_retries_metric is not None:
+            outbound_retries_metric.labels(service=service, reason=reason).inc()
+        if outbound_retry_delay_metric is not None:
+            outbound_retry_delay_metric.labels(service=service).observe(delay)
+
+    retrying = AsyncRetrying(
+        retry=retry_if_exception(retryable),
+        wait=_wait_with_retry_after(policy),
+        stop=stop_after_attempt(max(1, policy.max_attempts)) | stop_before_delay(policy.deadline_seconds),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
+    return await retrying(func)
+
+
+__all__ = ["RetryPolicy", "call_with_retries", "parse_retry_after"]
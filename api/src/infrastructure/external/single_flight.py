@@ -0,0 +1,86 @@
+"""
+Request coalescing ("single flight") for outbound reads.
+
+Concurrent callers asking for the same key share one in-flight call: the
+first starts it, the others await its result (or its exception). The call is
+shielded, so a cancelled waiter never cancels the work others depend on.
+Nothing is cached once the call completes - that is the read-through cache's job.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+try:
+    from prometheus_client import Counter, Gauge
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.single_flight")
+
+T = TypeVar("T")
+
+if METRICS_AVAILABLE:
+    single_flight_coalesced_metric = Counter(
+        "single_flight_coalesced_total",
+        "Calls that joined an identical in-flight upstream request instead of sending their own",
+        ["name"],
+    )
+    single_flight_waiters_metric = Gauge(
+        "single_flight_waiters",
+        "Callers currently waiting on an in-flight request started by another caller",
+        ["name"],
+    )
+else:
+    single_flight_coalesced_metric = None
+    single_flight_waiters_metric = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls per key. Results are shared: treat them as read-only."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+            return await asyncio.shield(task)
+
+        if single_flight_coalesced_metric is not None:
+            single_flight_coalesced_metric.labels(name=self.name).inc()
+        if single_flight_waiters_metric is not None:
+            single_flight_waiters_metric.labels(name=self.name).inc()
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if single_flight_waiters_metric is not None:
+                single_flight_waiters_metric.labels(name=self.name).dec()
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Mark the exception retrieved even if every waiter was cancelled.
+            logger.debug("Single-flight [%s] call failed: %r", self.name, task.exception())
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def request_key(*parts: Any, params: dict | None = None) -> tuple:
+    """Hashable key from positional parts and a (possibly unordered) params dict."""
+
+    items = tuple(sorted((str(k), repr(v)) for k, v in (params or {}).items()))
+    return (*parts, items)
+
+
+__all__ = ["SingleFlight", "request_key"]
@@ -8,7 +8,9 @@ import base64
 import logging
 from typing import Optional
 
-import httpx
+from api.src.infrastructure.external.http_pool import get_http_client
+
+OPENAI_API_BASE = "https://api.openai.com"
 
 logger = logging.getLogger(__name__)
 
@@ -48,12 +50,12 @@ async def synthesize_preview(
         "Content-Type": "application/json",
     }
 
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        response = await client.post(
-            "https://api.openai.com/v1/audio/speech",
-            json=payload,
-            headers=headers,
-        )
+    client = get_http_client(OPENAI_API_BASE)
+    response = await client.post(
+        f"{OPENAI_API_BASE}/v1/audio/speech",
+        json=payload,
+        headers=headers,
+    )
 
     if response.status_code != 200:
         logger.error("Voice preview request failed: %s", response.text)
@@ -0,0 +1,192 @@
+"""
+Async access to the synchronous Twilio SDK.
+
+Every SDK call runs on a dedicated, bounded thread pool so a Twilio round trip
+never blocks the event loop. The semaphore keeps callers waiting on the loop,
+not queued inside the executor, and the timeout covers that wait as well as
+the request. Clients are cached per credentials. They share one pooled
+``requests`` session per account SID, so repeated calls reuse TLS connections.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from requests.adapters import HTTPAdapter
+from twilio.base.exceptions import TwilioRestException
+from twilio.http.http_client import TwilioHttpClient
+from twilio.rest import Client as TwilioRestClient
+
+from api.src.core.settings import get_settings
+
+try:
+    from prometheus_client import Gauge, Histogram
+
+    METRICS_AVAILABLE = True
+except ImportError:
+    METRICS_AVAILABLE = False
+
+logger = logging.getLogger("ava.twilio")
+
+T = TypeVar("T")
+
+if METRICS_AVAILABLE:
+    twilio_request_duration_metric = Histogram(
+        "twilio_request_duration_seconds",
+        "Twilio SDK calls, including the wait for a free worker",
+        ["operation", "outcome"],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 20, 30),
+    )
+    twilio_in_flight_metric = Gauge(
+        "twilio_requests_in_flight",
+        "Twilio SDK calls running on the gateway's worker threads",
+    )
+else:
+    twilio_request_duration_metric = None
+    twilio_in_flight_metric = None
+
+
+class TwilioTimeoutError(TimeoutError):
+    """A Twilio call did not finish within ``twilio_timeout_seconds``."""
+
+
+class TwilioGateway:
+    """Bounded executor, concurrency limit and client cache for Twilio calls."""
+
+    def __init__(self, *, max_concurrency: int, timeout: float, cache_size: int = 128) -> None:
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[tuple[asyncio.Semaphore, asyncio.AbstractEventLoop]] = None
+        self._http_clients: OrderedDict[str, TwilioHttpClient] = OrderedDict()
+        self._clients: OrderedDict[tuple[str, str], TwilioRestClient] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def client(self, account_sid: str, auth_token: str) -> TwilioRestClient:
+        """SDK client for these credentials, sharing the account's HTTP session."""
+
+        key = (account_sid, hashlib.sha256(auth_token.encode()).hexdigest())
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+            client = TwilioRestClient(account_sid, auth_token, http_client=self._http_client(account_sid))
+            self._clients[key] = client
+            while len(self._clients) > self.cache_size:
+                self._clients.popitem(last=False)
+            return client
+
+    def _http_client(self, account_sid: str) -> TwilioHttpClient:
+        http_client = self._http_clients.get(account_sid)
+        if http_client is not None:
+            self._http_clients.move_to_end(account_sid)
+            return http_client
+        http_client = TwilioHttpClient(pool_connections=True, timeout=self.timeout)
+        # One keep-alive connection per worker thread instead of requests' default of 10.
+        http_client.session.mount("https://", HTTPAdapter(pool_maxsize=self.max_concurrency))
+        self._http_clients[account_sid] = http_client
+        while len(self._http_clients) > self.cache_size:
+            _, evicted = self._http_clients.popitem(last=False)
+            evicted.session.close()
+        return http_client
+
+    def _limiter(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[1] is not loop:
+            self._semaphore = (asyncio.Semaphore(self.max_concurrency), loop)
+        return self._semaphore[0]
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="twilio")
+        return self._executor
+
+    async def run(self, operation: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking SDK call (``client.calls.create``...) on the worker pool.
+
+        Raises :class:`TwilioTimeoutError` when the call, including the wait
+        for a free worker, exceeds the timeout. The worker thread then finishes
+        on its own, bounded by the HTTP timeout.
+        """
+
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await asyncio.wait_for(self._run(func, *args, **kwargs), timeout=self.timeout)
+            outcome = "ok"
+            return result
+        except asyncio.TimeoutError as exc:
+            outcome = "timeout"
+            raise TwilioTimeoutError(f"Twilio {operation} timed out after {self.timeout:g}s") from exc
+        except TwilioRestException:
+            outcome = "rejected"
+            raise
+        finally:
+            if twilio_request_duration_metric is not None:
+                twilio_request_duration_metric.labels(operation=operation, outcome=outcome).observe(
+                    time.perf_counter() - started
+                )
+
+    async def _run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        async with self._limiter():
+            if twilio_in_flight_metric is not None:
+                twilio_in_flight_metric.inc()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._pool(), functools.partial(func, *args, **kwargs))
+            finally:
+                if twilio_in_flight_metric is not None:
+                    twilio_in_flight_metric.dec()
+
+    def shutdown(self) -> None:
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for http_client in self._http_clients.values():
+                http_client.session.close()
+            self._http_clients.clear()
+            self._clients.clear()
+
+
+_gateway: Optional[TwilioGateway] = None
+
+
+def get_twilio_gateway() -> TwilioGateway:
+    global _gateway
+    if _gateway is None:
+        settings = get_settings()
+        _gateway = TwilioGateway(
+            max_concurrency=settings.twilio_max_concurrency,
+            timeout=settings.twilio_timeout_seconds,
+            cache_size=settings.twilio_client_cache_size,
+        )
+    return _gateway
+
+
+def close_twilio_gateway() -> None:
+    """Stop the worker threads and close pooled sessions (application shutdown)."""
+
+    global _gateway
+    gateway, _gateway = _gateway, None
+    if gateway is not None:
+        gateway.shutdown()
+
+
+__all__ = [
+    "TwilioGateway",
+    "TwilioTimeoutError",
+    "close_twilio_gateway",
+    "get_twilio_gateway",
+]
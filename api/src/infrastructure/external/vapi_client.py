@@ -4,26 +4,101 @@ Minimal async client for the Vapi REST API.
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, Sequence
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
 
 import httpx
 
 from api.src.core.settings import get_settings
-from api.src.infrastructure.external.circuit_breaker import with_circuit_breaker
+from api.src.infrastructure.cache import ReadThroughCache, get_cache_backend
+from api.src.infrastructure.external.circuit_breaker import CircuitBreakerConfig, get_circuit_breaker
+from api.src.infrastructure.external.http_pool import get_http_client
+from api.src.infrastructure.external.retry import RetryPolicy, call_with_retries, parse_retry_after
+from api.src.infrastructure.external.single_flight import SingleFlight, request_key
+
+# Methods whose repetition is harmless. POST creates resources and DELETE of an
+# already deleted phone number would surface a 404, so those are only retried
+# when the request provably never reached Vapi (connection failure, 429).
+RETRY_SAFE_METHODS = frozenset({"GET", "HEAD", "PATCH"})
+
+# Concurrent identical reads of one tenant (e.g. dashboard widgets loading together) share one request.
+_in_flight = SingleFlight("vapi")
 
 
 class VapiApiError(RuntimeError):
     """Raised when the Vapi API responds with an error."""
 
+    def __init__(
+        self,
+        message: str,
+        *,
+        status_code: Optional[int] = None,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
 
 class VapiRateLimitError(VapiApiError):
     """Raised when Vapi API returns 429 Too Many Requests."""
 
 
-class VapiAuthError(VapiApiError):
+class VapiServerError(VapiApiError):
+    """Raised when Vapi API returns a 5xx response."""
+
+
+class VapiClientError(VapiApiError):
+    """Raised for 4xx responses caused by the request itself (not counted by the circuit breaker)."""
+
+
+class VapiAuthError(VapiClientError):
     """Raised when Vapi API returns 401 Unauthorized."""
 
 
+def _breaker_config() -> CircuitBreakerConfig:
+    settings = get_settings()
+    return CircuitBreakerConfig(
+        failure_threshold=settings.circuit_breaker_threshold,
+        recovery_timeout=settings.circuit_breaker_recovery_timeout,
+        excluded_exceptions=(VapiClientError,),
+        max_concurrency=settings.vapi_max_concurrency_per_tenant,
+    )
+
+
+def _retry_policy() -> RetryPolicy:
+    settings = get_settings()
+    return RetryPolicy(
+        max_attempts=settings.vapi_retry_max_attempts,
+        backoff_seconds=settings.vapi_retry_backoff_seconds,
+        max_backoff_seconds=settings.vapi_retry_max_backoff_seconds,
+        deadline_seconds=settings.vapi_retry_deadline_seconds,
+    )
+
+
+_cache: Optional[ReadThroughCache] = None
+
+
+def get_vapi_cache() -> ReadThroughCache:
+    """Cache of assistant and phone-number reads, one namespace per API token."""
+    global _cache
+    if _cache is None:
+        settings = get_settings()
+        _cache = ReadThroughCache(
+            "vapi",
+            backend=get_cache_backend(),
+            ttl_seconds=settings.vapi_cache_ttl_seconds,
+            stale_seconds=settings.vapi_cache_stale_seconds,
+        )
+    return _cache
+
+
+def _should_retry(exc: BaseException, *, idempotent: bool) -> bool:
+    if isinstance(exc, (VapiRateLimitError, httpx.ConnectError, httpx.ConnectTimeout)):
+        return True
+    return idempotent and isinstance(exc, (VapiServerError, httpx.TransportError))
+
+
 class VapiClient:
     """Lightweight wrapper around the Vapi REST endpoints used by the platform."""
 
@@ -39,8 +114,21 @@ class VapiClient:
             "Authorization": f"Bearer {self._token}",
             "Content-Type": "application/json",
         }
+        self._cache_namespace = "vapi:" + hashlib.sha256(self._token.encode()).hexdigest()[:16]
+
+    async def _cached(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        if not get_settings().vapi_cache_enabled:
+            return await loader()
+        return await get_vapi_cache().get_or_load(self._cache_namespace, key, loader)
+
+    async def _mutate(self, method: str, path: str, *, json: Any | None = None) -> Any:
+        """Send a write and drop this tenant's cached reads (even on failure: it may have applied)."""
+        try:
+            return await self._request(method, path, json=json)
+        finally:
+            if get_settings().vapi_cache_enabled:
+                await get_vapi_cache().invalidate(self._cache_namespace)
 
-    @with_circuit_breaker("vapi")
     async def _request(
         self,
         method: str,
@@ -48,31 +136,90 @@ class VapiClient:
         *,
         params: dict | None = None,
         json: Any | None = None,
+    ) -> Any:
+        if method.upper() in ("GET", "HEAD"):
+            key = request_key(self._cache_namespace, self._base_url, method.upper(), path, params=params)
+            return await _in_flight.do(key, lambda: self._request_once(method, path, params=params, json=json))
+        return await self._request_once(method, path, params=params, json=json)
+
+    async def _request_once(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict | None = None,
+        json: Any | None = None,
+    ) -> Any:
+        # One breaker (and concurrency cap) per API token: a tenant with a bad key or a
+        # throttled account must not open the circuit for everybody else.
+        breaker = get_circuit_breaker("vapi", _breaker_config(), key=self._token)
+        idempotent = method.upper() in RETRY_SAFE_METHODS
+        return await call_with_retries(
+            lambda: breaker.call(self._send, method, path, params=params, json=json),
+            policy=_retry_policy(),
+            should_retry=lambda exc: _should_retry(exc, idempotent=idempotent),
+            service="vapi",
+            breaker=breaker,
+        )
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict | None = None,
+        json: Any | None = None,
     ) -> Any:
         url = f"{self._base_url}{path}"
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.request(method, url, headers=self._headers, params=params, json=json)
+        # Shared keep-alive pool per upstream; the tenant's token travels in the request headers.
+        client = get_http_client(self._base_url)
+        response = await client.request(method, url, headers=self._headers, params=params, json=json)
 
         # Raise specific exceptions for better error handling
-        if response.status_code == 429:
-            raise VapiRateLimitError(f"Vapi rate limit exceeded: {response.text}")
-        if response.status_code == 401:
-            raise VapiAuthError(f"Vapi authentication failed: {response.text}")
-        if response.status_code >= 400:
-            raise VapiApiError(f"Vapi error {response.status_code}: {response.text}")
+        status_code = response.status_code
+        if status_code == 429:
+            raise VapiRateLimitError(
+                f"Vapi rate limit exceeded: {response.text}",
+                status_code=status_code,
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+            )
+        if status_code == 401:
+            raise VapiAuthError(f"Vapi authentication failed: {response.text}", status_code=status_code)
+        if 400 <= status_code < 500:
+            raise VapiClientError(f"Vapi error {status_code}: {response.text}", status_code=status_code)
+        if status_code >= 500:
+            raise VapiServerError(
+                f"Vapi error {status_code}: {response.text}",
+                status_code=status_code,
+                retry_after=parse_retry_after(response.headers.get("retry-after")),
+            )
             
         if response.headers.get("content-type", "").startswith("application/json"):
             return response.json()
         return response.text
 
     async def list_assistants(self, *, limit: int = 50) -> Sequence[dict]:
-        data = await self._request("GET", "/assistant", params={"limit": limit})
+        data = await self._cached(
+            f"assistants:{limit}", lambda: self._request("GET", "/assistant", params={"limit": limit})
+        )
         return data.get("items", data) if isinstance(data, dict) else data
 
-    async def list_calls(self, *, limit: int = 100, status: Optional[str] = None) -> Sequence[dict]:
+    async def list_calls(
+        self,
+        *,
+        limit: int = 100,
+        status: Optional[str] = None,
+        updated_at_gt: Optional[str] = None,
+        created_at_lt: Optional[str] = None,
+    ) -> Sequence[dict]:
+        """List calls, newest first. ``updated_at_gt``/``created_at_lt`` are ISO-8601 bounds."""
         params: Dict[str, Any] = {"limit": limit}
         if status:
             params["status"] = status
+        if updated_at_gt:
+            params["updatedAtGt"] = updated_at_gt
+        if created_at_lt:
+            params["createdAtLt"] = created_at_lt
         data = await self._request("GET", "/call", params=params)
         return data if isinstance(data, list) else data.get("items", data)
 
@@ -80,7 +227,9 @@ class VapiClient:
         return await self._request("GET", f"/call/{call_id}")
 
     async def get_assistant(self, assistant_id: str) -> dict:
-        return await self._request("GET", f"/assistant/{assistant_id}")
+        return await self._cached(
+            f"assistant:{assistant_id}", lambda: self._request("GET", f"/assistant/{assistant_id}")
+        )
 
     async def create_assistant(
         self,
@@ -176,7 +325,7 @@ class VapiClient:
         if functions:
             payload["functions"] = functions
 
-        return await self._request("POST", "/assistant", json=payload)
+        return await self._mutate("POST", "/assistant", json=payload)
 
     async def update_assistant(
         self,
@@ -262,7 +411,7 @@ class VapiClient:
             payload["serverUrl"] = server_url
 
         print(f"🔥 DIVINE UPDATE: Updating assistant {assistant_id} with payload: {payload}")
-        return await self._request("PATCH", f"/assistant/{assistant_id}", json=payload)
+        return await self._mutate("PATCH", f"/assistant/{assistant_id}", json=payload)
 
     async def get_or_create_assistant(
         self,
@@ -369,7 +518,7 @@ class VapiClient:
         if area_code:
             payload["areaCode"] = area_code
 
-        return await self._request("POST", "/phone-number", json=payload)
+        return await self._mutate("POST", "/phone-number", json=payload)
 
     async def import_phone_number(
         self,
@@ -389,18 +538,18 @@ class VapiClient:
             "assistantId": assistant_id,
         }
 
-        return await self._request("POST", "/phone-number", json=payload)
+        return await self._mutate("POST", "/phone-number", json=payload)
 
     async def delete_phone_number(self, phone_number_id: str) -> bool:
         """Delete a phone number from Vapi."""
 
-        await self._request("DELETE", f"/phone-number/{phone_number_id}")
+        await self._mutate("DELETE", f"/phone-number/{phone_number_id}")
         return True
 
     async def update_assistant_webhook(self, assistant_id: str, server_url: str) -> dict:
         """Update assistant webhook endpoint."""
 
-        return await self._request(
+        return await self._mutate(
             "PATCH",
             f"/assistant/{assistant_id}",
             json={"serverUrl": server_url},
@@ -432,7 +581,9 @@ class VapiClient:
         Returns:
             Liste des phone numbers avec leurs assistantId
         """
-        data = await self._request("GET", "/phone-number", params={"limit": limit})
+        data = await self._cached(
+            f"phone_numbers:{limit}", lambda: self._request("GET", "/phone-number", params={"limit": limit})
+        )
         return data if isinstance(data, list) else data.get("items", data)
 
     async def get_phone_numbers(self, *, limit: int = 50) -> Sequence[dict]:
@@ -455,11 +606,19 @@ class VapiClient:
         Returns:
             Phone number object mis à jour
         """
-        return await self._request(
+        return await self._mutate(
             "PATCH",
             f"/phone-number/{phone_id}",
             json={"assistantId": assistant_id}
         )
 
 
-__all__ = ["VapiClient", "VapiApiError"]
+__all__ = [
+    "VapiApiError",
+    "VapiAuthError",
+    "VapiClient",
+    "VapiClientError",
+    "VapiRateLimitError",
+    "VapiServerError",
+    "get_vapi_cache",
+]
@@ -7,15 +7,25 @@ Exports all database models for easy import.
 from .ava_profile import AvaProfile
 from .base import Base
 from .call import CallRecord
+from .call_rollup import CallRollup
+from .call_sync_cursor import CallSyncCursor
+from .call_topic import CallTopic
+from .outbound_email import OutboundEmail
 from .studio_config import StudioConfig
 from .tenant import Tenant
 from .user import User
+from .webhook_event import WebhookEvent
 
 __all__ = [
     "Base",
     "AvaProfile",
     "CallRecord",
+    "CallRollup",
+    "CallSyncCursor",
+    "CallTopic",
+    "OutboundEmail",
     "StudioConfig",
     "Tenant",
     "User",
+    "WebhookEvent",
 ]
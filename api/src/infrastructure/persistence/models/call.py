@@ -7,8 +7,8 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, Float, ForeignKey, Integer, JSON, String, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text
+from sqlalchemy.dialects.postgresql import REGCONFIG, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -28,8 +28,16 @@ class CallRecord(Base):
     ended_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     duration_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     cost: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
-    meta: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False)
-    transcript: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Heavy columns (raw Vapi payload, full transcript) are deferred: listings use
+    # projections, and code that needs them loads them with ``undefer``.
+    meta: Mapped[dict] = mapped_column(JSON, default=dict, nullable=False, deferred=True)
+    transcript: Mapped[Optional[str]] = mapped_column(Text, nullable=True, deferred=True)
+    # Text search configuration of the transcript (``french``, ``english``...), from the
+    # tenant's language at ingest. On PostgreSQL the generated ``search_vector`` column
+    # and its GIN index are created by migration only (see call_search_repository).
+    search_config: Mapped[str] = mapped_column(
+        String(32).with_variant(REGCONFIG(), "postgresql"), nullable=False, default="simple", server_default="simple"
+    )
 
     def update_from_payload(self, payload: dict[str, object]) -> None:
         """Update the record using a Vapi call payload."""
@@ -64,6 +72,15 @@ class CallRecord(Base):
             self.transcript = transcript
 
 
+# Keyset pagination of a tenant's calls, newest first (see list_call_summaries)
+Index(
+    "ix_calls_tenant_started_at_id",
+    CallRecord.tenant_id,
+    CallRecord.started_at.desc(),
+    CallRecord.id,
+)
+
+
 def _parse_datetime(value: object) -> Optional[datetime]:
     if not isinstance(value, str):
         return None
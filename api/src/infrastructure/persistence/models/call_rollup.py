@@ -0,0 +1,43 @@
+"""
+Hourly call aggregates maintained alongside the ``calls`` table.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class CallRollup(Base):
+    """Per tenant, assistant and UTC hour totals used by analytics instead of raw calls."""
+
+    __tablename__ = "call_rollups"
+
+    tenant_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
+    )
+    assistant_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    hour_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    call_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    duration_sq_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    cost_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sentiment_sum: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    sentiment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+# Analytics read a tenant's hours across all assistants (see get_hourly_rollup_buckets)
+Index("ix_call_rollups_tenant_hour", CallRollup.tenant_id, CallRollup.hour_start)
+
+
+__all__ = ["CallRollup"]
@@ -0,0 +1,36 @@
+"""
+Per-tenant cursor tracking incremental call synchronisation with Vapi.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, ForeignKey, String, Text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class CallSyncCursor(Base):
+    """High-water mark of the last calls pulled from Vapi for a tenant."""
+
+    __tablename__ = "call_sync_cursors"
+
+    tenant_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), primary_key=True
+    )
+    last_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_call_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    last_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_synced_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Set while a catch-up spans several passes (page cap reached): the Vapi ``createdAt`` to resume
+    # below, and the ``updatedAt`` high-water of its first pass, adopted once the catch-up completes.
+    resume_created_before: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    resume_updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+__all__ = ["CallSyncCursor"]
@@ -0,0 +1,33 @@
+"""
+Per-call topic terms extracted at ingest for trending-topic analytics.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+from sqlalchemy import Date, ForeignKey, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+
+class CallTopic(Base):
+    """How often ``term`` occurs in one call; ``day`` is the call's UTC start date."""
+
+    __tablename__ = "call_topics"
+    __table_args__ = (Index("ix_call_topics_tenant_day_term", "tenant_id", "day", "term"),)
+
+    call_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("calls.id", ondelete="CASCADE"), primary_key=True
+    )
+    term: Mapped[str] = mapped_column(String(64), primary_key=True)
+    tenant_id: Mapped[UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("tenants.id", ondelete="CASCADE"), nullable=False
+    )
+    day: Mapped[date] = mapped_column(Date, nullable=False)
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+
+__all__ = ["CallTopic"]
@@ -0,0 +1,70 @@
+"""
+Durable queue of outbound emails and their delivery status.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# Lifecycle: pending -> sending -> sent, or back to pending with a backoff,
+# or dead once the attempts are exhausted or the provider rejects the message.
+OUTBOUND_EMAIL_PENDING = "pending"
+OUTBOUND_EMAIL_SENDING = "sending"
+OUTBOUND_EMAIL_SENT = "sent"
+OUTBOUND_EMAIL_DEAD = "dead"
+
+# Providers: the tenant's own SMTP server (smtp_user_id set), the platform
+# SMTP server (smtp_user_id NULL), or the Resend API.
+EMAIL_PROVIDER_SMTP = "smtp"
+EMAIL_PROVIDER_RESEND = "resend"
+
+
+class OutboundEmail(Base):
+    """A rendered email queued by a request handler and delivered by a worker."""
+
+    __tablename__ = "outbound_emails"
+    __table_args__ = (
+        # One email per logical message (e.g. one summary per call); NULL keys never conflict
+        UniqueConstraint("dedupe_key", name="uq_outbound_emails_dedupe_key"),
+    )
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    provider: Mapped[str] = mapped_column(String(16), nullable=False)
+    smtp_user_id: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    dedupe_key: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    recipients: Mapped[list] = mapped_column(JSON, nullable=False)
+    subject: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Cleared once sent: bodies may quote transcripts, which have their own retention.
+    html: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=OUTBOUND_EMAIL_PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    provider_message_id: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    sent_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# Claim query: next due emails of a status, oldest first
+Index("ix_outbound_emails_status_available_at", OutboundEmail.status, OutboundEmail.available_at)
+
+
+__all__ = [
+    "EMAIL_PROVIDER_RESEND",
+    "EMAIL_PROVIDER_SMTP",
+    "OUTBOUND_EMAIL_DEAD",
+    "OUTBOUND_EMAIL_PENDING",
+    "OUTBOUND_EMAIL_SENDING",
+    "OUTBOUND_EMAIL_SENT",
+    "OutboundEmail",
+]
@@ -72,6 +72,18 @@ class StudioConfig(Base):
         String(255),
         nullable=True,
     )
+    # Call summary emails: one per call ("immediate") or one digest per "hourly"/"daily" window
+    summary_digest_mode: Mapped[str] = mapped_column(
+        String(16),
+        default="immediate",
+        server_default="immediate",
+        nullable=False,
+    )
+    summary_digest_sent_until: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="End of the last digest window queued",
+    )
     smtp_server: Mapped[str] = mapped_column(
         String(255),
         default="",
@@ -201,6 +213,18 @@ class StudioConfig(Base):
         nullable=False,
     )
 
+    # Data retention (None = platform default from settings)
+    transcript_retention_hours: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Hours before call transcripts are scrubbed",
+    )
+    call_retention_days: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        nullable=True,
+        comment="Days before call records are deleted",
+    )
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
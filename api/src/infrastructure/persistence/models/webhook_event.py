@@ -0,0 +1,58 @@
+"""
+Durable outbox of inbound webhook events awaiting background processing.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from sqlalchemy import JSON, DateTime, Index, Integer, String, Text, UniqueConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from .base import Base
+
+# Lifecycle: pending -> processing -> done, or back to pending with a backoff,
+# or dead once the attempts are exhausted.
+WEBHOOK_EVENT_PENDING = "pending"
+WEBHOOK_EVENT_PROCESSING = "processing"
+WEBHOOK_EVENT_DONE = "done"
+WEBHOOK_EVENT_DEAD = "dead"
+
+
+class WebhookEvent(Base):
+    """A raw webhook payload queued by the endpoint and processed by a worker."""
+
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        # Deduplicates redeliveries: one row per provider event (NULL keys never conflict)
+        UniqueConstraint("source", "event_type", "event_key", name="uq_webhook_events_source_type_key"),
+    )
+
+    id: Mapped[UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    source: Mapped[str] = mapped_column(String(32), nullable=False)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    event_key: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default=WEBHOOK_EVENT_PENDING)
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    available_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+# Claim query: next due events of a status, oldest first
+Index("ix_webhook_events_status_available_at", WebhookEvent.status, WebhookEvent.available_at)
+
+
+__all__ = [
+    "WEBHOOK_EVENT_DEAD",
+    "WEBHOOK_EVENT_DONE",
+    "WEBHOOK_EVENT_PENDING",
+    "WEBHOOK_EVENT_PROCESSING",
+    "WebhookEvent",
+]
@@ -5,6 +5,7 @@ Clean Architecture repository pattern implementations.
 """
 
 from .call_repository import (
+    UpsertResult,
     upsert_calls,
     get_recent_calls,
     get_calls_in_range,
@@ -14,6 +15,7 @@ from .call_repository import (
 from .user_repository import UserRepository
 
 __all__ = [
+    "UpsertResult",
     "upsert_calls",
     "get_recent_calls",
     "get_calls_in_range",
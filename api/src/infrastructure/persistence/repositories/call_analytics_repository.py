@@ -0,0 +1,358 @@
+"""
+Aggregate queries over call records for the analytics dashboard.
+
+Counts, sums and hour bucketing run in SQL ``GROUP BY`` so analytics never
+hydrates full ``CallRecord`` rows (``meta`` JSON and transcripts) just to
+count them. PostgreSQL is the production target; SQLite is supported for tests.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import Float, and_, case, cast, func, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_rollup import CallRollup
+from api.src.infrastructure.persistence.repositories.call_repository import (
+    CALL_LISTING_COLUMNS,
+    _coerce_tenant_id,
+)
+
+ACTIVE_STATUSES = ("in-progress", "ringing", "queued")
+FAILED_STATUSES = ("failed", "no-answer", "error", "abandoned")
+ANOMALY_STATUSES = ("failed", "error", "no-answer")
+NEGATIVE_SENTIMENT_THRESHOLD = 0.2
+
+# Sentiment lookup order, mirroring analytics._extract_sentiment
+SENTIMENT_PATHS = (
+    ("analytics", "sentimentScore"),
+    ("analytics", "customerSatisfaction"),
+    ("sentimentScore",),
+)
+_NUMERIC_PATTERN = r"^\s*-?[0-9]+(\.[0-9]+)?([eE][-+]?[0-9]+)?\s*$"
+
+
+@dataclass
+class HourlyCallBucket:
+    """Call aggregates for one UTC hour."""
+
+    hour: datetime
+    total: int = 0
+    active: int = 0
+    failed: int = 0
+    duration_sum: int = 0
+    duration_count: int = 0
+    duration_sq_sum: float = 0.0
+    cost_sum: float = 0.0
+    sentiment_sum: float = 0.0
+    sentiment_count: int = 0
+    in_overview: bool = True
+
+    def merge(self, other: "HourlyCallBucket") -> None:
+        self.total += other.total
+        self.active += other.active
+        self.failed += other.failed
+        self.duration_sum += other.duration_sum
+        self.duration_count += other.duration_count
+        self.duration_sq_sum += other.duration_sq_sum
+        self.cost_sum += other.cost_sum
+        self.sentiment_sum += other.sentiment_sum
+        self.sentiment_count += other.sentiment_count
+
+
+@dataclass(frozen=True)
+class AnomalyCandidate:
+    id: str
+    assistant_id: str
+    started_at: datetime
+    status: str
+    duration_seconds: Optional[int]
+    sentiment: Optional[float]
+
+
+def _dialect(session: AsyncSession) -> str:
+    return session.get_bind().dialect.name
+
+
+def _json_number(dialect: str, path: tuple[str, ...]):
+    """Read a numeric value out of ``calls.meta``, ignoring non-numeric values."""
+
+    if dialect == "postgresql":
+        text = CallRecord.meta[path].as_string()
+        return case((text.op("~")(_NUMERIC_PATTERN), cast(text, Float)), else_=None)
+    return CallRecord.meta[path].as_float()
+
+
+def sentiment_expression(dialect: str):
+    return func.coalesce(*(_json_number(dialect, path) for path in SENTIMENT_PATHS))
+
+
+def hour_expression(dialect: str):
+    if dialect == "postgresql":
+        # Literals rather than bind params so GROUP BY matches the selected expression
+        return func.date_trunc(literal_column("'hour'"), func.timezone(literal_column("'UTC'"), CallRecord.started_at))
+    return func.strftime("%Y-%m-%d %H:00:00", CallRecord.started_at)
+
+
+def as_utc_hour(value: Any) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _window(tenant_id, start: datetime, end: datetime):
+    return and_(
+        CallRecord.tenant_id == _coerce_tenant_id(tenant_id),
+        CallRecord.started_at >= start,
+        CallRecord.started_at <= end,
+    )
+
+
+async def get_hourly_call_buckets(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    overview_start: Optional[datetime] = None,
+) -> Sequence[HourlyCallBucket]:
+    """
+    Aggregate the tenant's calls between ``start`` and ``end`` per UTC hour.
+
+    When ``overview_start`` is given, calls before it are grouped separately
+    (``in_overview=False``) so a shorter overview window can be summed exactly
+    from the same scan.
+    """
+
+    dialect = _dialect(session)
+    hour = hour_expression(dialect).label("hour")
+    sentiment = sentiment_expression(dialect)
+    has_duration = and_(CallRecord.duration_seconds.is_not(None), CallRecord.duration_seconds != 0)
+
+    columns = [
+        hour,
+        func.count().label("total"),
+        func.sum(case((CallRecord.status.in_(ACTIVE_STATUSES), 1), else_=0)).label("active"),
+        func.sum(case((func.lower(CallRecord.status).in_(FAILED_STATUSES), 1), else_=0)).label("failed"),
+        func.sum(func.coalesce(CallRecord.duration_seconds, 0)).label("duration_sum"),
+        func.sum(case((has_duration, 1), else_=0)).label("duration_count"),
+        func.sum(
+            case((has_duration, cast(CallRecord.duration_seconds, Float) * CallRecord.duration_seconds), else_=0.0)
+        ).label("duration_sq_sum"),
+        func.sum(func.coalesce(CallRecord.cost, 0.0)).label("cost_sum"),
+        func.sum(func.coalesce(sentiment, 0.0)).label("sentiment_sum"),
+        func.count(sentiment).label("sentiment_count"),
+    ]
+    group_by = [hour]
+    if overview_start is not None:
+        in_overview = case((CallRecord.started_at >= overview_start, 1), else_=0).label("in_overview")
+        columns.append(in_overview)
+        group_by.append(in_overview)
+
+    query = select(*columns).where(_window(tenant_id, start, end)).group_by(*group_by).order_by(hour)
+    result = await session.execute(query)
+
+    return [
+        HourlyCallBucket(
+            hour=as_utc_hour(row.hour),
+            total=int(row.total or 0),
+            active=int(row.active or 0),
+            failed=int(row.failed or 0),
+            duration_sum=int(row.duration_sum or 0),
+            duration_count=int(row.duration_count or 0),
+            duration_sq_sum=float(row.duration_sq_sum or 0),
+            cost_sum=float(row.cost_sum or 0),
+            sentiment_sum=float(row.sentiment_sum or 0),
+            sentiment_count=int(row.sentiment_count or 0),
+            in_overview=bool(row.in_overview) if overview_start is not None else True,
+        )
+        for row in result
+    ]
+
+
+async def get_hourly_rollup_buckets(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    overview_start: Optional[datetime] = None,
+) -> Sequence[HourlyCallBucket]:
+    """
+    Same as :func:`get_hourly_call_buckets` but summed from ``call_rollups``.
+
+    Rollups have hour granularity, so partial hours at the window edges are
+    counted whole. ``active`` is a live status rather than a historical total,
+    so it is still counted from ``calls``.
+    """
+
+    tenant_key = _coerce_tenant_id(tenant_id)
+    first_hour = start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    rollups = await session.execute(
+        select(
+            CallRollup.hour_start,
+            func.sum(CallRollup.call_count).label("total"),
+            func.sum(CallRollup.failed_count).label("failed"),
+            func.sum(CallRollup.duration_sum).label("duration_sum"),
+            func.sum(CallRollup.duration_count).label("duration_count"),
+            func.sum(CallRollup.duration_sq_sum).label("duration_sq_sum"),
+            func.sum(CallRollup.cost_sum).label("cost_sum"),
+            func.sum(CallRollup.sentiment_sum).label("sentiment_sum"),
+            func.sum(CallRollup.sentiment_count).label("sentiment_count"),
+        )
+        .where(CallRollup.tenant_id == tenant_key)
+        .where(CallRollup.hour_start >= first_hour)
+        .where(CallRollup.hour_start <= end)
+        .group_by(CallRollup.hour_start)
+        .order_by(CallRollup.hour_start)
+    )
+    buckets = {
+        as_utc_hour(row.hour_start): HourlyCallBucket(
+            hour=as_utc_hour(row.hour_start),
+            total=int(row.total or 0),
+            failed=int(row.failed or 0),
+            duration_sum=int(row.duration_sum or 0),
+            duration_count=int(row.duration_count or 0),
+            duration_sq_sum=float(row.duration_sq_sum or 0),
+            cost_sum=float(row.cost_sum or 0),
+            sentiment_sum=float(row.sentiment_sum or 0),
+            sentiment_count=int(row.sentiment_count or 0),
+        )
+        for row in rollups
+    }
+
+    dialect = _dialect(session)
+    hour = hour_expression(dialect).label("hour")
+    active_rows = await session.execute(
+        select(hour, func.count().label("active"))
+        .where(_window(tenant_id, start, end))
+        .where(CallRecord.status.in_(ACTIVE_STATUSES))
+        .group_by(hour)
+    )
+    for row in active_rows:
+        bucket_hour = as_utc_hour(row.hour)
+        bucket = buckets.setdefault(bucket_hour, HourlyCallBucket(hour=bucket_hour))
+        bucket.active = int(row.active or 0)
+
+    if overview_start is not None:
+        overview_hour = overview_start.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+        for bucket in buckets.values():
+            bucket.in_overview = bucket.hour >= overview_hour
+
+    return [buckets[key] for key in sorted(buckets)]
+
+
+async def get_anomaly_candidates(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+    long_duration_threshold: float,
+    limit: int,
+) -> Sequence[AnomalyCandidate]:
+    """Return the most recent calls that trip at least one anomaly rule, newest first."""
+
+    dialect = _dialect(session)
+    sentiment = sentiment_expression(dialect).label("sentiment")
+    query = (
+        select(
+            CallRecord.id,
+            CallRecord.assistant_id,
+            CallRecord.started_at,
+            CallRecord.status,
+            CallRecord.duration_seconds,
+            sentiment,
+        )
+        .where(_window(tenant_id, start, end))
+        .where(
+            or_(
+                CallRecord.duration_seconds >= long_duration_threshold,
+                func.lower(CallRecord.status).in_(ANOMALY_STATUSES),
+                sentiment_expression(dialect) < NEGATIVE_SENTIMENT_THRESHOLD,
+            )
+        )
+        .order_by(CallRecord.started_at.desc())
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return [
+        AnomalyCandidate(
+            id=row.id,
+            assistant_id=row.assistant_id,
+            started_at=row.started_at,
+            status=row.status,
+            duration_seconds=row.duration_seconds,
+            sentiment=float(row.sentiment) if row.sentiment is not None else None,
+        )
+        for row in result
+    ]
+
+
+async def get_recent_calls_with_sentiment(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    limit: int = 20,
+) -> Sequence[Any]:
+    """Return listing columns, transcript and SQL-extracted sentiment for the latest calls."""
+
+    query = (
+        select(
+            *CALL_LISTING_COLUMNS,
+            CallRecord.transcript,
+            sentiment_expression(_dialect(session)).label("sentiment"),
+        )
+        .where(CallRecord.tenant_id == _coerce_tenant_id(tenant_id))
+        .order_by(CallRecord.started_at.desc())
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return result.all()
+
+
+async def get_topic_sources(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    start: datetime,
+    end: datetime,
+) -> Sequence[tuple[str, Optional[str], Any, Any, Any]]:
+    """Return ``(id, transcript, topics, tags, keywords)`` for calls in the window, newest first."""
+
+    query = (
+        select(
+            CallRecord.id,
+            CallRecord.transcript,
+            CallRecord.meta["topics"],
+            CallRecord.meta["tags"],
+            CallRecord.meta["keywords"],
+        )
+        .where(_window(tenant_id, start, end))
+        .order_by(CallRecord.started_at.desc())
+    )
+    result = await session.execute(query)
+    return [tuple(row) for row in result]
+
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "ANOMALY_STATUSES",
+    "AnomalyCandidate",
+    "FAILED_STATUSES",
+    "HourlyCallBucket",
+    "get_anomaly_candidates",
+    "get_hourly_call_buckets",
+    "get_hourly_rollup_buckets",
+    "get_recent_calls_with_sentiment",
+    "get_topic_sources",
+    "hour_expression",
+    "as_utc_hour",
+    "sentiment_expression",
+]
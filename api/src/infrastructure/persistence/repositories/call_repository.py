@@ -4,17 +4,40 @@ Repository functions for persisting and querying call records.
 
 from __future__ import annotations
 
-from datetime import datetime, timedelta, timezone
-from typing import Iterable, Optional, Sequence
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Iterable, Optional, Sequence
 
 from uuid import UUID
 
-from sqlalchemy import Select, select
+from sqlalchemy import JSON, Integer, Row, Select, and_, case, cast, delete, func, literal_column, or_, select, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from api.src.infrastructure.persistence.models.call import CallRecord
 
 
+# Columns returned by call listings (everything except the heavy meta/transcript).
+CALL_LISTING_COLUMNS = (
+    CallRecord.id,
+    CallRecord.assistant_id,
+    CallRecord.customer_number,
+    CallRecord.status,
+    CallRecord.started_at,
+    CallRecord.ended_at,
+    CallRecord.duration_seconds,
+    CallRecord.cost,
+)
+TRANSCRIPT_PREVIEW_LENGTH = 200
+_FULL_RECORD = (undefer(CallRecord.meta), undefer(CallRecord.transcript))
+
+
+def _transcript_preview():
+    return func.substr(CallRecord.transcript, 1, TRANSCRIPT_PREVIEW_LENGTH).label("transcript_preview")
+
+
 def _coerce_tenant_id(value):
     """Normalize tenant identifiers so UUID columns can be filtered reliably."""
 
@@ -30,17 +53,146 @@ def _coerce_tenant_id(value):
     return value
 
 
-async def upsert_calls(session: AsyncSession, calls: Iterable[CallRecord]) -> None:
-    """Persist a collection of call records, merging on primary key."""
+@dataclass(frozen=True)
+class UpsertResult:
+    """Number of call rows created and updated by :func:`upsert_calls`."""
+
+    inserted: int = 0
+    updated: int = 0
+
+    def __add__(self, other: "UpsertResult") -> "UpsertResult":
+        return UpsertResult(self.inserted + other.inserted, self.updated + other.updated)
 
+
+# asyncpg caps a statement at 32767 bind parameters; 12 columns x 1000 rows stays well below.
+UPSERT_BATCH_SIZE = 1000
+
+
+async def upsert_calls(
+    session: AsyncSession,
+    calls: Iterable[CallRecord],
+    *,
+    commit: bool = True,
+    search_config: Optional[str] = None,
+) -> UpsertResult:
+    """
+    Persist a collection of call records, merging on primary key.
+
+    Existing rows are merged the same way as :meth:`CallRecord.update_from_payload`:
+    ``meta`` is shallow-merged and missing payload fields keep their stored value.
+    PostgreSQL uses one ``INSERT ... ON CONFLICT`` statement per batch; other
+    dialects (SQLite in tests) fall back to a single ``SELECT ... IN`` per batch.
+    ``search_config`` (see ``search_config_for``) sets the transcript text search
+    configuration of every call in the batch.
+    """
+
+    # The same call can only be touched once per statement; the last payload wins.
+    unique: dict[str, CallRecord] = {}
     for call in calls:
-        existing = await session.get(CallRecord, call.id)
-        if existing:
-            existing.update_from_payload(call.meta)
+        unique[call.id] = call
+    records = list(unique.values())
+
+    result = UpsertResult()
+    if not records:
+        return result
+
+    dialect = session.get_bind().dialect.name
+    for offset in range(0, len(records), UPSERT_BATCH_SIZE):
+        batch = records[offset : offset + UPSERT_BATCH_SIZE]
+        if dialect == "postgresql":
+            result += await _upsert_batch_postgresql(session, batch, search_config)
         else:
-            session.add(call)
+            result += await _upsert_batch_generic(session, batch, search_config)
+
+    if commit:
+        await session.commit()
+    return result
+
+
+def _upsert_row(call: CallRecord, search_config: Optional[str]) -> dict:
+    payload = call.meta or {}
+    duration = call.duration_seconds
+    if duration is None and call.started_at and call.ended_at and payload.get("startedAt"):
+        duration = int((call.ended_at - call.started_at).total_seconds())
+    transcript = call.transcript if isinstance(call.transcript, str) and call.transcript.strip() else None
+    return {
+        "id": call.id,
+        "assistant_id": call.assistant_id,
+        "tenant_id": _coerce_tenant_id(call.tenant_id),
+        "customer_number": call.customer_number,
+        "status": call.status,
+        "started_at": call.started_at,
+        "ended_at": call.ended_at,
+        "duration_seconds": duration,
+        "cost": call.cost,
+        "meta": payload,
+        "transcript": transcript,
+        "search_config": search_config or call.search_config or "simple",
+    }
+
+
+async def _upsert_batch_postgresql(
+    session: AsyncSession, batch: Sequence[CallRecord], search_config: Optional[str]
+) -> UpsertResult:
+    table = CallRecord.__table__
+    stmt = pg_insert(table).values([_upsert_row(call, search_config) for call in batch])
+    excluded = stmt.excluded
+    excluded_meta = cast(excluded.meta, JSONB)
+
+    def _payload_has(key: str):
+        return func.nullif(excluded_meta[key].astext, "").is_not(None)
+
+    started_at = case((_payload_has("startedAt"), excluded.started_at), else_=table.c.started_at)
+    ended_at = func.coalesce(excluded.ended_at, table.c.ended_at)
+
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={
+            "status": func.coalesce(excluded_meta["status"].astext, table.c.status),
+            "meta": cast(
+                func.coalesce(cast(table.c.meta, JSONB), literal_column("'{}'::jsonb")).op("||")(excluded_meta),
+                JSON,
+            ),
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "duration_seconds": func.coalesce(
+                excluded.duration_seconds,
+                cast(func.extract("epoch", ended_at - started_at), Integer),
+                table.c.duration_seconds,
+            ),
+            "cost": func.coalesce(excluded.cost, table.c.cost),
+            "transcript": func.coalesce(excluded.transcript, table.c.transcript),
+            "search_config": excluded.search_config if search_config else table.c.search_config,
+        },
+    ).returning(literal_column("(xmax = 0)").label("inserted"))
+
+    rows = (await session.execute(stmt)).scalars().all()
+    inserted = sum(1 for flag in rows if flag)
+    return UpsertResult(inserted=inserted, updated=len(rows) - inserted)
+
+
+async def _upsert_batch_generic(
+    session: AsyncSession, batch: Sequence[CallRecord], search_config: Optional[str]
+) -> UpsertResult:
+    ids = [call.id for call in batch]
+    existing_rows = await session.execute(
+        select(CallRecord).where(CallRecord.id.in_(ids)).options(undefer(CallRecord.meta))
+    )
+    existing = {record.id: record for record in existing_rows.scalars().all()}
 
-    await session.commit()
+    inserted = 0
+    for call in batch:
+        record = existing.get(call.id)
+        if record is None:
+            record = call
+            session.add(call)
+            inserted += 1
+        else:
+            record.update_from_payload(call.meta or {})
+        if search_config:
+            record.search_config = search_config
+    await session.flush()
+    return UpsertResult(inserted=inserted, updated=len(batch) - inserted)
 
 
 async def get_recent_calls(
@@ -50,9 +202,11 @@ async def get_recent_calls(
     since: datetime | None = None,
     limit: int = 100,
 ) -> Sequence[CallRecord]:
-    """Return recent calls ordered by start time."""
+    """Return recent calls ordered by start time, with ``meta`` and ``transcript`` loaded."""
 
-    query: Select[tuple[CallRecord]] = select(CallRecord).order_by(CallRecord.started_at.desc())
+    query: Select[tuple[CallRecord]] = (
+        select(CallRecord).options(*_FULL_RECORD).order_by(CallRecord.started_at.desc())
+    )
     tenant_filter = _coerce_tenant_id(tenant_id)
     if tenant_filter:
         query = query.where(CallRecord.tenant_id == tenant_filter)
@@ -72,11 +226,12 @@ async def get_calls_in_range(
     start: datetime,
     end: datetime,
 ) -> Sequence[CallRecord]:
-    """Return calls within a date range for analytics."""
+    """Return full calls (``meta`` and ``transcript`` loaded) within a date range."""
 
     tenant_filter = _coerce_tenant_id(tenant_id)
     query: Select[tuple[CallRecord]] = (
         select(CallRecord)
+        .options(*_FULL_RECORD)
         .where(CallRecord.tenant_id == tenant_filter)
         .where(CallRecord.started_at >= start)
         .where(CallRecord.started_at <= end)
@@ -86,23 +241,198 @@ async def get_calls_in_range(
     return result.scalars().all()
 
 
-async def prune_old_calls(session: AsyncSession, *, before: datetime) -> int:
-    """Optionally remove very old call metadata."""
+def _retention_batch(
+    before: datetime,
+    *criteria,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+    limit: int,
+) -> Select:
+    """Ids of at most ``limit`` calls started before ``before``, for one batched UPDATE/DELETE."""
 
-    query = select(CallRecord).where(CallRecord.started_at < before)
-    result = await session.execute(query)
-    records = result.scalars().all()
-    deleted = len(records)
-    for record in records:
-        await session.delete(record)
-    await session.commit()
-    return deleted
+    query = select(CallRecord.id).where(CallRecord.started_at < before, *criteria)
+    tenant_key = _coerce_tenant_id(tenant_id)
+    if tenant_key is not None:
+        query = query.where(CallRecord.tenant_id == tenant_key)
+    excluded = [_coerce_tenant_id(value) for value in exclude_tenant_ids]
+    if excluded:
+        query = query.where(CallRecord.tenant_id.not_in(excluded))
+    # Rows locked by a concurrent webhook are picked up by the next batch (no-op on SQLite).
+    return query.limit(limit).with_for_update(skip_locked=True)
+
+
+async def scrub_expired_transcripts(
+    session: AsyncSession,
+    *,
+    before: datetime,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+    limit: int = 1000,
+) -> int:
+    """
+    Null out up to ``limit`` transcripts of calls started before ``before``.
+
+    Returns the number of rows scrubbed; fewer than ``limit`` means nothing is
+    left to scrub. Does not commit.
+    """
+
+    batch = _retention_batch(
+        before,
+        CallRecord.transcript.is_not(None),
+        tenant_id=tenant_id,
+        exclude_tenant_ids=exclude_tenant_ids,
+        limit=limit,
+    )
+    result = await session.execute(
+        update(CallRecord)
+        .where(CallRecord.id.in_(batch))
+        .values(transcript=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+async def prune_old_calls(
+    session: AsyncSession,
+    *,
+    before: datetime,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+    limit: int = 1000,
+) -> int:
+    """
+    Delete up to ``limit`` calls started before ``before``.
+
+    Returns the number of rows deleted. Rollups are left to the caller
+    (see ``prune_call_rollups``). Does not commit.
+    """
+
+    batch = _retention_batch(before, tenant_id=tenant_id, exclude_tenant_ids=exclude_tenant_ids, limit=limit)
+    result = await session.execute(
+        delete(CallRecord).where(CallRecord.id.in_(batch)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
 
 
 async def get_call_by_id(session: AsyncSession, call_id: str) -> CallRecord | None:
-    """Retrieve a call by its identifier."""
+    """Retrieve a call by its identifier, including ``meta`` and ``transcript``."""
+
+    return await session.get(CallRecord, call_id, options=_FULL_RECORD)
+
+
+@dataclass(frozen=True)
+class CallPageCursor:
+    """Position after the last row of a page in ``(started_at DESC, id ASC)`` order."""
+
+    started_at: datetime
+    id: str
+
+
+async def list_call_summaries(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    limit: int = 50,
+    after: Optional[CallPageCursor] = None,
+    status: Optional[str] = None,
+    assistant_id: Optional[str] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    customer_number: Optional[str] = None,
+) -> Sequence[Row]:
+    """
+    Return listing rows for the tenant's calls, newest first.
+
+    Only the listing columns and the first ``TRANSCRIPT_PREVIEW_LENGTH``
+    characters of the transcript are selected; ``meta`` is never read.
+    Pagination is keyset-based on ``(started_at DESC, id)``, matching
+    ``ix_calls_tenant_started_at_id``, so every page costs the same as the first.
+    """
+
+    query = (
+        select(*CALL_LISTING_COLUMNS, _transcript_preview())
+        .where(CallRecord.tenant_id == _coerce_tenant_id(tenant_id))
+        .order_by(CallRecord.started_at.desc(), CallRecord.id.asc())
+        .limit(limit)
+    )
+    if after is not None:
+        query = query.where(
+            or_(
+                CallRecord.started_at < after.started_at,
+                and_(CallRecord.started_at == after.started_at, CallRecord.id > after.id),
+            )
+        )
+    if status:
+        query = query.where(CallRecord.status == status)
+    if assistant_id:
+        query = query.where(CallRecord.assistant_id == assistant_id)
+    if started_from:
+        query = query.where(CallRecord.started_at >= started_from)
+    if started_to:
+        query = query.where(CallRecord.started_at < started_to)
+    if customer_number:
+        query = query.where(CallRecord.customer_number == customer_number)
+
+    result = await session.execute(query)
+    return result.all()
+
+
+async def stream_call_export(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    include_transcript: bool = False,
+    include_meta: bool = False,
+    batch_size: int = 1000,
+) -> AsyncIterator[Row]:
+    """
+    Yield the tenant's calls oldest first through a server-side cursor.
+
+    Rows are fetched ``batch_size`` at a time, so memory stays flat however
+    many calls the tenant has. ``transcript`` and ``meta`` are only selected
+    when asked for.
+    """
 
-    return await session.get(CallRecord, call_id)
+    columns = [*CALL_LISTING_COLUMNS]
+    if include_transcript:
+        columns.append(CallRecord.transcript)
+    if include_meta:
+        columns.append(CallRecord.meta)
+    query = (
+        select(*columns)
+        .where(CallRecord.tenant_id == _coerce_tenant_id(tenant_id))
+        .order_by(CallRecord.started_at.asc(), CallRecord.id.asc())
+        .execution_options(yield_per=batch_size)
+    )
+    if started_from:
+        query = query.where(CallRecord.started_at >= started_from)
+    if started_to:
+        query = query.where(CallRecord.started_at < started_to)
+
+    result = await session.stream(query)
+    try:
+        async for row in result:
+            yield row
+    finally:
+        await result.close()
+
+
+async def scrub_transcripts(session: AsyncSession, call_ids: Iterable[str]) -> int:
+    """Null out the transcripts of the given calls with one UPDATE. Does not commit."""
+
+    ids = list(call_ids)
+    if not ids:
+        return 0
+    result = await session.execute(
+        update(CallRecord)
+        .where(CallRecord.id.in_(ids))
+        .where(CallRecord.transcript.is_not(None))
+        .values(transcript=None)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
 
 
 async def delete_call_record(session: AsyncSession, call_id: str, tenant_id: str) -> bool:
@@ -138,49 +468,30 @@ async def delete_call_record(session: AsyncSession, call_id: str, tenant_id: str
         return False
     
     print(f"   🗑️  Deleting call...")
+    from api.src.infrastructure.persistence.repositories.call_rollup_repository import refresh_call_rollups
+    from api.src.infrastructure.persistence.repositories.call_topic_repository import refresh_call_topics
+
     await session.delete(call)
+    await session.flush()
+    await refresh_call_rollups(session, tenant_id=call.tenant_id, started_at=[call.started_at])
+    await refresh_call_topics(session, call_ids=[call.id])
     await session.commit()
     print(f"   ✅ Call deleted successfully")
     return True
 
 
-async def scrub_transcript_if_expired(
-    session: AsyncSession,
-    call: CallRecord,
-    *,
-    now: datetime,
-    retention: timedelta,
-) -> bool:
-    """
-    Remove transcript if older than the retention window.
-
-    Returns True if the transcript was scrubbed.
-    """
-
-    if not call.transcript or not call.started_at:
-        return False
-
-    started_at = call.started_at
-    if started_at.tzinfo is None:
-        started_at = started_at.replace(tzinfo=timezone.utc)
-    else:
-        started_at = started_at.astimezone(timezone.utc)
-
-    if started_at <= now - retention:
-        call.transcript = None
-        await session.flush()
-        return True
-
-    return False
-
-
 __all__ = [
     "CallRecord",
+    "UpsertResult",
     "upsert_calls",
     "get_recent_calls",
     "get_calls_in_range",
     "get_call_by_id",
+    "CallPageCursor",
+    "list_call_summaries",
+    "stream_call_export",
+    "scrub_transcripts",
+    "scrub_expired_transcripts",
     "prune_old_calls",
     "delete_call_record",
-    "scrub_transcript_if_expired",
 ]
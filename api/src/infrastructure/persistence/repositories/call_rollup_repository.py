@@ -0,0 +1,218 @@
+"""
+Maintenance of the hourly ``call_rollups`` table.
+
+Rollups are rebuilt per touched hour from the ``calls`` rows of that hour
+rather than adjusted with deltas, so replays, status updates and deletes
+simply recompute the hour. A write touches one or two hours, so a refresh only
+scans the handful of calls in those hours.
+
+Two transactions rebuilding the same hour would each miss the other's
+uncommitted call, and the last writer would drop one. On Postgres a rebuild
+therefore first takes transaction-level advisory locks on its hours: a tenant's
+rebuild locks its (tenant, hour) pairs and shares the hour lock with other
+tenants, while an all-tenant rebuild (backfill, retention) locks the hours
+exclusively. Locks are taken in ascending hour order and released at commit.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional, Sequence
+
+from sqlalchemy import Float, Text, and_, bindparam, case, cast, delete, func, insert, select
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_rollup import CallRollup
+from api.src.infrastructure.persistence.repositories.call_analytics_repository import (
+    FAILED_STATUSES,
+    as_utc_hour,
+    hour_expression,
+    sentiment_expression,
+)
+from api.src.infrastructure.persistence.repositories.call_repository import _coerce_tenant_id
+
+HOUR = timedelta(hours=1)
+_AGGREGATE_COLUMNS = (
+    "call_count",
+    "failed_count",
+    "duration_sum",
+    "duration_count",
+    "duration_sq_sum",
+    "cost_sum",
+    "sentiment_sum",
+    "sentiment_count",
+)
+
+
+def floor_hour(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _contiguous_ranges(hours: Sequence[datetime], *, max_gap: timedelta = timedelta(hours=24)):
+    """Group sorted hours into ``[start, end)`` ranges so distant hours are not rebuilt together."""
+
+    range_start = range_end = None
+    for hour in hours:
+        if range_start is None:
+            range_start, range_end = hour, hour + HOUR
+        elif hour - range_end > max_gap:
+            yield range_start, range_end
+            range_start, range_end = hour, hour + HOUR
+        else:
+            range_end = hour + HOUR
+    if range_start is not None:
+        yield range_start, range_end
+
+
+async def _advisory_locks(session: AsyncSession, keys: Sequence[str], *, shared: bool = False) -> None:
+    key = func.unnest(bindparam("keys", list(keys), type_=ARRAY(Text))).table_valued("key").render_derived()
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    await session.execute(select(lock(func.hashtext(key.c.key))))
+
+
+async def _lock_hours(session: AsyncSession, *, start: datetime, end: datetime, tenant_key) -> None:
+    """Serialise rebuilds of the hours in ``[start, end)`` until the transaction ends (Postgres only)."""
+
+    hours = []
+    hour = start
+    while hour < end:
+        hours.append(hour.isoformat())
+        hour += HOUR
+    if tenant_key is None:
+        await _advisory_locks(session, [f"call_rollups:{value}" for value in hours])
+        return
+    await _advisory_locks(session, [f"call_rollups:{value}" for value in hours], shared=True)
+    await _advisory_locks(session, [f"call_rollups:{tenant_key}:{value}" for value in hours])
+
+
+async def rebuild_call_rollups(
+    session: AsyncSession,
+    *,
+    start: datetime,
+    end: datetime,
+    tenant_id=None,
+) -> int:
+    """
+    Recompute every rollup row for hours in ``[start, end)`` from ``calls``.
+
+    ``tenant_id=None`` rebuilds all tenants (used by the backfill script).
+    Returns the number of rollup rows written. Does not commit.
+    """
+
+    dialect = session.get_bind().dialect.name
+    tenant_key = _coerce_tenant_id(tenant_id)
+    start, end = floor_hour(start), floor_hour(end - timedelta(microseconds=1)) + HOUR
+    if dialect == "postgresql":
+        await _lock_hours(session, start=start, end=end, tenant_key=tenant_key)
+
+    delete_stmt = delete(CallRollup).where(CallRollup.hour_start >= start, CallRollup.hour_start < end)
+    window = [CallRecord.started_at >= start, CallRecord.started_at < end]
+    if tenant_key is not None:
+        delete_stmt = delete_stmt.where(CallRollup.tenant_id == tenant_key)
+        window.append(CallRecord.tenant_id == tenant_key)
+    await session.execute(delete_stmt.execution_options(synchronize_session=False))
+
+    hour = hour_expression(dialect).label("hour")
+    sentiment = sentiment_expression(dialect)
+    has_duration = and_(CallRecord.duration_seconds.is_not(None), CallRecord.duration_seconds != 0)
+    query = (
+        select(
+            CallRecord.tenant_id,
+            CallRecord.assistant_id,
+            hour,
+            func.count().label("call_count"),
+            func.sum(case((func.lower(CallRecord.status).in_(FAILED_STATUSES), 1), else_=0)).label("failed_count"),
+            func.sum(func.coalesce(CallRecord.duration_seconds, 0)).label("duration_sum"),
+            func.sum(case((has_duration, 1), else_=0)).label("duration_count"),
+            func.sum(
+                case((has_duration, cast(CallRecord.duration_seconds, Float) * CallRecord.duration_seconds), else_=0.0)
+            ).label("duration_sq_sum"),
+            func.sum(func.coalesce(CallRecord.cost, 0.0)).label("cost_sum"),
+            func.sum(func.coalesce(sentiment, 0.0)).label("sentiment_sum"),
+            func.count(sentiment).label("sentiment_count"),
+        )
+        .where(*window)
+        .group_by(CallRecord.tenant_id, CallRecord.assistant_id, hour)
+    )
+    rows = [
+        {
+            "tenant_id": row.tenant_id,
+            "assistant_id": row.assistant_id,
+            "hour_start": as_utc_hour(row.hour),
+            "call_count": int(row.call_count or 0),
+            "failed_count": int(row.failed_count or 0),
+            "duration_sum": int(row.duration_sum or 0),
+            "duration_count": int(row.duration_count or 0),
+            "duration_sq_sum": float(row.duration_sq_sum or 0),
+            "cost_sum": float(row.cost_sum or 0),
+            "sentiment_sum": float(row.sentiment_sum or 0),
+            "sentiment_count": int(row.sentiment_count or 0),
+        }
+        for row in await session.execute(query)
+    ]
+    if not rows:
+        return 0
+
+    if dialect == "postgresql":
+        # Defensive: the hour locks already keep concurrent rebuilds of these rows apart.
+        stmt = pg_insert(CallRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CallRollup.tenant_id, CallRollup.assistant_id, CallRollup.hour_start],
+            set_={column: stmt.excluded[column] for column in _AGGREGATE_COLUMNS} | {"updated_at": func.now()},
+        )
+    else:
+        stmt = insert(CallRollup)
+    await session.execute(stmt, rows)
+    return len(rows)
+
+
+async def refresh_call_rollups(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    started_at: Iterable[Optional[datetime]],
+) -> int:
+    """Rebuild the tenant's rollups for the hours containing ``started_at``. Does not commit."""
+
+    hours = sorted({floor_hour(value) for value in started_at if value is not None})
+    written = 0
+    for range_start, range_end in _contiguous_ranges(hours):
+        written += await rebuild_call_rollups(session, start=range_start, end=range_end, tenant_id=tenant_id)
+    return written
+
+
+async def prune_call_rollups(
+    session: AsyncSession,
+    *,
+    before: datetime,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+) -> int:
+    """
+    Drop rollups of calls deleted by retention (``started_at < before``).
+
+    Hours wholly before ``before`` are deleted; the hour containing it is
+    rebuilt from the remaining calls. Returns the number of rows deleted. Does not commit.
+    """
+
+    boundary = floor_hour(before)
+    stmt = delete(CallRollup).where(CallRollup.hour_start < boundary)
+    tenant_key = _coerce_tenant_id(tenant_id)
+    if tenant_key is not None:
+        stmt = stmt.where(CallRollup.tenant_id == tenant_key)
+    excluded = [_coerce_tenant_id(value) for value in exclude_tenant_ids]
+    if excluded:
+        stmt = stmt.where(CallRollup.tenant_id.not_in(excluded))
+    result = await session.execute(stmt.execution_options(synchronize_session=False))
+
+    if before > boundary:
+        # Rebuilding from ``calls`` is correct for every tenant, so no exclusions are needed here.
+        await rebuild_call_rollups(session, start=boundary, end=boundary + HOUR, tenant_id=tenant_key)
+    return result.rowcount or 0
+
+
+__all__ = ["floor_hour", "prune_call_rollups", "rebuild_call_rollups", "refresh_call_rollups"]
@@ -0,0 +1,176 @@
+"""
+Full-text search over call transcripts.
+
+On PostgreSQL ``calls.search_vector`` is a stored generated column,
+``to_tsvector(search_config, transcript)``, with a GIN index. ``search_config``
+is set from the tenant's language when calls are ingested. Queries use
+``websearch_to_tsquery`` in the tenant's current configuration. Results are
+ranked with ``ts_rank_cd``, and ``ts_headline`` runs only on the returned
+page. Other dialects (SQLite in tests) fall back to ``ILIKE`` on every word.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from sqlalchemy import and_, func, literal, literal_column, select
+from sqlalchemy.dialects.postgresql import REGCONFIG, TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.repositories.call_repository import CALL_LISTING_COLUMNS, _coerce_tenant_id
+from api.src.infrastructure.persistence.repositories.call_topic_repository import get_tenant_language
+
+# Language tag prefix -> PostgreSQL text search configuration (keep in sync with the migration).
+SEARCH_CONFIGS = {
+    "en": "english",
+    "fr": "french",
+    "es": "spanish",
+    "de": "german",
+    "it": "italian",
+    "pt": "portuguese",
+    "nl": "dutch",
+}
+DEFAULT_SEARCH_CONFIG = "simple"
+
+# Highlight markers that cannot appear in transcripts; swapped for <mark> after escaping.
+_START, _STOP = "\x02", "\x03"
+_HEADLINE_OPTIONS = f"StartSel={_START}, StopSel={_STOP}, MaxWords=30, MinWords=10, MaxFragments=2, FragmentDelimiter=\" … \""
+_SNIPPET_RADIUS = 80
+
+_search_vector = literal_column("calls.search_vector", type_=TSVECTOR)
+
+
+def search_config_for(language: Optional[str]) -> str:
+    """Text search configuration for a language tag such as ``fr-FR``."""
+
+    base = (language or "").split("-")[0].split("_")[0].lower()
+    return SEARCH_CONFIGS.get(base, DEFAULT_SEARCH_CONFIG)
+
+
+async def get_tenant_search_config(session: AsyncSession, tenant_id) -> str:
+    return search_config_for(await get_tenant_language(session, tenant_id))
+
+
+def _highlight(text: str) -> str:
+    """HTML-escape a snippet and turn the markers into ``<mark>`` tags."""
+
+    return html.escape(text).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _filters(
+    tenant_id,
+    *,
+    status: Optional[str],
+    started_from: Optional[datetime],
+    started_to: Optional[datetime],
+    transcript_cutoff: Optional[datetime],
+) -> list[Any]:
+    criteria: list[Any] = [CallRecord.tenant_id == _coerce_tenant_id(tenant_id)]
+    if status:
+        criteria.append(CallRecord.status == status)
+    if started_from:
+        criteria.append(CallRecord.started_at >= started_from)
+    if started_to:
+        criteria.append(CallRecord.started_at < started_to)
+    if transcript_cutoff:
+        # Expired transcripts are hidden until the retention job scrubs them; never match them.
+        criteria.append(CallRecord.started_at >= transcript_cutoff)
+    return criteria
+
+
+async def search_calls(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    query: str,
+    limit: int = 20,
+    status: Optional[str] = None,
+    started_from: Optional[datetime] = None,
+    started_to: Optional[datetime] = None,
+    transcript_cutoff: Optional[datetime] = None,
+) -> Sequence[dict[str, Any]]:
+    """
+    Return the tenant's calls whose transcript matches ``query``, best first.
+
+    Each result has the listing columns plus ``rank`` and an HTML-safe
+    ``snippet`` with the matches wrapped in ``<mark>``.
+    """
+
+    criteria = _filters(
+        tenant_id,
+        status=status,
+        started_from=started_from,
+        started_to=started_to,
+        transcript_cutoff=transcript_cutoff,
+    )
+    if session.get_bind().dialect.name == "postgresql":
+        config = literal(await get_tenant_search_config(session, tenant_id), REGCONFIG)
+        return await _search_postgresql(session, config, query, criteria, limit)
+    return await _search_fallback(session, query, criteria, limit)
+
+
+async def _search_postgresql(session: AsyncSession, config, query: str, criteria, limit: int):
+    tsquery = func.websearch_to_tsquery(config, query)
+    rank = func.ts_rank_cd(_search_vector, tsquery).label("rank")
+    # Rank and limit first so ts_headline only parses the transcripts of one page.
+    page = (
+        select(CallRecord.id, rank)
+        .where(_search_vector.op("@@")(tsquery), *criteria)
+        .order_by(rank.desc(), CallRecord.started_at.desc())
+        .limit(limit)
+        .subquery()
+    )
+    snippet = func.ts_headline(config, CallRecord.transcript, tsquery, _HEADLINE_OPTIONS).label("snippet")
+    result = await session.execute(
+        select(*CALL_LISTING_COLUMNS, page.c.rank, snippet)
+        .join(page, page.c.id == CallRecord.id)
+        .order_by(page.c.rank.desc(), CallRecord.started_at.desc())
+    )
+    return [{**row._mapping, "rank": float(row.rank), "snippet": _highlight(row.snippet or "")} for row in result]
+
+
+def _fallback_snippet(transcript: str, words: Sequence[str]) -> str:
+    lowered = transcript.lower()
+    positions = [lowered.find(word) for word in words if word in lowered]
+    first = min(positions) if positions else 0
+    start, end = max(0, first - _SNIPPET_RADIUS), first + _SNIPPET_RADIUS
+    fragment = transcript[start:end]
+    pattern = re.compile("|".join(re.escape(word) for word in words), re.IGNORECASE)
+    marked = pattern.sub(lambda match: f"{_START}{match.group(0)}{_STOP}", fragment)
+    return ("…" if start else "") + _highlight(marked) + ("…" if end < len(transcript) else "")
+
+
+async def _search_fallback(session: AsyncSession, query: str, criteria, limit: int):
+    # Every word must appear; the newest ``limit`` matches are ranked by occurrences.
+    words = [word.lower() for word in re.findall(r"\w+", query)]
+    if not words:
+        return []
+    matches = and_(*(CallRecord.transcript.icontains(word, autoescape=True) for word in words))
+    result = await session.execute(
+        select(*CALL_LISTING_COLUMNS, CallRecord.transcript)
+        .where(matches, *criteria)
+        .order_by(CallRecord.started_at.desc())
+        .limit(limit)
+    )
+    calls = []
+    for row in result:
+        data = dict(row._mapping)
+        transcript = data.pop("transcript") or ""
+        data["rank"] = float(sum(transcript.lower().count(word) for word in words))
+        data["snippet"] = _fallback_snippet(transcript, words)
+        calls.append(data)
+    calls.sort(key=lambda item: item["rank"], reverse=True)
+    return calls
+
+
+__all__ = [
+    "DEFAULT_SEARCH_CONFIG",
+    "SEARCH_CONFIGS",
+    "get_tenant_search_config",
+    "search_calls",
+    "search_config_for",
+]
@@ -0,0 +1,175 @@
+"""
+Maintenance and queries of the ``call_topics`` index.
+
+Like the hourly rollups, a call's topic rows are rebuilt from its ``calls``
+row whenever it is written, so replays and edits never double count. The
+tenant's studio config language picks the stopword list.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from typing import Any, Iterable, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.domain.services.topic_extraction import extract_terms
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_topic import CallTopic
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.repositories.call_repository import _coerce_tenant_id
+
+_SOURCE_COLUMNS = (
+    CallRecord.id,
+    CallRecord.tenant_id,
+    CallRecord.started_at,
+    CallRecord.transcript,
+    CallRecord.meta["topics"],
+    CallRecord.meta["tags"],
+    CallRecord.meta["keywords"],
+)
+
+
+async def get_tenant_language(session: AsyncSession, tenant_id) -> Optional[str]:
+    """Language of the tenant's studio config, or ``None`` when it has none."""
+
+    result = await session.execute(
+        select(StudioConfig.language).where(StudioConfig.user_id == str(tenant_id)).limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+def _utc_day(value: datetime) -> date:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).date()
+
+
+async def _index_sources(session: AsyncSession, query) -> int:
+    languages: dict[Any, Optional[str]] = {}
+    rows = []
+    for call_id, tenant_id, started_at, transcript, *metadata in await session.execute(query):
+        if started_at is None:
+            continue
+        if tenant_id not in languages:
+            languages[tenant_id] = await get_tenant_language(session, tenant_id)
+        day = _utc_day(started_at)
+        rows.extend(
+            {"call_id": call_id, "term": term, "tenant_id": tenant_id, "day": day, "count": count}
+            for term, count in extract_terms(transcript, *metadata, language=languages[tenant_id]).items()
+        )
+    if not rows:
+        return 0
+
+    if session.get_bind().dialect.name == "postgresql":
+        # A concurrent refresh of the same call may have re-inserted rows after our delete.
+        stmt = pg_insert(CallTopic)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CallTopic.call_id, CallTopic.term],
+            set_={"count": stmt.excluded.count, "day": stmt.excluded.day},
+        )
+    else:
+        stmt = insert(CallTopic)
+    await session.execute(stmt, rows)
+    return len(rows)
+
+
+async def refresh_call_topics(session: AsyncSession, *, call_ids: Iterable[str]) -> int:
+    """
+    Re-extract the topics of ``call_ids`` from their current ``calls`` rows.
+
+    Deleted calls simply lose their rows. Returns the number of topic rows
+    written. Does not commit.
+    """
+
+    ids = sorted({str(call_id) for call_id in call_ids if call_id})
+    if not ids:
+        return 0
+    await session.execute(
+        delete(CallTopic).where(CallTopic.call_id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return await _index_sources(session, select(*_SOURCE_COLUMNS).where(CallRecord.id.in_(ids)))
+
+
+async def rebuild_call_topics(
+    session: AsyncSession,
+    *,
+    start: datetime,
+    end: datetime,
+    tenant_id=None,
+) -> int:
+    """
+    Re-extract the topics of every call started in ``[start, end)``.
+
+    ``tenant_id=None`` rebuilds all tenants (used by the backfill script).
+    Returns the number of topic rows written. Does not commit.
+    """
+
+    window = [CallRecord.started_at >= start, CallRecord.started_at < end]
+    tenant_key = _coerce_tenant_id(tenant_id)
+    if tenant_key is not None:
+        window.append(CallRecord.tenant_id == tenant_key)
+    await session.execute(
+        delete(CallTopic)
+        .where(CallTopic.call_id.in_(select(CallRecord.id).where(*window)))
+        .execution_options(synchronize_session=False)
+    )
+    return await _index_sources(session, select(*_SOURCE_COLUMNS).where(*window))
+
+
+async def prune_call_topics(
+    session: AsyncSession,
+    *,
+    before: datetime,
+    tenant_id=None,
+    exclude_tenant_ids: Iterable = (),
+) -> int:
+    """
+    Drop topic rows of days wholly before ``before``.
+
+    Used with the call retention cutoff: topic rows outlive expired
+    transcripts and go with their calls, which also drop them through the
+    foreign key. Returns the number of rows deleted. Does not commit.
+    """
+
+    stmt = delete(CallTopic).where(CallTopic.day < _utc_day(before))
+    tenant_key = _coerce_tenant_id(tenant_id)
+    if tenant_key is not None:
+        stmt = stmt.where(CallTopic.tenant_id == tenant_key)
+    excluded = [_coerce_tenant_id(value) for value in exclude_tenant_ids]
+    if excluded:
+        stmt = stmt.where(CallTopic.tenant_id.not_in(excluded))
+    result = await session.execute(stmt.execution_options(synchronize_session=False))
+    return result.rowcount or 0
+
+
+async def get_trending_terms(
+    session: AsyncSession,
+    *,
+    tenant_id,
+    since: date,
+    limit: int,
+) -> Sequence[tuple[str, int, str]]:
+    """Return ``(term, occurrences, sample call id)`` for the top terms since ``since``."""
+
+    total = func.sum(CallTopic.count).label("total")
+    query = (
+        select(CallTopic.term, total, func.max(CallTopic.call_id))
+        .where(CallTopic.tenant_id == _coerce_tenant_id(tenant_id), CallTopic.day >= since)
+        .group_by(CallTopic.term)
+        .order_by(total.desc(), CallTopic.term)
+        .limit(limit)
+    )
+    result = await session.execute(query)
+    return [(term, int(count or 0), call_id) for term, count, call_id in result]
+
+
+__all__ = [
+    "get_tenant_language",
+    "get_trending_terms",
+    "prune_call_topics",
+    "rebuild_call_topics",
+    "refresh_call_topics",
+]
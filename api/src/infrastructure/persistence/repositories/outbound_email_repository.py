@@ -0,0 +1,214 @@
+"""
+Repository functions for the ``outbound_emails`` queue.
+
+Same claiming scheme as the webhook outbox: ``FOR UPDATE SKIP LOCKED`` hands
+each due email to one worker, and an email whose worker died mid-send is
+reclaimed once its lease expires.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+from uuid import UUID, uuid4
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.models.outbound_email import (
+    OUTBOUND_EMAIL_DEAD,
+    OUTBOUND_EMAIL_PENDING,
+    OUTBOUND_EMAIL_SENDING,
+    OUTBOUND_EMAIL_SENT,
+    OutboundEmail,
+)
+
+
+@dataclass(frozen=True)
+class OutboundEmailStats:
+    """Backlog snapshot used for the queue depth/lag metrics."""
+
+    pending: int
+    sending: int
+    dead: int
+    oldest_due_at: Optional[datetime]
+
+
+async def enqueue_outbound_email(
+    session: AsyncSession,
+    *,
+    kind: str,
+    provider: str,
+    recipients: Sequence[str],
+    subject: str,
+    html: str,
+    now: datetime,
+    smtp_user_id: Optional[str] = None,
+    dedupe_key: Optional[str] = None,
+) -> Optional[UUID]:
+    """
+    Add an email to the queue unless one with the same ``dedupe_key`` exists.
+
+    Returns the new row id, or None for a duplicate. Does not commit.
+    """
+
+    values = {
+        "id": uuid4(),
+        "kind": kind,
+        "provider": provider,
+        "smtp_user_id": smtp_user_id,
+        "dedupe_key": dedupe_key,
+        "recipients": list(recipients),
+        "subject": subject[:255],
+        "html": html,
+        "status": OUTBOUND_EMAIL_PENDING,
+        "attempts": 0,
+        "available_at": now,
+        "created_at": now,
+    }
+    if session.get_bind().dialect.name == "postgresql":
+        stmt = (
+            pg_insert(OutboundEmail)
+            .values(**values)
+            .on_conflict_do_nothing(index_elements=[OutboundEmail.dedupe_key])
+            .returning(OutboundEmail.id)
+        )
+        return (await session.execute(stmt)).scalar_one_or_none()
+
+    if dedupe_key is not None and await session.scalar(
+        select(OutboundEmail.id).where(OutboundEmail.dedupe_key == dedupe_key).limit(1)
+    ):
+        return None
+    session.add(OutboundEmail(**values))
+    await session.flush()
+    return values["id"]
+
+
+async def claim_outbound_emails(
+    session: AsyncSession,
+    *,
+    limit: int,
+    now: datetime,
+    lease: timedelta,
+) -> Sequence[OutboundEmail]:
+    """Lock up to ``limit`` due emails, mark them sending and commit."""
+
+    query = (
+        select(OutboundEmail)
+        .where(
+            or_(
+                and_(OutboundEmail.status == OUTBOUND_EMAIL_PENDING, OutboundEmail.available_at <= now),
+                and_(OutboundEmail.status == OUTBOUND_EMAIL_SENDING, OutboundEmail.locked_at < now - lease),
+            )
+        )
+        .order_by(OutboundEmail.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    emails = (await session.execute(query)).scalars().all()
+    for email in emails:
+        email.status = OUTBOUND_EMAIL_SENDING
+        email.locked_at = now
+        email.attempts += 1
+    await session.commit()
+    return emails
+
+
+async def mark_outbound_email_sent(
+    session: AsyncSession,
+    email_id,
+    *,
+    now: datetime,
+    provider_message_id: Optional[str],
+) -> None:
+    """Record a delivery and drop the body. Does not commit."""
+
+    await session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id == email_id)
+        .values(
+            status=OUTBOUND_EMAIL_SENT,
+            sent_at=now,
+            locked_at=None,
+            last_error=None,
+            html=None,
+            provider_message_id=(provider_message_id or None) and provider_message_id[:255],
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def fail_outbound_email(
+    session: AsyncSession,
+    email_id,
+    *,
+    error: str,
+    retry_at: Optional[datetime],
+) -> None:
+    """Record a failed attempt; ``retry_at=None`` dead-letters the email. Does not commit."""
+
+    values: dict[str, Any] = {"last_error": error[:2000], "locked_at": None}
+    if retry_at is None:
+        values["status"] = OUTBOUND_EMAIL_DEAD
+    else:
+        values.update(status=OUTBOUND_EMAIL_PENDING, available_at=retry_at)
+    await session.execute(
+        update(OutboundEmail)
+        .where(OutboundEmail.id == email_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_outbound_email_stats(session: AsyncSession, *, now: datetime) -> OutboundEmailStats:
+    counts = dict(
+        (
+            await session.execute(
+                select(OutboundEmail.status, func.count())
+                .where(OutboundEmail.status != OUTBOUND_EMAIL_SENT)
+                .group_by(OutboundEmail.status)
+            )
+        ).all()
+    )
+    oldest_due_at = await session.scalar(
+        select(func.min(OutboundEmail.available_at)).where(
+            OutboundEmail.status == OUTBOUND_EMAIL_PENDING,
+            OutboundEmail.available_at <= now,
+        )
+    )
+    return OutboundEmailStats(
+        pending=int(counts.get(OUTBOUND_EMAIL_PENDING, 0)),
+        sending=int(counts.get(OUTBOUND_EMAIL_SENDING, 0)),
+        dead=int(counts.get(OUTBOUND_EMAIL_DEAD, 0)),
+        oldest_due_at=oldest_due_at,
+    )
+
+
+async def prune_outbound_emails(session: AsyncSession, *, before: datetime, limit: int = 1000) -> int:
+    """Delete up to ``limit`` sent or dead emails created before ``before``. Does not commit."""
+
+    batch = (
+        select(OutboundEmail.id)
+        .where(
+            OutboundEmail.status.in_([OUTBOUND_EMAIL_SENT, OUTBOUND_EMAIL_DEAD]),
+            OutboundEmail.created_at < before,
+        )
+        .limit(limit)
+    )
+    result = await session.execute(
+        delete(OutboundEmail).where(OutboundEmail.id.in_(batch)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+__all__ = [
+    "OutboundEmailStats",
+    "claim_outbound_emails",
+    "enqueue_outbound_email",
+    "fail_outbound_email",
+    "get_outbound_email_stats",
+    "mark_outbound_email_sent",
+    "prune_outbound_emails",
+]
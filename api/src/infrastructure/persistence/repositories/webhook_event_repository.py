@@ -0,0 +1,218 @@
+"""
+Repository functions for the ``webhook_events`` outbox.
+
+Workers claim due events with ``FOR UPDATE SKIP LOCKED`` so several API
+processes can drain the queue concurrently without handing out an event twice.
+An event whose worker died mid-processing is reclaimed once its lease expires.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+from uuid import uuid4
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.src.infrastructure.persistence.models.webhook_event import (
+    WEBHOOK_EVENT_DEAD,
+    WEBHOOK_EVENT_DONE,
+    WEBHOOK_EVENT_PENDING,
+    WEBHOOK_EVENT_PROCESSING,
+    WebhookEvent,
+)
+
+
+@dataclass(frozen=True)
+class WebhookQueueStats:
+    """Backlog snapshot used for the queue depth/lag metrics."""
+
+    pending: int
+    processing: int
+    dead: int
+    oldest_due_at: Optional[datetime]
+
+
+async def enqueue_webhook_event(
+    session: AsyncSession,
+    *,
+    source: str,
+    event_type: str,
+    payload: dict[str, Any],
+    now: datetime,
+    event_key: Optional[str] = None,
+    status: str = WEBHOOK_EVENT_PENDING,
+) -> bool:
+    """
+    Add an event to the outbox unless one with the same ``event_key`` exists.
+
+    Returns False for a duplicate. ``status=done`` records an event that was
+    handled inline, so later redeliveries are recognised. Does not commit.
+    """
+
+    values = {
+        "id": uuid4(),
+        "source": source,
+        "event_type": event_type,
+        "event_key": event_key,
+        "payload": payload,
+        "status": status,
+        "attempts": 0 if status == WEBHOOK_EVENT_PENDING else 1,
+        "available_at": now,
+        "created_at": now,
+        "processed_at": now if status == WEBHOOK_EVENT_DONE else None,
+    }
+    if session.get_bind().dialect.name == "postgresql":
+        stmt = (
+            pg_insert(WebhookEvent)
+            .values(**values)
+            .on_conflict_do_nothing(
+                index_elements=[WebhookEvent.source, WebhookEvent.event_type, WebhookEvent.event_key]
+            )
+            .returning(WebhookEvent.id)
+        )
+        return (await session.execute(stmt)).first() is not None
+
+    if event_key is not None and await webhook_event_exists(
+        session, source=source, event_type=event_type, event_key=event_key
+    ):
+        return False
+    session.add(WebhookEvent(**values))
+    await session.flush()
+    return True
+
+
+async def webhook_event_exists(session: AsyncSession, *, source: str, event_type: str, event_key: str) -> bool:
+    """One lookup on the ``(source, event_type, event_key)`` unique index."""
+
+    found = await session.scalar(
+        select(WebhookEvent.id)
+        .where(
+            WebhookEvent.source == source,
+            WebhookEvent.event_type == event_type,
+            WebhookEvent.event_key == event_key,
+        )
+        .limit(1)
+    )
+    return found is not None
+
+
+async def claim_webhook_events(
+    session: AsyncSession,
+    *,
+    limit: int,
+    now: datetime,
+    lease: timedelta,
+) -> Sequence[WebhookEvent]:
+    """
+    Lock up to ``limit`` due events, mark them processing and commit.
+
+    Due means pending with ``available_at`` in the past, or processing with a
+    lease older than ``lease`` (the worker holding it is presumed dead).
+    """
+
+    query = (
+        select(WebhookEvent)
+        .where(
+            or_(
+                and_(WebhookEvent.status == WEBHOOK_EVENT_PENDING, WebhookEvent.available_at <= now),
+                and_(WebhookEvent.status == WEBHOOK_EVENT_PROCESSING, WebhookEvent.locked_at < now - lease),
+            )
+        )
+        .order_by(WebhookEvent.available_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    events = (await session.execute(query)).scalars().all()
+    for event in events:
+        event.status = WEBHOOK_EVENT_PROCESSING
+        event.locked_at = now
+        event.attempts += 1
+    await session.commit()
+    return events
+
+
+async def complete_webhook_event(session: AsyncSession, event_id, *, now: datetime) -> None:
+    """Mark a claimed event as processed. Does not commit."""
+
+    await session.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id == event_id)
+        .values(status=WEBHOOK_EVENT_DONE, processed_at=now, locked_at=None, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def fail_webhook_event(
+    session: AsyncSession,
+    event_id,
+    *,
+    error: str,
+    retry_at: Optional[datetime],
+) -> None:
+    """Record a failed attempt; ``retry_at=None`` dead-letters the event. Does not commit."""
+
+    values: dict[str, Any] = {"last_error": error[:2000], "locked_at": None}
+    if retry_at is None:
+        values["status"] = WEBHOOK_EVENT_DEAD
+    else:
+        values.update(status=WEBHOOK_EVENT_PENDING, available_at=retry_at)
+    await session.execute(
+        update(WebhookEvent)
+        .where(WebhookEvent.id == event_id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def get_webhook_queue_stats(session: AsyncSession, *, now: datetime) -> WebhookQueueStats:
+    counts = dict(
+        (
+            await session.execute(
+                select(WebhookEvent.status, func.count())
+                .where(WebhookEvent.status != WEBHOOK_EVENT_DONE)
+                .group_by(WebhookEvent.status)
+            )
+        ).all()
+    )
+    oldest_due_at = await session.scalar(
+        select(func.min(WebhookEvent.available_at)).where(
+            WebhookEvent.status == WEBHOOK_EVENT_PENDING,
+            WebhookEvent.available_at <= now,
+        )
+    )
+    return WebhookQueueStats(
+        pending=int(counts.get(WEBHOOK_EVENT_PENDING, 0)),
+        processing=int(counts.get(WEBHOOK_EVENT_PROCESSING, 0)),
+        dead=int(counts.get(WEBHOOK_EVENT_DEAD, 0)),
+        oldest_due_at=oldest_due_at,
+    )
+
+
+async def prune_webhook_events(session: AsyncSession, *, before: datetime, limit: int = 1000) -> int:
+    """Delete up to ``limit`` processed events older than ``before``. Does not commit."""
+
+    batch = (
+        select(WebhookEvent.id)
+        .where(WebhookEvent.status == WEBHOOK_EVENT_DONE, WebhookEvent.processed_at < before)
+        .limit(limit)
+    )
+    result = await session.execute(
+        delete(WebhookEvent).where(WebhookEvent.id.in_(batch)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+__all__ = [
+    "WebhookQueueStats",
+    "claim_webhook_events",
+    "complete_webhook_event",
+    "enqueue_webhook_event",
+    "fail_webhook_event",
+    "get_webhook_queue_stats",
+    "prune_webhook_events",
+    "webhook_event_exists",
+]
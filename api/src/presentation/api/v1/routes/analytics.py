@@ -4,25 +4,33 @@ from __future__ import annotations
 
 import logging
 
-from typing import Optional
+from typing import Optional, Sequence
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from api.src.application.services.analytics import (
     compute_activity_heatmap,
+    compute_dashboard,
     compute_overview_metrics,
     compute_time_series,
     compute_trending_topics,
     detect_anomalies,
     recent_calls_with_transcripts,
+)
+from api.src.application.services.call_sync import (
+    get_call_sync_worker,
+    get_sync_cursor,
+    is_cursor_stale,
     synchronise_calls_from_vapi,
 )
-from api.src.application.services.email import get_user_email_service
-from api.src.application.services.tenant import ensure_tenant_for_user
+from api.src.application.services.outbound_email import EMAIL_KIND_CALL_TRANSCRIPT, enqueue_email
+from api.src.application.services.tenant import ensure_tenant_for_user, tenant_id_for_user
+from api.src.infrastructure.email.templates import CallEmailData, render_call_transcript_email
 from api.src.infrastructure.external.vapi_client import VapiApiError, VapiClient
-from api.src.infrastructure.database.session import get_session
+from api.src.infrastructure.database.session import get_read_session, get_session
 from api.src.infrastructure.persistence.models.call import CallRecord
 from api.src.infrastructure.persistence.models.studio_config import StudioConfig as StudioConfigModel
 from api.src.infrastructure.persistence.models.user import User
@@ -48,95 +56,114 @@ async def _load_studio_config(session: AsyncSession, user_id: str) -> Optional[S
     return result.scalar_one_or_none()
 
 
-async def _sync_calls(session: AsyncSession, tenant_id, client: VapiClient) -> None:
+async def _sync_calls(session: AsyncSession, tenant_id, client: VapiClient) -> Sequence[CallRecord]:
     try:
-        await synchronise_calls_from_vapi(session, tenant_id=tenant_id, vapi_client=client)
+        return await synchronise_calls_from_vapi(session, tenant_id=tenant_id, vapi_client=client)
     except VapiApiError as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
 
 
-@router.get("/overview")
-async def analytics_overview(
+async def _data_as_of(session: AsyncSession, user: User, tenant_id) -> Optional[str]:
+    """Return when the tenant's calls were last synced, queueing a background sync if stale."""
+    cursor = await get_sync_cursor(session, tenant_id)
+    if is_cursor_stale(cursor) and user.vapi_api_key:
+        get_call_sync_worker().request_sync(user.id)
+    if cursor is None or cursor.last_synced_at is None:
+        return None
+    return cursor.last_synced_at.isoformat()
+
+
+@router.post("/sync")
+async def analytics_sync(
     user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ) -> dict[str, object]:
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    await session.refresh(user)
-    
+    """Pull new or updated calls from Vapi right away instead of waiting for the worker."""
     client = _client(user)
     tenant = await ensure_tenant_for_user(session, user)
     tenant_id = tenant.id
-    await _sync_calls(session, tenant_id, client)
+    records = await _sync_calls(session, tenant_id, client)
+    cursor = await get_sync_cursor(session, tenant_id)
+    return {
+        "synced": len(records),
+        "dataAsOf": cursor.last_synced_at.isoformat() if cursor and cursor.last_synced_at else None,
+    }
+
+
+@router.get("/dashboard")
+async def analytics_dashboard(
+    user: User = Depends(get_current_user),
+    read_db: AsyncSession = Depends(get_read_session),
+) -> dict[str, object]:
+    """Overview, time series, heatmap, anomalies, topics and recent calls in one response."""
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
+    dashboard = await compute_dashboard(read_db, tenant_id=tenant_id)
+    return {**dashboard, "dataAsOf": data_as_of}
+
+
+@router.get("/overview")
+async def analytics_overview(
+    user: User = Depends(get_current_user),
+    read_db: AsyncSession = Depends(get_read_session),
+) -> dict[str, object]:
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
 
-    overview = await compute_overview_metrics(session, tenant_id=tenant_id)
-    calls = await recent_calls_with_transcripts(session, tenant_id=tenant_id)
-    topics = await compute_trending_topics(session, tenant_id=tenant_id, limit=6)
+    overview = await compute_overview_metrics(read_db, tenant_id=tenant_id)
+    calls = await recent_calls_with_transcripts(read_db, tenant_id=tenant_id)
+    topics = await compute_trending_topics(read_db, tenant_id=tenant_id, limit=6)
 
     return {
         "overview": overview,
         "calls": calls,
         "topics": topics,
+        "dataAsOf": data_as_of,
     }
 
 
 @router.get("/timeseries")
 async def analytics_timeseries(
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    read_db: AsyncSession = Depends(get_read_session),
 ) -> dict[str, object]:
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    await session.refresh(user)
-    
-    client = _client(user)
-    tenant = await ensure_tenant_for_user(session, user)
-    await _sync_calls(session, tenant.id, client)
-    series = await compute_time_series(session, tenant_id=tenant.id)
-    return {"series": series}
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
+    series = await compute_time_series(read_db, tenant_id=tenant_id)
+    return {"series": series, "dataAsOf": data_as_of}
 
 
 @router.get("/topics")
 async def analytics_topics(
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    read_db: AsyncSession = Depends(get_read_session),
 ) -> dict[str, object]:
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    await session.refresh(user)
-    
-    client = _client(user)
-    tenant = await ensure_tenant_for_user(session, user)
-    await _sync_calls(session, tenant.id, client)
-    topics = await compute_trending_topics(session, tenant_id=tenant.id)
-    return {"topics": topics}
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
+    topics = await compute_trending_topics(read_db, tenant_id=tenant_id)
+    return {"topics": topics, "dataAsOf": data_as_of}
 
 
 @router.get("/anomalies")
 async def analytics_anomalies(
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    read_db: AsyncSession = Depends(get_read_session),
 ) -> dict[str, object]:
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    await session.refresh(user)
-    
-    client = _client(user)
-    tenant = await ensure_tenant_for_user(session, user)
-    await _sync_calls(session, tenant.id, client)
-    anomalies = await detect_anomalies(session, tenant_id=tenant.id)
-    return {"anomalies": anomalies}
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
+    anomalies = await detect_anomalies(read_db, tenant_id=tenant_id)
+    return {"anomalies": anomalies, "dataAsOf": data_as_of}
 
 
 @router.get("/heatmap")
 async def analytics_heatmap(
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    read_db: AsyncSession = Depends(get_read_session),
 ) -> dict[str, object]:
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    await session.refresh(user)
-    
-    client = _client(user)
-    tenant = await ensure_tenant_for_user(session, user)
-    await _sync_calls(session, tenant.id, client)
-    heatmap = await compute_activity_heatmap(session, tenant_id=tenant.id)
-    return {"heatmap": heatmap}
+    tenant_id = tenant_id_for_user(user)
+    data_as_of = await _data_as_of(read_db, user, tenant_id)
+    heatmap = await compute_activity_heatmap(read_db, tenant_id=tenant_id)
+    return {"heatmap": heatmap, "dataAsOf": data_as_of}
 
 
 @router.post("/calls/{call_id}/email")
@@ -146,7 +173,7 @@ async def send_call_transcript_email(
     session: AsyncSession = Depends(get_session),
 ) -> dict[str, str]:
     """
-    Send call transcript via email to the user.
+    Queue the call transcript email to the user.
 
     Args:
         call_id: The ID of the call to send
@@ -154,14 +181,15 @@ async def send_call_transcript_email(
         session: Database session
 
     Returns:
-        Success message with email ID
+        Success message with the queued email ID
 
     Raises:
-        HTTPException: If call not found or email fails
+        HTTPException: If call not found or no email provider is configured
     """
     # Fetch call record
     result = await session.execute(
         select(CallRecord)
+        .options(undefer(CallRecord.transcript))
         .where(CallRecord.id == call_id)
         .where(CallRecord.tenant_id == user.id)
     )
@@ -175,138 +203,46 @@ async def send_call_transcript_email(
 
     studio_config = await _load_studio_config(session, user.id)
 
-    # Parse transcript into lines
-    transcript_lines = []
-    if call.transcript:
-        for line in call.transcript.split('\n'):
-            line = line.strip()
-            if line.startswith('AI:'):
-                transcript_lines.append({
-                    'speaker': 'AI',
-                    'text': line[3:].strip()
-                })
-            elif line.startswith('User:'):
-                transcript_lines.append({
-                    'speaker': 'User',
-                    'text': line[5:].strip()
-                })
-
-    # Build HTML email
-    html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Call Transcript - AVA</title>
-</head>
-<body style="margin: 0; padding: 0; font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh;">
-    <div style="max-width: 800px; margin: 0 auto; padding: 40px 20px;">
-        <!-- Header -->
-        <div style="text-align: center; margin-bottom: 40px;">
-            <h1 style="color: white; font-size: 48px; font-weight: 800; margin: 0 0 16px 0; text-shadow: 0 2px 10px rgba(0,0,0,0.2);">
-                ✨ AVA
-            </h1>
-            <p style="color: rgba(255,255,255,0.9); font-size: 18px; margin: 0;">
-                Call Transcript
-            </p>
-        </div>
-
-        <!-- Card -->
-        <div style="background: rgba(255, 255, 255, 0.95); backdrop-filter: blur(10px); border-radius: 24px; box-shadow: 0 20px 60px rgba(0,0,0,0.3); padding: 40px; margin-bottom: 24px;">
-            <!-- Call Info -->
-            <div style="border-bottom: 1px solid rgba(0,0,0,0.1); padding-bottom: 24px; margin-bottom: 32px;">
-                <h2 style="margin: 0 0 16px 0; font-size: 24px; font-weight: 700; color: #1a202c;">
-                    📞 Call Details
-                </h2>
-                <div style="display: grid; gap: 12px; font-size: 14px; color: #4a5568;">
-                    <div><strong>Phone Number:</strong> {call.customer_number or 'N/A'}</div>
-                    <div><strong>Status:</strong> <span style="display: inline-block; padding: 4px 12px; background: #48bb78; color: white; border-radius: 12px; font-size: 12px; font-weight: 600;">{call.status}</span></div>
-                    <div><strong>Duration:</strong> {call.duration_seconds or 0}s</div>
-                    <div><strong>Cost:</strong> ${(call.cost if call.cost else 0):.4f}</div>
-                    <div><strong>Date:</strong> {call.started_at.strftime('%Y-%m-%d %H:%M:%S UTC') if call.started_at else 'N/A'}</div>
-                </div>
-            </div>
-
-            <!-- Transcript -->
-            <div>
-                <h2 style="margin: 0 0 24px 0; font-size: 24px; font-weight: 700; color: #1a202c;">
-                    💬 Conversation
-                </h2>
-                <div style="display: flex; flex-direction: column; gap: 20px;">
-"""
-
-    # Add transcript messages
-    for msg in transcript_lines:
-        if msg['speaker'] == 'AI':
-            html_content += f"""
-                    <div style="display: flex; align-items: start; gap: 12px;">
-                        <div style="flex-shrink: 0; width: 40px; height: 40px; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
-                            AI
-                        </div>
-                        <div style="flex: 1; background: #f7fafc; border: 1px solid #e2e8f0; border-radius: 16px; padding: 16px; max-width: 70%;">
-                            <div style="font-size: 12px; font-weight: 600; color: #667eea; margin-bottom: 8px;">AVA Assistant</div>
-                            <div style="font-size: 14px; color: #2d3748; line-height: 1.6;">{msg['text']}</div>
-                        </div>
-                    </div>
-"""
-        else:
-            html_content += f"""
-                    <div style="display: flex; align-items: start; gap: 12px; flex-direction: row-reverse;">
-                        <div style="flex-shrink: 0; width: 40px; height: 40px; background: linear-gradient(135deg, #4299e1 0%, #38b2ac 100%); border-radius: 50%; display: flex; align-items: center; justify-content: center; color: white; font-weight: 600;">
-                            U
-                        </div>
-                        <div style="flex: 1; background: #ebf8ff; border: 1px solid #bee3f8; border-radius: 16px; padding: 16px; max-width: 70%;">
-                            <div style="font-size: 12px; font-weight: 600; color: #4299e1; margin-bottom: 8px;">Customer</div>
-                            <div style="font-size: 14px; color: #2d3748; line-height: 1.6;">{msg['text']}</div>
-                        </div>
-                    </div>
-"""
-
-    html_content += """
-                </div>
-            </div>
-        </div>
-
-        <!-- Footer -->
-        <div style="text-align: center; color: rgba(255,255,255,0.8); font-size: 12px;">
-            <p style="margin: 0 0 8px 0;">Powered by AVA - AI Voice Assistant Platform</p>
-            <p style="margin: 0; opacity: 0.7;">This is an automated email. Please do not reply.</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
-
-    # Send email
-    try:
-        email_service = get_user_email_service(studio_config)
-
-        recipient_email = (
-            (studio_config.fallback_email or studio_config.summary_email) if studio_config else None
-        ) or user.email
-
-        if not recipient_email:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No recipient email configured for transcript delivery.",
-            )
-
-        result = await email_service.send_email(
-            to=[recipient_email],
-            subject=f"📞 Call Transcript - {call.customer_number or call_id[:8]}",
-            html=html_content
+    # One pass over the transcript turns with the cached templates
+    html_content = render_call_transcript_email(
+        CallEmailData(
+            caller="Call Details",
+            phone=call.customer_number,
+            status=call.status,
+            started_at=call.started_at,
+            duration_seconds=call.duration_seconds,
+            transcript=call.transcript,
+            cost=call.cost,
         )
+    )
 
-        return {
-            "status": "success",
-            "message": f"Transcript sent to {recipient_email}",
-            "email_id": result.get('id', 'unknown')
-        }
+    recipient_email = (
+        (studio_config.fallback_email or studio_config.summary_email) if studio_config else None
+    ) or user.email
 
-    except Exception as exc:
-        logger.exception("Failed to send call transcript email.", extra={"call_id": call_id})
+    if not recipient_email:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No recipient email configured for transcript delivery.",
+        )
+
+    # Queue the email; the outbound email worker delivers it and records the status
+    email_id = await enqueue_email(
+        session,
+        kind=EMAIL_KIND_CALL_TRANSCRIPT,
+        recipients=[recipient_email],
+        subject=f"📞 Call Transcript - {call.customer_number or call_id[:8]}",
+        html=html_content,
+        studio_config=studio_config,
+    )
+    if email_id is None:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send email: {str(exc)}"
-        ) from exc
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="No email provider configured for transcript delivery.",
+        )
+
+    return {
+        "status": "success",
+        "message": f"Transcript queued for {recipient_email}",
+        "email_id": str(email_id),
+    }
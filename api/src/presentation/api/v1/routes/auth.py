@@ -14,12 +14,12 @@ from sqlalchemy.exc import IntegrityError
 import bcrypt
 import jwt
 
+from api.src.application.services.outbound_email import queue_magic_link
 from api.src.core.settings import get_settings
 from api.src.infrastructure.database.session import get_session
 from api.src.infrastructure.persistence.repositories.user_repository import UserRepository
 from api.src.infrastructure.persistence.models.user import User
-from api.src.presentation.dependencies.auth import get_current_user
-from api.src.infrastructure.email.email_service import get_email_service
+from api.src.presentation.dependencies.auth import get_current_user, invalidate_cached_user
 from sqlalchemy import select
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -199,7 +199,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire, "type": "access"})
+    # iat keys the authenticated-user cache: a fresh login never reuses a cached principal
+    to_encode.update({"exp": expire, "iat": datetime.utcnow(), "type": "access"})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -463,6 +464,7 @@ async def update_current_user_profile(
             detail="User not found",
         )
 
+    await invalidate_cached_user(current_user.id)
     return serialize_user(updated_user)
 
 
@@ -529,23 +531,15 @@ async def send_magic_link(
     }
     magic_token = jwt.encode(magic_token_payload, SECRET_KEY, algorithm=ALGORITHM)
     
-    # Envoyer l'email (avec locale du user)
-    email_service = get_email_service()
-    email_sent = await email_service.send_magic_link(
+    # Mettre l'email en file d'attente (avec locale du user) : l'envoi SMTP/Resend
+    # se fait dans le worker, la requête ne l'attend pas
+    await queue_magic_link(
+        session,
         to_email=user.email,
         magic_token=magic_token,
         locale=user.locale or "fr"  # ✅ Passer le locale du user
     )
     
-    if not email_sent:
-        # En dev sans SMTP, c'est OK (juste loggé)
-        # En prod, c'est une vraie erreur
-        if email_service.smtp_user and email_service.smtp_password:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Échec de l'envoi de l'email. Réessayez dans quelques instants."
-            )
-    
     return success_message
 
 
@@ -602,6 +596,7 @@ async def verify_magic_link(
     access_token_payload = {
         "sub": str(user.id),  # ✅ ID dans sub (pas email)
         "email": user.email,
+        "iat": datetime.utcnow(),
         "exp": datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     }
     access_token = jwt.encode(access_token_payload, SECRET_KEY, algorithm=ALGORITHM)
@@ -2,57 +2,78 @@
 
 from __future__ import annotations
 
+import base64
+import json
 from typing import Optional
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from api.src.infrastructure.database.session import get_session
+from api.src.application.services.call_export import gzip_chunks, iter_call_export, parse_export_columns
+from api.src.application.services.retention import get_retention_policy
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database.session import get_read_session, get_session, read_session, wants_primary
 from api.src.infrastructure.persistence.models.user import User
 from api.src.presentation.dependencies.auth import get_current_user
 from api.src.infrastructure.persistence.repositories.call_repository import (
+    CallPageCursor,
     delete_call_record,
     get_call_by_id,
-    get_recent_calls,
-    scrub_transcript_if_expired,
+    list_call_summaries,
 )
+from api.src.infrastructure.persistence.repositories.call_search_repository import search_calls
 
 router = APIRouter(prefix="/calls", tags=["calls"])
-TRANSCRIPT_RETENTION = timedelta(hours=24)
 
 
 @router.get("")
 async def list_calls(
     limit: int = Query(50, ge=1, le=200),
     status: Optional[str] = Query(None),
+    assistant_id: Optional[str] = Query(None),
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    customer_number: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
     user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
-    List recent calls with optional status filter.
+    List calls, newest first, one page at a time.
 
     Query params:
-    - limit: Max number of calls (1-200)
+    - limit: Page size (1-200)
     - status: Filter by status (in-progress, ended, failed)
+    - assistant_id: Filter by assistant
+    - from / to: ISO-8601 start time range (from inclusive, to exclusive)
+    - customer_number: Filter by caller number
+    - cursor: ``nextCursor`` from the previous page
     """
 
-    calls = await get_recent_calls(session, tenant_id=str(user.id), limit=limit)
-    now_utc = datetime.now(timezone.utc)
-    scrubbed = False
-    for call in calls:
-        scrubbed |= await scrub_transcript_if_expired(
-            session,
-            call,
-            now=now_utc,
-            retention=TRANSCRIPT_RETENTION,
-        )
-
-    if scrubbed:
-        await session.commit()
+    after = _decode_cursor(cursor) if cursor else None
+    rows = await list_call_summaries(
+        session,
+        tenant_id=str(user.id),
+        limit=limit + 1,
+        after=after,
+        status=status,
+        assistant_id=assistant_id,
+        started_from=started_from,
+        started_to=started_to,
+        customer_number=customer_number,
+    )
+    calls, has_more = rows[:limit], len(rows) > limit
+    next_cursor = _encode_cursor(calls[-1]) if has_more else None
 
-    if status:
-        calls = [call for call in calls if call.status == status]
+    # The retention job scrubs expired transcripts; until it runs they are only hidden here.
+    expired_before = await _transcript_cutoff(session, user)
+    expired_ids = {
+        call.id
+        for call in calls
+        if call.transcript_preview and _is_expired(call.started_at, expired_before)
+    }
 
     return {
         "calls": [
@@ -65,14 +86,156 @@ async def list_calls(
                 "endedAt": call.ended_at.isoformat() if call.ended_at else None,
                 "durationSeconds": call.duration_seconds,
                 "cost": call.cost,
-                "transcriptPreview": call.transcript[:200] if call.transcript else None,
+                "transcriptPreview": None if call.id in expired_ids else call.transcript_preview,
             }
             for call in calls
         ],
         "total": len(calls),
+        "nextCursor": next_cursor,
     }
 
 
+@router.get("/search")
+async def search_call_transcripts(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    status: Optional[str] = Query(None),
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Search calls by what was said, best matches first.
+
+    Query params:
+    - q: Web-search style query (``"exact phrase"``, ``or``, ``-excluded``)
+    - limit: Number of results (1-50)
+    - status, from / to: Same filters as the call list
+
+    ``snippet`` is HTML-escaped with the matches wrapped in ``<mark>``.
+    """
+
+    calls = await search_calls(
+        session,
+        tenant_id=str(user.id),
+        query=q,
+        limit=limit,
+        status=status,
+        started_from=started_from,
+        started_to=started_to,
+        transcript_cutoff=await _transcript_cutoff(session, user),
+    )
+    return {
+        "calls": [
+            {
+                "id": call["id"],
+                "assistantId": call["assistant_id"],
+                "customerNumber": call["customer_number"],
+                "status": call["status"],
+                "startedAt": call["started_at"].isoformat() if call["started_at"] else None,
+                "endedAt": call["ended_at"].isoformat() if call["ended_at"] else None,
+                "durationSeconds": call["duration_seconds"],
+                "cost": call["cost"],
+                "rank": call["rank"],
+                "snippet": call["snippet"],
+            }
+            for call in calls
+        ],
+        "total": len(calls),
+    }
+
+
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+@router.get("/export")
+async def export_calls(
+    request: Request,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    started_from: Optional[datetime] = Query(None, alias="from"),
+    started_to: Optional[datetime] = Query(None, alias="to"),
+    columns: Optional[str] = Query(None),
+    compress: bool = Query(False, alias="gzip"),
+    user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_read_session),
+):
+    """
+    Stream every call in the range as a CSV or NDJSON download, oldest first.
+
+    Query params:
+    - format: ``csv`` (default) or ``ndjson``
+    - from / to: ISO-8601 start time range (from inclusive, to exclusive)
+    - columns: Comma separated list of listing columns, ``transcript`` and
+      ``meta.<field>`` paths (default: the listing columns)
+    - gzip: Return a ``.gz`` file
+    """
+
+    try:
+        selected = parse_export_columns(columns)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+    transcript_cutoff = await _transcript_cutoff(session, user) if "transcript" in selected else None
+    primary = wants_primary(request)
+    tenant_id = str(user.id)
+
+    async def body():
+        # The request session is closed before streaming starts, so the cursor gets its own.
+        async with read_session(primary=primary) as export_session:
+            async for chunk in iter_call_export(
+                export_session,
+                tenant_id=tenant_id,
+                columns=selected,
+                export_format=export_format,
+                started_from=started_from,
+                started_to=started_to,
+                transcript_cutoff=transcript_cutoff,
+                batch_size=get_settings().call_export_batch_size,
+            ):
+                yield chunk
+
+    filename = f"calls-{datetime.now(timezone.utc):%Y%m%d-%H%M%S}.{export_format}"
+    media_type = _EXPORT_MEDIA_TYPES[export_format]
+    chunks = body()
+    if compress:
+        chunks, filename, media_type = gzip_chunks(chunks), f"{filename}.gz", "application/gzip"
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _encode_cursor(row) -> str:
+    payload = json.dumps({"s": row.started_at.isoformat(), "i": row.id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> CallPageCursor:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return CallPageCursor(started_at=datetime.fromisoformat(payload["s"]), id=str(payload["i"]))
+    except (ValueError, KeyError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+async def _transcript_cutoff(session: AsyncSession, user: User) -> Optional[datetime]:
+    policy = await get_retention_policy(session, user.id)
+    return policy.transcript_cutoff(datetime.now(timezone.utc))
+
+
+def _is_expired(started_at: Optional[datetime], cutoff: Optional[datetime]) -> bool:
+    return cutoff is not None and started_at is not None and _as_utc(started_at) < cutoff
+
+
 @router.get("/{call_id}")
 async def get_call_detail(
     call_id: str,
@@ -87,14 +250,7 @@ async def get_call_detail(
     if not call or str(call.tenant_id) != str(user.id):
         raise HTTPException(status_code=404, detail="Call not found")
 
-    scrubbed = await scrub_transcript_if_expired(
-        session,
-        call,
-        now=datetime.now(timezone.utc),
-        retention=TRANSCRIPT_RETENTION,
-    )
-    if scrubbed:
-        await session.commit()
+    transcript_expired = _is_expired(call.started_at, await _transcript_cutoff(session, user))
 
     return {
         "id": call.id,
@@ -105,7 +261,7 @@ async def get_call_detail(
         "endedAt": call.ended_at.isoformat() if call.ended_at else None,
         "durationSeconds": call.duration_seconds,
         "cost": call.cost,
-        "transcript": call.transcript,
+        "transcript": None if transcript_expired else call.transcript,
         "metadata": call.meta,
         "recordingUrl": call.meta.get("recordingUrl") if isinstance(call.meta, dict) else None,
     }
@@ -6,12 +6,13 @@ from typing import Optional
 import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.src.application.services.twilio import list_incoming_numbers
+from api.src.infrastructure.external.twilio_gateway import get_twilio_gateway
 from api.src.application.services.vapi import get_vapi_client_for_user
 from api.src.infrastructure.database.session import get_session
 from api.src.infrastructure.persistence.models.user import User
 from api.src.presentation.dependencies.auth import get_current_user
 from api.src.core.settings import get_settings
-from twilio.rest import Client as TwilioClient
 
 router = APIRouter(prefix="/phone-numbers", tags=["phone"])
 logger = logging.getLogger(__name__)
@@ -95,8 +96,9 @@ async def create_us_number(
         }
     """
     # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
+    # (the cached user of get_current_user may predate a key saved on another worker)
     await db.refresh(user)
-    
+
     try:
         vapi = _get_vapi_client(user)
 
@@ -180,8 +182,9 @@ async def import_twilio_number(
         }
     """
     # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key + twilio credentials
+    # (the cached user of get_current_user may predate credentials saved on another worker)
     await db.refresh(user)
-    
+
     try:
         # 🔥 DIVINE: Auto-liaison intelligente si pas d'assistant_id fourni
         assistant_id = request.assistant_id
@@ -214,12 +217,10 @@ async def import_twilio_number(
                 )
 
         # 1. Verify Twilio number exists
-        twilio = TwilioClient(request.twilio_account_sid, request.twilio_auth_token)
+        twilio = get_twilio_gateway().client(request.twilio_account_sid, request.twilio_auth_token)
 
         try:
-            numbers = twilio.incoming_phone_numbers.list(
-                phone_number=request.phone_number, limit=1
-            )
+            numbers = await list_incoming_numbers(twilio, phone_number=request.phone_number, limit=1)
 
             if not numbers:
                 raise HTTPException(
@@ -323,12 +324,10 @@ async def verify_twilio_credentials(request: VerifyTwilioRequest):
         }
     """
     try:
-        client = TwilioClient(request.account_sid, request.auth_token)
+        client = get_twilio_gateway().client(request.account_sid, request.auth_token)
 
         # Test: verify number exists in this account
-        numbers = client.incoming_phone_numbers.list(
-            phone_number=request.phone_number, limit=1
-        )
+        numbers = await list_incoming_numbers(client, phone_number=request.phone_number, limit=1)
 
         if not numbers:
             return {
@@ -6,6 +6,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.src.application.services.routing_index import ROUTING_TABLE_STUDIO_CONFIGS, note_routing_change
 from api.src.infrastructure.database.session import get_session
 from api.src.infrastructure.persistence.models.user import User
 from api.src.infrastructure.persistence.models.studio_config import StudioConfig as StudioConfigModel
@@ -110,6 +111,9 @@ def db_to_schema(db_config: StudioConfigModel) -> StudioConfig:
         askForName=db_config.ask_for_name,
         askForEmail=db_config.ask_for_email,
         askForPhone=db_config.ask_for_phone,
+        summaryDigestMode=db_config.summary_digest_mode,
+        transcriptRetentionHours=db_config.transcript_retention_hours,
+        callRetentionDays=db_config.call_retention_days,
     )
 
 
@@ -192,6 +196,9 @@ async def update_studio_config(
         "askForName": "ask_for_name",
         "askForEmail": "ask_for_email",
         "askForPhone": "ask_for_phone",
+        "summaryDigestMode": "summary_digest_mode",
+        "transcriptRetentionHours": "transcript_retention_hours",
+        "callRetentionDays": "call_retention_days",
     }
 
     if "smtpPassword" in data:
@@ -205,12 +212,18 @@ async def update_studio_config(
                 detail=str(exc),
             ) from exc
 
+    if data.get("summaryDigestMode", db_config.summary_digest_mode) != db_config.summary_digest_mode:
+        # A new mode starts with the current window, not with everything since the last digest
+        db_config.summary_digest_sent_until = None
+
     for camel_key, value in data.items():
         snake_key = field_mapping.get(camel_key, camel_key)
         if hasattr(db_config, snake_key):
             setattr(db_config, snake_key, value)
 
     await db.commit()
+    # PATCH can set vapiAssistantId (and may have created the config)
+    note_routing_change(ROUTING_TABLE_STUDIO_CONFIGS, db_config.user_id)
     await db.refresh(db_config)
 
     return db_to_schema(db_config)
@@ -231,10 +244,6 @@ async def sync_config_to_vapi(
 
     This is THE MAGIC that makes your settings actually work!
     """
-    # 🔥 DIVINE FIX: Refresh user from DB to get latest vapi_api_key
-    # Without this, user object has stale data from JWT token
-    await db.refresh(current_user)
-    
     client = _client(current_user)
     db_config = await get_or_create_user_config(db, current_user)
     config = db_to_schema(db_config)
@@ -308,6 +317,7 @@ async def sync_config_to_vapi(
 
         db_config.vapi_assistant_id = assistant_id
         await db.commit()
+        note_routing_change(ROUTING_TABLE_STUDIO_CONFIGS, db_config.user_id)
         await db.refresh(db_config)
 
         print(f"✅ DIVINE SYNC {'UPDATE' if was_update else 'CREATE'} SUCCESS!")
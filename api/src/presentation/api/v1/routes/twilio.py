@@ -5,7 +5,8 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, status
 from twilio.base.exceptions import TwilioRestException
 
-from api.src.application.services.twilio import get_twilio_client
+from api.src.application.services.twilio import get_twilio_client, list_incoming_numbers
+from api.src.infrastructure.external.twilio_gateway import TwilioTimeoutError
 from api.src.infrastructure.persistence.models.user import User
 from api.src.presentation.dependencies.auth import get_current_user
 
@@ -17,9 +18,11 @@ async def list_numbers(user: User = Depends(get_current_user)) -> dict[str, obje
     """List Twilio phone numbers for the current user's credentials."""
     try:
         client = get_twilio_client(user, allow_env_fallback=True)
-        numbers = client.incoming_phone_numbers.list(limit=50)
+        numbers = await list_incoming_numbers(client, limit=50)
     except TwilioRestException as exc:
         raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc)) from exc
+    except TwilioTimeoutError as exc:
+        raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(exc)) from exc
 
     return {
         "numbers": [
@@ -17,9 +17,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from api.src.application.services.routing_index import ROUTING_TABLE_USERS, note_routing_change
 from api.src.infrastructure.external.vapi_client import VapiClient
 from api.src.infrastructure.persistence.models.user import User
-from api.src.presentation.dependencies.auth import get_current_user
+from api.src.presentation.dependencies.auth import get_current_user, invalidate_cached_user
 from api.src.infrastructure.database.session import get_session
 
 router = APIRouter(prefix="/twilio-settings", tags=["Twilio Settings"])
@@ -126,6 +127,8 @@ async def update_twilio_settings(
     user.twilio_phone_number = settings.phone_number
 
     await db.commit()
+    await invalidate_cached_user(user.id)
+    note_routing_change(ROUTING_TABLE_USERS, user.id)
     await db.refresh(user)
 
     return TwilioSettingsResponse(
@@ -190,5 +193,7 @@ async def delete_twilio_settings(
     user.twilio_phone_number = None
 
     await db.commit()
+    await invalidate_cached_user(user.id)
+    note_routing_change(ROUTING_TABLE_USERS, user.id)
 
     return None
@@ -8,7 +8,7 @@ from pydantic import BaseModel, Field
 
 from api.src.infrastructure.database.session import get_session
 from api.src.infrastructure.persistence.models.user import User
-from api.src.presentation.dependencies.auth import get_current_user
+from api.src.presentation.dependencies.auth import get_current_user, invalidate_cached_user
 
 router = APIRouter()
 
@@ -76,6 +76,7 @@ async def update_onboarding_flags(
         current_user.onboarding_assistant_created = payload.onboarding_assistant_created
 
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
 
     return OnboardingResponse(
@@ -127,6 +128,7 @@ async def update_user_profile(
     # For now, these fields are accepted but not persisted
 
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
 
     return UserProfileResponse(
@@ -162,6 +164,7 @@ async def complete_onboarding(
     current_user.onboarding_step = 9  # Final step
 
     await db.commit()
+    await invalidate_cached_user(current_user.id)
     await db.refresh(current_user)
 
     return CompleteOnboardingResponse(
@@ -7,7 +7,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from api.src.infrastructure.persistence.models.user import User
-from api.src.presentation.dependencies.auth import get_current_user
+from api.src.presentation.dependencies.auth import get_current_user, invalidate_cached_user
 from api.src.infrastructure.database.session import get_session
 
 router = APIRouter(prefix="/vapi-settings", tags=["Vapi Settings"])
@@ -79,6 +79,7 @@ async def update_vapi_key(
 
     try:
         await session.commit()
+        await invalidate_cached_user(user.id)
         await session.refresh(user)
     except Exception as exc:
         await session.rollback()
@@ -113,6 +114,7 @@ async def delete_vapi_key(
 
     try:
         await session.commit()
+        await invalidate_cached_user(user.id)
         await session.refresh(user)
     except Exception as exc:
         await session.rollback()
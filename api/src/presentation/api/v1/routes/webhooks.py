@@ -7,33 +7,52 @@ Endpoints:
 - Handles: call.ended, function-call, transcript.update
 
 Events processed:
-1. call.ended → Save call to DB + Send email notification
+1. call.ended → Queued in the webhook outbox; a worker saves the call + queues the email
 2. function-call → Execute actions (save_caller_info, etc.)
 3. transcript.update → Stream real-time updates (future)
 """
 
 from fastapi import APIRouter, Request, HTTPException, Header, status
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional, Dict, Any, Tuple
 from uuid import UUID, uuid4
 import hmac
 import hashlib
 import json
 from sqlalchemy import select
+from sqlalchemy.orm import undefer
 from urllib.parse import parse_qs
 
-from api.src.application.services.email import get_user_email_service
+from api.src.application.services.call_digest import sends_immediate_summary
+from api.src.application.services.outbound_email import get_outbound_email_worker, queue_call_summary
+from api.src.application.services.routing_index import get_routing_index, normalize_phone_number
 from api.src.application.services.tenant import ensure_tenant_for_user
 from api.src.application.services.twilio import resolve_twilio_credentials
+from api.src.application.services.webhook_queue import (
+    enqueue_webhook,
+    register_webhook_handler,
+    remember_webhook,
+    run_webhook_inline,
+    webhook_recently_seen,
+)
 from api.src.core.settings import get_settings
 from api.src.infrastructure.database.session import get_session
 from api.src.infrastructure.persistence.models.call import CallRecord
 from api.src.infrastructure.persistence.models.studio_config import StudioConfig as StudioConfigModel
 from api.src.infrastructure.persistence.models.user import User
+from api.src.infrastructure.persistence.models.webhook_event import WEBHOOK_EVENT_DONE
+from api.src.infrastructure.persistence.repositories.call_repository import upsert_calls
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import refresh_call_rollups
+from api.src.infrastructure.persistence.repositories.call_search_repository import get_tenant_search_config
+from api.src.infrastructure.persistence.repositories.call_topic_repository import refresh_call_topics
+from api.src.infrastructure.persistence.repositories.webhook_event_repository import enqueue_webhook_event
 from twilio.request_validator import RequestValidator
 
 router = APIRouter(prefix="/webhooks", tags=["webhooks"])
 
+TWILIO_STATUS_EVENT = "call.status"
+TWILIO_STATUS_HISTORY_LIMIT = 20
+
 
 def verify_vapi_signature(signature: Optional[str], body: bytes) -> bool:
     """
@@ -65,7 +84,7 @@ async def vapi_webhook(
 
     Receives events from Vapi.ai:
     - call.started: Call initiated
-    - call.ended: Call completed → SAVE + EMAIL
+    - call.ended: Call completed → queued, then SAVE + EMAIL in the background
     - function-call: Execute custom functions
     - transcript.update: Real-time transcription
 
@@ -98,8 +117,25 @@ async def vapi_webhook(
 
     # Route to appropriate handler
     if event_type == "call.ended":
-        await handle_call_ended(event)
-        return {"status": "success", "action": "call_saved_and_email_sent"}
+        # Redeliveries of the same call are acknowledged without side effects
+        call_id = (event.get("call") or {}).get("id")
+        event_key = str(call_id) if call_id else None
+        if settings.webhook_queue_enabled:
+            queued = False
+            async for db in get_session():
+                queued = await enqueue_webhook(
+                    db, source="vapi", event_type=event_type, event_key=event_key, payload=event
+                )
+                break
+            return {"status": "success", "action": "call_ended_queued" if queued else "duplicate_ignored"}
+        processed = await run_webhook_inline(
+            source="vapi",
+            event_type=event_type,
+            event_key=event_key,
+            payload=event,
+            handler=handle_call_ended,
+        )
+        return {"status": "success", "action": "call_saved_and_email_sent" if processed else "duplicate_ignored"}
 
     elif event_type == "function-call":
         result = await handle_function_call(event)
@@ -121,13 +157,18 @@ async def vapi_webhook(
 
 async def handle_call_ended(event: dict):
     """
-    Process completed call.
+    Process completed call (run by the webhook queue worker).
+
+    The call is upserted, so a retry (or a call already pulled by the sync
+    worker) updates the row instead of failing. Database failures propagate
+    so the event is retried. The summary email is queued in the same
+    transaction, at most once per call, and sent by the outbound email worker.
 
     Actions:
     1. Extract call data from Vapi payload
     2. Get caller info (if exists in DB)
     3. Save call to database
-    4. Send email notification to org owner
+    4. Queue the email notification to org owner
 
     Args:
         event: Vapi call.ended event payload
@@ -170,79 +211,86 @@ async def handle_call_ended(event: dict):
     caller_name = customer_data.get("name", metadata.get("caller_name", "Unknown Caller"))
     business_name = metadata.get("organization") or metadata.get("organizationName") or "AVA Business"
     org_email = "nissieltb@gmail.com"  # Legacy fallback
+    call_date = datetime.fromisoformat(ended_at.replace("Z", "+00:00")) if ended_at else datetime.utcnow()
+
+    async def queue_summary(db, config: Optional[StudioConfigModel], *, commit: bool) -> bool:
+        email_id = await queue_call_summary(
+            db,
+            studio_config=config,
+            to_email=org_email,
+            call_id=vapi_call_id,
+            caller_name=caller_name,
+            caller_phone=caller_phone,
+            transcript=transcript_text,
+            duration=duration,
+            call_date=call_date,
+            business_name=business_name,
+            commit=commit,
+        )
+        return email_id is not None
 
     # Save call to database
-    resolved_user: Optional[User] = None
-    resolved_config: Optional[StudioConfigModel] = None
-    try:
-        async for db in get_session():
-            user, config = await _resolve_user_and_config(db, assistant_id, metadata)
+    summary_handled = False
+    async for db in get_session():
+        user, config = await _resolve_user_and_config(db, assistant_id, metadata)
+
+        if not user:
+            print("   ⚠️  No user found, skipping DB save")
+            break
+
+        tenant = await ensure_tenant_for_user(db, user)
+        business_name = config.organization_name if config else business_name
+        org_email = config.fallback_email or config.summary_email or user.email or org_email
+
+        new_call = CallRecord(
+            id=vapi_call_id,
+            assistant_id=assistant_id or "unknown",
+            tenant_id=tenant.id,
+            customer_number=caller_phone,
+            status="completed",
+            started_at=_parse_iso_datetime(started_at),
+            ended_at=_parse_iso_datetime(ended_at) if ended_at else None,
+            duration_seconds=duration,
+            cost=cost,
+            transcript=transcript_text,
+            meta={
+                "caller_name": caller_name,
+                "recording_url": recording_url,
+                "assistant_id": assistant_id,
+                "vapi": call_data,
+            },
+        )
 
-            if not user:
-                print("   ⚠️  No user found, skipping DB save")
-                break
+        previous_started_at = await db.scalar(
+            select(CallRecord.started_at).where(CallRecord.id == new_call.id)
+        )
+        await upsert_calls(
+            db, [new_call], commit=False, search_config=await get_tenant_search_config(db, tenant.id)
+        )
+        await refresh_call_rollups(
+            db,
+            tenant_id=tenant.id,
+            started_at=[previous_started_at, new_call.started_at],
+        )
+        await refresh_call_topics(db, call_ids=[new_call.id])
+        # Same transaction as the call: a retried event neither loses nor duplicates the email.
+        # Tenants on an hourly/daily digest get this call in the digest instead.
+        summary_queued = sends_immediate_summary(config) and await queue_summary(db, config, commit=False)
+        await db.commit()
+        summary_handled = True
+        if summary_queued:
+            get_outbound_email_worker().wake()
+            print(f"   ✅ Summary email queued for {org_email}")
 
-            tenant = await ensure_tenant_for_user(db, user)
-            resolved_user = user
-            resolved_config = config
-            business_name = config.organization_name if config else business_name
-            org_email = config.fallback_email or config.summary_email or user.email or org_email
-
-            new_call = CallRecord(
-                id=vapi_call_id,
-                assistant_id=assistant_id or "unknown",
-                tenant_id=tenant.id,
-                customer_number=caller_phone,
-                status="completed",
-                started_at=_parse_iso_datetime(started_at),
-                ended_at=_parse_iso_datetime(ended_at) if ended_at else None,
-                duration_seconds=duration,
-                cost=cost,
-                transcript=transcript_text,
-                meta={
-                    "caller_name": caller_name,
-                    "recording_url": recording_url,
-                    "assistant_id": assistant_id,
-                    "vapi": call_data,
-                },
-            )
+        print(f"   ✅ Call saved to database (ID: {new_call.id})")
+        break  # Exit async generator
 
-            db.add(new_call)
-            await db.commit()
-
-            print(f"   ✅ Call saved to database (ID: {new_call.id})")
-            break  # Exit async generator
-    except Exception as e:
-        print(f"   ❌ Failed to save call to DB: {e}")
-        import traceback
-        traceback.print_exc()
-        # Continue with email even if DB save fails
-
-    # Send email notification
-    email_service = get_user_email_service(resolved_config)
-    recipient_email = org_email
-    if not recipient_email and resolved_user:
-        recipient_email = resolved_user.email
-
-    if not recipient_email:
-        print("   ⚠️  No recipient email configured, skipping summary email")
-        return
-
-    email_sent = await email_service.send_call_summary(
-        to_email=recipient_email,
-        caller_name=caller_name,
-        caller_phone=caller_phone,
-        transcript=transcript_text,
-        duration=duration,
-        call_date=datetime.fromisoformat(ended_at.replace("Z", "+00:00")) if ended_at else datetime.utcnow(),
-        call_id=vapi_call_id,
-        business_name=business_name
-    )
-
-    if email_sent:
-        print(f"   ✅ Email sent to {recipient_email}")
-    else:
-        print(f"   ❌ Failed to send email")
+    if not summary_handled:
+        # No tenant resolved: legacy fallback recipient through the platform sender
+        async for db in get_session():
+            if await queue_summary(db, None, commit=True):
+                print(f"   ✅ Summary email queued for {org_email}")
+            break
 
     print("   ✅ Call processed successfully")
 
@@ -324,7 +372,7 @@ async def save_caller_info(params: dict) -> dict:
     }
 
 
-def format_transcript(transcript_data: list) -> str:
+def format_transcript(transcript_data: list) -> Optional[str]:
     """
     Format transcript from Vapi format to readable text.
 
@@ -336,10 +384,12 @@ def format_transcript(transcript_data: list) -> str:
     ]
 
     Returns:
-        Formatted transcript string
+        Formatted transcript string, or None without a transcript (the
+        upsert then keeps one already stored by the sync; emails render
+        their own placeholder)
     """
     if not transcript_data:
-        return "No transcript available"
+        return None
 
     lines = []
     for entry in transcript_data:
@@ -359,19 +409,6 @@ def format_transcript(transcript_data: list) -> str:
     return "\n\n".join(lines)
 
 
-def _normalize_phone(number: Optional[str]) -> Optional[str]:
-    if not number:
-        return None
-    number = number.strip()
-    if not number:
-        return None
-    if number.startswith("00"):
-        number = f"+{number[2:]}"
-    if not number.startswith("+") and number.replace("+", "").lstrip("-").isdigit():
-        number = f"+{number}"
-    return number
-
-
 def _parse_twilio_timestamp(value: Optional[str]) -> datetime:
     if not value:
         return datetime.utcnow()
@@ -429,6 +466,17 @@ async def _resolve_user_and_config(
     config: Optional[StudioConfigModel] = None
 
     candidate_user_id = metadata.get("user_id") or metadata.get("userId")
+    index = get_routing_index()
+    if index.loaded:
+        route = index.for_user(candidate_user_id) if candidate_user_id else None
+        route = route or index.for_assistant(assistant_id)
+        if route is not None:
+            user = await db.get(User, route.user_id)
+        if user is not None:
+            if route.config_id is not None:
+                config = await db.get(StudioConfigModel, route.config_id)
+            return user, config or await _config_for_user(db, user.id)
+
     if candidate_user_id:
         user = await db.get(User, str(candidate_user_id))
 
@@ -440,20 +488,35 @@ async def _resolve_user_and_config(
         if config:
             user = await db.get(User, config.user_id)
 
-    if user and config is None:
-        result = await db.execute(select(StudioConfigModel).where(StudioConfigModel.user_id == user.id))
-        config = result.scalar_one_or_none()
-
     if not user:
         fallback = await db.execute(select(User).limit(1))
         user = fallback.scalar_one_or_none()
-        if user and config is None:
-            result = await db.execute(select(StudioConfigModel).where(StudioConfigModel.user_id == user.id))
-            config = result.scalar_one_or_none()
+
+    if user and config is None:
+        config = await _config_for_user(db, user.id)
 
     return user, config
 
 
+async def _config_for_user(db, user_id: str) -> Optional[StudioConfigModel]:
+    result = await db.execute(select(StudioConfigModel).where(StudioConfigModel.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def _user_for_number(db, to_number: Optional[str]) -> Optional[User]:
+    if not to_number:
+        return None
+    index = get_routing_index()
+    route = index.for_number(to_number) if index.loaded else None
+    if route is not None:
+        user = await db.get(User, route.user_id)
+        if user is not None:
+            return user
+    # Not indexed (yet): a number saved on another worker only shows up after the next poll
+    result = await db.execute(select(User).where(User.twilio_phone_number == to_number))
+    return result.scalar_one_or_none()
+
+
 def _parse_iso_datetime(value: Optional[str]) -> datetime:
     if not value:
         return datetime.utcnow()
@@ -497,18 +560,21 @@ async def twilio_status_webhook(request: Request):
     if not call_sid:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing CallSid")
 
-    # Signature validation
     twilio_status = _map_twilio_status(form_data.get("CallStatus"))
+    duplicate_response = {"status": "ok", "callSid": call_sid, "callStatus": twilio_status, "duplicate": True}
+    event_key = _twilio_event_key(call_sid, form_data)
+    # Only validated, committed callbacks are cached, so a hit costs no I/O and has no side effect
+    if webhook_recently_seen("twilio", TWILIO_STATUS_EVENT, event_key):
+        return duplicate_response
+
+    # Signature validation
     timestamp = _parse_twilio_timestamp(form_data.get("Timestamp") or form_data.get("CallTimestamp"))
-    from_number = _normalize_phone(form_data.get("From"))
-    to_number = _normalize_phone(form_data.get("To") or form_data.get("Called"))
+    from_number = normalize_phone_number(form_data.get("From"))
+    to_number = normalize_phone_number(form_data.get("To") or form_data.get("Called"))
     duration_value = form_data.get("CallDuration") or form_data.get("DialCallDuration")
 
     async for db in get_session():
-        user_for_number = None
-        if to_number:
-            result = await db.execute(select(User).where(User.twilio_phone_number == to_number))
-            user_for_number = result.scalar_one_or_none()
+        user_for_number = await _user_for_number(db, to_number)
 
         signature = request.headers.get("X-Twilio-Signature")
         try:
@@ -523,7 +589,21 @@ async def twilio_status_webhook(request: Request):
             if not validator.validate(str(request.url), form_data, signature):
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Twilio signature")
 
-        record = await db.get(CallRecord, call_sid)
+        is_new_event = await enqueue_webhook_event(
+            db,
+            source="twilio",
+            event_type=TWILIO_STATUS_EVENT,
+            event_key=event_key,
+            payload=form_data,
+            now=datetime.now(timezone.utc),
+            status=WEBHOOK_EVENT_DONE,
+        )
+        if not is_new_event:
+            remember_webhook("twilio", TWILIO_STATUS_EVENT, event_key)
+            return duplicate_response
+
+        record = await db.get(CallRecord, call_sid, options=[undefer(CallRecord.meta)])
+        previous_started_at = record.started_at if record else None
 
         if not record:
             # Find associated user/tenant based on destination number
@@ -568,11 +648,10 @@ async def twilio_status_webhook(request: Request):
             if duration_value and duration_value.isdigit():
                 record.duration_seconds = int(duration_value)
             meta = record.meta or {}
-            twilio_meta = meta.get("twilio_status_history", [])
-            twilio_meta.append({
-                "status": twilio_status,
-                "timestamp": timestamp.isoformat(),
-            })
+            twilio_meta = _append_status_history(
+                meta.get("twilio_status_history"),
+                {"status": twilio_status, "timestamp": timestamp.isoformat()},
+            )
             record.meta = {
                 **meta,
                 "twilio": form_data,
@@ -580,7 +659,38 @@ async def twilio_status_webhook(request: Request):
                 "twilio_call_sid": call_sid,
             }
 
+        await db.flush()
+        await refresh_call_rollups(
+            db,
+            tenant_id=record.tenant_id,
+            started_at=[previous_started_at, record.started_at],
+        )
+        if previous_started_at != record.started_at:
+            # Status callbacks never touch the transcript; only the topic day can move.
+            await refresh_call_topics(db, call_ids=[record.id])
         await db.commit()
+        remember_webhook("twilio", TWILIO_STATUS_EVENT, event_key)
         break
 
     return {"status": "ok", "callSid": call_sid, "callStatus": twilio_status}
+
+
+def _twilio_event_key(call_sid: str, form_data: Dict[str, str]) -> str:
+    """CallSid + status (+ SequenceNumber when Twilio sends it) identifies one callback."""
+
+    parts = [call_sid, (form_data.get("CallStatus") or "").lower()]
+    if form_data.get("SequenceNumber"):
+        parts.append(form_data["SequenceNumber"])
+    return ":".join(parts)
+
+
+def _append_status_history(history: Any, entry: Dict[str, str]) -> list:
+    """Append ``entry`` unless it repeats the last one; keep the newest entries only."""
+
+    entries = list(history) if isinstance(history, list) else []
+    if not entries or entries[-1] != entry:
+        entries.append(entry)
+    return entries[-TWILIO_STATUS_HISTORY_LIMIT:]
+
+
+register_webhook_handler("vapi", "call.ended", handle_call_ended)
@@ -3,19 +3,32 @@ Authentication dependencies for Ava API.
 
 Provides `get_current_user()` dependency that validates JWT tokens and returns
 the authenticated User object with vapi_api_key for multi-tenant operations.
+
+The user row is cached for a few seconds per (user id, token ``iat``) and
+attached to the request session without a query, so routes can use and even
+modify it directly. Routes that change the user call
+`invalidate_cached_user()` after committing. The row holds the password hash
+and Vapi/Twilio credentials, so this cache is always process-local, never the
+shared Redis backend; other workers may serve a copy up to
+``auth_user_cache_ttl_seconds`` old, so routes that need freshly saved
+credentials refresh the user first.
 """
 
 from __future__ import annotations
 
 import os
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Any, Optional
 
 from fastapi import Depends, HTTPException, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
+from sqlalchemy import DateTime, inspect as sa_inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
 
 from ...core.settings import Settings, get_settings
+from ...infrastructure.cache import InMemoryCacheBackend, ReadThroughCache
 from ...infrastructure.persistence.models.user import User
 from ...infrastructure.database.session import get_session
 
@@ -42,6 +55,56 @@ async def _parse_token(token: str, settings: Settings) -> dict:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
 
 
+_USER_COLUMNS = tuple(attr.key for attr in sa_inspect(User).column_attrs)
+_USER_DATETIME_COLUMNS = frozenset(
+    attr.key for attr in sa_inspect(User).column_attrs if isinstance(attr.columns[0].type, DateTime)
+)
+
+_user_cache: Optional[ReadThroughCache] = None
+
+
+def get_user_cache() -> ReadThroughCache:
+    global _user_cache
+    if _user_cache is None:
+        settings = get_settings()
+        # Never a shared backend: snapshots contain secrets (see the module docstring).
+        _user_cache = ReadThroughCache(
+            "auth_user",
+            backend=InMemoryCacheBackend(max_entries=settings.cache_max_entries),
+            ttl_seconds=settings.auth_user_cache_ttl_seconds,
+        )
+    return _user_cache
+
+
+def _user_namespace(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def _snapshot_user(user: User) -> dict[str, Any]:
+    """JSON-friendly column values (shared cache backends store JSON)."""
+    snapshot = {key: getattr(user, key) for key in _USER_COLUMNS}
+    for key in _USER_DATETIME_COLUMNS:
+        if snapshot[key] is not None:
+            snapshot[key] = snapshot[key].isoformat()
+    return snapshot
+
+
+async def _attach_user(session: AsyncSession, snapshot: dict[str, Any]) -> User:
+    """Rebuild the user from a snapshot and attach it to ``session`` without a SELECT."""
+    values = dict(snapshot)
+    for key in _USER_DATETIME_COLUMNS:
+        if values.get(key) is not None:
+            values[key] = datetime.fromisoformat(values[key])
+    user = User(**values)
+    make_transient_to_detached(user)
+    return await session.merge(user, load=False)
+
+
+async def invalidate_cached_user(user_id: str) -> None:
+    """Forget every cached copy of a user; call after committing a change to it."""
+    await get_user_cache().invalidate(_user_namespace(str(user_id)))
+
+
 async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials | None, Security(bearer_scheme)] = None,
     session: Annotated[AsyncSession, Depends(get_session)] = None,
@@ -53,8 +116,6 @@ async def get_current_user(
     Returns the full User object with vapi_api_key for multi-tenant Vapi operations.
     In DEV mode, returns default dev user if no credentials provided.
     """
-    from sqlalchemy import select
-
     # DEV MODE: Get or create default user
     if DEV_MODE and credentials is None:
         result = await session.execute(select(User).limit(1))
@@ -85,11 +146,19 @@ async def get_current_user(
     if not user_id_raw:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token payload")
 
-    # Query user by ID
-    result = await session.execute(select(User).where(User.id == str(user_id_raw)))
-    user = result.scalar_one_or_none()
-
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    user_id = str(user_id_raw)
 
-    return user
+    async def load_user() -> dict[str, Any]:
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return _snapshot_user(user)
+
+    if settings.auth_user_cache_ttl_seconds <= 0:
+        snapshot = await load_user()
+    else:
+        snapshot = await get_user_cache().get_or_load(
+            _user_namespace(user_id), str(payload.get("iat", "")), load_user
+        )
+    return await _attach_user(session, snapshot)
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, EmailStr, Field
 
@@ -88,6 +88,15 @@ class StudioConfig(BaseModel):
     # 🎯 NEW: Vapi Assistant ID (for sync)
     vapiAssistantId: str | None = Field(default=None, description="Linked Vapi Assistant ID")
 
+    # Call summary emails: one per call, or one digest per hour/day
+    summaryDigestMode: Literal["immediate", "hourly", "daily"] = Field(
+        default="immediate", description="Call summary email frequency"
+    )
+
+    # Data retention (None = platform default)
+    transcriptRetentionHours: Optional[int] = Field(default=None, ge=1, description="Hours before transcripts are scrubbed")
+    callRetentionDays: Optional[int] = Field(default=None, ge=1, description="Days before call records are deleted")
+
 
 class StudioConfigUpdate(BaseModel):
     organizationName: Optional[str] = None
@@ -131,6 +140,13 @@ class StudioConfigUpdate(BaseModel):
     # 🎯 NEW: Vapi link
     vapiAssistantId: Optional[str] = None
 
+    # Call summary emails
+    summaryDigestMode: Optional[Literal["immediate", "hourly", "daily"]] = None
+
+    # Data retention
+    transcriptRetentionHours: Optional[int] = Field(default=None, ge=1)
+    callRetentionDays: Optional[int] = Field(default=None, ge=1)
+
 
 DEFAULT_STUDIO_CONFIG = StudioConfig(
     organizationName="Ava",
@@ -5,6 +5,7 @@ import os
 import sys
 from pathlib import Path
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 # Set test environment variables BEFORE any imports
@@ -16,6 +17,7 @@ os.environ["AVA_API_VAPI_API_KEY"] = "test_vapi_key"
 os.environ["INTEGRATIONS_STUB_MODE"] = "true"  # Enable stubs for testing
 os.environ["CIRCUIT_BREAKER_ENABLED"] = "true"
 os.environ["RATE_LIMIT_PER_MINUTE"] = "60"  # Higher limit for tests
+os.environ["AVA_API_BACKGROUND_WORKERS_ENABLED"] = "false"  # No background loops in tests
 
 # Add project root to Python path
 project_root = Path(__file__).parent.parent
@@ -29,7 +31,7 @@ def client():
     """Create a test client for the FastAPI application."""
     # Mock database to avoid DB connection during tests that don't need it
     from unittest.mock import patch, MagicMock, AsyncMock
-    from api.src.infrastructure.database.session import get_session
+    from api.src.infrastructure.database.session import get_read_session, get_session
     
     # Create a mock engine with async context manager support
     mock_engine = MagicMock()
@@ -46,6 +48,7 @@ def client():
         app = create_app()
         # Override get_session dependency to avoid DB queries
         app.dependency_overrides[get_session] = mock_get_session
+        app.dependency_overrides[get_read_session] = mock_get_session
         
         with TestClient(app) as test_client:
             yield test_client
@@ -78,7 +81,7 @@ def create_async_mock_dependency(return_value):
 def client_with_mock_user(mock_user):
     """Create a test client with mocked authentication."""
     from unittest.mock import patch, MagicMock, AsyncMock
-    from api.src.infrastructure.database.session import get_session
+    from api.src.infrastructure.database.session import get_read_session, get_session
     from api.src.presentation.dependencies.auth import get_current_user
     
     # Create a mock engine with async context manager support
@@ -100,6 +103,7 @@ def client_with_mock_user(mock_user):
         app = create_app()
         # Override dependencies to avoid DB queries and auth
         app.dependency_overrides[get_session] = mock_get_session
+        app.dependency_overrides[get_read_session] = mock_get_session
         app.dependency_overrides[get_current_user] = mock_get_current_user
         
         with TestClient(app) as test_client:
@@ -108,6 +112,48 @@ def client_with_mock_user(mock_user):
         app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture
+async def sqlite_session():
+    """AsyncSession on an in-memory SQLite database with the user and call tables created."""
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+    from api.src.infrastructure.persistence.models import (
+        Base,
+        CallRecord,
+        CallRollup,
+        CallSyncCursor,
+        CallTopic,
+        OutboundEmail,
+        StudioConfig,
+        Tenant,
+        User,
+        WebhookEvent,
+    )
+    from api.src.infrastructure.persistence.models.phone_number import PhoneNumber
+
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[
+                User.__table__,
+                Tenant.__table__,
+                CallRecord.__table__,
+                CallRollup.__table__,
+                CallSyncCursor.__table__,
+                CallTopic.__table__,
+                OutboundEmail.__table__,
+                PhoneNumber.__table__,
+                StudioConfig.__table__,
+                WebhookEvent.__table__,
+            ],
+        )
+    session_factory = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
+    async with session_factory() as session:
+        yield session
+    await engine.dispose()
+
+
 # Register custom marks
 def pytest_configure(config):
     config.addinivalue_line("markers", "integration: mark test as integration test")
@@ -0,0 +1,153 @@
+"""Tests for the SQL-backed analytics aggregation engine."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from api.src.application.services.analytics import compute_dashboard, compute_overview_metrics
+from api.src.core.settings import get_settings
+from api.src.domain.services.topic_extraction import extract_terms, stopwords_for
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_rollup import CallRollup
+from api.src.infrastructure.persistence.models.call_topic import CallTopic
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.tenant import Tenant
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import (
+    rebuild_call_rollups,
+    refresh_call_rollups,
+)
+from api.src.infrastructure.persistence.repositories.call_topic_repository import (
+    rebuild_call_topics,
+    refresh_call_topics,
+)
+
+NOW = datetime(2026, 10, 15, 12, 30, tzinfo=timezone.utc)
+
+
+async def _seed(session, tenant_id):
+    session.add(Tenant(id=tenant_id, name="Test"))
+    rows = [
+        # (id, hours ago, status, duration, cost, sentiment, transcript)
+        ("c1", 1, "ended", 120, 0.5, 0.9, "Rendez-vous plombier urgent"),
+        ("c2", 2, "in-progress", None, None, None, None),
+        ("c3", 26, "failed", 0, 0.1, None, "Rappel facture"),
+        ("c4", 24 * 10, "ended", 3600, 1.0, 0.1, "Plombier fuite"),
+        ("c5", 24 * 30, "ended", 60, 9.0, 0.5, "Hors fenêtre"),
+    ]
+    for call_id, hours_ago, status, duration, cost, sentiment, transcript in rows:
+        meta = {"analytics": {"sentimentScore": sentiment}} if sentiment is not None else {}
+        session.add(
+            CallRecord(
+                id=call_id,
+                assistant_id="asst-1",
+                tenant_id=tenant_id,
+                status=status,
+                started_at=NOW - timedelta(hours=hours_ago),
+                duration_seconds=duration,
+                cost=cost,
+                meta=meta,
+                transcript=transcript,
+            )
+        )
+    await session.commit()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_rollups", [True, False])
+async def test_compute_dashboard_aggregates_in_sql(sqlite_session, monkeypatch, use_rollups):
+    tenant_id = uuid4()
+    await _seed(sqlite_session, tenant_id)
+    await rebuild_call_rollups(sqlite_session, start=NOW - timedelta(days=60), end=NOW + timedelta(hours=1))
+    await rebuild_call_topics(sqlite_session, start=NOW - timedelta(days=60), end=NOW + timedelta(hours=1))
+    await sqlite_session.commit()
+    monkeypatch.setattr(get_settings(), "analytics_use_rollups", use_rollups)
+    monkeypatch.setattr(get_settings(), "analytics_use_topic_index", use_rollups)
+
+    with patch("api.src.application.services.analytics._now", return_value=NOW):
+        dashboard = await compute_dashboard(sqlite_session, tenant_id=tenant_id)
+        overview = await compute_overview_metrics(sqlite_session, tenant_id=tenant_id)
+
+    assert dashboard["overview"] == overview
+    assert overview["totalCalls"] == 3
+    assert overview["activeNow"] == 1
+    assert overview["avgDurationSeconds"] == 120.0  # zero/None durations are ignored
+    assert overview["satisfaction"] == 0.9
+    assert overview["totalCost"] == 0.6
+
+    series = {point["date"]: point for point in dashboard["series"]}
+    assert len(series) == 15
+    assert series["2026-10-15"]["totalCalls"] == 2
+    assert series["2026-10-14"]["failedRate"] == 1.0
+    assert series["2026-10-05"]["avgDuration"] == 60.0
+    assert series["2026-10-05"]["avgSentiment"] == 0.1
+
+    assert sum(cell["count"] for cell in dashboard["heatmap"]) == 4
+
+    anomalies = {(item["callId"], item["type"]) for item in dashboard["anomalies"]}
+    # Durations 120s and 3600s give mean + 2σ = 5340s, so c4 is not "long"
+    assert anomalies == {("c3", "call_failed"), ("c4", "negative_sentiment")}
+
+    labels = {topic["label"]: topic["count"] for topic in dashboard["topics"]}
+    assert labels["plombier"] == 2
+    assert "fenêtre" not in labels
+
+
+@pytest.mark.asyncio
+async def test_refresh_call_rollups_tracks_updates_and_deletes(sqlite_session):
+    tenant_id = uuid4()
+    await _seed(sqlite_session, tenant_id)
+    call = await sqlite_session.get(CallRecord, "c2")
+
+    await refresh_call_rollups(sqlite_session, tenant_id=tenant_id, started_at=[call.started_at])
+    await sqlite_session.commit()
+    rollups = (await sqlite_session.execute(select(CallRollup))).scalars().all()
+    assert [(r.call_count, r.failed_count) for r in rollups] == [(1, 0)]
+
+    call.status = "failed"
+    await refresh_call_rollups(sqlite_session, tenant_id=tenant_id, started_at=[call.started_at])
+    await sqlite_session.commit()
+    rollup = (await sqlite_session.execute(select(CallRollup))).scalar_one()
+    await sqlite_session.refresh(rollup)
+    assert rollup.failed_count == 1
+
+    await sqlite_session.delete(call)
+    await refresh_call_rollups(sqlite_session, tenant_id=tenant_id, started_at=[call.started_at])
+    await sqlite_session.commit()
+    assert (await sqlite_session.execute(select(CallRollup))).scalars().all() == []
+
+
+@pytest.mark.asyncio
+async def test_call_topics_use_tenant_language_and_follow_edits(sqlite_session):
+    tenant_id = uuid4()
+    await _seed(sqlite_session, tenant_id)
+    sqlite_session.add(StudioConfig(user_id=str(tenant_id), language="fr"))
+    call = await sqlite_session.get(CallRecord, "c1")
+    call.transcript = "Bonjour, plombier urgent. Merci, plombier!"
+    call.meta = {"topics": ["Fuite"]}
+    await sqlite_session.commit()
+
+    await refresh_call_topics(sqlite_session, call_ids=["c1"])
+    await sqlite_session.commit()
+    rows = await sqlite_session.execute(select(CallTopic.term, CallTopic.count).where(CallTopic.call_id == "c1"))
+    assert dict(rows.all()) == {"fuite": 1, "plombier": 2, "urgent": 1}
+
+    call.transcript = None
+    await refresh_call_topics(sqlite_session, call_ids=["c1"])
+    await sqlite_session.commit()
+    rows = await sqlite_session.execute(select(CallTopic.term).where(CallTopic.call_id == "c1"))
+    assert rows.scalars().all() == ["fuite"]
+
+
+def test_stopwords_follow_the_language_tag():
+    assert "merci" in stopwords_for("fr-FR")
+    assert "merci" not in stopwords_for("en")
+    assert {"merci", "thanks"} <= stopwords_for(None)
+    assert extract_terms("Thanks, billing question", ["Billing"], language="en-US") == {
+        "billing": 2,
+        "question": 1,
+    }
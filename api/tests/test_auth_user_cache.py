@@ -0,0 +1,94 @@
+"""Tests for the authenticated-user cache in get_current_user."""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+from sqlalchemy import select, update
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.cache import InMemoryCacheBackend, ReadThroughCache
+from api.src.infrastructure.persistence.models.user import User
+from api.src.presentation.dependencies import auth as auth_dependencies
+from api.src.presentation.dependencies.auth import get_current_user, invalidate_cached_user
+
+SECRET = "test-secret-key"
+
+
+@pytest.fixture
+def auth_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "jwt_secret_key", SECRET)
+    monkeypatch.setattr(settings, "auth_user_cache_ttl_seconds", 30.0)
+    monkeypatch.setattr(
+        auth_dependencies,
+        "_user_cache",
+        ReadThroughCache("auth_user", backend=InMemoryCacheBackend(), ttl_seconds=30.0),
+    )
+    return settings
+
+
+def _credentials(user_id: str, iat: int) -> HTTPAuthorizationCredentials:
+    token = jwt.encode({"sub": user_id, "iat": iat}, SECRET, algorithm="HS256")
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+async def _rename_behind_the_cache(session, user_id: str, name: str) -> None:
+    await session.execute(
+        update(User).where(User.id == user_id).values(name=name).execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    session.expunge_all()
+
+
+@pytest.mark.asyncio
+async def test_user_is_cached_per_token_until_invalidated(sqlite_session, auth_settings):
+    sqlite_session.add(User(id="user-1", email="a@example.com", name="Ada", vapi_api_key="vk-1"))
+    await sqlite_session.commit()
+    sqlite_session.expunge_all()
+
+    user = await get_current_user(_credentials("user-1", 100), sqlite_session, auth_settings)
+    assert (user.name, user.vapi_api_key) == ("Ada", "vk-1")
+    assert user.created_at is not None
+
+    await _rename_behind_the_cache(sqlite_session, "user-1", "Grace")
+    cached = await get_current_user(_credentials("user-1", 100), sqlite_session, auth_settings)
+    assert cached.name == "Ada"
+
+    # A new token (new iat) never reuses the cached principal.
+    sqlite_session.expunge_all()
+    fresh = await get_current_user(_credentials("user-1", 200), sqlite_session, auth_settings)
+    assert fresh.name == "Grace"
+
+    await _rename_behind_the_cache(sqlite_session, "user-1", "Hopper")
+    await invalidate_cached_user("user-1")
+    reloaded = await get_current_user(_credentials("user-1", 100), sqlite_session, auth_settings)
+    assert reloaded.name == "Hopper"
+
+
+@pytest.mark.asyncio
+async def test_cached_user_is_attached_to_the_session(sqlite_session, auth_settings):
+    sqlite_session.add(User(id="user-2", email="b@example.com", name="Ada"))
+    await sqlite_session.commit()
+    sqlite_session.expunge_all()
+
+    await get_current_user(_credentials("user-2", 1), sqlite_session, auth_settings)
+    sqlite_session.expunge_all()
+
+    user = await get_current_user(_credentials("user-2", 1), sqlite_session, auth_settings)
+    user.twilio_phone_number = "+33100000000"
+    await sqlite_session.commit()
+
+    stored = await sqlite_session.scalar(select(User.twilio_phone_number).where(User.id == "user-2"))
+    assert stored == "+33100000000"
+
+
+def test_user_cache_stays_in_process_with_a_shared_backend(monkeypatch):
+    # Snapshots hold the password hash and Vapi/Twilio credentials: never Redis.
+    monkeypatch.setattr(get_settings(), "cache_redis_url", "redis://cache.test:6379/0")
+    monkeypatch.setattr(auth_dependencies, "_user_cache", None)
+
+    cache = auth_dependencies.get_user_cache()
+
+    assert isinstance(cache.backend, InMemoryCacheBackend)
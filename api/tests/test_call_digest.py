@@ -0,0 +1,120 @@
+"""Tests for call email templates and hourly/daily digests (SQLite)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from api.src.application.services.call_digest import digest_window, queue_call_digest, sends_immediate_summary
+from api.src.core.settings import get_settings
+from api.src.infrastructure.email.templates import (
+    CallEmailData,
+    get_template,
+    parse_transcript,
+    render_call_summary_email,
+)
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.outbound_email import OutboundEmail
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.tenant import Tenant
+from api.src.infrastructure.persistence.models.user import User
+from api.src.presentation.api.v1.routes.webhooks import format_transcript
+
+NOW = datetime(2026, 10, 15, 10, 20, tzinfo=timezone.utc)
+
+
+def test_transcript_turns_from_webhook_and_vapi_formats():
+    transcript = "AVA: Bonjour\nCaller: J'ai une fuite\nsous l'évier\nAI: Il est 10:30\nUser: <merci>"
+
+    assert parse_transcript(transcript) == [
+        ("ai", "Bonjour"),
+        ("user", "J'ai une fuite sous l'évier"),
+        ("ai", "Il est 10:30"),
+        ("user", "<merci>"),
+    ]
+    html = render_call_summary_email(
+        CallEmailData(
+            caller="Jean <b>",
+            phone="+33600000000",
+            status=None,
+            started_at=NOW,
+            duration_seconds=75,
+            transcript=transcript,
+        ),
+        business_name="Plomberie",
+    )
+    assert "&lt;merci&gt;" in html and "Jean &lt;b&gt;" in html
+    assert html.count("AVA Assistant") == 2 and html.count(">Customer<") == 2
+    assert "1 min 15 s" in html
+    assert get_template("turn_ai") is get_template("turn_ai")
+
+
+def test_missing_transcript_is_stored_empty_and_rendered_as_a_placeholder():
+    # A placeholder stored on the call would overwrite the transcript saved by the sync.
+    assert format_transcript([]) is None
+    html = render_call_summary_email(
+        CallEmailData(caller="Jean", phone=None, status=None, started_at=NOW, duration_seconds=0, transcript=None),
+        business_name="Plomberie",
+    )
+    assert "No transcript available" in html
+
+
+def test_digest_windows():
+    assert digest_window("hourly", NOW) == (NOW.replace(hour=9, minute=0), NOW.replace(hour=10, minute=0))
+    # Paris is UTC+2 on 15 October: the day runs from 22:00 to 22:00 UTC.
+    start, end = digest_window("daily", NOW, "Europe/Paris")
+    assert (start, end) == (
+        datetime(2026, 10, 13, 22, tzinfo=timezone.utc),
+        datetime(2026, 10, 14, 22, tzinfo=timezone.utc),
+    )
+    # DST ends on 25 October 2026: that day lasts 25 hours.
+    start, end = digest_window("daily", datetime(2026, 10, 26, 12, tzinfo=timezone.utc), "Europe/Paris")
+    assert end - start == timedelta(hours=25)
+    assert sends_immediate_summary(None)
+    assert not sends_immediate_summary(StudioConfig(summary_digest_mode="daily"))
+
+
+@pytest.mark.asyncio
+async def test_hourly_digest_gathers_the_window_once(sqlite_session, monkeypatch):
+    monkeypatch.setattr(get_settings(), "resend_api_key", "re_test")
+    tenant_id = uuid4()
+    sqlite_session.add(User(id=str(tenant_id), email="owner@test", name="Owner"))
+    sqlite_session.add(Tenant(id=tenant_id, name="Plomberie"))
+    config = StudioConfig(user_id=str(tenant_id), organization_name="Plomberie", summary_digest_mode="hourly")
+    sqlite_session.add(config)
+    for call_id, started_minutes_ago, caller in (
+        ("in-1", 70, "Alice"),  # 09:10
+        ("in-2", 40, "Bob"),  # 09:40
+        ("late", 10, "Carol"),  # 10:10, next window
+        ("early", 130, "Dan"),  # 08:10, previous window
+    ):
+        started_at = NOW - timedelta(minutes=started_minutes_ago)
+        sqlite_session.add(
+            CallRecord(
+                id=call_id,
+                assistant_id="asst",
+                tenant_id=tenant_id,
+                status="ended",
+                started_at=started_at,
+                ended_at=started_at + timedelta(minutes=2),
+                transcript=f"AI: Bonjour {caller}",
+                meta={"caller_name": caller},
+            )
+        )
+    await sqlite_session.commit()
+
+    email_id = await queue_call_digest(sqlite_session, config, now=NOW, grace=timedelta(minutes=10))
+    again = await queue_call_digest(sqlite_session, config, now=NOW, grace=timedelta(minutes=10))
+
+    assert email_id is not None and again is None
+    email = await sqlite_session.scalar(select(OutboundEmail))
+    assert email.kind == "call_digest" and email.recipients == ["owner@test"]
+    assert email.dedupe_key == f"call_digest:{tenant_id}:20261015T1000Z"
+    assert "Alice" in email.html and "Bob" in email.html
+    assert "Carol" not in email.html and "Dan" not in email.html
+    sqlite_session.expire_all()
+    cursor = await sqlite_session.scalar(select(StudioConfig.summary_digest_sent_until))
+    assert cursor.replace(tzinfo=timezone.utc) == NOW.replace(minute=0)
@@ -0,0 +1,124 @@
+"""Tests for the batched call upsert (SQLite fallback path)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import undefer
+
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.tenant import Tenant
+from api.src.infrastructure.persistence.repositories.call_repository import (
+    CallPageCursor,
+    list_call_summaries,
+    scrub_transcripts,
+    upsert_calls,
+)
+
+
+def _record(call_id: str, tenant_id, **payload) -> CallRecord:
+    meta = {"id": call_id, **payload}
+    return CallRecord(
+        id=call_id,
+        assistant_id="asst-1",
+        tenant_id=tenant_id,
+        status=payload.get("status", "unknown"),
+        started_at=datetime(2026, 10, 1, 10, 0, tzinfo=timezone.utc),
+        duration_seconds=payload.get("durationSeconds"),
+        cost=payload.get("cost"),
+        meta=meta,
+        transcript=payload.get("transcript"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_upsert_calls_reports_inserted_and_updated(sqlite_session):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Test"))
+    await sqlite_session.commit()
+
+    first = await upsert_calls(
+        sqlite_session,
+        [
+            _record("call-1", tenant_id, status="in-progress", transcript="AI: Bonjour", customerName="Ana"),
+            _record("call-2", tenant_id, status="ended"),
+        ],
+    )
+    assert (first.inserted, first.updated) == (2, 0)
+
+    second = await upsert_calls(
+        sqlite_session,
+        [
+            _record("call-1", tenant_id, status="ended", cost=0.42, transcript=""),
+            _record("call-3", tenant_id, status="queued"),
+            _record("call-3", tenant_id, status="ringing"),
+        ],
+    )
+    assert (second.inserted, second.updated) == (1, 1)
+
+    sqlite_session.expire_all()
+    rows = {
+        row.id: row
+        for row in (
+            await sqlite_session.execute(
+                select(CallRecord).options(undefer(CallRecord.meta), undefer(CallRecord.transcript))
+            )
+        ).scalars()
+    }
+    assert set(rows) == {"call-1", "call-2", "call-3"}
+    assert rows["call-1"].status == "ended"
+    assert rows["call-1"].cost == pytest.approx(0.42)
+    assert rows["call-1"].transcript == "AI: Bonjour"  # blank payload keeps the stored transcript
+    assert rows["call-1"].meta["customerName"] == "Ana"  # meta is merged, not replaced
+    assert rows["call-3"].status == "ringing"
+
+
+@pytest.mark.asyncio
+async def test_upsert_calls_empty_batch_is_noop(sqlite_session):
+    result = await upsert_calls(sqlite_session, [])
+    assert (result.inserted, result.updated) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_list_call_summaries_projects_preview_without_meta(sqlite_session):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Test"))
+    await upsert_calls(sqlite_session, [_record("call-1", tenant_id, status="ended", transcript="x" * 500)])
+
+    rows = await list_call_summaries(sqlite_session, tenant_id=tenant_id)
+
+    assert len(rows) == 1
+    assert rows[0].transcript_preview == "x" * 200
+    assert "meta" not in rows[0]._fields
+    assert "transcript" not in rows[0]._fields
+
+    assert await scrub_transcripts(sqlite_session, ["call-1"]) == 1
+    rows = await list_call_summaries(sqlite_session, tenant_id=tenant_id)
+    assert rows[0].transcript_preview is None
+
+
+@pytest.mark.asyncio
+async def test_list_call_summaries_keyset_pages_with_sql_filters(sqlite_session):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Test"))
+    records = []
+    for index in range(7):
+        record = _record(f"call-{index}", tenant_id, status="failed" if index % 2 else "ended")
+        record.started_at = datetime(2026, 10, 1, 10, index // 2, tzinfo=timezone.utc)  # ties on started_at
+        records.append(record)
+    await upsert_calls(sqlite_session, records)
+
+    seen, after = [], None
+    while True:
+        page = await list_call_summaries(sqlite_session, tenant_id=tenant_id, limit=3, after=after)
+        seen.extend(row.id for row in page)
+        if len(page) < 3:
+            break
+        after = CallPageCursor(started_at=page[-1].started_at, id=page[-1].id)
+    assert seen == ["call-6", "call-4", "call-5", "call-2", "call-3", "call-0", "call-1"]
+
+    failed = await list_call_summaries(sqlite_session, tenant_id=tenant_id, limit=2, status="failed")
+    assert [row.id for row in failed] == ["call-5", "call-3"]
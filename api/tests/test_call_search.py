@@ -0,0 +1,109 @@
+"""Tests for transcript full-text search."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.tenant import Tenant
+from api.src.infrastructure.persistence.repositories.call_repository import upsert_calls
+from api.src.infrastructure.persistence.repositories.call_search_repository import search_calls, search_config_for
+
+NOW = datetime(2026, 10, 15, 12, 0, tzinfo=timezone.utc)
+
+
+async def _seed(session, tenant_id) -> None:
+    session.add(Tenant(id=tenant_id, name="Search"))
+    rows = [
+        ("c1", 1, "ended", "Le plombier viendra demain pour la fuite <urgent>"),
+        ("c2", 2, "failed", "Fuite d'eau, rappeler le plombier"),
+        ("c3", 3, "ended", "Question sur la facture"),
+        ("c4", 40, "ended", "Vieux plombier, transcript expiré"),
+    ]
+    for call_id, days_ago, status, transcript in rows:
+        session.add(
+            CallRecord(
+                id=call_id,
+                assistant_id="asst-1",
+                tenant_id=tenant_id,
+                status=status,
+                started_at=NOW - timedelta(days=days_ago),
+                transcript=transcript,
+            )
+        )
+    await session.commit()
+
+
+def test_search_config_follows_language_tag():
+    assert search_config_for("fr-FR") == "french"
+    assert search_config_for("en") == "english"
+    assert search_config_for("xx") == "simple"
+    assert search_config_for(None) == "simple"
+
+
+@pytest.mark.asyncio
+async def test_fallback_search_filters_and_highlights(sqlite_session):
+    tenant_id = uuid4()
+    await _seed(sqlite_session, tenant_id)
+
+    results = await search_calls(
+        sqlite_session,
+        tenant_id=tenant_id,
+        query="plombier fuite",
+        transcript_cutoff=NOW - timedelta(days=30),
+    )
+    assert {call["id"] for call in results} == {"c1", "c2"}
+    snippet = next(call["snippet"] for call in results if call["id"] == "c1")
+    assert "<mark>plombier</mark>" in snippet
+    assert "&lt;urgent&gt;" in snippet
+
+    failed = await search_calls(sqlite_session, tenant_id=tenant_id, query="plombier", status="failed")
+    assert [call["id"] for call in failed] == ["c2"]
+
+    other_tenant = await search_calls(sqlite_session, tenant_id=uuid4(), query="plombier")
+    assert other_tenant == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_sets_the_search_config(sqlite_session):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Search"))
+    await sqlite_session.commit()
+    call = CallRecord(id="c1", assistant_id="a", tenant_id=tenant_id, status="ended", started_at=NOW, meta={})
+
+    await upsert_calls(sqlite_session, [call], search_config="french")
+
+    stored = await sqlite_session.scalar(select(CallRecord.search_config).where(CallRecord.id == "c1"))
+    assert stored == "french"
+
+
+@pytest.mark.asyncio
+async def test_postgresql_search_uses_the_tenant_configuration():
+    statements = []
+
+    async def execute(statement):
+        statements.append(statement)
+        result = MagicMock()
+        result.scalar_one_or_none.return_value = "fr-FR"
+        result.__iter__.return_value = iter([])
+        return result
+
+    session = SimpleNamespace(
+        execute=execute,
+        get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")),
+    )
+
+    assert await search_calls(session, tenant_id=uuid4(), query='"fuite d\'eau" -facture') == []
+
+    compiled = statements[-1].compile(dialect=postgresql.dialect())
+    sql = str(compiled)
+    assert "calls.search_vector @@ websearch_to_tsquery(" in sql
+    assert "ts_rank_cd" in sql and "ts_headline" in sql
+    assert "french" in compiled.params.values()
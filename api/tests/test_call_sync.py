@@ -0,0 +1,182 @@
+"""Tests for the incremental Vapi call sync."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from api.src.application.services.call_sync import (
+    _fetch_changed_calls,
+    is_cursor_stale,
+    synchronise_calls_from_vapi,
+)
+from api.src.infrastructure.persistence.models.call_rollup import CallRollup
+from api.src.infrastructure.persistence.models.call_sync_cursor import CallSyncCursor
+
+
+def _call(index: int, *, updated: str) -> dict:
+    return {
+        "id": f"call-{index}",
+        "assistantId": "asst-1",
+        "status": "ended",
+        "createdAt": f"2026-10-01T10:{index:02d}:00Z",
+        "startedAt": f"2026-10-01T10:{index:02d}:00Z",
+        "updatedAt": updated,
+    }
+
+
+@pytest.mark.asyncio
+async def test_fetch_changed_calls_pages_with_created_at_cursor():
+    client = MagicMock()
+    client.list_calls = AsyncMock(
+        side_effect=[
+            [_call(5, updated="2026-10-01T11:00:00Z"), _call(4, updated="2026-10-01T11:00:00Z")],
+            [_call(3, updated="2026-10-01T11:00:00Z")],
+        ]
+    )
+    since = datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc)
+
+    calls, resume_created_before = await _fetch_changed_calls(client, updated_after=since, page_size=2, max_pages=5)
+
+    assert [c["id"] for c in calls] == ["call-5", "call-4", "call-3"]
+    assert resume_created_before is None
+    first, second = client.list_calls.await_args_list
+    assert first.kwargs == {"limit": 2, "updated_at_gt": "2026-10-01T09:00:00Z", "created_at_lt": None}
+    assert second.kwargs["created_at_lt"] == "2026-10-01T10:04:00Z"
+
+
+@pytest.mark.asyncio
+async def test_synchronise_advances_cursor_and_upserts_only_changes():
+    tenant_id = uuid4()
+    cursor = CallSyncCursor(
+        tenant_id=tenant_id,
+        last_updated_at=datetime(2026, 10, 1, 9, 0, tzinfo=timezone.utc),
+    )
+    session = MagicMock()
+    session.get = AsyncMock(return_value=cursor)
+    session.scalars = AsyncMock(return_value=[])
+    session.commit = AsyncMock()
+    client = MagicMock()
+    client.list_calls = AsyncMock(return_value=[_call(7, updated="2026-10-01T12:30:00Z")])
+
+    with patch("api.src.application.services.call_sync.upsert_calls", new_callable=AsyncMock) as upsert, patch(
+        "api.src.application.services.call_sync.refresh_call_rollups", new_callable=AsyncMock
+    ) as refresh, patch(
+        "api.src.application.services.call_sync.refresh_call_topics", new_callable=AsyncMock
+    ) as refresh_topics, patch(
+        "api.src.application.services.call_sync.get_tenant_search_config", AsyncMock(return_value="french")
+    ):
+        records = await synchronise_calls_from_vapi(session, tenant_id=tenant_id, vapi_client=client)
+
+    assert [r.id for r in records] == ["call-7"]
+    upsert.assert_awaited_once()
+    assert upsert.await_args.kwargs["search_config"] == "french"
+    assert refresh.await_args.kwargs["started_at"] == [records[0].started_at]
+    assert refresh_topics.await_args.kwargs["call_ids"] == ["call-7"]
+    assert session.commit.await_count == 2  # Before the Vapi round trips, then the writes
+    assert session.get.await_args_list[1].kwargs == {"with_for_update": True, "populate_existing": True}
+    assert client.list_calls.await_args.kwargs["updated_at_gt"] == "2026-10-01T09:00:00Z"
+    assert cursor.last_updated_at == datetime(2026, 10, 1, 12, 30, tzinfo=timezone.utc)
+    assert cursor.last_call_id == "call-7"
+    assert cursor.last_synced_at is not None
+    assert cursor.last_error is None
+
+
+class PagedVapi:
+    """Vapi list_calls over ``calls``: updatedAt/createdAt filters, newest created first."""
+
+    def __init__(self, calls: list[dict]) -> None:
+        self.calls = calls
+
+    async def list_calls(self, *, limit, updated_at_gt, created_at_lt):
+        matching = [
+            call
+            for call in self.calls
+            if (updated_at_gt is None or call["updatedAt"] > updated_at_gt)
+            and (created_at_lt is None or call["createdAt"] < created_at_lt)
+        ]
+        return sorted(matching, key=lambda call: call["createdAt"], reverse=True)[:limit]
+
+
+@pytest.mark.asyncio
+async def test_page_cap_resumes_on_the_next_pass_without_losing_calls():
+    tenant_id = uuid4()
+    cursor = CallSyncCursor(tenant_id=tenant_id)
+    session = MagicMock()
+    session.get = AsyncMock(return_value=cursor)
+    session.scalars = AsyncMock(return_value=[])
+    session.commit = AsyncMock()
+    vapi = PagedVapi([_call(index, updated=f"2026-10-01T11:{index:02d}:00Z") for index in range(1, 10)])
+    synced: list[str] = []
+
+    async def sync_pass():
+        with patch("api.src.application.services.call_sync.upsert_calls", new_callable=AsyncMock), patch(
+            "api.src.application.services.call_sync.refresh_call_rollups", new_callable=AsyncMock
+        ), patch("api.src.application.services.call_sync.refresh_call_topics", new_callable=AsyncMock), patch(
+            "api.src.application.services.call_sync.get_tenant_search_config", AsyncMock(return_value="simple")
+        ):
+            records = await synchronise_calls_from_vapi(
+                session, tenant_id=tenant_id, vapi_client=vapi, limit=2, max_pages=2
+            )
+        synced.extend(record.id for record in records)
+
+    await sync_pass()
+    # Capped after 4 of 9 calls: the cursor keeps the resume point, not the newest updatedAt.
+    assert cursor.last_updated_at is None and cursor.resume_created_before == "2026-10-01T10:06:00Z"
+
+    # call-9 changes while the catch-up is in progress.
+    vapi.calls[-1] = _call(9, updated="2026-10-01T12:00:00Z")
+    await sync_pass()
+    await sync_pass()
+
+    assert cursor.resume_created_before is None
+    assert cursor.last_updated_at == datetime(2026, 10, 1, 11, 9, tzinfo=timezone.utc)
+    await sync_pass()
+    assert sorted(set(synced)) == [f"call-{index}" for index in range(1, 10)]
+    assert synced[-1] == "call-9"  # Its later change is fetched once the catch-up is done
+
+
+@pytest.mark.asyncio
+async def test_sync_moves_a_rescheduled_call_out_of_its_old_hour(sqlite_session):
+    tenant_id = uuid4()
+    vapi = PagedVapi([_call(5, updated="2026-10-01T11:00:00Z")])
+    await synchronise_calls_from_vapi(sqlite_session, tenant_id=tenant_id, vapi_client=vapi)
+
+    vapi.calls[0] = {**vapi.calls[0], "startedAt": "2026-10-01T13:05:00Z", "updatedAt": "2026-10-01T13:10:00Z"}
+    await synchronise_calls_from_vapi(sqlite_session, tenant_id=tenant_id, vapi_client=vapi)
+
+    rollups = (await sqlite_session.scalars(select(CallRollup))).all()
+    assert [(rollup.hour_start.hour, rollup.call_count) for rollup in rollups] == [(13, 1)]
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_a_cursor_moved_by_a_concurrent_pass(sqlite_session):
+    tenant_id = uuid4()
+    vapi = PagedVapi([_call(5, updated="2026-10-01T11:00:00Z")])
+    later = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+    list_calls = vapi.list_calls
+
+    async def concurrent_pass(**kwargs):
+        # The read transaction is over: another worker commits its pass meanwhile.
+        assert not sqlite_session.in_transaction()
+        sqlite_session.add(CallSyncCursor(tenant_id=tenant_id, last_updated_at=later))
+        await sqlite_session.commit()
+        return await list_calls(**kwargs)
+
+    vapi.list_calls = concurrent_pass
+    records = await synchronise_calls_from_vapi(sqlite_session, tenant_id=tenant_id, vapi_client=vapi)
+
+    assert [record.id for record in records] == ["call-5"]
+    cursor = await sqlite_session.get(CallSyncCursor, tenant_id)
+    assert cursor.last_updated_at.replace(tzinfo=timezone.utc) == later
+
+
+def test_is_cursor_stale():
+    now = datetime.now(tz=timezone.utc)
+    assert is_cursor_stale(None)
+    assert is_cursor_stale(CallSyncCursor(last_synced_at=now - timedelta(minutes=10)), max_age_seconds=60)
+    assert not is_cursor_stale(CallSyncCursor(last_synced_at=now), max_age_seconds=60)
@@ -0,0 +1,124 @@
+"""Tests for partitioned circuit breakers, bulkheads and shared breaker state."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.external import circuit_breaker as cb
+from api.src.infrastructure.external.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitState,
+    InMemoryCircuitStateBackend,
+    get_circuit_breaker,
+)
+
+
+class ClientError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.setattr(cb, "_breakers", cb.OrderedDict())
+    cb.set_circuit_state_backend(InMemoryCircuitStateBackend())
+    yield
+    cb.set_circuit_state_backend(None)
+
+
+async def _fail() -> None:
+    raise RuntimeError("upstream down")
+
+
+async def _client_error() -> None:
+    raise ClientError("404")
+
+
+@pytest.mark.asyncio
+async def test_breakers_are_isolated_per_key():
+    config = CircuitBreakerConfig(failure_threshold=2)
+    tenant_a = get_circuit_breaker("vapi", config, key="token-a")
+    tenant_b = get_circuit_breaker("vapi", config, key="token-b")
+
+    assert tenant_a is not tenant_b
+    assert "token-a" not in tenant_a.name
+    assert get_circuit_breaker("vapi", key="token-a") is tenant_a
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await tenant_a.call(_fail)
+
+    assert tenant_a.state == CircuitState.OPEN
+    assert tenant_b.state == CircuitState.CLOSED
+    with pytest.raises(HTTPException) as exc_info:
+        await tenant_a.call(_fail)
+    assert exc_info.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_excluded_exceptions_do_not_open_the_circuit():
+    breaker = get_circuit_breaker(
+        "vapi", CircuitBreakerConfig(failure_threshold=1, excluded_exceptions=(ClientError,)), key="t"
+    )
+
+    for _ in range(3):
+        with pytest.raises(ClientError):
+            await breaker.call(_client_error)
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker._failure_count == 0
+
+
+@pytest.mark.asyncio
+async def test_bulkhead_rejects_when_saturated():
+    breaker = get_circuit_breaker(
+        "vapi", CircuitBreakerConfig(max_concurrency=1, concurrency_timeout=0.05), key="t"
+    )
+    release = asyncio.Event()
+
+    async def slow() -> str:
+        await release.wait()
+        return "ok"
+
+    first = asyncio.create_task(breaker.call(slow))
+    await asyncio.sleep(0)
+    with pytest.raises(HTTPException) as exc_info:
+        await breaker.call(slow)
+    assert exc_info.value.status_code == 503
+
+    release.set()
+    assert await first == "ok"
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_registry_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(get_settings(), "circuit_breaker_registry_size", 2)
+
+    first = get_circuit_breaker("vapi", key="a")
+    get_circuit_breaker("vapi", key="b")
+    get_circuit_breaker("vapi", key="a")  # refresh "a"
+    get_circuit_breaker("vapi", key="c")
+
+    assert len(cb._breakers) == 2
+    assert get_circuit_breaker("vapi", key="a") is first
+    assert all(not name.endswith(cb._partition("b")) for name in cb._breakers)
+
+
+@pytest.mark.asyncio
+async def test_open_state_is_shared_through_the_backend():
+    backend = InMemoryCircuitStateBackend()
+    config = CircuitBreakerConfig(failure_threshold=1, state_sync_interval=0)
+    worker_a = CircuitBreaker(name="vapi:abc", config=config, service="vapi", backend=backend)
+    worker_b = CircuitBreaker(name="vapi:abc", config=config, service="vapi", backend=backend)
+
+    with pytest.raises(RuntimeError):
+        await worker_a.call(_fail)
+    assert worker_a.state == CircuitState.OPEN
+
+    with pytest.raises(HTTPException):
+        await worker_b.call(_fail)
+    assert worker_b.state == CircuitState.OPEN
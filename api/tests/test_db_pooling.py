@@ -0,0 +1,75 @@
+"""Tests for the configurable database pool modes and their instrumentation."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import text
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database import pooling
+from api.src.infrastructure.database.pooling import (
+    InstrumentedAsyncAdaptedQueuePool,
+    InstrumentedNullPool,
+    engine_options,
+    label_pool,
+    pool_usage,
+)
+
+
+def test_nullpool_mode_disables_prepared_statements(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "database_pool_mode", "nullpool_pgbouncer")
+
+    options = engine_options(settings)
+
+    assert options["poolclass"] is InstrumentedNullPool
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert "pool_size" not in options
+
+
+def test_queue_pool_mode_keeps_connections_and_caches_statements(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "database_pool_mode", "queue_pool")
+    monkeypatch.setattr(settings, "database_pool_size", 5)
+    monkeypatch.setattr(settings, "database_statement_cache_size", 64)
+
+    options = engine_options(settings)
+
+    assert options["poolclass"] is InstrumentedAsyncAdaptedQueuePool
+    assert options["pool_size"] == 5
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"]["statement_cache_size"] == 64
+
+
+def test_unknown_pool_mode_is_rejected(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "database_pool_mode", "bogus")
+    with pytest.raises(ValueError):
+        engine_options(settings)
+
+
+@pytest.mark.asyncio
+async def test_queue_pool_reports_checkouts_and_usage():
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:", poolclass=InstrumentedAsyncAdaptedQueuePool, pool_size=2, max_overflow=1
+    )
+    label_pool(engine.sync_engine.pool, "test")
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            usage = {label: (out, idle, cap) for label, out, idle, cap in pool_usage()}
+            assert usage["test"] == (1, 0, 3)
+
+        usage = {label: (out, idle, cap) for label, out, idle, cap in pool_usage()}
+        assert usage["test"] == (0, 1, 3)
+
+        if pooling.db_pool_checkout_metric is not None:
+            samples = pooling.db_pool_checkout_metric.labels(engine="test").collect()[0].samples
+            count = next(sample.value for sample in samples if sample.name.endswith("_count"))
+            assert count >= 1
+    finally:
+        await engine.dispose()
@@ -0,0 +1,46 @@
+"""Tests for the shared outbound HTTP client pool."""
+
+from __future__ import annotations
+
+import httpx
+import pytest
+
+from api.src.infrastructure.external import vapi_client
+from api.src.infrastructure.external.http_pool import HttpClientPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_one_client_per_upstream():
+    pool = HttpClientPool()
+    try:
+        first = pool.get("https://api.vapi.ai")
+        assert pool.get("https://api.vapi.ai/") is first
+        assert pool.get("https://api.openai.com") is not first
+        assert [upstream for upstream, _, _ in pool.connection_counts()] == [
+            "https://api.vapi.ai",
+            "https://api.openai.com",
+        ]
+
+        await first.aclose()
+        assert pool.get("https://api.vapi.ai") is not first
+    finally:
+        await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_vapi_clients_share_pool_with_own_credentials(monkeypatch):
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["Authorization"])
+        return httpx.Response(200, json={"items": []})
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vapi_client, "get_http_client", lambda base_url: shared)
+
+    await vapi_client.VapiClient(token="tenant-a").list_assistants()
+    await vapi_client.VapiClient(token="tenant-b").list_assistants()
+
+    assert seen == ["Bearer tenant-a", "Bearer tenant-b"]
+    assert not shared.is_closed
+    await shared.aclose()
@@ -0,0 +1,165 @@
+"""Tests for the outbound email queue and its worker (SQLite)."""
+
+from __future__ import annotations
+
+import smtplib
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.application.services import outbound_email
+from api.src.application.services.outbound_email import (
+    EMAIL_KIND_CALL_TRANSCRIPT,
+    OutboundEmailWorker,
+    enqueue_email,
+    queue_call_summary,
+)
+from api.src.core.settings import get_settings
+from api.src.infrastructure.email.resend_client import ResendError
+from api.src.infrastructure.email.smtp_client import SMTPConfig
+from api.src.infrastructure.persistence.models.outbound_email import OutboundEmail
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+
+TENANT_SMTP = SMTPConfig(server="smtp.tenant.test", username="owner@tenant.test", password="secret")
+
+
+class FakeSMTPClient:
+    def __init__(self) -> None:
+        self.batches: list[tuple[SMTPConfig, list]] = []
+        self.failures: dict[str, Exception] = {}
+
+    async def send_many(self, config, messages):
+        self.batches.append((config, messages))
+        return [self.failures.get(message.recipients[0], f"<{message.subject}@smtp>") for message in messages]
+
+
+@pytest.fixture
+def providers(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "resend_api_key", "re_test")
+    monkeypatch.setattr(settings, "email_queue_backoff_seconds", 0.0)
+    monkeypatch.setattr(settings, "email_queue_max_attempts", 2)
+    # Any studio config with SMTP fields counts as configured; skip the password decryption.
+    monkeypatch.setattr(
+        outbound_email,
+        "resolve_smtp_config",
+        lambda config: TENANT_SMTP if config is not None and config.smtp_server else None,
+    )
+    smtp = FakeSMTPClient()
+    monkeypatch.setattr(outbound_email, "get_smtp_client", lambda: smtp)
+    resend_calls: list[dict] = []
+    resend_failures: dict[str, Exception] = {}
+
+    async def fake_resend(**kwargs):
+        resend_calls.append(kwargs)
+        error = resend_failures.get(kwargs["recipients"][0])
+        if error is not None:
+            raise error
+        return f"re_{len(resend_calls)}"
+
+    monkeypatch.setattr(outbound_email, "send_resend_email", fake_resend)
+    return smtp, resend_calls, resend_failures
+
+
+def _worker(session) -> OutboundEmailWorker:
+    factory = async_sessionmaker(session.bind, expire_on_commit=False, class_=AsyncSession)
+    return OutboundEmailWorker(
+        interval_seconds=60, concurrency=8, smtp_concurrency=2, resend_concurrency=2, session_factory=factory
+    )
+
+
+async def _tenant_config(session) -> StudioConfig:
+    config = StudioConfig(
+        user_id="user-1",
+        smtp_server="smtp.tenant.test",
+        smtp_port="587",
+        smtp_username="owner@tenant.test",
+        smtp_password_encrypted="encrypted",
+    )
+    session.add(config)
+    await session.commit()
+    return config
+
+
+async def _rows(session) -> dict[str, OutboundEmail]:
+    session.expire_all()
+    emails = (await session.execute(select(OutboundEmail))).scalars().all()
+    return {email.recipients[0]: email for email in emails}
+
+
+@pytest.mark.asyncio
+async def test_enqueue_picks_the_lane_and_dedupes(sqlite_session, providers):
+    config = await _tenant_config(sqlite_session)
+    summary = dict(
+        to_email="owner@tenant.test",
+        call_id="call-1",
+        caller_name="Jean",
+        caller_phone="+33600000000",
+        transcript="AI: Bonjour\nUser: <fuite>",
+        duration=75,
+        call_date=outbound_email._now(),
+        business_name="Plomberie",
+    )
+
+    first = await queue_call_summary(sqlite_session, studio_config=config, **summary)
+    again = await queue_call_summary(sqlite_session, studio_config=config, **summary)
+    platform = await enqueue_email(
+        sqlite_session, kind=EMAIL_KIND_CALL_TRANSCRIPT, recipients=["x@test"], subject="Transcript", html="<p/>"
+    )
+
+    assert first is not None and again is None and platform is not None
+    rows = await _rows(sqlite_session)
+    assert (rows["owner@tenant.test"].provider, rows["owner@tenant.test"].smtp_user_id) == ("smtp", "user-1")
+    assert "&lt;fuite&gt;" in rows["owner@tenant.test"].html
+    assert (rows["x@test"].provider, rows["x@test"].smtp_user_id) == ("resend", None)
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_each_lane_and_records_delivery(sqlite_session, providers):
+    smtp, resend_calls, _ = providers
+    config = await _tenant_config(sqlite_session)
+    for recipient in ("a@tenant.test", "b@tenant.test", "c@tenant.test"):
+        await enqueue_email(
+            sqlite_session, kind="test", recipients=[recipient], subject=recipient, html="<p/>", studio_config=config
+        )
+    await enqueue_email(sqlite_session, kind="test", recipients=["d@test"], subject="d", html="<p/>")
+
+    await _worker(sqlite_session).run_once()
+
+    # Three tenant emails over at most two SMTP sessions, one Resend call.
+    assert [cfg for cfg, _ in smtp.batches] == [TENANT_SMTP, TENANT_SMTP]
+    assert sorted(len(messages) for _, messages in smtp.batches) == [1, 2]
+    assert [call["recipients"] for call in resend_calls] == [["d@test"]]
+    rows = await _rows(sqlite_session)
+    assert {email.status for email in rows.values()} == {"sent"}
+    assert all(email.html is None and email.sent_at is not None for email in rows.values())
+    assert rows["a@tenant.test"].provider_message_id == "<a@tenant.test@smtp>"
+    assert rows["d@test"].provider_message_id == "re_1"
+
+
+@pytest.mark.asyncio
+async def test_worker_retries_and_dead_letters(sqlite_session, providers):
+    smtp, _, resend_failures = providers
+    config = await _tenant_config(sqlite_session)
+    smtp.failures["refused@tenant.test"] = smtplib.SMTPRecipientsRefused({"refused@tenant.test": (550, b"no")})
+    resend_failures["flaky@test"] = ResendError("Resend returned 503", permanent=False)
+    resend_failures["invalid@test"] = ResendError("Resend returned 422", permanent=True)
+
+    await enqueue_email(
+        sqlite_session, kind="test", recipients=["refused@tenant.test"], subject="s", html="<p/>", studio_config=config
+    )
+    for recipient in ("flaky@test", "invalid@test"):
+        await enqueue_email(sqlite_session, kind="test", recipients=[recipient], subject="s", html="<p/>")
+
+    # Zero backoff: the transient failure is retried within the pass until its attempts run out.
+    await _worker(sqlite_session).run_once()
+
+    rows = await _rows(sqlite_session)
+    assert {recipient: (email.status, email.attempts) for recipient, email in rows.items()} == {
+        "refused@tenant.test": ("dead", 1),
+        "flaky@test": ("dead", 2),
+        "invalid@test": ("dead", 1),
+    }
+    assert "503" in rows["flaky@test"].last_error
+    assert rows["flaky@test"].html == "<p/>"
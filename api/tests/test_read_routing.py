@@ -0,0 +1,94 @@
+"""Tests for routing read-only sessions to the replica."""
+
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import Request
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.database import session as db_session
+
+
+@pytest_asyncio.fixture
+async def engines(monkeypatch):
+    pytest.importorskip("aiosqlite")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    primary = create_async_engine("sqlite+aiosqlite:///:memory:")
+    replica = create_async_engine("sqlite+aiosqlite:///:memory:")
+    monkeypatch.setattr(get_settings(), "database_read_health_interval_seconds", 0)
+
+    def use(replica_engine):
+        monkeypatch.setattr(db_session, "engine", primary)
+        monkeypatch.setattr(db_session, "read_engine", replica_engine)
+        monkeypatch.setattr(db_session, "SessionLocal", async_sessionmaker(bind=primary, class_=AsyncSession))
+        monkeypatch.setattr(db_session, "ReadSessionLocal", async_sessionmaker(bind=replica_engine, class_=AsyncSession))
+        monkeypatch.setattr(db_session, "replica_health", db_session.ReplicaHealth())
+
+    use(replica)
+    yield primary, replica, use
+    await primary.dispose()
+    await replica.dispose()
+
+
+def _request(headers: dict[str, str]) -> Request:
+    raw = [(key.lower().encode(), value.encode()) for key, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+@pytest.mark.asyncio
+async def test_reads_go_to_the_replica_unless_primary_is_requested(engines):
+    primary, replica, _ = engines
+
+    async with db_session.read_session() as session:
+        assert session.bind is replica
+    async with db_session.read_session(primary=True) as session:
+        assert session.bind is primary
+
+    dependency = db_session.get_read_session(_request({db_session.READ_CONSISTENCY_HEADER: "primary"}))
+    session = await dependency.__anext__()
+    assert session.bind is primary
+    await dependency.aclose()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_replica_falls_back_to_the_primary(engines, tmp_path):
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    primary, _, use = engines
+    use(create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/missing/dir/replica.db"))
+
+    async with db_session.read_session() as session:
+        assert session.bind is primary
+    assert db_session.replica_health.available is False
+
+
+@pytest.mark.asyncio
+async def test_replica_probe_times_out_while_connecting(engines, monkeypatch):
+    import asyncio
+    from contextlib import asynccontextmanager
+
+    class BlackholedEngine:
+        @asynccontextmanager
+        async def connect(self):
+            await asyncio.sleep(3600)
+            yield
+
+    monkeypatch.setattr(db_session, "read_engine", BlackholedEngine())
+    monkeypatch.setattr(db_session.settings, "database_read_health_timeout_seconds", 0.05)
+
+    assert await asyncio.wait_for(db_session.replica_health.check(), timeout=1) is False
+
+
+def test_analytics_reads_hold_a_single_connection():
+    from api.src.presentation.api.v1.routes import analytics
+
+    reads = [route for route in analytics.router.routes if route.methods == {"GET"}]
+    assert reads
+    for route in reads:
+        # get_current_user's own session only connects when the user is not cached
+        calls = [dependency.call for dependency in route.dependant.dependencies]
+        assert db_session.get_read_session in calls, route.path
+        assert db_session.get_session not in calls, route.path
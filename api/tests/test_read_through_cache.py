@@ -0,0 +1,102 @@
+"""Tests for the read-through cache and its use in front of Vapi reads."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from api.src.infrastructure.cache import InMemoryCacheBackend, ReadThroughCache
+from api.src.infrastructure.cache import read_through
+from api.src.infrastructure.external import vapi_client
+
+
+class Loader:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        return {"version": self.calls}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000.0]
+    monkeypatch.setattr(read_through.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.mark.asyncio
+async def test_serves_fresh_then_stale_while_revalidating(clock):
+    cache = ReadThroughCache("test", backend=InMemoryCacheBackend(), ttl_seconds=10, stale_seconds=60)
+    loader = Loader()
+
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 1}
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 1}
+    assert loader.calls == 1
+
+    clock[0] += 30  # stale: old value now, one refresh in the background
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 1}
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 1}
+    await asyncio.sleep(0)
+    assert loader.calls == 2
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 2}
+
+    clock[0] += 100  # past the stale window: load synchronously
+    assert await cache.get_or_load("tenant", "k", loader) == {"version": 3}
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_only_that_namespace(clock):
+    cache = ReadThroughCache("test", backend=InMemoryCacheBackend(), ttl_seconds=10)
+    loader = Loader()
+    await cache.get_or_load("a", "k", loader)
+    await cache.get_or_load("b", "k", loader)
+
+    await cache.invalidate("a")
+
+    assert await cache.get_or_load("a", "k", loader) == {"version": 3}
+    assert await cache.get_or_load("b", "k", loader) == {"version": 2}
+
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_is_a_bounded_lru(clock):
+    backend = InMemoryCacheBackend(max_entries=2)
+    cache = ReadThroughCache("test", backend=backend, ttl_seconds=10)
+    loader = Loader()
+    await cache.get_or_load("t", "a", loader)
+    await cache.get_or_load("t", "b", loader)
+    await cache.get_or_load("t", "a", loader)  # refresh "a"
+    await cache.get_or_load("t", "c", loader)
+
+    assert len(backend) == 2
+    assert await backend.get("t", "b") is None
+    assert (await backend.get("t", "a")).value == {"version": 1}
+
+
+@pytest.mark.asyncio
+async def test_vapi_reads_are_cached_until_a_write(monkeypatch):
+    sent: list[tuple[str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append((request.method, request.url.path))
+        return httpx.Response(200, json={"items": [{"id": "asst-1"}]} if request.method == "GET" else {"id": "x"})
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vapi_client, "get_http_client", lambda base_url: shared)
+    monkeypatch.setattr(
+        vapi_client, "_cache", ReadThroughCache("vapi", backend=InMemoryCacheBackend(), ttl_seconds=60)
+    )
+
+    client = vapi_client.VapiClient(token="cache-tenant")
+    assert await client.list_assistants() == [{"id": "asst-1"}]
+    assert await client.list_assistants() == [{"id": "asst-1"}]
+    await vapi_client.VapiClient(token="other-tenant").list_assistants()
+    assert sent.count(("GET", "/assistant")) == 2
+
+    await client.assign_phone_number("pn-1", "asst-1")
+    await client.list_assistants()
+    assert sent.count(("GET", "/assistant")) == 3
+    await shared.aclose()
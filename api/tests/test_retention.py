@@ -0,0 +1,137 @@
+"""Tests for the batched call retention job."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import select
+
+from api.src.application.services.retention import apply_retention, get_retention_policy
+from api.src.core.settings import get_settings
+from api.src.infrastructure.persistence.models.call import CallRecord
+from api.src.infrastructure.persistence.models.call_rollup import CallRollup
+from api.src.infrastructure.persistence.models.call_topic import CallTopic
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.tenant import Tenant
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import rebuild_call_rollups
+from api.src.infrastructure.persistence.repositories.call_topic_repository import refresh_call_topics
+
+NOW = datetime(2026, 10, 15, 12, 30, tzinfo=timezone.utc)
+
+
+def _call(call_id: str, tenant_id, hours_ago: float) -> CallRecord:
+    return CallRecord(
+        id=call_id,
+        assistant_id="asst-1",
+        tenant_id=tenant_id,
+        status="ended",
+        started_at=NOW - timedelta(hours=hours_ago),
+        duration_seconds=60,
+        meta={},
+        transcript=f"transcript {call_id}",
+    )
+
+
+@pytest.fixture
+def retention_settings(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "transcript_retention_hours", 24)
+    monkeypatch.setattr(settings, "call_retention_days", 30)
+    return settings
+
+
+@pytest.mark.asyncio
+async def test_apply_retention_scrubs_and_deletes_in_batches(sqlite_session, retention_settings):
+    default_tenant, strict_tenant = uuid4(), uuid4()
+    sqlite_session.add_all([Tenant(id=default_tenant, name="Default"), Tenant(id=strict_tenant, name="Strict")])
+    sqlite_session.add(
+        StudioConfig(user_id=str(strict_tenant), transcript_retention_hours=1, call_retention_days=2)
+    )
+    sqlite_session.add_all(
+        [
+            _call("d-fresh", default_tenant, 2),
+            _call("d-expired-1", default_tenant, 30),
+            _call("d-expired-2", default_tenant, 48),
+            _call("d-old", default_tenant, 24 * 40),
+            _call("s-fresh", strict_tenant, 0.5),
+            _call("s-expired", strict_tenant, 2),
+            _call("s-old", strict_tenant, 24 * 3),
+        ]
+    )
+    await sqlite_session.commit()
+    await rebuild_call_rollups(sqlite_session, start=NOW - timedelta(days=60), end=NOW + timedelta(hours=1))
+    await sqlite_session.commit()
+
+    result = await apply_retention(sqlite_session, now=NOW, batch_size=1)
+
+    # Scrubs count rows still holding a transcript: d-expired-1, d-expired-2, d-old, s-expired, s-old
+    assert result.transcripts_scrubbed == 5
+    assert result.calls_deleted == 2
+
+    rows = await sqlite_session.execute(select(CallRecord.id, CallRecord.transcript))
+    transcripts = dict(rows.all())
+    assert transcripts == {
+        "d-fresh": "transcript d-fresh",
+        "d-expired-1": None,
+        "d-expired-2": None,
+        "s-fresh": "transcript s-fresh",
+        "s-expired": None,
+    }
+
+    rollup_counts = await sqlite_session.execute(select(CallRollup.call_count))
+    assert sum(rollup_counts.scalars().all()) == 5
+
+    # A second pass has nothing left to do.
+    again = await apply_retention(sqlite_session, now=NOW, batch_size=1)
+    assert (again.transcripts_scrubbed, again.calls_deleted) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_rollups_outlive_calls_left_by_a_capped_deletion(sqlite_session, retention_settings):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Default"))
+    sqlite_session.add_all([_call(f"old-{index}", tenant_id, 24 * (40 + index)) for index in range(3)])
+    await sqlite_session.commit()
+    await rebuild_call_rollups(sqlite_session, start=NOW - timedelta(days=60), end=NOW)
+    await sqlite_session.commit()
+
+    capped = await apply_retention(sqlite_session, now=NOW, batch_size=1, max_batches=2)
+    assert capped.calls_deleted == 2
+    # One expired call is left, so every rollup hour is kept for now.
+    assert len((await sqlite_session.execute(select(CallRollup))).all()) == 3
+
+    finished = await apply_retention(sqlite_session, now=NOW, batch_size=1, max_batches=2)
+    assert finished.calls_deleted == 1
+    assert (await sqlite_session.execute(select(CallRollup))).all() == []
+
+
+@pytest.mark.asyncio
+async def test_topics_outlive_expired_transcripts_until_the_call_goes(sqlite_session, retention_settings):
+    tenant_id = uuid4()
+    sqlite_session.add(Tenant(id=tenant_id, name="Default"))
+    sqlite_session.add_all([_call("scrubbed", tenant_id, 24 * 3), _call("deleted", tenant_id, 24 * 40)])
+    await sqlite_session.commit()
+    await refresh_call_topics(sqlite_session, call_ids=["scrubbed", "deleted"])
+    await sqlite_session.commit()
+
+    await apply_retention(sqlite_session, now=NOW, batch_size=10)
+
+    topic_calls = await sqlite_session.execute(select(CallTopic.call_id).distinct())
+    assert topic_calls.scalars().all() == ["scrubbed"]
+
+
+@pytest.mark.asyncio
+async def test_get_retention_policy_falls_back_to_defaults(sqlite_session, retention_settings):
+    tenant_id = uuid4()
+    sqlite_session.add(StudioConfig(user_id=str(tenant_id), transcript_retention_hours=6))
+    await sqlite_session.commit()
+
+    custom = await get_retention_policy(sqlite_session, tenant_id)
+    assert custom.transcript_retention == timedelta(hours=6)
+    assert custom.call_retention == timedelta(days=30)
+
+    default = await get_retention_policy(sqlite_session, uuid4())
+    assert default.transcript_retention == timedelta(hours=24)
+    assert default.call_cutoff(NOW) == NOW - timedelta(days=30)
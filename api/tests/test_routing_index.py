@@ -0,0 +1,138 @@
+"""Tests for the in-memory webhook routing index (SQLite)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.application.services.routing_index import RoutingIndex, RoutingIndexWorker
+from api.src.infrastructure.persistence.models.phone_number import PhoneNumber, PhoneProvider
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig
+from api.src.infrastructure.persistence.models.user import User
+from api.src.presentation.api.v1.routes import webhooks
+
+ALICE, BOB = str(uuid4()), str(uuid4())
+
+
+async def _seed(session) -> dict[str, StudioConfig]:
+    session.add(User(id=ALICE, email="alice@test", twilio_phone_number="0033612345678"))
+    session.add(User(id=BOB, email="bob@test"))
+    configs = {
+        ALICE: StudioConfig(user_id=ALICE, vapi_assistant_id="asst-alice"),
+        BOB: StudioConfig(user_id=BOB, vapi_assistant_id="asst-bob"),
+    }
+    session.add_all(configs.values())
+    session.add_all(
+        [
+            PhoneNumber(org_id=ALICE, provider=PhoneProvider.VAPI, e164="+15550001", routing={"assistant_id": "asst-bob"}),
+            PhoneNumber(org_id=ALICE, provider=PhoneProvider.TWILIO, e164="+15550002", routing={}),
+        ]
+    )
+    await session.commit()
+    return configs
+
+
+@pytest.mark.asyncio
+async def test_load_resolves_assistants_and_numbers(sqlite_session):
+    configs = await _seed(sqlite_session)
+    index = RoutingIndex()
+
+    await index.load(sqlite_session)
+
+    alice = index.for_assistant("asst-alice")
+    assert (alice.user_id, str(alice.tenant_id), alice.config_id) == (ALICE, ALICE, configs[ALICE].id)
+    assert index.for_number("+33612345678") == alice
+    assert index.for_number("+15550001").user_id == BOB  # Routed to Bob's assistant
+    assert index.for_number("+15550002").user_id == ALICE  # Falls back to the org
+    assert index.for_user(BOB).config_id == configs[BOB].id
+    assert index.for_assistant("unknown") is None and index.for_number("+10000000") is None
+
+
+@pytest.mark.asyncio
+async def test_refresh_applies_one_change_at_a_time(sqlite_session):
+    await _seed(sqlite_session)
+    index = RoutingIndex()
+    await index.load(sqlite_session)
+
+    await sqlite_session.execute(update(User).where(User.id == ALICE).values(twilio_phone_number="+33700000000"))
+    await sqlite_session.execute(delete(StudioConfig).where(StudioConfig.user_id == BOB))
+    await sqlite_session.commit()
+    await index.refresh(sqlite_session, "users", ALICE)
+    await index.refresh(sqlite_session, "studio_configs", BOB)
+
+    assert index.for_number("+33612345678") is None
+    assert index.for_number("+33700000000").user_id == ALICE
+    assert index.for_assistant("asst-bob") is None
+    assert index.for_user(BOB).config_id is None
+    # The number routed to Bob's deleted assistant now belongs to its org.
+    assert index.for_number("+15550001").user_id == ALICE
+
+
+@pytest.mark.asyncio
+async def test_polling_picks_up_updated_rows(sqlite_session):
+    await _seed(sqlite_session)
+    index = RoutingIndex()
+    watermark = await index.load(sqlite_session)
+
+    later = datetime.utcnow() + timedelta(minutes=5)
+    sqlite_session.add(User(id="carol", email="carol@test", twilio_phone_number="+33800000000", updated_at=later))
+    await sqlite_session.commit()
+    new_watermark = await index.refresh_since(sqlite_session, watermark)
+
+    assert index.for_number("+33800000000").user_id == "carol"
+    assert new_watermark > watermark
+
+
+@pytest.mark.asyncio
+async def test_worker_loads_then_applies_notifications(sqlite_session):
+    await _seed(sqlite_session)
+    factory = async_sessionmaker(sqlite_session.bind, expire_on_commit=False, class_=AsyncSession)
+    index = RoutingIndex()
+    worker = RoutingIndexWorker(index, interval_seconds=60, reload_seconds=3600, session_factory=factory)
+
+    await worker.run_once()
+    assert index.loaded and index.for_assistant("asst-alice").user_id == ALICE
+
+    await sqlite_session.execute(
+        update(StudioConfig).where(StudioConfig.user_id == ALICE).values(vapi_assistant_id="asst-alice-2")
+    )
+    await sqlite_session.commit()
+    worker._on_notification(None, 1, "ava_routing", '{"table": "studio_configs", "key": "%s"}' % ALICE)
+    worker._on_notification(None, 1, "ava_routing", "not json")
+    await worker.run_once()
+
+    assert index.for_assistant("asst-alice") is None
+    assert index.for_assistant("asst-alice-2").user_id == ALICE
+
+
+@pytest.mark.asyncio
+async def test_webhook_resolution_reads_the_index(sqlite_session, monkeypatch):
+    configs = await _seed(sqlite_session)
+    index = RoutingIndex()
+    await index.load(sqlite_session)
+    monkeypatch.setattr(webhooks, "get_routing_index", lambda: index)
+
+    user, config = await webhooks._resolve_user_and_config(sqlite_session, "asst-bob", {})
+    assert (user.id, config.id) == (BOB, configs[BOB].id)
+
+    user, config = await webhooks._resolve_user_and_config(sqlite_session, "asst-bob", {"userId": ALICE})
+    assert (user.id, config.id) == (ALICE, configs[ALICE].id)
+
+
+@pytest.mark.asyncio
+async def test_twilio_number_missing_from_the_index_falls_back_to_sql(sqlite_session, monkeypatch):
+    await _seed(sqlite_session)
+    index = RoutingIndex()
+    await index.load(sqlite_session)
+    monkeypatch.setattr(webhooks, "get_routing_index", lambda: index)
+    # Saved by another worker after the index was loaded
+    await sqlite_session.execute(update(User).where(User.id == BOB).values(twilio_phone_number="+33900000000"))
+    await sqlite_session.commit()
+
+    assert (await webhooks._user_for_number(sqlite_session, "+33612345678")).id == ALICE
+    assert (await webhooks._user_for_number(sqlite_session, "+33900000000")).id == BOB
+    assert await webhooks._user_for_number(sqlite_session, None) is None
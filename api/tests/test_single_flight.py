@@ -0,0 +1,91 @@
+"""Tests for coalescing concurrent identical upstream calls."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.external import vapi_client
+from api.src.infrastructure.external.single_flight import SingleFlight, request_key
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+    calls = 0
+
+    async def fetch() -> list[int]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return [1, 2, 3]
+
+    waiters = [asyncio.create_task(flight.do("k", fetch)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert flight.in_flight() == 1
+    release.set()
+
+    assert await asyncio.gather(*waiters) == [[1, 2, 3]] * 5
+    assert calls == 1
+    assert flight.in_flight() == 0
+
+    # Completed calls are not cached.
+    await flight.do("k", fetch)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter_and_cancellation_is_isolated():
+    flight = SingleFlight("test")
+    release = asyncio.Event()
+
+    async def fail() -> None:
+        await release.wait()
+        raise RuntimeError("upstream down")
+
+    first = asyncio.create_task(flight.do("k", fail))
+    second = asyncio.create_task(flight.do("k", fail))
+    third = asyncio.create_task(flight.do("k", fail))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    results = await asyncio.gather(first, second, third, return_exceptions=True)
+    assert isinstance(results[0], asyncio.CancelledError)
+    assert all(isinstance(result, RuntimeError) for result in results[1:])
+
+
+def test_request_key_ignores_param_order():
+    assert request_key("t", "GET", "/call", params={"a": 1, "b": 2}) == request_key(
+        "t", "GET", "/call", params={"b": 2, "a": 1}
+    )
+
+
+@pytest.mark.asyncio
+async def test_vapi_coalesces_identical_gets_per_tenant(monkeypatch):
+    monkeypatch.setattr(get_settings(), "vapi_cache_enabled", False)
+    sent: list[str] = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.headers["Authorization"])
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=[{"id": "call-1"}])
+
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vapi_client, "get_http_client", lambda base_url: shared)
+
+    tenant_a = vapi_client.VapiClient(token="flight-a")
+    tenant_b = vapi_client.VapiClient(token="flight-b")
+    results = await asyncio.gather(
+        *(tenant_a.list_calls(limit=100) for _ in range(4)),
+        tenant_b.list_calls(limit=100),
+    )
+
+    assert all(result == [{"id": "call-1"}] for result in results)
+    assert sorted(sent) == ["Bearer flight-a", "Bearer flight-b"]
+    await shared.aclose()
@@ -1,22 +1,38 @@
+import smtplib
+import threading
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from api.src.infrastructure.email.smtp_client import SMTPClient, SMTPConfig
+from api.src.infrastructure.email.smtp_client import SMTPClient, SMTPConfig, SMTPMessage
+
+CONFIG = SMTPConfig(server="smtp.test", port=587, username="user@test", password="secret")
+
+
+@pytest.fixture
+def client():
+    client = SMTPClient(max_workers=2, pool_size=2, idle_timeout=60.0)
+    yield client
+    client.shutdown()
+
+
+def _healthy_session() -> MagicMock:
+    session = MagicMock()
+    session.noop.return_value = (250, b"OK")
+    return session
 
 
 @pytest.mark.asyncio
 @patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
-async def test_smtp_client_sends_email(smtp_cls: MagicMock):
-    smtp_instance = smtp_cls.return_value.__enter__.return_value
+async def test_smtp_client_sends_email(smtp_cls: MagicMock, client):
+    smtp_instance = smtp_cls.return_value
 
-    client = SMTPClient()
-    config = SMTPConfig(server="smtp.test", port=587, username="user@test", password="secret")
-    await client.send_email(config, ["dest@test"], "Subject", "<p>Hello</p>")
+    message_id = await client.send_email(CONFIG, ["dest@test"], "Subject", "<p>Hello</p>")
 
     smtp_instance.starttls.assert_called_once()
     smtp_instance.login.assert_called_once_with("user@test", "secret")
     smtp_instance.send_message.assert_called_once()
+    assert message_id.endswith("@test>")
 
 
 @pytest.mark.asyncio
@@ -26,3 +42,88 @@ async def test_smtp_client_validates_configuration():
 
     with pytest.raises(ValueError):
         await client.send_email(config, ["dest@test"], "Subject", "<p>Hello</p>")
+
+
+@pytest.mark.asyncio
+@patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
+async def test_sessions_are_reused_on_worker_threads(smtp_cls: MagicMock, client):
+    session = _healthy_session()
+    smtp_cls.return_value = session
+    threads = set()
+    session.send_message.side_effect = lambda msg: threads.add(threading.current_thread().name)
+
+    await client.send_email(CONFIG, ["a@test"], "One", "<p>1</p>")
+    results = await client.send_many(
+        CONFIG, [SMTPMessage(("b@test",), "Two", "<p>2</p>"), SMTPMessage(("c@test",), "Three", "<p>3</p>")]
+    )
+
+    assert len(results) == 2 and all(isinstance(result, str) for result in results)
+    assert smtp_cls.call_count == 1
+    session.login.assert_called_once()
+    session.noop.assert_called_once()  # health check before the second checkout only
+    assert session.send_message.call_count == 3
+    assert all(name.startswith("smtp") for name in threads)
+
+
+@pytest.mark.asyncio
+@patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
+async def test_stale_sessions_reconnect(smtp_cls: MagicMock, client):
+    dead, dropped, fresh = _healthy_session(), _healthy_session(), _healthy_session()
+    dead.noop.side_effect = smtplib.SMTPServerDisconnected()
+    dropped.send_message.side_effect = [None, smtplib.SMTPServerDisconnected()]
+    smtp_cls.side_effect = [dead, dropped, fresh]
+
+    await client.send_email(CONFIG, ["a@test"], "One", "<p>1</p>")  # opens ``dead``
+    # ``dead`` fails its NOOP; ``dropped`` is opened, pooled, then drops after the NOOP.
+    await client.send_email(CONFIG, ["a@test"], "Two", "<p>2</p>")
+    await client.send_email(CONFIG, ["a@test"], "Three", "<p>3</p>")
+
+    assert smtp_cls.call_count == 3
+    dead.close.assert_called()
+    fresh.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
+async def test_idle_sessions_are_evicted(smtp_cls: MagicMock, client):
+    first, second = _healthy_session(), _healthy_session()
+    smtp_cls.side_effect = [first, second]
+    client.idle_timeout = 0.0
+
+    await client.send_email(CONFIG, ["a@test"], "One", "<p>1</p>")
+    await client.send_email(CONFIG, ["a@test"], "Two", "<p>2</p>")
+
+    first.quit.assert_called_once()
+    first.noop.assert_not_called()
+    second.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
+async def test_one_failed_message_does_not_stop_the_batch(smtp_cls: MagicMock, client):
+    first, second = _healthy_session(), _healthy_session()
+    first.send_message.side_effect = smtplib.SMTPRecipientsRefused({"bad@test": (550, b"unknown")})
+    smtp_cls.side_effect = [first, second]
+
+    results = await client.send_many(
+        CONFIG, [SMTPMessage(("bad@test",), "One", "<p>1</p>"), SMTPMessage(("ok@test",), "Two", "<p>2</p>")]
+    )
+
+    assert isinstance(results[0], smtplib.SMTPRecipientsRefused)
+    assert isinstance(results[1], str)
+    second.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("api.src.infrastructure.email.smtp_client.smtplib.SMTP")
+async def test_authentication_failure_fails_every_message(smtp_cls: MagicMock, client):
+    smtp_cls.return_value.login.side_effect = smtplib.SMTPAuthenticationError(535, b"bad credentials")
+
+    results = await client.send_many(
+        CONFIG, [SMTPMessage(("a@test",), "One", "<p>1</p>"), SMTPMessage(("b@test",), "Two", "<p>2</p>")]
+    )
+
+    assert smtp_cls.call_count == 1
+    assert all(isinstance(result, smtplib.SMTPAuthenticationError) for result in results)
+    with pytest.raises(smtplib.SMTPAuthenticationError):
+        await client.send_email(CONFIG, ["a@test"], "Three", "<p>3</p>")
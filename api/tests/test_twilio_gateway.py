@@ -0,0 +1,81 @@
+"""Tests for running the synchronous Twilio SDK off the event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from api.src.infrastructure.external import twilio_gateway
+from api.src.infrastructure.external.twilio_gateway import TwilioGateway, TwilioTimeoutError
+
+
+@pytest.fixture
+def gateway():
+    gateway = TwilioGateway(max_concurrency=2, timeout=1.0)
+    yield gateway
+    gateway.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_calls_run_on_bounded_worker_threads(gateway):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def blocking_call(value: int) -> tuple[int, str]:
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return value, threading.current_thread().name
+
+    ticks = 0
+
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    beat = asyncio.create_task(heartbeat())
+    results = await asyncio.gather(*(gateway.run("calls.create", blocking_call, value) for value in range(6)))
+    beat.cancel()
+
+    assert [value for value, _ in results] == list(range(6))
+    assert all(name.startswith("twilio") for _, name in results)
+    assert peak == 2
+    assert ticks > 5  # the loop kept running while the SDK blocked
+
+    if twilio_gateway.twilio_request_duration_metric is not None:
+        samples = twilio_gateway.twilio_request_duration_metric.labels(
+            operation="calls.create", outcome="ok"
+        ).collect()[0].samples
+        assert next(s.value for s in samples if s.name.endswith("_count")) >= 6
+
+
+@pytest.mark.asyncio
+async def test_slow_calls_time_out(gateway):
+    gateway.timeout = 0.05
+    release = threading.Event()
+
+    with pytest.raises(TwilioTimeoutError):
+        await gateway.run("incoming_phone_numbers.list", release.wait, 1)
+    release.set()
+
+
+def test_clients_share_one_http_session_per_account(gateway):
+    first = gateway.client("AC1", "token-a")
+    assert gateway.client("AC1", "token-a") is first
+
+    rotated = gateway.client("AC1", "token-b")
+    other = gateway.client("AC2", "token-a")
+    assert rotated is not first
+    assert rotated.http_client is first.http_client
+    assert other.http_client is not first.http_client
+    assert first.http_client.timeout == 1.0
@@ -0,0 +1,99 @@
+"""Tests for Vapi retries with backoff, Retry-After and breaker coordination."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from api.src.core.settings import get_settings
+from api.src.infrastructure.external import circuit_breaker as cb
+from api.src.infrastructure.external import vapi_client
+from api.src.infrastructure.external.circuit_breaker import InMemoryCircuitStateBackend
+from api.src.infrastructure.external.retry import parse_retry_after
+
+
+@pytest.fixture
+def vapi_responses(monkeypatch):
+    """Serve queued responses to VapiClient and record the methods it sent."""
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "vapi_retry_max_attempts", 3)
+    monkeypatch.setattr(settings, "vapi_retry_backoff_seconds", 0.001)
+    monkeypatch.setattr(settings, "vapi_retry_max_backoff_seconds", 0.001)
+    monkeypatch.setattr(settings, "vapi_retry_deadline_seconds", 5.0)
+    monkeypatch.setattr(settings, "vapi_cache_enabled", False)
+    monkeypatch.setattr(cb, "_breakers", cb.OrderedDict())
+    cb.set_circuit_state_backend(InMemoryCircuitStateBackend())
+
+    queued: list[httpx.Response] = []
+    sent: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        sent.append(request.method)
+        return queued.pop(0)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(vapi_client, "get_http_client", lambda base_url: client)
+    yield queued, sent
+    cb.set_circuit_state_backend(None)
+
+
+@pytest.mark.asyncio
+async def test_get_retries_server_errors(vapi_responses):
+    queued, sent = vapi_responses
+    queued += [httpx.Response(502), httpx.Response(200, json={"id": "call-1"})]
+
+    result = await vapi_client.VapiClient(token="t").get_call("call-1")
+
+    assert result == {"id": "call-1"}
+    assert sent == ["GET", "GET"]
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_on_server_error(vapi_responses):
+    queued, sent = vapi_responses
+    queued += [httpx.Response(502), httpx.Response(200, json={})]
+
+    with pytest.raises(vapi_client.VapiServerError):
+        await vapi_client.VapiClient(token="t")._request("POST", "/assistant", json={})
+
+    assert sent == ["POST"]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_honours_retry_after_within_deadline(vapi_responses):
+    queued, sent = vapi_responses
+    queued += [httpx.Response(429, headers={"Retry-After": "0"}), httpx.Response(200, json={"id": "a"})]
+    assert await vapi_client.VapiClient(token="t").get_assistant("a") == {"id": "a"}
+    assert sent == ["GET", "GET"]
+
+    # A Retry-After beyond the deadline budget gives up instead of sleeping.
+    sent.clear()
+    queued += [httpx.Response(429, headers={"Retry-After": "60"})]
+    with pytest.raises(vapi_client.VapiRateLimitError) as exc_info:
+        await vapi_client.VapiClient(token="t").get_assistant("a")
+    assert exc_info.value.retry_after == 60
+    assert sent == ["GET"]
+
+
+@pytest.mark.asyncio
+async def test_retries_stop_once_the_breaker_opens(vapi_responses, monkeypatch):
+    queued, sent = vapi_responses
+    monkeypatch.setattr(get_settings(), "vapi_retry_max_attempts", 5)
+    monkeypatch.setattr(get_settings(), "circuit_breaker_threshold", 2)
+    queued += [httpx.Response(503) for _ in range(5)]
+
+    with pytest.raises(vapi_client.VapiServerError):
+        await vapi_client.VapiClient(token="t").get_call("call-1")
+
+    assert sent == ["GET", "GET"]
+
+
+def test_parse_retry_after_accepts_seconds_and_dates():
+    now = datetime(2026, 10, 17, 12, 0, tzinfo=timezone.utc)
+    assert parse_retry_after("7") == 7
+    assert parse_retry_after("Sat, 17 Oct 2026 12:00:30 GMT", now=now) == 30
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
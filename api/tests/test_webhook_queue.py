@@ -0,0 +1,140 @@
+"""Tests for the webhook outbox worker (SQLite)."""
+
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from api.src.application.services import webhook_queue
+from api.src.application.services.webhook_queue import WebhookQueueWorker, register_webhook_handler, retry_delay
+from api.src.core.settings import get_settings
+from api.src.infrastructure.persistence.models.webhook_event import WebhookEvent
+from api.src.infrastructure.persistence.repositories.webhook_event_repository import enqueue_webhook_event
+
+
+@pytest.fixture
+def handlers(monkeypatch):
+    monkeypatch.setattr(webhook_queue, "_handlers", {})
+    return webhook_queue._handlers
+
+
+def _worker(session) -> WebhookQueueWorker:
+    factory = async_sessionmaker(session.bind, expire_on_commit=False, class_=AsyncSession)
+    return WebhookQueueWorker(interval_seconds=60, concurrency=2, session_factory=factory)
+
+
+async def _statuses(session) -> dict[str, tuple[str, int]]:
+    session.expire_all()
+    rows = await session.execute(select(WebhookEvent.event_type, WebhookEvent.status, WebhookEvent.attempts))
+    return {event_type: (status, attempts) for event_type, status, attempts in rows.all()}
+
+
+@pytest.mark.asyncio
+async def test_worker_processes_retries_and_dead_letters(sqlite_session, handlers, monkeypatch):
+    monkeypatch.setattr(get_settings(), "webhook_queue_max_attempts", 2)
+    monkeypatch.setattr(get_settings(), "webhook_queue_backoff_seconds", 0.0)
+    seen: list[dict] = []
+
+    async def ok(payload):
+        seen.append(payload)
+
+    async def broken(payload):
+        raise RuntimeError("smtp down")
+
+    register_webhook_handler("test", "ok", ok)
+    register_webhook_handler("test", "broken", broken)
+
+    for event_type in ("ok", "broken", "unknown"):
+        await enqueue_webhook_event(
+            sqlite_session, source="test", event_type=event_type, payload={"type": event_type}, now=webhook_queue._now()
+        )
+    await sqlite_session.commit()
+
+    # Zero backoff: the broken event is retried within the same pass until dead-lettered.
+    await _worker(sqlite_session).run_once()
+
+    assert seen == [{"type": "ok"}]
+    assert await _statuses(sqlite_session) == {
+        "ok": ("done", 1),
+        "broken": ("dead", 2),
+        "unknown": ("dead", 1),
+    }
+    dead = await sqlite_session.scalar(select(WebhookEvent.last_error).where(WebhookEvent.event_type == "broken"))
+    assert "smtp down" in dead
+
+
+@pytest.mark.asyncio
+async def test_failed_event_waits_for_backoff(sqlite_session, handlers, monkeypatch):
+    monkeypatch.setattr(get_settings(), "webhook_queue_backoff_seconds", 60.0)
+
+    async def broken(payload):
+        raise RuntimeError("boom")
+
+    register_webhook_handler("test", "broken", broken)
+    await enqueue_webhook_event(
+        sqlite_session, source="test", event_type="broken", payload={}, now=webhook_queue._now()
+    )
+    await sqlite_session.commit()
+
+    await _worker(sqlite_session).run_once()
+
+    assert await _statuses(sqlite_session) == {"broken": ("pending", 1)}
+
+
+def test_retry_delay_is_bounded_exponential():
+    for attempts in range(1, 12):
+        delay = retry_delay(attempts, base_seconds=5, max_seconds=900)
+        expected = min(900, 5 * 2 ** (attempts - 1))
+        assert expected / 2 <= delay <= expected
+
+
+@pytest.mark.asyncio
+async def test_enqueue_webhook_deduplicates_by_event_key(sqlite_session, monkeypatch):
+    worker = _worker(sqlite_session)
+    monkeypatch.setattr(webhook_queue, "get_webhook_queue_worker", lambda: worker)
+    monkeypatch.setattr(webhook_queue, "_recent_keys", webhook_queue.RecentWebhookKeys(maxsize=8))
+    payload = {"type": "call.ended", "call": {"id": "call-1"}}
+
+    assert await webhook_queue.enqueue_webhook(
+        sqlite_session, source="vapi", event_type="call.ended", event_key="call-1", payload=payload
+    )
+    # Answered by the in-process LRU
+    assert not await webhook_queue.enqueue_webhook(
+        sqlite_session, source="vapi", event_type="call.ended", event_key="call-1", payload=payload
+    )
+    # Another process (empty LRU) hits the unique key instead
+    webhook_queue._recent_keys.clear()
+    assert not await webhook_queue.enqueue_webhook(
+        sqlite_session, source="vapi", event_type="call.ended", event_key="call-1", payload=payload
+    )
+    # Events without a key are never deduplicated
+    assert await webhook_queue.enqueue_webhook(
+        sqlite_session, source="vapi", event_type="call.ended", payload=payload
+    )
+
+    count = await sqlite_session.scalar(select(func.count()).select_from(WebhookEvent))
+    assert count == 2
+
+
+def test_recent_webhook_keys_evicts_least_recently_used():
+    keys = webhook_queue.RecentWebhookKeys(maxsize=2)
+    keys.add(("twilio", "call.status", "a"))
+    keys.add(("twilio", "call.status", "b"))
+    assert ("twilio", "call.status", "a") in keys  # refreshes "a"
+    keys.add(("twilio", "call.status", "c"))
+    assert ("twilio", "call.status", "b") not in keys
+    assert ("twilio", "call.status", "a") in keys
+
+
+def test_twilio_status_history_is_bounded_and_deduplicated():
+    from api.src.presentation.api.v1.routes.webhooks import TWILIO_STATUS_HISTORY_LIMIT, _append_status_history
+
+    history: list = []
+    for index in range(TWILIO_STATUS_HISTORY_LIMIT + 5):
+        entry = {"status": "ringing", "timestamp": str(index)}
+        history = _append_status_history(history, entry)
+        history = _append_status_history(history, entry)
+
+    assert len(history) == TWILIO_STATUS_HISTORY_LIMIT
+    assert history[-1] == {"status": "ringing", "timestamp": str(TWILIO_STATUS_HISTORY_LIMIT + 4)}
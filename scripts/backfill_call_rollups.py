@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Backfill the call_rollups table from existing calls.
+
+Run once after `alembic upgrade head` (and any time rollups need rebuilding),
+then set AVA_API_ANALYTICS_USE_ROLLUPS=true so analytics read the rollups:
+
+    python scripts/backfill_call_rollups.py                 # all history
+    python scripts/backfill_call_rollups.py --days 90       # last 90 days
+    python scripts/backfill_call_rollups.py --tenant <uuid>
+
+Rollups are rebuilt one day at a time, each day in its own transaction, so the
+script can be interrupted and re-run safely.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select  # noqa: E402
+
+from api.src.infrastructure.database.session import SessionLocal  # noqa: E402
+from api.src.infrastructure.persistence.models.call import CallRecord  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_repository import _coerce_tenant_id  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import (  # noqa: E402
+    floor_hour,
+    rebuild_call_rollups,
+)
+
+CHUNK = timedelta(days=1)
+
+
+async def backfill(*, days: int | None, tenant_id: str | None) -> None:
+    tenant_key = _coerce_tenant_id(tenant_id)
+    end = floor_hour(datetime.now(tz=timezone.utc)) + timedelta(hours=1)
+
+    async with SessionLocal() as session:
+        if days is not None:
+            start = end - timedelta(days=days)
+        else:
+            query = select(func.min(CallRecord.started_at))
+            if tenant_key is not None:
+                query = query.where(CallRecord.tenant_id == tenant_key)
+            oldest = (await session.execute(query)).scalar_one_or_none()
+            if oldest is None:
+                print("No calls to backfill.")
+                return
+            start = floor_hour(oldest)
+
+    total = 0
+    cursor = start
+    while cursor < end:
+        chunk_end = min(cursor + CHUNK, end)
+        async with SessionLocal() as session:
+            written = await rebuild_call_rollups(session, start=cursor, end=chunk_end, tenant_id=tenant_key)
+            await session.commit()
+        total += written
+        print(f"{cursor:%Y-%m-%d}: {written} rollup rows")
+        cursor = chunk_end
+
+    print(f"Done: {total} rollup rows written from {start.isoformat()} to {end.isoformat()}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=None, help="Only rebuild the last N days")
+    parser.add_argument("--tenant", default=None, help="Only rebuild one tenant (UUID)")
+    args = parser.parse_args()
+    asyncio.run(backfill(days=args.days, tenant_id=args.tenant))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Backfill the call_topics table from existing calls.
+
+Run once after `alembic upgrade head` (and after changing a stopword list),
+then set AVA_API_ANALYTICS_USE_TOPIC_INDEX=true so trending topics read the index:
+
+    python scripts/backfill_call_topics.py                  # last 14 days (the trending window)
+    python scripts/backfill_call_topics.py --days 90        # last 90 days
+    python scripts/backfill_call_topics.py --all            # all history
+    python scripts/backfill_call_topics.py --tenant <uuid>
+
+Topics are rebuilt one day at a time, each day in its own transaction, so the
+script can be interrupted and re-run safely.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import func, select  # noqa: E402
+
+from api.src.infrastructure.database.session import SessionLocal  # noqa: E402
+from api.src.infrastructure.persistence.models.call import CallRecord  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_repository import _coerce_tenant_id  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_rollup_repository import floor_hour  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_topic_repository import rebuild_call_topics  # noqa: E402
+
+CHUNK = timedelta(days=1)
+
+
+async def backfill(*, days: int | None, tenant_id: str | None) -> None:
+    tenant_key = _coerce_tenant_id(tenant_id)
+    end = floor_hour(datetime.now(tz=timezone.utc)) + timedelta(hours=1)
+
+    async with SessionLocal() as session:
+        if days is not None:
+            start = end - timedelta(days=days)
+        else:
+            query = select(func.min(CallRecord.started_at))
+            if tenant_key is not None:
+                query = query.where(CallRecord.tenant_id == tenant_key)
+            oldest = (await session.execute(query)).scalar_one_or_none()
+            if oldest is None:
+                print("No calls to backfill.")
+                return
+            start = floor_hour(oldest)
+
+    total = 0
+    cursor = start
+    while cursor < end:
+        chunk_end = min(cursor + CHUNK, end)
+        async with SessionLocal() as session:
+            written = await rebuild_call_topics(session, start=cursor, end=chunk_end, tenant_id=tenant_key)
+            await session.commit()
+        total += written
+        print(f"{cursor:%Y-%m-%d}: {written} topic rows")
+        cursor = chunk_end
+
+    print(f"Done: {total} topic rows written from {start.isoformat()} to {end.isoformat()}.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=14, help="Only rebuild the last N days (default 14)")
+    parser.add_argument("--all", action="store_true", help="Rebuild all history")
+    parser.add_argument("--tenant", default=None, help="Only rebuild one tenant (UUID)")
+    args = parser.parse_args()
+    asyncio.run(backfill(days=None if args.all else args.days, tenant_id=args.tenant))
+
+
+if __name__ == "__main__":
+    main()
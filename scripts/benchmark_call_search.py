@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark transcript search (GET /calls/search) on a synthetic tenant.
+
+Needs a PostgreSQL database migrated to head (AVA_API_DATABASE_URL). The script
+creates a throwaway tenant with N calls of random French call-centre vocabulary,
+times a few queries through ``search_calls``, prints the plan of the first one,
+and deletes the tenant (calls cascade) at the end:
+
+    python scripts/benchmark_call_search.py                    # 100k calls
+    python scripts/benchmark_call_search.py --calls 500000 --runs 50
+    python scripts/benchmark_call_search.py --keep             # leave the data for manual EXPLAINs
+
+Do not run it against production: the insert and the GIN index updates are heavy.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import text  # noqa: E402
+
+from api.src.infrastructure.database.session import SessionLocal, dispose_engines  # noqa: E402
+from api.src.infrastructure.persistence.models.studio_config import StudioConfig  # noqa: E402
+from api.src.infrastructure.persistence.models.tenant import Tenant  # noqa: E402
+from api.src.infrastructure.persistence.repositories.call_search_repository import search_calls  # noqa: E402
+
+VOCABULARY = (
+    "bonjour rendez-vous plombier fuite facture rappel urgent livraison commande annulation "
+    "remboursement adresse horaires disponible demain semaine prochaine matin après-midi devis "
+    "intervention chaudière chauffage électricien panne compteur contrat abonnement paiement "
+    "retard colis numéro téléphone message secrétariat consultation docteur ordonnance vaccin "
+    "réservation table restaurant menu allergie anniversaire groupe terrasse parking accès"
+).split()
+QUERIES = ("plombier fuite", '"facture remboursement"', "chaudière -devis", "rendez-vous or réservation", "ordonnance")
+
+INSERT_CALLS = text(
+    """
+    INSERT INTO calls (id, assistant_id, tenant_id, status, started_at, meta, transcript, search_config)
+    SELECT
+        'bench-' || :run || '-' || g,
+        'bench',
+        :tenant_id,
+        CASE WHEN g % 20 = 0 THEN 'failed' ELSE 'ended' END,
+        now() - make_interval(mins => g),
+        '{}'::json,
+        (
+            SELECT string_agg(vocab[1 + floor(random() * array_length(vocab, 1))::int], ' ')
+            FROM generate_series(1, :words + g * 0)
+        ),
+        'french'::regconfig
+    FROM generate_series(:first, :last) AS g, (SELECT CAST(:vocab AS text[]) AS vocab) AS v
+    """
+)
+
+
+async def seed(tenant_id: uuid.UUID, *, calls: int, words: int, batch: int) -> None:
+    run = uuid.uuid4().hex[:8]
+    async with SessionLocal() as session:
+        session.add(Tenant(id=tenant_id, name="search benchmark"))
+        # The tenant's language picks the query configuration, as in production.
+        session.add(StudioConfig(user_id=str(tenant_id), language="fr"))
+        await session.commit()
+    for first in range(1, calls + 1, batch):
+        last = min(first + batch - 1, calls)
+        async with SessionLocal() as session:
+            await session.execute(
+                INSERT_CALLS,
+                {
+                    "run": run,
+                    "tenant_id": tenant_id,
+                    "words": words,
+                    "first": first,
+                    "last": last,
+                    "vocab": list(VOCABULARY),
+                },
+            )
+            await session.commit()
+        print(f"  inserted {last}/{calls}")
+    async with SessionLocal() as session:
+        await session.execute(text("ANALYZE calls"))
+        await session.commit()
+
+
+async def explain(tenant_id: uuid.UUID, query: str) -> None:
+    async with SessionLocal() as session:
+        plan = await session.execute(
+            text(
+                """
+                EXPLAIN (ANALYZE, BUFFERS)
+                SELECT id, ts_rank_cd(search_vector, q) AS rank
+                FROM calls, websearch_to_tsquery('french', :query) AS q
+                WHERE tenant_id = :tenant_id AND search_vector @@ q
+                ORDER BY rank DESC LIMIT 20
+                """
+            ),
+            {"query": query, "tenant_id": tenant_id},
+        )
+        print("\n".join(row[0] for row in plan))
+
+
+async def benchmark(*, calls: int, words: int, runs: int, batch: int, keep: bool) -> None:
+    tenant_id = uuid.uuid4()
+    print(f"Seeding {calls} calls of {words} words for tenant {tenant_id}…")
+    started = time.perf_counter()
+    await seed(tenant_id, calls=calls, words=words, batch=batch)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    try:
+        for query in QUERIES:
+            timings = []
+            async with SessionLocal() as session:
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    results = await search_calls(session, tenant_id=tenant_id, query=query, limit=20)
+                    timings.append((time.perf_counter() - started) * 1000)
+            timings.sort()
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{query!r:32} {len(results):>3} results  "
+                f"p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms  max {timings[-1]:7.2f} ms"
+            )
+        print()
+        await explain(tenant_id, QUERIES[0])
+    finally:
+        if not keep:
+            async with SessionLocal() as session:
+                await session.execute(text("DELETE FROM tenants WHERE id = :tenant_id"), {"tenant_id": tenant_id})
+                await session.execute(
+                    text("DELETE FROM studio_configs WHERE user_id = :user_id"), {"user_id": str(tenant_id)}
+                )
+                await session.commit()
+        await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000, help="Synthetic calls to insert (default 100000)")
+    parser.add_argument("--words", type=int, default=120, help="Words per transcript (default 120)")
+    parser.add_argument("--runs", type=int, default=20, help="Timed runs per query (default 20)")
+    parser.add_argument("--batch", type=int, default=20_000, help="Calls inserted per transaction")
+    parser.add_argument("--keep", action="store_true", help="Keep the synthetic tenant and calls")
+    args = parser.parse_args()
+    asyncio.run(benchmark(calls=args.calls, words=args.words, runs=args.runs, batch=args.batch, keep=args.keep))
+
+
+if __name__ == "__main__":
+    main()